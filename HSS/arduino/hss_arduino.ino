@@ -5,6 +5,17 @@
  * Step motorları, lazeri ve fanları kontrol eder.
  * Sıcaklık sensöründen veri okur.
  * Acil durdurma butonunu izler.
+ *
+ * İletişim satır tabanlı JSON ile başlar. Raspberry Pi {"type":"protocol","mode":"binary"}
+ * gönderirse yanıttan sonra ikili protokole geçilir:
+ *   [tip: uint8][sıra: uint16 LE][gövde][CRC16-CCITT: uint16 LE], COBS ile kodlanır,
+ *   0x00 ile sonlandırılır. Sıra numarası 0 olan komutlara yanıt verilmez.
+ * Mesaj düzenleri control/binary_protocol.py ile aynıdır.
+ *
+ * Yörünge komutu (hedef pozisyon, varış süresi) noktalarını kuyruğa alır.
+ * Noktalar sırayla, iki eksen noktaya aynı anda ulaşacak hızlarda yürütülür;
+ * kuyruk bittiğinde ilk komutun ID'siyle trajectory_done gönderilir. Başka bir
+ * hareket komutu, durdurma veya acil durum yörüngeyi keser (completed=false).
  */
 
 #include <ArduinoJson.h>
@@ -49,10 +60,52 @@ float currentVerticalPos = 0.0;
 float targetHorizontalPos = 0.0;
 float targetVerticalPos = 0.0;
 
+// Yörünge kuyruğu (halka tampon: hedef pozisyonlar ve varış süreleri)
+const int TRAJECTORY_CAPACITY = 32;
+const float POSITION_TOLERANCE = 360.0 / STEPS_PER_REVOLUTION / 2;  // Yarım adım (derece)
+float trajectoryH[TRAJECTORY_CAPACITY];
+float trajectoryV[TRAJECTORY_CAPACITY];
+uint16_t trajectoryDuration[TRAJECTORY_CAPACITY];  // milisaniye
+int trajectoryHead = 0;
+int trajectoryCount = 0;
+uint16_t trajectoryId = 0;
+bool trajectoryActive = false;
+
 // Lazer zaman aşımı
 unsigned long laserActivationTime = 0;
 unsigned long laserTimeout = 2000;  // milisaniye
 
+// İkili protokol
+const uint8_t MSG_MOTOR = 0x01;
+const uint8_t MSG_MOTOR_STOP = 0x02;
+const uint8_t MSG_LASER = 0x03;
+const uint8_t MSG_FAN = 0x04;
+const uint8_t MSG_STATUS_REQUEST = 0x05;
+const uint8_t MSG_EMERGENCY_STOP = 0x06;
+const uint8_t MSG_EMERGENCY_RESET = 0x07;
+const uint8_t MSG_CALIBRATE = 0x08;
+const uint8_t MSG_TRAJECTORY = 0x09;
+const uint8_t MSG_JSON_ENVELOPE = 0x7F;
+const uint8_t MSG_RESPONSE = 0x80;
+const uint8_t MSG_STATUS = 0x81;
+const uint8_t MSG_ERROR = 0x82;
+const uint8_t MSG_STATUS_MESSAGE = 0x83;
+const uint8_t MSG_TRAJECTORY_DONE = 0x84;
+
+const uint8_t TRAJECTORY_APPEND = 0x01;
+const int TRAJECTORY_POINT_SIZE = 10;  // yatay (float), dikey (float), süre (uint16 ms)
+
+const uint8_t STATUS_LASER_ACTIVE = 0x01;
+const uint8_t STATUS_FAN_ACTIVE = 0x02;
+const uint8_t STATUS_EMERGENCY_STOP = 0x04;
+
+const int MAX_FRAME_SIZE = 200;
+
+bool binaryMode = false;
+uint8_t rxFrame[MAX_FRAME_SIZE];
+int rxLength = 0;
+bool rxOverflow = false;
+
 void setup() {
   // Seri port başlat
   Serial.begin(115200);
@@ -100,6 +153,15 @@ void loop() {
 }
 
 void readCommands() {
+  if (binaryMode) {
+    readBinaryCommands();
+  }
+  else {
+    readJsonCommands();
+  }
+}
+
+void readJsonCommands() {
   if (Serial.available()) {
     // JSON verisini oku
     StaticJsonDocument<256> doc;
@@ -110,77 +172,303 @@ void readCommands() {
       return;
     }
     
-    // Komut tipini al
-    const char* commandType = doc["type"];
+    // Komut ID'si varsa sakla (yanıt için, 0: yanıt yok)
+    uint16_t commandId = doc["id"] | 0;
     
-    // Komut ID'si varsa sakla (yanıt için)
-    String commandId = "";
-    if (doc.containsKey("id")) {
-      commandId = doc["id"].as<String>();
-    }
+    handleJsonCommand(doc, commandId);
+  }
+}
+
+void readBinaryCommands() {
+  // Bekleyen tüm baytları oku, 0x00 geldiğinde çerçeveyi işle
+  while (Serial.available()) {
+    uint8_t b = Serial.read();
     
-    // Komut tipine göre işlem yap
-    if (strcmp(commandType, "motor") == 0) {
-      handleMotorCommand(doc, commandId);
+    if (b == 0) {
+      if (!rxOverflow && rxLength > 0) {
+        handleBinaryFrame(rxFrame, rxLength);
+      }
+      rxLength = 0;
+      rxOverflow = false;
     }
-    else if (strcmp(commandType, "laser") == 0) {
-      handleLaserCommand(doc, commandId);
+    else if (rxLength < MAX_FRAME_SIZE) {
+      rxFrame[rxLength++] = b;
     }
-    else if (strcmp(commandType, "fan") == 0) {
-      handleFanCommand(doc, commandId);
+    else {
+      // Çerçeve çok uzun, sonlandırıcıya kadar atla
+      rxOverflow = true;
     }
-    else if (strcmp(commandType, "status") == 0) {
-      sendStatusUpdate();
+  }
+}
+
+void handleJsonCommand(const JsonDocument& doc, uint16_t commandId) {
+  // Komut tipini al
+  const char* commandType = doc["type"] | "";
+  
+  // Komut tipine göre işlem yap
+  if (strcmp(commandType, "motor") == 0) {
+    handleMotorCommand(commandId, doc["horizontal"] | targetHorizontalPos,
+                       doc["vertical"] | targetVerticalPos, doc["speed"] | 0);
+  }
+  else if (strcmp(commandType, "trajectory") == 0) {
+    // {"type":"trajectory","append":false,"points":[[yatay,dikey,süre_ms],...]}
+    JsonArrayConst points = doc["points"].as<JsonArrayConst>();
+    if (beginTrajectory(commandId, doc["append"] | false, points.size())) {
+      for (JsonArrayConst point : points) {
+        queueTrajectoryPoint(point[0].as<float>(), point[1].as<float>(), point[2].as<unsigned int>());
+      }
+      sendCommandResponse(commandId, true, "Yörünge alındı");
+    }
+  }
+  else if (strcmp(commandType, "motor_stop") == 0) {
+    stopMotors();
+    sendCommandResponse(commandId, true, "Motorlar durduruldu");
+  }
+  else if (strcmp(commandType, "laser") == 0) {
+    float duration = doc["duration"] | 0.0;
+    handleLaserCommand(commandId, doc["state"] | false, (unsigned long)(duration * 1000));
+  }
+  else if (strcmp(commandType, "fan") == 0) {
+    handleFanCommand(commandId, doc["state"] | false);
+  }
+  else if (strcmp(commandType, "status") == 0) {
+    sendStatusUpdate();
+  }
+  else if (strcmp(commandType, "emergency_stop") == 0) {
+    emergencyStop = doc["stop"] | true;
+    if (emergencyStop) {
+      abortTrajectory();
     }
-    else if (strcmp(commandType, "emergency_stop") == 0) {
-      emergencyStop = doc["stop"];
-      sendCommandResponse(commandId, true, "Acil durdurma uygulandı");
+    sendCommandResponse(commandId, true, "Acil durdurma uygulandı");
+  }
+  else if (strcmp(commandType, "emergency_reset") == 0) {
+    emergencyStop = false;
+    sendCommandResponse(commandId, true, "Acil durum sıfırlandı");
+  }
+  else if (strcmp(commandType, "calibrate_motors") == 0) {
+    calibrateMotors(commandId);
+  }
+  else if (strcmp(commandType, "protocol") == 0) {
+    // Yanıt eski protokolle gönderilir, sonraki mesajlar yeni protokolle
+    const char* mode = doc["mode"] | "";
+    if (strcmp(mode, "binary") == 0 || strcmp(mode, "json") == 0) {
+      sendCommandResponse(commandId, true, "Protokol değiştirildi");
+      binaryMode = (strcmp(mode, "binary") == 0);
+      rxLength = 0;
+      rxOverflow = false;
+    }
+    else {
+      sendCommandResponse(commandId, false, "Bilinmeyen protokol");
     }
-    else if (strcmp(commandType, "emergency_reset") == 0) {
+  }
+  else {
+    sendErrorMessage("Bilinmeyen komut tipi");
+  }
+}
+
+void handleBinaryFrame(uint8_t* frame, int length) {
+  // COBS çöz (yerinde), CRC doğrula
+  int payloadLength = cobsDecode(frame, length, frame);
+  if (payloadLength < 5) {
+    sendErrorMessage("Geçersiz çerçeve");
+    return;
+  }
+  
+  uint16_t receivedCrc = frame[payloadLength - 2] | (frame[payloadLength - 1] << 8);
+  if (crc16(frame, payloadLength - 2) != receivedCrc) {
+    sendErrorMessage("CRC hatası");
+    return;
+  }
+  
+  uint8_t type = frame[0];
+  uint16_t commandId = frame[1] | (frame[2] << 8);
+  const uint8_t* body = frame + 3;
+  int bodyLength = payloadLength - 5;
+  
+  switch (type) {
+    case MSG_MOTOR:
+      if (bodyLength == 9) {
+        float horizontal, vertical;
+        memcpy(&horizontal, body, 4);
+        memcpy(&vertical, body + 4, 4);
+        handleMotorCommand(commandId, horizontal, vertical, body[8]);
+        return;
+      }
+      break;
+    case MSG_TRAJECTORY:
+      if (bodyLength >= 2 && bodyLength == 2 + body[1] * TRAJECTORY_POINT_SIZE) {
+        if (beginTrajectory(commandId, body[0] & TRAJECTORY_APPEND, body[1])) {
+          for (int i = 0; i < body[1]; i++) {
+            const uint8_t* point = body + 2 + i * TRAJECTORY_POINT_SIZE;
+            float horizontal, vertical;
+            memcpy(&horizontal, point, 4);
+            memcpy(&vertical, point + 4, 4);
+            queueTrajectoryPoint(horizontal, vertical, point[8] | (point[9] << 8));
+          }
+          sendCommandResponse(commandId, true, "Yörünge alındı");
+        }
+        return;
+      }
+      break;
+    case MSG_MOTOR_STOP:
+      stopMotors();
+      sendCommandResponse(commandId, true, "Motorlar durduruldu");
+      return;
+    case MSG_LASER:
+      if (bodyLength == 3) {
+        handleLaserCommand(commandId, body[0] != 0, body[1] | (body[2] << 8));
+        return;
+      }
+      break;
+    case MSG_FAN:
+      if (bodyLength == 1) {
+        handleFanCommand(commandId, body[0] != 0);
+        return;
+      }
+      break;
+    case MSG_STATUS_REQUEST:
+      sendStatusUpdate();
+      return;
+    case MSG_EMERGENCY_STOP:
+      if (bodyLength == 1) {
+        emergencyStop = body[0] != 0;
+        if (emergencyStop) {
+          abortTrajectory();
+        }
+        sendCommandResponse(commandId, true, "Acil durdurma uygulandı");
+        return;
+      }
+      break;
+    case MSG_EMERGENCY_RESET:
       emergencyStop = false;
       sendCommandResponse(commandId, true, "Acil durum sıfırlandı");
-    }
-    else if (strcmp(commandType, "calibrate_motors") == 0) {
+      return;
+    case MSG_CALIBRATE:
       calibrateMotors(commandId);
+      return;
+    case MSG_JSON_ENVELOPE: {
+      // İkili karşılığı olmayan komut: JSON metni, ID başlıkta
+      StaticJsonDocument<256> doc;
+      if (deserializeJson(doc, (const char*)body, bodyLength)) {
+        sendErrorMessage("JSON çözümleme hatası");
+        return;
+      }
+      handleJsonCommand(doc, commandId);
+      return;
     }
-    else {
+    default:
       sendErrorMessage("Bilinmeyen komut tipi");
-    }
+      return;
   }
+  
+  sendErrorMessage("Geçersiz mesaj uzunluğu");
 }
 
-void handleMotorCommand(const JsonDocument& doc, String commandId) {
+void handleMotorCommand(uint16_t commandId, float horizontal, float vertical, int speed) {
   if (emergencyStop) {
     sendCommandResponse(commandId, false, "Acil durum aktif, motorlar kilitli");
     return;
   }
   
-  if (doc.containsKey("horizontal")) {
-    targetHorizontalPos = doc["horizontal"];
+  abortTrajectory();
+  targetHorizontalPos = horizontal;
+  targetVerticalPos = vertical;
+  
+  // Hız 0 ise mevcut hız korunur
+  if (speed > 0) {
+    stepperH.setSpeed(speed);
+    stepperV.setSpeed(speed);
+  }
+  
+  sendMotorResponse(commandId);
+}
+
+bool beginTrajectory(uint16_t commandId, bool append, int count) {
+  if (emergencyStop) {
+    sendCommandResponse(commandId, false, "Acil durum aktif, motorlar kilitli");
+    return false;
   }
   
-  if (doc.containsKey("vertical")) {
-    targetVerticalPos = doc["vertical"];
+  if (append && !trajectoryActive) {
+    sendCommandResponse(commandId, false, "Aktif yörünge yok");
+    return false;
   }
   
-  int speed = 60;
-  if (doc.containsKey("speed")) {
-    speed = doc["speed"];
-    stepperH.setSpeed(speed);
-    stepperV.setSpeed(speed);
+  int freeSlots = TRAJECTORY_CAPACITY - (append ? trajectoryCount : 0);
+  if (count > freeSlots) {
+    sendCommandResponse(commandId, false, "Yörünge kuyruğu dolu");
+    return false;
+  }
+  
+  if (!append) {
+    // Yeni yörünge mevcut konumdan başlar
+    abortTrajectory();
+    targetHorizontalPos = currentHorizontalPos;
+    targetVerticalPos = currentVerticalPos;
+    trajectoryId = commandId;
+    trajectoryActive = true;
   }
   
-  sendCommandResponse(commandId, true, "Motor komutu alındı");
+  return true;
+}
+
+void queueTrajectoryPoint(float horizontal, float vertical, uint16_t durationMs) {
+  int index = (trajectoryHead + trajectoryCount) % TRAJECTORY_CAPACITY;
+  trajectoryH[index] = horizontal;
+  trajectoryV[index] = vertical;
+  trajectoryDuration[index] = durationMs > 0 ? durationMs : 1;
+  trajectoryCount++;
 }
 
-void handleLaserCommand(const JsonDocument& doc, String commandId) {
+void advanceTrajectory() {
+  if (!trajectoryActive) {
+    return;
+  }
+  
+  // Etkin noktaya varılmadıysa bekle
+  if (abs(targetHorizontalPos - currentHorizontalPos) > POSITION_TOLERANCE ||
+      abs(targetVerticalPos - currentVerticalPos) > POSITION_TOLERANCE) {
+    return;
+  }
+  
+  if (trajectoryCount == 0) {
+    trajectoryActive = false;
+    sendTrajectoryDone(trajectoryId, true);
+    return;
+  }
+  
+  float horizontal = trajectoryH[trajectoryHead];
+  float vertical = trajectoryV[trajectoryHead];
+  float seconds = trajectoryDuration[trajectoryHead] / 1000.0;
+  trajectoryHead = (trajectoryHead + 1) % TRAJECTORY_CAPACITY;
+  trajectoryCount--;
+  
+  // Eksen hızları: iki eksen noktaya aynı anda ulaşır (RPM = derece/saniye / 6)
+  long speedH = (long)(abs(horizontal - currentHorizontalPos) / seconds / 6.0 + 0.5);
+  long speedV = (long)(abs(vertical - currentVerticalPos) / seconds / 6.0 + 0.5);
+  stepperH.setSpeed(speedH > 0 ? speedH : 1);
+  stepperV.setSpeed(speedV > 0 ? speedV : 1);
+  
+  targetHorizontalPos = horizontal;
+  targetVerticalPos = vertical;
+}
+
+void abortTrajectory() {
+  trajectoryHead = 0;
+  trajectoryCount = 0;
+  
+  if (trajectoryActive) {
+    trajectoryActive = false;
+    sendTrajectoryDone(trajectoryId, false);
+  }
+}
+
+void handleLaserCommand(uint16_t commandId, bool state, unsigned long durationMs) {
   if (emergencyStop) {
     sendCommandResponse(commandId, false, "Acil durum aktif, lazer devre dışı");
     return;
   }
   
-  bool state = doc["state"];
-  
   if (state) {
     // Lazeri aktifleştir
     digitalWrite(LASER_PIN, HIGH);
@@ -188,9 +476,8 @@ void handleLaserCommand(const JsonDocument& doc, String commandId) {
     laserActivationTime = millis();
     
     // Zaman aşımını ayarla (varsa)
-    if (doc.containsKey("duration")) {
-      float duration = doc["duration"];
-      laserTimeout = (unsigned long)(duration * 1000);
+    if (durationMs > 0) {
+      laserTimeout = durationMs;
     }
     
     sendCommandResponse(commandId, true, "Lazer aktifleştirildi");
@@ -203,9 +490,7 @@ void handleLaserCommand(const JsonDocument& doc, String commandId) {
   }
 }
 
-void handleFanCommand(const JsonDocument& doc, String commandId) {
-  bool state = doc["state"];
-  
+void handleFanCommand(uint16_t commandId, bool state) {
   if (state) {
     // Fanları aktifleştir
     digitalWrite(FAN_PIN, HIGH);
@@ -220,13 +505,14 @@ void handleFanCommand(const JsonDocument& doc, String commandId) {
   }
 }
 
-void calibrateMotors(String commandId) {
+void calibrateMotors(uint16_t commandId) {
   if (emergencyStop) {
     sendCommandResponse(commandId, false, "Acil durum aktif, kalibrasyon yapılamıyor");
     return;
   }
   
   // Motorları sıfır konumuna getir
+  abortTrajectory();
   targetHorizontalPos = 0.0;
   targetVerticalPos = 0.0;
   
@@ -249,11 +535,15 @@ void checkEmergencyStop() {
     stopMotors();
     
     sendStatusMessage("Acil durum butonu basıldı");
+    
+    // Pi'deki güvenlik izleyicisi bir sonraki periyodik durumu beklemeden tepki versin
+    sendStatusUpdate();
   }
 }
 
 void stopMotors() {
   // Motorları mevcut konumlarında durdur
+  abortTrajectory();
   targetHorizontalPos = currentHorizontalPos;
   targetVerticalPos = currentVerticalPos;
 }
@@ -263,6 +553,9 @@ void controlMotors() {
     return;
   }
   
+  // Yörünge varsa sıradaki noktaya geç
+  advanceTrajectory();
+  
   // Yatay motor kontrolü
   if (targetHorizontalPos != currentHorizontalPos) {
     // Farkı hesapla
@@ -320,6 +613,18 @@ void readTemperature() {
 }
 
 void sendStatusUpdate() {
+  if (binaryMode) {
+    uint8_t body[13];
+    memcpy(body, &currentTemperature, 4);
+    memcpy(body + 4, &currentHorizontalPos, 4);
+    memcpy(body + 8, &currentVerticalPos, 4);
+    body[12] = (laserActive ? STATUS_LASER_ACTIVE : 0) |
+               (fanActive ? STATUS_FAN_ACTIVE : 0) |
+               (emergencyStop ? STATUS_EMERGENCY_STOP : 0);
+    sendBinaryFrame(MSG_STATUS, 0, body, sizeof(body));
+    return;
+  }
+  
   StaticJsonDocument<256> doc;
   
   doc["type"] = "status";
@@ -334,8 +639,14 @@ void sendStatusUpdate() {
   Serial.println();
 }
 
-void sendCommandResponse(String commandId, bool success, const char* message) {
-  if (commandId.length() == 0) {
+void sendCommandResponse(uint16_t commandId, bool success, const char* message) {
+  if (commandId == 0) {
+    return;
+  }
+  
+  if (binaryMode) {
+    uint8_t body[1] = { (uint8_t)(success ? 1 : 0) };
+    sendBinaryFrame(MSG_RESPONSE, commandId, body, sizeof(body));
     return;
   }
   
@@ -349,7 +660,57 @@ void sendCommandResponse(String commandId, bool success, const char* message) {
   Serial.println();
 }
 
+// Motor onayı komut alındığı andaki ölçülen pozisyonu taşır; Pi takip
+// hedeflerini durum mesajlarını beklemeden bu pozisyona göre hesaplar
+void sendMotorResponse(uint16_t commandId) {
+  if (commandId == 0) {
+    return;
+  }
+  
+  if (binaryMode) {
+    uint8_t body[9];
+    body[0] = 1;
+    memcpy(body + 1, &currentHorizontalPos, 4);
+    memcpy(body + 5, &currentVerticalPos, 4);
+    sendBinaryFrame(MSG_RESPONSE, commandId, body, sizeof(body));
+    return;
+  }
+  
+  StaticJsonDocument<256> doc;
+  
+  doc["id"] = commandId;
+  doc["status"] = "success";
+  doc["message"] = "Motor komutu alındı";
+  doc["horizontal_pos"] = currentHorizontalPos;
+  doc["vertical_pos"] = currentVerticalPos;
+  
+  serializeJson(doc, Serial);
+  Serial.println();
+}
+
+void sendTrajectoryDone(uint16_t id, bool completed) {
+  if (binaryMode) {
+    uint8_t body[3] = { (uint8_t)(id & 0xFF), (uint8_t)(id >> 8), (uint8_t)(completed ? 1 : 0) };
+    sendBinaryFrame(MSG_TRAJECTORY_DONE, 0, body, sizeof(body));
+    return;
+  }
+  
+  StaticJsonDocument<128> doc;
+  
+  doc["type"] = "trajectory_done";
+  doc["trajectory"] = id;
+  doc["completed"] = completed;
+  
+  serializeJson(doc, Serial);
+  Serial.println();
+}
+
 void sendErrorMessage(const char* message) {
+  if (binaryMode) {
+    sendBinaryFrame(MSG_ERROR, 0, (const uint8_t*)message, strlen(message));
+    return;
+  }
+  
   StaticJsonDocument<256> doc;
   
   doc["type"] = "error";
@@ -360,6 +721,11 @@ void sendErrorMessage(const char* message) {
 }
 
 void sendStatusMessage(const char* message) {
+  if (binaryMode) {
+    sendBinaryFrame(MSG_STATUS_MESSAGE, 0, (const uint8_t*)message, strlen(message));
+    return;
+  }
+  
   StaticJsonDocument<256> doc;
   
   doc["type"] = "status_message";
@@ -367,4 +733,83 @@ void sendStatusMessage(const char* message) {
   
   serializeJson(doc, Serial);
   Serial.println();
-} 
\ No newline at end of file
+}
+
+uint16_t crc16(const uint8_t* data, int length) {
+  // CRC-16/CCITT-FALSE (polinom 0x1021, başlangıç 0xFFFF)
+  uint16_t crc = 0xFFFF;
+  for (int i = 0; i < length; i++) {
+    crc ^= (uint16_t)data[i] << 8;
+    for (int j = 0; j < 8; j++) {
+      crc = (crc & 0x8000) ? (crc << 1) ^ 0x1021 : (crc << 1);
+    }
+  }
+  return crc;
+}
+
+int cobsDecode(const uint8_t* input, int length, uint8_t* output) {
+  // Yerinde çözme güvenlidir: çıktı her zaman girdinin gerisinde kalır
+  int readIndex = 0;
+  int writeIndex = 0;
+  
+  while (readIndex < length) {
+    uint8_t code = input[readIndex++];
+    if (code == 0 || readIndex + code - 1 > length) {
+      return -1;
+    }
+    
+    for (uint8_t i = 1; i < code; i++) {
+      output[writeIndex++] = input[readIndex++];
+    }
+    
+    if (code < 0xFF && readIndex < length) {
+      output[writeIndex++] = 0;
+    }
+  }
+  
+  return writeIndex;
+}
+
+void sendBinaryFrame(uint8_t type, uint16_t commandId, const uint8_t* body, int bodyLength) {
+  // Başlık + gövde + CRC, ardından COBS kodlama ve 0x00 sonlandırıcı
+  uint8_t payload[MAX_FRAME_SIZE];
+  if (bodyLength > MAX_FRAME_SIZE - 5) {
+    bodyLength = MAX_FRAME_SIZE - 5;
+  }
+  
+  payload[0] = type;
+  payload[1] = commandId & 0xFF;
+  payload[2] = commandId >> 8;
+  memcpy(payload + 3, body, bodyLength);
+  
+  int payloadLength = bodyLength + 3;
+  uint16_t crc = crc16(payload, payloadLength);
+  payload[payloadLength++] = crc & 0xFF;
+  payload[payloadLength++] = crc >> 8;
+  
+  uint8_t encoded[MAX_FRAME_SIZE + 2];
+  int codeIndex = 0;
+  int writeIndex = 1;
+  uint8_t code = 1;
+  
+  for (int i = 0; i < payloadLength; i++) {
+    if (payload[i] == 0) {
+      encoded[codeIndex] = code;
+      codeIndex = writeIndex++;
+      code = 1;
+    }
+    else {
+      encoded[writeIndex++] = payload[i];
+      code++;
+      if (code == 0xFF) {
+        encoded[codeIndex] = code;
+        codeIndex = writeIndex++;
+        code = 1;
+      }
+    }
+  }
+  encoded[codeIndex] = code;
+  
+  Serial.write(encoded, writeIndex);
+  Serial.write((uint8_t)0);
+}
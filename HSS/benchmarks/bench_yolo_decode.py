@@ -0,0 +1,139 @@
+"""
+YOLO çıkış çözümleme mikro-benchmark'ı.
+
+YoloDetector._decode_outputs (NumPy ile toplu çözümleme) ile eski satır satır
+Python döngüsünü YOLOv4-tiny boyutlarında sentetik çıkışlar üzerinde karşılaştırır.
+
+Kullanım:
+    python benchmarks/bench_yolo_decode.py --input-size 416 --repeat 200
+"""
+
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import YOLO_DETECTION_CLASSES
+from vision.yolo_detector import YoloDetector
+
+
+def make_outputs(input_size: int, num_classes: int = 80, hit_ratio: float = 0.01, seed: int = 0):
+    """
+    YOLOv4-tiny'nin iki çıkış katmanına benzer sentetik çıkışlar üretir.
+
+    Args:
+        input_size: YOLO giriş boyutu (32'nin katı)
+        num_classes: Sınıf sayısı
+        hit_ratio: Eşiği geçen satırların yaklaşık oranı
+        seed: Rastgele sayı tohumu
+
+    Returns:
+        List[np.ndarray]: Çıkış katmanları
+    """
+    rng = np.random.default_rng(seed)
+    outputs = []
+
+    # YOLOv4-tiny: 32 ve 16 adımlı iki ızgara, hücre başına 3 çapa
+    for stride in (32, 16):
+        grid = input_size // stride
+        rows = grid * grid * 3
+        output = np.zeros((rows, 5 + num_classes), dtype=np.float32)
+        output[:, 0:2] = rng.random((rows, 2))
+        output[:, 2:4] = rng.random((rows, 2)) * 0.3
+        output[:, 4] = rng.random(rows)
+        output[:, 5:] = rng.random((rows, num_classes)) * 0.3
+
+        # Bir kısım satıra yüksek skor ver
+        hits = rng.random(rows) < hit_ratio
+        hit_classes = rng.integers(0, num_classes, size=rows)
+        output[hits, 5 + hit_classes[hits]] = 0.5 + rng.random(hits.sum()) * 0.5
+        outputs.append(output)
+
+    return outputs
+
+
+def decode_loop(detector: YoloDetector, outputs, width: int, height: int):
+    """
+    Eski satır satır çözümleme döngüsü (karşılaştırma için).
+    """
+    class_ids = []
+    confidences = []
+    boxes = []
+
+    for output in outputs:
+        for detection in output:
+            scores = detection[5:]
+            class_id = np.argmax(scores)
+            confidence = scores[class_id]
+
+            class_name = detector.classes[class_id] if class_id < len(detector.classes) else "unknown"
+
+            if YOLO_DETECTION_CLASSES and class_name not in YOLO_DETECTION_CLASSES:
+                if confidence < detector.confidence_threshold + 0.1:
+                    continue
+
+            if confidence > detector.confidence_threshold:
+                center_x = int(detection[0] * width)
+                center_y = int(detection[1] * height)
+                w = int(detection[2] * width)
+                h = int(detection[3] * height)
+
+                min_size = min(width, height) * 0.02
+                if w < min_size or h < min_size:
+                    continue
+
+                x = int(center_x - w / 2)
+                y = int(center_y - h / 2)
+
+                boxes.append([x, y, w, h])
+                confidences.append(float(confidence))
+                class_ids.append(class_id)
+
+    return boxes, confidences, class_ids
+
+
+def time_call(func, repeat: int) -> float:
+    """
+    Fonksiyonu tekrar tekrar çalıştırıp çağrı başına ortalama süreyi döndürür (ms).
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return 1000 * (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO çıkış çözümleme benchmark'ı")
+    parser.add_argument("--input-size", type=int, default=416, help="YOLO giriş boyutu")
+    parser.add_argument("--width", type=int, default=480, help="Görüntü genişliği")
+    parser.add_argument("--height", type=int, default=360, help="Görüntü yüksekliği")
+    parser.add_argument("--repeat", type=int, default=100, help="Tekrar sayısı")
+    args = parser.parse_args()
+
+    detector = YoloDetector("", "", confidence_threshold=0.5)
+    outputs = make_outputs(args.input_size)
+    rows = sum(len(output) for output in outputs)
+
+    # Sonuçların aynı olduğunu doğrula
+    loop_result = decode_loop(detector, outputs, args.width, args.height)
+    numpy_result = detector._decode_outputs(outputs, args.width, args.height)
+    if [list(map(int, box)) for box in loop_result[0]] != numpy_result[0] or \
+            [int(c) for c in loop_result[2]] != numpy_result[2] or \
+            not np.allclose(loop_result[1], numpy_result[1]):
+        print("HATA: Döngü ve NumPy çözümleme sonuçları farklı")
+        sys.exit(1)
+
+    loop_ms = time_call(lambda: decode_loop(detector, outputs, args.width, args.height), args.repeat)
+    numpy_ms = time_call(lambda: detector._decode_outputs(outputs, args.width, args.height), args.repeat)
+
+    print(f"Satır sayısı: {rows}, aday kutu: {len(numpy_result[0])}")
+    print(f"Python döngüsü : {loop_ms:8.3f} ms")
+    print(f"NumPy çözümleme: {numpy_ms:8.3f} ms")
+    print(f"Hızlanma       : {loop_ms / numpy_ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Arduino seri yolu gecikme ve verim benchmark'ı.
+
+ArduinoComm'u Arduino simülatörüne (port "SIM") bağlar ve motor komutlarının
+uçtan uca gecikmesini (gönderim -> onay) JSON ve ikili protokol için ölçer:
+
+    sequential: Her komutun onayı beklenip sonraki gönderilir
+    pipelined:  Komutlar onay beklenmeden ardışık gönderilir, onaylar Future ile toplanır
+
+Sonuçlar p50/p95/p99 gecikme ve saniyedeki komut sayısı olarak JSON biçiminde
+raporlanır.
+
+Kullanım:
+    python benchmarks/serial_latency.py --commands 500 --protocols json,binary
+    python benchmarks/serial_latency.py --baudrate 1000000 --jitter 0.002 --output seri.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import ARDUINO_BAUDRATE, ARDUINO_SIM_SLEW_RATE, ARDUINO_SIM_LOOP_TIME, ARDUINO_SIM_JITTER
+from control.arduino_comm import ArduinoComm, SIMULATOR_PORT
+
+
+def summarize(samples_ms, elapsed_s: float):
+    """
+    Gecikme örneklerinden yüzdelik değerleri ve verimi hesaplar.
+
+    Args:
+        samples_ms: Komut başına gecikmeler (ms)
+        elapsed_s: Ölçümün toplam süresi (saniye)
+
+    Returns:
+        Dict[str, float]: p50/p95/p99/ortalama/en büyük gecikme ve saniyedeki komut sayısı
+    """
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(samples.mean()), 3),
+        "max_ms": round(float(samples.max()), 3),
+        "commands_per_s": round(len(samples) / elapsed_s, 1) if elapsed_s > 0 else None
+    }
+
+
+def motor_command(i: int):
+    """
+    Benchmark için i. motor komutunu oluşturur.
+    """
+    return {"type": "motor", "horizontal": float(i % 90) - 45.0, "vertical": float(i % 30), "speed": 60}
+
+
+def run_sequential(comm: ArduinoComm, count: int, timeout: float):
+    """
+    Komutları tek tek gönderip her birinin onayını bekler.
+
+    Returns:
+        Tuple[List[float], float, int]: (gecikmeler ms, toplam süre, zaman aşımı sayısı)
+    """
+    latencies = []
+    timeouts = 0
+    start = time.perf_counter()
+
+    for i in range(count):
+        sent_at = time.perf_counter()
+        try:
+            response = comm.send_command_async(motor_command(i)).result(timeout=timeout)
+        except FutureTimeoutError:
+            response = None
+
+        if response is None:
+            timeouts += 1
+            continue
+        latencies.append(1000 * (time.perf_counter() - sent_at))
+
+    return latencies, time.perf_counter() - start, timeouts
+
+
+def run_pipelined(comm: ArduinoComm, count: int, timeout: float):
+    """
+    Komutları onay beklemeden ardışık gönderir; onay zamanları geri çağırma ile kaydedilir.
+
+    Returns:
+        Tuple[List[float], float, int]: (gecikmeler ms, toplam süre, zaman aşımı sayısı)
+    """
+    sent_at = [0.0] * count
+    acked_at = [None] * count
+    futures = []
+    start = time.perf_counter()
+
+    for i in range(count):
+        sent_at[i] = time.perf_counter()
+
+        def on_response(response, index=i):
+            if response is not None:
+                acked_at[index] = time.perf_counter()
+
+        futures.append(comm.send_command_async(motor_command(i), on_response))
+
+    for future in futures:
+        try:
+            future.result(timeout=timeout)
+        except FutureTimeoutError:
+            pass
+    elapsed = time.perf_counter() - start
+
+    latencies = [1000 * (acked - sent) for sent, acked in zip(sent_at, acked_at) if acked is not None]
+    return latencies, elapsed, count - len(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Arduino seri yolu gecikme benchmark'ı (simülatör)")
+    parser.add_argument("--commands", type=int, default=300, help="Senaryo başına komut sayısı")
+    parser.add_argument("--warmup", type=int, default=10, help="Isınma komutu sayısı")
+    parser.add_argument("--protocols", default="json,binary", help="Virgülle ayrılmış protokoller (json, binary)")
+    parser.add_argument("--baudrate", type=int, default=ARDUINO_BAUDRATE, help="Simüle seri hız")
+    parser.add_argument("--loop-time", type=float, default=ARDUINO_SIM_LOOP_TIME,
+                        help="Arduino komut işleme süresi (saniye)")
+    parser.add_argument("--jitter", type=float, default=ARDUINO_SIM_JITTER,
+                        help="İşlem süresine eklenen en fazla rastgele gecikme (saniye)")
+    parser.add_argument("--slew-rate", type=float, default=ARDUINO_SIM_SLEW_RATE,
+                        help="Motor dönüş hızı (derece/saniye)")
+    parser.add_argument("--timeout", type=float, default=2.0, help="Komut başına onay zaman aşımı (saniye)")
+    parser.add_argument("--seed", type=int, default=0, help="Titreşim için rastgele sayı tohumu")
+    parser.add_argument("--output", default=None, help="JSON çıktı dosyası (yoksa standart çıktı)")
+    args = parser.parse_args()
+
+    comm = ArduinoComm(SIMULATOR_PORT, args.baudrate)
+    if not comm.initialize():
+        print("HATA: Simülatöre bağlanılamadı", file=sys.stderr)
+        sys.exit(1)
+
+    # Simülatör ayarları
+    simulator = comm.serial_conn
+    simulator.loop_time = args.loop_time
+    simulator.jitter = args.jitter
+    simulator.slew_rate = simulator.motor_rate = args.slew_rate
+    simulator.random.seed(args.seed)
+
+    report = {
+        "baudrate": args.baudrate,
+        "loop_time_s": args.loop_time,
+        "jitter_s": args.jitter,
+        "commands": args.commands,
+        "runs": []
+    }
+
+    try:
+        for protocol in [p.strip() for p in args.protocols.split(",")]:
+            if not comm.negotiate_protocol(protocol):
+                print(f"UYARI: {protocol} protokolüne geçilemedi, atlanıyor", file=sys.stderr)
+                continue
+
+            run_sequential(comm, args.warmup, args.timeout)
+
+            for scenario, runner in (("sequential", run_sequential), ("pipelined", run_pipelined)):
+                bytes_before = simulator.bytes_received
+                latencies, elapsed, timeouts = runner(comm, args.commands, args.timeout)
+                run = {
+                    "protocol": protocol,
+                    "scenario": scenario,
+                    "timeouts": timeouts,
+                    "bytes_per_command": round((simulator.bytes_received - bytes_before) / args.commands, 1)
+                }
+                if latencies:
+                    run.update(summarize(latencies, elapsed))
+                report["runs"].append(run)
+    finally:
+        comm.close()
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Sonuçlar kaydedildi: {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
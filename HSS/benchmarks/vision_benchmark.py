@@ -0,0 +1,297 @@
+"""
+Görüntü işleme hattı benchmark'ı.
+
+YoloDetector.detect, classify_balloons, detect_shapes, QRDetector.detect_and_decode
+ve draw_detections aşamalarını bir kare dizini veya video üzerinde, farklı
+YOLO giriş boyutları ve DNN backend'leri ile ölçer. Aşama başına p50/p95/p99
+gecikme, verim ve tepe bellek kullanımı (RSS) JSON olarak raporlanır.
+
+Gerçek görüntü verilmezse Camera test modundaki gibi hareketli dairelerden
+oluşan sentetik kareler kullanılır; model dosyaları yoksa YOLO aşaması atlanır
+ve diğer aşamalar sentetik kutularla ölçülür. Sentetik kutular yalnızca
+sentetik karelerde kullanılır; gerçek kayıtta YOLO yoksa tespit gerektiren
+aşamalar tespitsiz ölçülür.
+
+Kullanım:
+    python benchmarks/vision_benchmark.py --source kayit.mp4 --input-sizes 256,416 --backends cpu,opencl
+    python benchmarks/vision_benchmark.py --frames 300 --output sonuc.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import numpy as np
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (YOLO_CONFIG_PATH, YOLO_WEIGHTS_PATH, YOLO_CONFIDENCE_THRESHOLD, YOLO_NMS_THRESHOLD,
+                    YOLO_INPUT_SIZE, CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_FPS)
+from vision.yolo_detector import YoloDetector
+from vision.qr_detector import QRDetector
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def synthetic_frames(count: int, width: int = CAMERA_WIDTH, height: int = CAMERA_HEIGHT, fps: int = CAMERA_FPS):
+    """
+    Camera._test_mode_loop'a benzer hareketli daireli sentetik kareler ve kutuları üretir.
+
+    Args:
+        count: Kare sayısı
+        width: Kare genişliği
+        height: Kare yüksekliği
+        fps: Hareket hızını belirleyen kare hızı
+
+    Returns:
+        Tuple[List[np.ndarray], List[List[Dict]]]: (kareler, kare başına sentetik tespitler)
+    """
+    frames = []
+    boxes = []
+
+    for i in range(count):
+        t = i / fps
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        cv2.putText(frame, f"TEST MODU - {i:05d}", (50, height // 2),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+
+        # Kırmızı daire (test modundaki gibi) ve ters yönde dönen mavi kare
+        x = int(width / 2 + 100 * np.cos(t))
+        y = int(height / 2 + 100 * np.sin(t))
+        cv2.circle(frame, (x, y), 20, (0, 0, 255), -1)
+
+        sx = int(width / 2 + 80 * np.cos(-t))
+        sy = int(height / 2 + 80 * np.sin(-t))
+        cv2.rectangle(frame, (sx - 18, sy - 18), (sx + 18, sy + 18), (255, 0, 0), -1)
+
+        frames.append(frame)
+        boxes.append([
+            {"class_id": 0, "class_name": "balloon", "confidence": 1.0,
+             "box": (x - 25, y - 25, 50, 50), "center": (x, y)},
+            {"class_id": 0, "class_name": "balloon", "confidence": 1.0,
+             "box": (sx - 23, sy - 23, 46, 46), "center": (sx, sy)}
+        ])
+
+    return frames, boxes
+
+
+def load_frames(source: str, count: int):
+    """
+    Dizin veya video dosyasından kareleri yükler.
+
+    Args:
+        source: Görüntü dizini veya video dosyası
+        count: Maksimum kare sayısı
+
+    Returns:
+        List[np.ndarray]: Kareler
+    """
+    frames = []
+
+    if os.path.isdir(source):
+        names = sorted(n for n in os.listdir(source) if n.lower().endswith(IMAGE_EXTENSIONS))
+        for name in names[:count]:
+            frame = cv2.imread(os.path.join(source, name))
+            if frame is not None:
+                frames.append(frame)
+        return frames
+
+    capture = cv2.VideoCapture(source)
+    while len(frames) < count:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        frames.append(frame)
+    capture.release()
+
+    return frames
+
+
+def summarize(samples_ms, frame_count: int):
+    """
+    Gecikme örneklerinden yüzdelik değerleri ve verimi hesaplar.
+
+    Args:
+        samples_ms: Kare başına süreler (ms)
+        frame_count: Kare sayısı
+
+    Returns:
+        Dict[str, float]: p50/p95/p99/ortalama gecikme ve saniyedeki kare sayısı
+    """
+    samples = np.asarray(samples_ms, dtype=np.float64)
+    total_s = samples.sum() / 1000.0
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+
+    return {
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "mean_ms": round(float(samples.mean()), 3),
+        "max_ms": round(float(samples.max()), 3),
+        "throughput_fps": round(frame_count / total_s, 1) if total_s > 0 else None
+    }
+
+
+def peak_rss_mb():
+    """
+    İşlemin tepe bellek kullanımını (MB) döndürür; desteklenmiyorsa None.
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux'ta KB, macOS'ta bayt
+    divisor = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def run_pipeline(frames, synthetic_boxes, detector, qr_detector: QRDetector, warmup: int):
+    """
+    Tüm aşamaları kareler üzerinde çalıştırıp aşama başına süreleri ölçer.
+
+    Args:
+        frames: Kareler
+        synthetic_boxes: Kare başına sentetik tespitler (YOLO yoksa kullanılır;
+            gerçek kayıtta None)
+        detector: Başlatılmış YoloDetector veya ağı olmayan (YOLO atlanır) dedektör
+        qr_detector: QR dedektörü
+        warmup: Ölçüme dahil edilmeyen ısınma karesi sayısı
+
+    Returns:
+        Tuple[Dict[str, Dict[str, float]], float]: (aşama başına özet, kare başına tespit sayısı)
+    """
+    stages = ["detect", "classify_balloons", "detect_shapes", "qr_detect_and_decode", "draw_detections", "total"]
+    timings = {stage: [] for stage in stages}
+    use_yolo = detector.net is not None
+    detection_count = 0
+
+    for i, frame in enumerate(frames):
+        sample = {}
+        start = time.perf_counter()
+
+        t = time.perf_counter()
+        if use_yolo:
+            detections = detector.detect(frame)
+        elif synthetic_boxes is not None:
+            detections = [dict(d) for d in synthetic_boxes[i]]
+        else:
+            detections = []
+        sample["detect"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        detections = detector.classify_balloons(frame, detections)
+        sample["classify_balloons"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        detections = detector.detect_shapes(frame, detections)
+        sample["detect_shapes"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        qr_detector.detect_and_decode(frame)
+        sample["qr_detect_and_decode"] = time.perf_counter() - t
+
+        t = time.perf_counter()
+        detector.draw_detections(frame, detections)
+        sample["draw_detections"] = time.perf_counter() - t
+
+        sample["total"] = time.perf_counter() - start
+
+        if i >= warmup:
+            detection_count += len(detections)
+            for stage in stages:
+                timings[stage].append(1000 * sample[stage])
+
+    measured = len(frames) - warmup
+    result = {stage: summarize(timings[stage], measured) for stage in stages if timings[stage]}
+    if not use_yolo:
+        result.pop("detect", None)
+    return result, round(detection_count / measured, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Görüntü işleme hattı benchmark'ı")
+    parser.add_argument("--source", default=None, help="Görüntü dizini veya video dosyası (yoksa sentetik)")
+    parser.add_argument("--frames", type=int, default=200, help="Kullanılacak kare sayısı")
+    parser.add_argument("--warmup", type=int, default=5, help="Isınma karesi sayısı")
+    parser.add_argument("--input-sizes", default=str(YOLO_INPUT_SIZE),
+                        help="Virgülle ayrılmış YOLO giriş boyutları (örn. 160,256,416)")
+    parser.add_argument("--backends", default="cpu",
+                        help="Virgülle ayrılmış DNN backend'leri (" + ", ".join(["auto"] + list(YoloDetector.BACKENDS)) + ")")
+    parser.add_argument("--config", default=YOLO_CONFIG_PATH, help="YOLO config dosyası")
+    parser.add_argument("--weights", default=YOLO_WEIGHTS_PATH, help="YOLO ağırlık dosyası")
+    parser.add_argument("--output", default=None, help="JSON çıktı dosyası (yoksa standart çıktı)")
+    args = parser.parse_args()
+
+    # Kareleri hazırla
+    frames = load_frames(args.source, args.frames) if args.source else []
+    source = args.source
+    if frames:
+        # Gerçek karelerdeki nesnelerle ilgisiz olduklarından sentetik kutular kullanılmaz
+        synthetic_boxes = None
+    else:
+        if args.source:
+            print(f"UYARI: {args.source} içinden kare okunamadı, sentetik kareler kullanılıyor", file=sys.stderr)
+        frames, synthetic_boxes = synthetic_frames(args.frames)
+        source = "synthetic"
+
+    if len(frames) <= args.warmup:
+        print("HATA: Kare sayısı ısınma karesi sayısından fazla olmalı", file=sys.stderr)
+        sys.exit(1)
+
+    qr_detector = QRDetector()
+    report = {
+        "source": source,
+        "frames": len(frames),
+        "warmup": args.warmup,
+        "frame_size": [frames[0].shape[1], frames[0].shape[0]],
+        "opencv_version": cv2.__version__,
+        "runs": []
+    }
+
+    for backend in args.backends.split(","):
+        for input_size in [int(size) for size in args.input_sizes.split(",")]:
+            detector = YoloDetector(args.config, args.weights, YOLO_CONFIDENCE_THRESHOLD, YOLO_NMS_THRESHOLD,
+                                    input_size=input_size, backend=backend.strip())
+            yolo_available = detector.initialize()
+            if not yolo_available and synthetic_boxes is None:
+                print("UYARI: YOLO modeli yok; gerçek karelerde tespit aşamaları tespitsiz ölçülüyor",
+                      file=sys.stderr)
+
+            stages, detections_per_frame = run_pipeline(frames, synthetic_boxes, detector, qr_detector, args.warmup)
+
+            run = {
+                "backend": backend.strip(),
+                "input_size": input_size,
+                "yolo": yolo_available,
+                "synthetic_boxes": not yolo_available and synthetic_boxes is not None,
+                "detections_per_frame": detections_per_frame,
+                "stages": stages,
+                "peak_rss_mb": peak_rss_mb()
+            }
+            report["runs"].append(run)
+
+            # YOLO yoksa diğer aşamalar giriş boyutundan bağımsızdır
+            if not yolo_available:
+                break
+
+    report["peak_rss_mb"] = peak_rss_mb()
+
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Sonuçlar kaydedildi: {args.output}")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
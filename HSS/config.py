@@ -3,14 +3,27 @@ Hava Savunma Sistemi (HSS) için yapılandırma dosyası
 """
 
 # Donanım bağlantıları
-ARDUINO_PORT = "DUMMY"  # Arduino test modu - gerçek bağlantı için "/dev/ttyACM0" kullanın
+ARDUINO_PORT = "DUMMY"  # Arduino test modu - simülatör için "SIM", gerçek bağlantı için "/dev/ttyACM0" kullanın
 ARDUINO_BAUDRATE = 115200       # Seri iletişim hızı
+ARDUINO_READ_TIMEOUT = 0.1      # Seri okuma zaman aşımı (saniye) - okuma iş parçacığının kapanma gecikmesi
+ARDUINO_BINARY_PROTOCOL = True  # Bağlantıda ikili (COBS + CRC16) protokolü iste, desteklenmezse JSON kullan
+ARDUINO_PROTOCOL_TIMEOUT = 1.0  # Protokol anlaşması yanıt bekleme süresi (saniye)
+ARDUINO_RESPONSE_EXPIRY = 15.0  # Yanıtı bu sürede gelmeyen komutun bekleme kaydı None ile çözülüp silinir (saniye)
+
+# Arduino simülatörü (ARDUINO_PORT = "SIM" ile donanımsız seri yol)
+ARDUINO_SIM_SLEW_RATE = 360.0       # Motor dönüş hızı (derece/saniye, 60 RPM)
+ARDUINO_SIM_LOOP_TIME = 0.0005      # Arduino döngüsünün komut işleme süresi (saniye)
+ARDUINO_SIM_JITTER = 0.0005         # İşlem süresine eklenen en fazla rastgele gecikme (saniye)
+ARDUINO_SIM_STATUS_INTERVAL = 1.0   # Durum mesajı aralığı (saniye)
 
 # Kamera ve görüntü ayarları
 CAMERA_ID = -1                  # Test modu için -1, gerçek kamera için 0 veya başka ID
 CAMERA_WIDTH = 480              # Kamera genişliği (düşük çözünürlük - performans için)
 CAMERA_HEIGHT = 360             # Kamera yüksekliği (düşük çözünürlük - performans için)
 CAMERA_FPS = 30                 # Kamera FPS
+CAMERA_REPLAY_PACING = "realtime"  # Kayıt oynatma hızı: realtime, fixed, fast, step
+CAMERA_REPLAY_LOOP = False      # Kayıt sonunda başa dön
+RECORDING_IMAGE_FORMAT = "png"  # Kayıt kare biçimi (png kayıpsız, jpg daha küçük)
 
 # YOLO yapılandırması
 YOLO_CONFIG_PATH = "models/yolov4-tiny.cfg"
@@ -24,8 +37,15 @@ YOLO_DETECTION_CLASSES = ["balloon", "red_balloon", "blue_balloon"]  # Öncelikl
 # Motor parametreleri
 MOTOR_HORIZONTAL_RANGE = 270    # Yatay hareket aralığı (derece)
 MOTOR_VERTICAL_RANGE = 60       # Dikey hareket aralığı (derece)
-MOTOR_SPEED = 50                # Motor hızı
-MOTOR_ACCELERATION = 25         # Motor ivmesi
+MOTOR_SPEED = 50                # Motor hızı (RPM, 1 RPM = 6 derece/saniye)
+MOTOR_ACCELERATION = 25         # Motor ivmesi (RPM/saniye)
+MOTOR_SETPOINT_RATE = 50        # Takip hedef noktası gönderim hızı (Hz) - yalnızca en son hedef gönderilir
+
+# Yörünge parametreleri (çok adımlı hareketler tek toplu komutla yüklenir)
+TRAJECTORY_RAMP_STEPS = 2           # Hızlanma/yavaşlama rampası başına yörünge noktası
+TRAJECTORY_MAX_POINTS = 32          # Yörünge başına en fazla nokta (hss_arduino.ino TRAJECTORY_CAPACITY)
+TRAJECTORY_CHECK_STEP = 0.5         # Yasak bölge kontrolünde yol örnekleme aralığı (derece)
+TRAJECTORY_COMPLETION_MARGIN = 2.0  # Yörünge tamamlanma beklemesine planlanan süreye ek pay (saniye)
 
 # Lazer parametreleri
 LASER_TIMEOUT = 2.0             # Lazer aktif kalma süresi (saniye)
@@ -34,6 +54,8 @@ LASER_TIMEOUT = 2.0             # Lazer aktif kalma süresi (saniye)
 MAX_TEMPERATURE = 75.0          # Maksimum sıcaklık (Celcius)
 EMERGENCY_STOP_PIN = 17         # Acil durdurma butonu pini
 SAFETY_TIMEOUT = 300            # Güvenlik zaman aşımı (saniye)
+SAFETY_HEARTBEAT_TIMEOUT = 3.0  # Bu süre Arduino'dan durum mesajı gelmezse sistem güvensiz sayılır (saniye)
+SAFETY_FAN_COOLDOWN = 30.0      # Sıcaklık normale döndükten sonra fanların çalışmaya devam ettiği süre (saniye)
 
 # Mod parametreleri
 MODE_TIMEOUT = 300              # Her mod için zaman sınırı (saniye)
@@ -50,9 +72,15 @@ RESTRICTED_ZONES = [
 
 # Hedef renkleri
 TARGET_COLORS = {
-    "RED": ((0, 100, 100), (10, 255, 255)),     # Düşman (HSV alt ve üst değerleri)
+    # Düşman (HSV alt ve üst değerleri) - kırmızı ton 180'de 0'a sarıldığı için iki aralık
+    "RED": [((0, 100, 100), (10, 255, 255)), ((170, 100, 100), (180, 255, 255))],
     "BLUE": ((100, 100, 100), (130, 255, 255))  # Dost (HSV alt ve üst değerleri)
 }
+ENEMY_COLORS = ["RED"]            # Düşman kabul edilen renkler
+COLOR_LUT_BITS = 5                # Renk tablosunda kanal başına bit (5 -> 32³ hücre)
+COLOR_MIN_PIXEL_RATIO = 0.1       # Renk seçimi için bölgedeki minimum piksel oranı
+COLOR_MAX_SAMPLES = 4096          # Bölge başına incelenecek maksimum piksel (sabit maliyet)
+FEATURE_CACHE_MOVE_RATIO = 0.1    # İz kutusu boyutunun bu oranından az kıpırdadıysa şekil yeniden hesaplanmaz
 
 # Geometrik şekiller
 TARGET_SHAPES = ["CIRCLE", "SQUARE", "TRIANGLE"]
@@ -89,6 +117,28 @@ DISABLE_UI_ANIMATIONS = True     # UI animasyonları devre dışı (performans i
 SKIP_YOLO_DETECTION = 2          # YOLO tespitini n kare atla (arttırıldı - performans için)
 SKIP_UI_UPDATES = 1              # Her n karede bir UI güncelle (performans için)
 USE_DIRECT_RENDERING = True      # Doğrudan render kullan (performans için)
+USE_DETECTION_WORKER = True      # Tespiti ayrı iş parçacığında çalıştır (UI/mod döngüsü bloklanmaz)
+YOLO_PROCESS_POOL_SIZE = 0       # >1 ise tespit bu sayıda işlemde paralel çalışır (çok çekirdekli kartlar için)
+YOLO_POOL_RESULT_TIMEOUT = 5.0   # Havuz işleminden sonuç bekleme süresi (saniye); aşılırsa görev bırakılır
+
+# Hedef takibi (YOLO kareleri arasında)
+USE_TRACKER = True               # Kareler arasında izleri Kalman ile taşı, YOLO'yu seyrek çalıştır
+TRACKER_DETECT_INTERVAL = 3      # YOLO her N karede bir çalışır
+TRACKER_MIN_CONFIDENCE = 0.35    # Bu güvenin altına düşen iz varsa YOLO hemen çalışır
+TRACKER_CONFIDENCE_DECAY = 0.9   # Tahmin edilen her karede iz güveni bu oranla azalır
+TRACKER_IOU_THRESHOLD = 0.3      # İz-tespit eşleştirmesi için minimum IoU
+TRACKER_MAX_MISSES = 2           # İz silinmeden önce kaçırılabilecek YOLO turu sayısı
+
+# İz çevresinde bölgesel (ROI) tespit
+USE_ROI_DETECTION = True         # İz varken YOLO'yu yalnızca hedef çevresindeki bölgede çalıştır
+YOLO_ROI_INPUT_SIZE = 160        # ROI tespitinde YOLO giriş boyutu (32'nin katı)
+YOLO_ROI_SCALE = 3.0             # ROI kenarı = hedef kutusunun büyük kenarı x bu katsayı
+YOLO_ROI_MAX_AREA = 0.5          # ROI'ler karenin bu oranından büyükse tam kare taranır
+YOLO_FULL_SCAN_INTERVAL = 5      # Her N YOLO turunda bir tam kare taraması (yeni hedefler için)
+
+# Uçtan uca gecikme izleme (kare yakalama -> motor komutu)
+TRACING_ENABLED = True           # Kare başına aşama zaman damgalarını kaydet
+TRACE_RING_SIZE = 1024           # Bellekte tutulan en son iz sayısı
 
 # Test ve Mock modlar
 TEST_MODE = True          # Test modunu aktifleştir
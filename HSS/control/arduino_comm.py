@@ -1,20 +1,40 @@
 """
 Raspberry Pi ve Arduino arasındaki seri iletişimi yöneten modül.
+Bağlantıda ikili protokol istenir; Arduino desteklemezse satır tabanlı JSON kullanılır.
 """
 
 import serial
 import json
 import time
+import itertools
 import threading
 import logging
-from typing import Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, List, Optional, Tuple, Callable
+
+from config import ARDUINO_READ_TIMEOUT, ARDUINO_BINARY_PROTOCOL, ARDUINO_PROTOCOL_TIMEOUT, ARDUINO_RESPONSE_EXPIRY
+from control.binary_protocol import encode_command, decode_frame, ProtocolError, FRAME_DELIMITER
+from control.arduino_simulator import SimulatedSerial
+
+# Bu port adı verildiğinde gerçek seri port yerine Arduino simülatörü kullanılır
+SIMULATOR_PORT = "SIM"
 
 class ArduinoComm:
     """
     Arduino ile seri iletişim kuran sınıf.
-    JSON formatında mesajlar gönderir ve alır.
+    Mesajlar JSON biçiminde (dict) oluşturulur; hatta JSON satırları veya
+    ikili çerçeveler olarak taşınır.
+    
+    ID'li her komut için bir Future tutulur; yanıt geldiğinde okuma iş parçacığı
+    Future'ı çözer. Böylece birden fazla komut yanıt beklemeden ardışık gönderilebilir.
+    Yanıtı ARDUINO_RESPONSE_EXPIRY içinde gelmeyen komutların Future'ı None ile
+    çözülür; böylece kaybolan yanıtlar ID sayacı dönünce yeni komutlara karışmaz.
     """
     
+    # wait_for_response çağrılmadan önce çözülen yanıtlardan saklanacak en fazla sayı
+    COMPLETED_RESPONSE_LIMIT = 64
+    
     def __init__(self, port: str, baudrate: int = 115200):
         """
         ArduinoComm sınıfını başlatır.
@@ -29,11 +49,28 @@ class ArduinoComm:
         self.running = False
         self.lock = threading.Lock()
         self.last_status = {}
+        self.last_status_time = 0.0
         self.last_temperature = 0.0
         self.emergency_stop_active = False
         
-        # Yanıt beklediğimiz komutlar için kuyruk
-        self.response_queue = {}
+        # Yanıt beklenen komutlar: komut ID'si -> (Future, son geçerlilik zamanı)
+        # (kayıt sırasıyla tutulur; en eskisi önce sona erer)
+        self.pending_responses = {}
+        self.response_expiry = ARDUINO_RESPONSE_EXPIRY
+        self.response_lock = threading.Lock()
+        
+        # Çözülmüş ama henüz wait_for_response ile alınmamış Future'lar (en eskisi önce atılır)
+        self.completed_responses = OrderedDict()
+        
+        # Komut ID'leri: ikili protokoldeki uint16 sıra numarası (0: yanıt istenmez)
+        self.command_ids = itertools.cycle(range(1, 0x10000))
+        
+        # Mesaj tipine göre dinleyiciler (değiştirilirken kopyalanır, okuma iş parçacığı kilitsiz gezer)
+        self.message_listeners = {}
+        
+        # Hat protokolü ("json" veya "binary") ve bekleyen protokol isteği (ID, mod)
+        self.protocol = "json"
+        self.protocol_request = None
         
         # Logger ayarları
         self.logger = logging.getLogger("ArduinoComm")
@@ -54,8 +91,12 @@ class ArduinoComm:
             return True
             
         try:
-            self.serial_conn = serial.Serial(self.port, self.baudrate, timeout=1)
-            time.sleep(2)  # Arduino'nun resetlenmesi için bekle
+            # Okuma iş parçacığı veri gelene kadar bloklanır; zaman aşımı yalnızca kapanışı denetler
+            if self.port == SIMULATOR_PORT:
+                self.serial_conn = SimulatedSerial(self.baudrate, timeout=ARDUINO_READ_TIMEOUT)
+            else:
+                self.serial_conn = serial.Serial(self.port, self.baudrate, timeout=ARDUINO_READ_TIMEOUT)
+                time.sleep(2)  # Arduino'nun resetlenmesi için bekle
             self.running = True
             
             # Arduino'dan veri okuma iş parçacığını başlat
@@ -64,15 +105,78 @@ class ArduinoComm:
             self.read_thread.start()
             
             self.logger.info(f"Arduino bağlantısı kuruldu: {self.port}")
+            
+            if ARDUINO_BINARY_PROTOCOL:
+                self.negotiate_protocol("binary")
             return True
             
         except (serial.SerialException, IOError) as e:
             self.logger.error(f"Arduino bağlantısı kurulamadı: {str(e)}")
             return False
     
+    def negotiate_protocol(self, mode: str = "binary", timeout: float = ARDUINO_PROTOCOL_TIMEOUT) -> bool:
+        """
+        Arduino ile hat protokolünü değiştirir. İstek mevcut protokolle gönderilir;
+        Arduino onaylarsa okuma iş parçacığı yanıttan hemen sonraki bayttan
+        itibaren yeni protokole geçer.
+        
+        Args:
+            mode: "binary" veya "json"
+            timeout: Yanıt bekleme süresi (saniye)
+            
+        Returns:
+            bool: Protokol değiştiyse True (desteklenmiyorsa eski protokol kalır)
+        """
+        if self.test_mode or mode == self.protocol:
+            return mode == self.protocol
+        
+        command = {"id": self.next_command_id(), "type": "protocol", "mode": mode}
+        self.protocol_request = (command["id"], mode)
+        
+        response = self.send_command_async(command)
+        try:
+            response = response.result(timeout=timeout)
+        except FutureTimeoutError:
+            response = None
+        finally:
+            self.protocol_request = None
+        
+        if response and response.get("status") == "success":
+            self.logger.info(f"Arduino protokolü: {mode}")
+            return True
+        
+        self.logger.warning(f"Arduino {mode} protokolünü desteklemiyor, {self.protocol} kullanılıyor")
+        return False
+    
+    def next_command_id(self) -> int:
+        """
+        Yeni bir komut ID'si (1-65535 arası, dönüşümlü) döndürür.
+        """
+        return next(self.command_ids)
+    
     def send_command(self, command: Dict[str, Any]) -> bool:
         """
-        Arduino'ya JSON formatında komut gönderir.
+        Arduino'ya komut gönderir (etkin protokole göre JSON satırı veya ikili çerçeve).
+        
+        Args:
+            command: Gönderilecek komut (JSON dict formatında)
+            
+        Returns:
+            bool: Gönderim başarılı ise True, değilse False
+        """
+        # Yanıt gönderimden önce gelebileceği için bekleme kaydı önce yapılır
+        if "id" not in command:
+            return self._write_command(command)
+        
+        self._register_response(command["id"])
+        if not self._write_command(command):
+            self._resolve_response(command["id"], None)
+            return False
+        return True
+    
+    def _write_command(self, command: Dict[str, Any]) -> bool:
+        """
+        Komutu etkin protokolle seri porta yazar (yanıt kaydı yapmaz).
         
         Args:
             command: Gönderilecek komut (JSON dict formatında)
@@ -94,15 +198,14 @@ class ArduinoComm:
         
         try:
             with self.lock:
-                # JSON'a çevir ve yeni satır karakteri ekle
-                command_str = json.dumps(command) + "\n"
-                self.serial_conn.write(command_str.encode())
+                if self.protocol == "binary":
+                    data = encode_command(command)
+                else:
+                    # JSON'a çevir ve yeni satır karakteri ekle
+                    data = (json.dumps(command) + "\n").encode()
+                self.serial_conn.write(data)
                 self.serial_conn.flush()
                 
-                # Komut ID'si varsa yanıt bekleme listesine ekle
-                if "id" in command:
-                    self.response_queue[command["id"]] = None
-                
                 self.logger.debug(f"Komut gönderildi: {command}")
                 return True
                 
@@ -110,30 +213,173 @@ class ArduinoComm:
             self.logger.error(f"Komut gönderilirken hata oluştu: {str(e)}")
             return False
     
+    def send_command_async(self, command: Dict[str, Any],
+                           callback: Optional[Callable[[Optional[Dict[str, Any]]], None]] = None) -> Future:
+        """
+        Komutu gönderir ve yanıtı beklemeden bir Future döndürür.
+        
+        Komutta ID yoksa yeni bir ID eklenir. Future, Arduino yanıtıyla (JSON dict)
+        çözülür; gönderim başarısız olursa veya bağlantı kapanırsa None ile çözülür.
+        Test modunda başarılı yanıtla çözülmüş bir Future döner.
+        
+        Args:
+            command: Gönderilecek komut (JSON dict formatında)
+            callback: Yanıt geldiğinde yanıtla çağrılacak fonksiyon (okuma iş
+                parçacığında çalışır, kısa tutulmalıdır)
+            
+        Returns:
+            Future: Komut yanıtı
+        """
+        if "id" not in command:
+            command["id"] = self.next_command_id()
+        command_id = command["id"]
+        
+        # Yanıt gönderimden önce gelebileceği için Future önce kaydedilir
+        future = self._register_response(command_id)
+        
+        if not self._write_command(command):
+            self._resolve_response(command_id, None)
+        elif self.test_mode:
+            self._resolve_response(command_id, {"id": command_id, "type": "response", "status": "success"})
+        
+        if callback is not None:
+            future.add_done_callback(lambda f: callback(f.result()))
+        
+        return future
+    
+    def _register_response(self, command_id: int) -> Future:
+        """
+        Komut ID'si için yeni bir yanıt Future'ı oluşturur.
+        
+        ID sayacı döndüğünde aynı ID'nin önceki komutu hâlâ bekliyor olabilir; onun
+        Future'ı (ve geri çağırmaları) yeni komuta verilmez, None ile çözülür.
+        Süresi dolan bekleme kayıtları da burada None ile çözülür.
+        
+        Args:
+            command_id: Komut ID'si
+            
+        Returns:
+            Future: Yanıt Future'ı
+        """
+        now = time.monotonic()
+        future = Future()
+        
+        with self.response_lock:
+            abandoned = self._pop_expired(now)
+            previous = self.pending_responses.pop(command_id, None)
+            if previous is not None:
+                abandoned.append(previous[0])
+            
+            # Önceki komutun alınmamış yanıtı geçersizdir
+            self.completed_responses.pop(command_id, None)
+            self.pending_responses[command_id] = (future, now + self.response_expiry)
+        
+        # Geri çağırmalar kilit dışında çalışır
+        for stale in abandoned:
+            if not stale.done():
+                stale.set_result(None)
+        
+        return future
+    
+    def _pop_expired(self, now: float) -> List[Future]:
+        """
+        Süresi dolan bekleme kayıtlarını siler (response_lock tutulurken çağrılır).
+        
+        Args:
+            now: Şimdiki zaman (time.monotonic)
+            
+        Returns:
+            List[Future]: Silinen kayıtların Future'ları
+        """
+        expired = []
+        for command_id, (future, deadline) in self.pending_responses.items():
+            if deadline > now:
+                break
+            expired.append(command_id)
+        
+        if expired:
+            self.logger.warning(f"{len(expired)} komutun yanıtı {self.response_expiry:.0f} saniyede "
+                                f"gelmedi, bekleme kaydı silindi")
+        return [self.pending_responses.pop(command_id)[0] for command_id in expired]
+    
+    def _resolve_response(self, command_id: int, response: Optional[Dict[str, Any]]) -> bool:
+        """
+        Bekleyen komutun Future'ını yanıtla çözer.
+        
+        Args:
+            command_id: Komut ID'si
+            response: Yanıt (gönderim hatasında None)
+            
+        Returns:
+            bool: Bekleyen komut bulunduysa True
+        """
+        with self.response_lock:
+            entry = self.pending_responses.pop(command_id, None)
+            future = entry[0] if entry is not None else None
+            if future is not None:
+                # Yanıt bekleyen henüz wait_for_response çağırmamış olabilir
+                self.completed_responses[command_id] = future
+                if len(self.completed_responses) > self.COMPLETED_RESPONSE_LIMIT:
+                    self.completed_responses.popitem(last=False)
+        
+        if future is None:
+            return False
+        
+        if not future.done():
+            future.set_result(response)
+        return True
+    
     def _read_from_arduino(self):
         """
         Arduino'dan gelen verileri sürekli okur (arka plan iş parçacığı).
+        
+        Okuma, veri gelene veya ARDUINO_READ_TIMEOUT dolana kadar bloklanır;
+        gelen satırlar beklemeden işlenir.
         """
-        buffer = ""
+        buffer = bytearray()
         
         while self.running and self.serial_conn:
             try:
-                if self.serial_conn.in_waiting > 0:
-                    # Mevcut veriyi oku
-                    data = self.serial_conn.read(self.serial_conn.in_waiting).decode()
-                    buffer += data
+                # En az bir bayt gelene kadar bekle, bekleyen veriyi tek seferde al
+                data = self.serial_conn.read(max(1, self.serial_conn.in_waiting))
+                if not data:
+                    continue
+                
+                buffer += data
+                
+                # Tam mesajları ayıkla (protokol bir yanıttan sonra değişebilir)
+                start = 0
+                while True:
+                    binary = self.protocol == "binary"
+                    end = buffer.find(FRAME_DELIMITER if binary else b"\n", start)
+                    if end == -1:
+                        break
+                    
+                    line = bytes(buffer[start:end])
+                    start = end + 1
                     
-                    # Tam JSON mesajı aramak için bufferı kontrol et
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        
-                        try:
+                    try:
+                        if binary:
+                            message = decode_frame(line)
+                        else:
+                            line = line.strip()
+                            if not line:
+                                continue
                             message = json.loads(line)
-                            self._process_message(message)
-                        except json.JSONDecodeError:
-                            self.logger.warning(f"JSON çözümlenirken hata oluştu: {line}")
+                            if not isinstance(message, dict):
+                                self.logger.warning(f"Nesne olmayan JSON mesajı atlandı: {line!r}")
+                                continue
+                        self._process_message(message)
+                    except ProtocolError as e:
+                        self.logger.warning(f"İkili mesaj çözümlenirken hata oluştu: {str(e)}")
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        self.logger.warning(f"JSON çözümlenirken hata oluştu: {line!r}")
+                    except (TypeError, ValueError, AttributeError) as e:
+                        # Hatalı alanlı tek bir mesaj okuma iş parçacığını sonlandırmamalı
+                        self.logger.error(f"Mesaj işlenirken hata oluştu: {str(e)}")
                 
-                time.sleep(0.01)  # CPU kullanımını azalt
+                if start:
+                    del buffer[:start]
                 
             except (serial.SerialException, IOError) as e:
                 self.logger.error(f"Arduino okuma hatası: {str(e)}")
@@ -142,18 +388,28 @@ class ArduinoComm:
     
     def _process_message(self, message: Dict[str, Any]):
         """
-        Arduino'dan gelen JSON mesajını işler.
+        Arduino'dan gelen mesajı işler.
         
         Args:
-            message: Arduino'dan alınan JSON mesajı
+            message: Arduino'dan alınan mesaj (JSON dict biçiminde)
         """
-        # Mesaj ID'si varsa, bekleyen yanıtlar listesinde güncelle
-        if "id" in message and message["id"] in self.response_queue:
-            self.response_queue[message["id"]] = message
+        # Eski yazılımlar ID'yi metin olarak döndürür
+        if isinstance(message.get("id"), str) and message["id"].isdigit():
+            message["id"] = int(message["id"])
+        
+        # Protokol isteği onaylandıysa sonraki baytlar yeni protokolle okunur
+        request = self.protocol_request
+        if request and message.get("id") == request[0] and message.get("status") == "success":
+            self.protocol = request[1]
+        
+        # Mesaj ID'si varsa, bekleyen komutun Future'ını çöz
+        if "id" in message:
+            self._resolve_response(message["id"], message)
         
         # Durum mesajını güncelle
         if message.get("type") == "status":
             self.last_status = message
+            self.last_status_time = time.monotonic()
             
             # Sıcaklık verisi varsa, sakla
             if "temperature" in message:
@@ -163,15 +419,70 @@ class ArduinoComm:
             if "emergency_stop" in message:
                 self.emergency_stop_active = message["emergency_stop"]
         
+        # Dinleyicilere beklemeden bildir
+        for listener in self.message_listeners.get(message.get("type"), ()):
+            try:
+                listener(message)
+            except Exception as e:
+                self.logger.error(f"Mesaj dinleyicisi hatası ({message.get('type')}): {str(e)}")
+        
         # Hata mesajı geldi mi kontrol et
         if message.get("type") == "error":
             self.logger.error(f"Arduino'dan hata mesajı: {message.get('message', 'Bilinmeyen hata')}")
         
         self.logger.debug(f"Arduino'dan mesaj alındı: {message}")
     
-    def wait_for_response(self, command_id: str, timeout: float = 2.0) -> Optional[Dict[str, Any]]:
+    def add_message_listener(self, message_type: str, listener: Callable[[Dict[str, Any]], None]):
+        """
+        Belirli tipteki mesajlar için dinleyici ekler. Dinleyici okuma iş
+        parçacığında, mesaj çözülür çözülmez çağrılır; bu yüzden kısa sürmeli
+        ve yanıt beklememelidir.
+        
+        Args:
+            message_type: Mesaj tipi (örn. "status", "trajectory_done")
+            listener: Mesajla çağrılacak fonksiyon
+        """
+        with self.lock:
+            listeners = dict(self.message_listeners)
+            listeners[message_type] = listeners.get(message_type, ()) + (listener,)
+            self.message_listeners = listeners
+    
+    def remove_message_listener(self, message_type: str, listener: Callable[[Dict[str, Any]], None]):
+        """
+        Mesaj dinleyicisini kaldırır.
+        
+        Args:
+            message_type: Mesaj tipi
+            listener: Kaldırılacak fonksiyon
+        """
+        with self.lock:
+            listeners = dict(self.message_listeners)
+            listeners[message_type] = tuple(l for l in listeners.get(message_type, ()) if l != listener)
+            self.message_listeners = listeners
+    
+    def add_status_listener(self, listener: Callable[[Dict[str, Any]], None]):
         """
-        Gönderilen bir komutun yanıtını bekler.
+        Durum mesajı dinleyicisi ekler (add_message_listener("status", ...)).
+        
+        Args:
+            listener: Durum mesajıyla çağrılacak fonksiyon
+        """
+        self.add_message_listener("status", listener)
+    
+    def remove_status_listener(self, listener: Callable[[Dict[str, Any]], None]):
+        """
+        Durum mesajı dinleyicisini kaldırır.
+        
+        Args:
+            listener: Kaldırılacak fonksiyon
+        """
+        self.remove_message_listener("status", listener)
+    
+    def wait_for_response(self, command_id: int, timeout: float = 2.0) -> Optional[Dict[str, Any]]:
+        """
+        Gönderilen bir komutun yanıtını bekler (Future üzerinde bloklanır).
+        
+        Yanıt bu çağrıdan önce gelmişse saklanan yanıt hemen döndürülür.
         
         Args:
             command_id: Beklenen komut ID'si
@@ -180,22 +491,31 @@ class ArduinoComm:
         Returns:
             Optional[Dict]: Yanıt gelirse JSON, zaman aşımında None
         """
-        start_time = time.time()
+        with self.response_lock:
+            entry = self.pending_responses.get(command_id)
+            if entry is not None:
+                future = entry[0]
+            else:
+                future = self.completed_responses.pop(command_id, None)
         
-        while time.time() - start_time < timeout:
-            if command_id in self.response_queue and self.response_queue[command_id] is not None:
-                response = self.response_queue[command_id]
-                del self.response_queue[command_id]
-                return response
-            
-            time.sleep(0.01)
+        if future is None:
+            self.logger.warning(f"Yanıt beklenen komut bulunamadı: {command_id}")
+            return None
         
-        # Zaman aşımı
-        if command_id in self.response_queue:
-            del self.response_queue[command_id]
+        try:
+            response = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Zaman aşımı (bu arada ID yeni bir komuta verildiyse onun kaydı silinmez)
+            with self.response_lock:
+                entry = self.pending_responses.get(command_id)
+                if entry is not None and entry[0] is future:
+                    del self.pending_responses[command_id]
+            self.logger.warning(f"Komut yanıtı zaman aşımına uğradı: {command_id}")
+            return None
         
-        self.logger.warning(f"Komut yanıtı zaman aşımına uğradı: {command_id}")
-        return None
+        with self.response_lock:
+            self.completed_responses.pop(command_id, None)
+        return response
     
     def get_status(self) -> Dict[str, Any]:
         """
@@ -259,6 +579,14 @@ class ArduinoComm:
         if self.read_thread and self.read_thread.is_alive():
             self.read_thread.join(timeout=1.0)
         
+        # Yanıt bekleyenleri serbest bırak
+        with self.response_lock:
+            pending = list(self.pending_responses)
+        for command_id in pending:
+            self._resolve_response(command_id, None)
+        with self.response_lock:
+            self.completed_responses.clear()
+        
         if self.serial_conn:
             self.serial_conn.close()
             self.serial_conn = None
@@ -0,0 +1,491 @@
+"""
+Donanım olmadan ArduinoComm'un gerçek seri yolunu çalıştıran Arduino simülatörü.
+
+SimulatedSerial, ArduinoComm'un kullandığı serial.Serial arayüzünü (write, flush,
+read, in_waiting, close) süreç içinde taklit eder ve hss_arduino.ino protokolünü
+(JSON ve ikili) uygular. Baud hızına göre hat süresi, döngü/işlem gecikmesi,
+rastgele titreşim (jitter) ve step motor dönüş hızı benzetilir.
+
+ArduinoComm, port "SIM" olduğunda bu sınıfı kullanır.
+"""
+
+import json
+import time
+import random
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
+
+from config import (ARDUINO_SIM_SLEW_RATE, ARDUINO_SIM_LOOP_TIME, ARDUINO_SIM_JITTER,
+                    ARDUINO_SIM_STATUS_INTERVAL, TRAJECTORY_MAX_POINTS)
+from control.binary_protocol import decode_frame, encode_report, ProtocolError, FRAME_DELIMITER
+
+# Seri hatta bayt başına bit sayısı (8N1: başlangıç + 8 veri + bitiş)
+BITS_PER_BYTE = 10
+
+
+class SimulatedSerial:
+    """
+    hss_arduino.ino davranışını taklit eden süreç içi seri port.
+
+    Pi'den gelen baytlar hat süresi dolduğunda simüle Arduino'ya ulaşır;
+    Arduino'nun yanıtları döngü gecikmesi, titreşim ve hat süresi sonunda
+    okunabilir hale gelir. Motor pozisyonları dönüş hızıyla hedefe ilerler.
+    """
+
+    def __init__(self, baudrate: int = 115200, timeout: Optional[float] = 1.0,
+                 slew_rate: float = ARDUINO_SIM_SLEW_RATE, loop_time: float = ARDUINO_SIM_LOOP_TIME,
+                 jitter: float = ARDUINO_SIM_JITTER, status_interval: float = ARDUINO_SIM_STATUS_INTERVAL,
+                 seed: Optional[int] = None):
+        """
+        SimulatedSerial sınıfını başlatır.
+
+        Args:
+            baudrate: Seri hız (hat süresi hesabı için; 0 ise hat süresi yok)
+            timeout: read() zaman aşımı (saniye, None ise süresiz)
+            slew_rate: Hız komutu gelene kadar kullanılan motor dönüş hızı (derece/saniye)
+            loop_time: Arduino döngüsünün komut başına işlem süresi (saniye)
+            jitter: İşlem süresine eklenen en fazla rastgele gecikme (saniye)
+            status_interval: Durum mesajı aralığı (saniye, 0 ise gönderilmez)
+            seed: Titreşim için rastgele sayı tohumu
+        """
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.slew_rate = slew_rate
+        self.loop_time = loop_time
+        self.jitter = jitter
+        self.status_interval = status_interval
+        self.random = random.Random(seed)
+
+        self.is_open = True
+        self.condition = threading.Condition()
+
+        # Hat kuyrukları: (ulaşma zamanı, baytlar)
+        self.host_to_device = deque()
+        self.device_to_host = deque()
+        self.host_line_free = 0.0
+        self.device_line_free = 0.0
+
+        # Pi tarafında okunmaya hazır baytlar
+        self.rx_buffer = bytearray()
+
+        # Simüle Arduino durumu
+        self.binary_mode = False
+        self.device_buffer = bytearray()
+        self.emergency_stop = False
+        self.laser_active = False
+        self.laser_off_time = 0.0
+        self.laser_timeout = 2.0
+        self.fan_active = False
+        self.temperature = 25.0
+        self.horizontal_pos = 0.0
+        self.vertical_pos = 0.0
+        self.target_horizontal = 0.0
+        self.target_vertical = 0.0
+        self.motor_rate = slew_rate
+        self.last_motor_update = time.monotonic()
+
+        # Yörünge kuyruğu: (yatay, dikey, varış süresi ms); etkin noktada eksen hızları ayrı
+        self.trajectory = deque()
+        self.trajectory_id = 0
+        self.trajectory_active = False
+        self.axis_rates = None
+
+        # İstatistikler
+        self.commands_handled = 0
+        self.bytes_received = 0
+        self.bytes_sent = 0
+
+        # Logger
+        self.logger = logging.getLogger("SimulatedSerial")
+
+        self.device_thread = threading.Thread(target=self._device_loop)
+        self.device_thread.daemon = True
+        self.device_thread.start()
+
+        with self.condition:
+            self._emit({"type": "status_message", "message": "Arduino başlatıldı"}, time.monotonic())
+
+    # --- serial.Serial arayüzü ---
+
+    @property
+    def in_waiting(self) -> int:
+        """
+        Okunmaya hazır bayt sayısı.
+        """
+        with self.condition:
+            self._collect_arrived(time.monotonic())
+            return len(self.rx_buffer)
+
+    def write(self, data: bytes) -> int:
+        """
+        Baytları simüle hatta gönderir (hat süresi sonunda Arduino'ya ulaşır).
+        """
+        with self.condition:
+            arrival = self._line_delay(len(data), time.monotonic(), "host_line_free")
+            self.host_to_device.append((arrival, bytes(data)))
+            self.bytes_received += len(data)
+            self.condition.notify_all()
+        return len(data)
+
+    def flush(self):
+        """
+        Gönderilen baytların hatta çıkmasını bekler.
+        """
+        delay = self.host_line_free - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def read(self, size: int = 1) -> bytes:
+        """
+        En fazla size bayt okur; veri yoksa zaman aşımına kadar bekler.
+        """
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+
+        with self.condition:
+            while self.is_open:
+                now = time.monotonic()
+                self._collect_arrived(now)
+                if self.rx_buffer:
+                    data = bytes(self.rx_buffer[:size])
+                    del self.rx_buffer[:size]
+                    return data
+
+                # Bir sonraki yanıtın ulaşmasına veya zaman aşımına kadar bekle
+                wait = None if deadline is None else deadline - now
+                if self.device_to_host:
+                    next_arrival = self.device_to_host[0][0] - now
+                    wait = next_arrival if wait is None else min(wait, next_arrival)
+                if wait is not None and wait <= 0:
+                    if deadline is not None and now >= deadline:
+                        return b""
+                    continue
+                self.condition.wait(wait)
+
+        return b""
+
+    def reset_input_buffer(self):
+        """
+        Okunmamış baytları atar.
+        """
+        with self.condition:
+            self.rx_buffer.clear()
+            self.device_to_host.clear()
+
+    def close(self):
+        """
+        Simüle portu kapatır.
+        """
+        with self.condition:
+            self.is_open = False
+            self.condition.notify_all()
+
+        if self.device_thread.is_alive() and threading.current_thread() is not self.device_thread:
+            self.device_thread.join(timeout=1.0)
+
+    # --- Hat benzetimi ---
+
+    def _line_delay(self, length: int, ready_time: float, line: str) -> float:
+        """
+        Hattın boşalmasını ve bayt aktarım süresini hesaba katarak ulaşma zamanını döndürür.
+        """
+        start = max(ready_time, getattr(self, line))
+        arrival = start + (length * BITS_PER_BYTE / self.baudrate if self.baudrate else 0.0)
+        setattr(self, line, arrival)
+        return arrival
+
+    def _collect_arrived(self, now: float):
+        """
+        Hattan ulaşmış yanıtları okuma tamponuna taşır (kilit tutulurken çağrılır).
+        """
+        while self.device_to_host and self.device_to_host[0][0] <= now:
+            self.rx_buffer += self.device_to_host.popleft()[1]
+
+    def _emit(self, message: Dict[str, Any], ready_time: float):
+        """
+        Simüle Arduino'nun mesajını etkin protokolle hatta yazar (kilit tutulurken çağrılır).
+        """
+        if self.binary_mode:
+            data = encode_report(message)
+        else:
+            data = (json.dumps(message) + "\n").encode()
+
+        arrival = self._line_delay(len(data), ready_time, "device_line_free")
+        self.device_to_host.append((arrival, data))
+        self.bytes_sent += len(data)
+        self.condition.notify_all()
+
+    # --- Simüle Arduino ---
+
+    def _device_loop(self):
+        """
+        Simüle Arduino döngüsü: gelen baytları işler, motorları ilerletir ve
+        periyodik durum mesajı gönderir (arka plan iş parçacığı).
+        """
+        next_status = time.monotonic() + self.status_interval if self.status_interval else None
+
+        with self.condition:
+            while self.is_open:
+                now = time.monotonic()
+                self._update_actuators(now)
+
+                while self.host_to_device and self.host_to_device[0][0] <= now:
+                    self.device_buffer += self.host_to_device.popleft()[1]
+                    self._parse_device_buffer(now)
+
+                if next_status is not None and now >= next_status:
+                    self._emit(self._status_message(), now)
+                    next_status = now + self.status_interval
+
+                # Bir sonraki olaya kadar uyu
+                wakeups = [t for t in (next_status,
+                                       self.host_to_device[0][0] if self.host_to_device else None,
+                                       self.laser_off_time if self.laser_active else None,
+                                       self._motion_end(now) if self.trajectory_active else None)
+                           if t is not None]
+                self.condition.wait(max(0.0, min(wakeups) - now) if wakeups else None)
+
+    def _parse_device_buffer(self, now: float):
+        """
+        Arduino tarafındaki tampondan tam komutları ayıklayıp işler.
+        """
+        while True:
+            delimiter = FRAME_DELIMITER if self.binary_mode else b"\n"
+            end = self.device_buffer.find(delimiter)
+            if end == -1:
+                return
+
+            chunk = bytes(self.device_buffer[:end])
+            del self.device_buffer[:end + 1]
+
+            try:
+                if self.binary_mode:
+                    command = decode_frame(chunk)
+                else:
+                    chunk = chunk.strip()
+                    if not chunk:
+                        continue
+                    command = json.loads(chunk)
+            except ProtocolError as e:
+                self._emit({"type": "error", "message": f"Geçersiz çerçeve: {str(e)}"}, now)
+                continue
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                self._emit({"type": "error", "message": "JSON çözümleme hatası"}, now)
+                continue
+
+            # Döngü süresi ve titreşim kadar sonra yanıtla
+            ready_time = now + self.loop_time + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            for message in self._handle_command(command, ready_time):
+                self._emit(message, ready_time)
+            self.commands_handled += 1
+
+    def _handle_command(self, command: Dict[str, Any], now: float) -> List[Dict[str, Any]]:
+        """
+        Komutu hss_arduino.ino'daki gibi işler.
+
+        Args:
+            command: Komut
+            now: İşlenme zamanı
+
+        Returns:
+            List[Dict[str, Any]]: Gönderilecek mesajlar
+        """
+        command_type = command.get("type", "")
+        command_id = command.get("id", 0)
+
+        def response(success: bool, message: str) -> List[Dict[str, Any]]:
+            if not command_id:
+                return []
+            return [{"id": command_id, "status": "success" if success else "error", "message": message}]
+
+        if command_type == "motor":
+            if self.emergency_stop:
+                return response(False, "Acil durum aktif, motorlar kilitli")
+            aborted = self._abort_trajectory()
+            self.target_horizontal = float(command.get("horizontal", self.target_horizontal))
+            self.target_vertical = float(command.get("vertical", self.target_vertical))
+            if command.get("speed"):
+                # Step hızı RPM: derece/saniye = RPM * 6
+                self.motor_rate = float(command["speed"]) * 6.0
+            # Onay, komut alındığı andaki ölçülen pozisyonu taşır
+            acknowledgement = response(True, "Motor komutu alındı")
+            for message in acknowledgement:
+                message["horizontal_pos"] = self.horizontal_pos
+                message["vertical_pos"] = self.vertical_pos
+            return aborted + acknowledgement
+
+        if command_type == "trajectory":
+            points = command.get("points", [])
+            append = bool(command.get("append"))
+            if self.emergency_stop:
+                return response(False, "Acil durum aktif, motorlar kilitli")
+            if append and not self.trajectory_active:
+                return response(False, "Aktif yörünge yok")
+            free = TRAJECTORY_MAX_POINTS - (len(self.trajectory) if append else 0)
+            if len(points) > free:
+                return response(False, "Yörünge kuyruğu dolu")
+            aborted = []
+            if not append:
+                # Yeni yörünge mevcut konumdan başlar
+                aborted = self._abort_trajectory()
+                self.target_horizontal = self.horizontal_pos
+                self.target_vertical = self.vertical_pos
+                self.trajectory_id = command_id
+                self.trajectory_active = True
+            self.trajectory.extend((float(h), float(v), max(1, int(duration_ms))) for h, v, duration_ms in points)
+            return aborted + response(True, "Yörünge alındı")
+
+        if command_type == "motor_stop":
+            aborted = self._abort_trajectory()
+            self.target_horizontal = self.horizontal_pos
+            self.target_vertical = self.vertical_pos
+            return aborted + response(True, "Motorlar durduruldu")
+
+        if command_type == "laser":
+            if self.emergency_stop:
+                return response(False, "Acil durum aktif, lazer devre dışı")
+            if command.get("state"):
+                if command.get("duration"):
+                    self.laser_timeout = float(command["duration"])
+                self.laser_active = True
+                self.laser_off_time = now + self.laser_timeout
+                return response(True, "Lazer aktifleştirildi")
+            self.laser_active = False
+            return response(True, "Lazer deaktifleştirildi")
+
+        if command_type == "fan":
+            self.fan_active = bool(command.get("state"))
+            return response(True, "Fanlar aktifleştirildi" if self.fan_active else "Fanlar deaktifleştirildi")
+
+        if command_type == "status":
+            return [self._status_message()]
+
+        if command_type == "emergency_stop":
+            self.emergency_stop = bool(command.get("stop", True))
+            aborted = self._abort_trajectory() if self.emergency_stop else []
+            return aborted + response(True, "Acil durdurma uygulandı")
+
+        if command_type == "emergency_reset":
+            self.emergency_stop = False
+            return response(True, "Acil durum sıfırlandı")
+
+        if command_type == "calibrate_motors":
+            if self.emergency_stop:
+                return response(False, "Acil durum aktif, kalibrasyon yapılamıyor")
+            aborted = self._abort_trajectory()
+            self.target_horizontal = 0.0
+            self.target_vertical = 0.0
+            return aborted + response(True, "Motorlar kalibre edildi")
+
+        if command_type == "protocol":
+            mode = command.get("mode")
+            if mode not in ("binary", "json"):
+                return response(False, "Bilinmeyen protokol")
+            # Yanıt eski protokolle gönderilir, sonraki mesajlar yeni protokolle
+            for message in response(True, "Protokol değiştirildi"):
+                self._emit(message, now)
+            self.binary_mode = (mode == "binary")
+            return []
+
+        return [{"type": "error", "message": "Bilinmeyen komut tipi"}]
+
+    def _update_actuators(self, now: float):
+        """
+        Motorları dönüş hızıyla hedefe ilerletir ve lazer zaman aşımını uygular.
+        """
+        elapsed = now - self.last_motor_update
+        self.last_motor_update = now
+
+        if not self.emergency_stop:
+            rate_h, rate_v = self.axis_rates or (self.motor_rate, self.motor_rate)
+            self.horizontal_pos = self._approach(self.horizontal_pos, self.target_horizontal, rate_h * elapsed)
+            self.vertical_pos = self._approach(self.vertical_pos, self.target_vertical, rate_v * elapsed)
+            self._advance_trajectory(now)
+
+        if self.laser_active and now >= self.laser_off_time:
+            self.laser_active = False
+            self._emit({"type": "status_message", "message": "Lazer zaman aşımı, deaktifleştirildi"}, now)
+
+    def _advance_trajectory(self, now: float):
+        """
+        Etkin yörünge noktasına varıldıysa sonraki noktaya geçer; kuyruk
+        bittiyse tamamlandı mesajı gönderir (kilit tutulurken çağrılır).
+        """
+        if not self.trajectory_active:
+            return
+        if (self.horizontal_pos, self.vertical_pos) != (self.target_horizontal, self.target_vertical):
+            return
+
+        if not self.trajectory:
+            self.trajectory_active = False
+            self.axis_rates = None
+            self._emit({"type": "trajectory_done", "trajectory": self.trajectory_id, "completed": True}, now)
+            return
+
+        # Eksen hızları: iki eksen noktaya aynı anda ulaşır (doğrusal yol)
+        horizontal, vertical, duration_ms = self.trajectory.popleft()
+        seconds = duration_ms / 1000.0
+        self.axis_rates = (abs(horizontal - self.horizontal_pos) / seconds,
+                           abs(vertical - self.vertical_pos) / seconds)
+        self.target_horizontal = horizontal
+        self.target_vertical = vertical
+
+    def _abort_trajectory(self) -> List[Dict[str, Any]]:
+        """
+        Etkin yörüngeyi iptal eder (kilit tutulurken çağrılır).
+
+        Returns:
+            List[Dict[str, Any]]: Yörünge etkinse tamamlanmadı mesajı
+        """
+        self.axis_rates = None
+        self.trajectory.clear()
+        if not self.trajectory_active:
+            return []
+        self.trajectory_active = False
+        return [{"type": "trajectory_done", "trajectory": self.trajectory_id, "completed": False}]
+
+    def _motion_end(self, now: float) -> float:
+        """
+        Etkin yörünge noktasına varış zamanını tahmin eder.
+        """
+        rate_h, rate_v = self.axis_rates or (self.motor_rate, self.motor_rate)
+        remaining = [abs(target - position) / rate
+                     for target, position, rate in ((self.target_horizontal, self.horizontal_pos, rate_h),
+                                                    (self.target_vertical, self.vertical_pos, rate_v))
+                     if target != position and rate > 0]
+        return now + max(remaining, default=0.0)
+
+    @staticmethod
+    def _approach(position: float, target: float, step: float) -> float:
+        """
+        Pozisyonu hedefe en fazla step kadar yaklaştırır.
+        """
+        if abs(target - position) <= step:
+            return target
+        return position + step if target > position else position - step
+
+    def _status_message(self) -> Dict[str, Any]:
+        """
+        hss_arduino.ino sendStatusUpdate() ile aynı alanlarda durum mesajı oluşturur.
+        """
+        return {
+            "type": "status",
+            "temperature": self.temperature,
+            "horizontal_pos": self.horizontal_pos,
+            "vertical_pos": self.vertical_pos,
+            "laser_active": self.laser_active,
+            "fan_active": self.fan_active,
+            "emergency_stop": self.emergency_stop
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Simülatör istatistiklerini döndürür.
+        """
+        return {
+            "commands_handled": self.commands_handled,
+            "bytes_received": self.bytes_received,
+            "bytes_sent": self.bytes_sent,
+            "binary_mode": self.binary_mode
+        }
@@ -0,0 +1,364 @@
+"""
+Raspberry Pi ve Arduino arasındaki ikili (binary) seri protokol modülü.
+
+Her mesaj sabit düzenli bir yapıdır:
+
+    [tip: uint8][sıra: uint16 LE][gövde][CRC16: uint16 LE]
+
+CRC, CRC-16/CCITT-FALSE (polinom 0x1021, başlangıç 0xFFFF) ile tip, sıra ve
+gövde üzerinden hesaplanır. Mesaj COBS ile kodlanır ve 0x00 baytı ile
+sonlandırılır. Sıra numarası 0 olan komutlara yanıt gönderilmez.
+
+İkili karşılığı olmayan komutlar JSON_ENVELOPE tipiyle JSON metni olarak
+taşınır; bu sayede ikili modda da tüm JSON komutları kullanılabilir.
+"""
+
+import json
+import struct
+from typing import Dict, Any
+
+# Pi -> Arduino komut tipleri
+MSG_MOTOR = 0x01
+MSG_MOTOR_STOP = 0x02
+MSG_LASER = 0x03
+MSG_FAN = 0x04
+MSG_STATUS_REQUEST = 0x05
+MSG_EMERGENCY_STOP = 0x06
+MSG_EMERGENCY_RESET = 0x07
+MSG_CALIBRATE = 0x08
+MSG_TRAJECTORY = 0x09
+
+# Her iki yönde: ikili karşılığı olmayan mesajlar için JSON zarfı
+MSG_JSON_ENVELOPE = 0x7F
+
+# Arduino -> Pi mesaj tipleri
+MSG_RESPONSE = 0x80
+MSG_STATUS = 0x81
+MSG_ERROR = 0x82
+MSG_STATUS_MESSAGE = 0x83
+MSG_TRAJECTORY_DONE = 0x84
+
+FRAME_DELIMITER = b"\x00"
+
+HEADER = struct.Struct("<BH")
+CRC = struct.Struct("<H")
+
+MOTOR_BODY = struct.Struct("<ffB")        # yatay, dikey (derece), hız
+LASER_BODY = struct.Struct("<BH")         # durum, süre (ms, 0: değiştirme)
+FLAG_BODY = struct.Struct("<B")           # fan durumu, acil durdurma, yanıt durumu
+POSITION_RESPONSE_BODY = struct.Struct("<Bff")  # yanıt durumu, ölçülen yatay, dikey (motor onayı)
+STATUS_BODY = struct.Struct("<fffB")      # sıcaklık, yatay, dikey, bayraklar
+TRAJECTORY_HEADER = struct.Struct("<BB")  # bayraklar, nokta sayısı
+TRAJECTORY_POINT = struct.Struct("<ffH")  # yatay, dikey (derece), varış süresi (ms)
+TRAJECTORY_DONE_BODY = struct.Struct("<HB")  # yörünge (ilk komutun sıra numarası), tamamlandı
+
+# Yörünge bayrakları
+TRAJECTORY_APPEND = 0x01
+
+# Tek çerçevedeki en fazla yörünge noktası (hss_arduino.ino MAX_FRAME_SIZE sınırı; gönderen bölmelidir)
+TRAJECTORY_FRAME_POINTS = 16
+
+# Durum bayrakları
+STATUS_LASER_ACTIVE = 0x01
+STATUS_FAN_ACTIVE = 0x02
+STATUS_EMERGENCY_STOP = 0x04
+
+# Gövdesiz komutlar
+_EMPTY_COMMANDS = {
+    "motor_stop": MSG_MOTOR_STOP,
+    "status": MSG_STATUS_REQUEST,
+    "emergency_reset": MSG_EMERGENCY_RESET,
+    "calibrate_motors": MSG_CALIBRATE
+}
+_EMPTY_TYPES = {code: name for name, code in _EMPTY_COMMANDS.items()}
+
+
+class ProtocolError(ValueError):
+    """
+    Bozuk veya tanınmayan ikili mesaj hatası.
+    """
+
+
+def _build_crc_table():
+    table = []
+    for byte in range(256):
+        crc = byte << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        table.append(crc & 0xFFFF)
+    return table
+
+
+_CRC_TABLE = _build_crc_table()
+
+
+def crc16(data: bytes, crc: int = 0xFFFF) -> int:
+    """
+    CRC-16/CCITT-FALSE değerini hesaplar.
+
+    Args:
+        data: Veri
+        crc: Başlangıç değeri
+
+    Returns:
+        int: 16 bit CRC
+    """
+    table = _CRC_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ table[(crc >> 8) ^ byte]
+    return crc
+
+
+def cobs_encode(data: bytes) -> bytes:
+    """
+    Veriyi 0x00 içermeyecek şekilde COBS ile kodlar (sonlandırıcı eklenmez).
+
+    Args:
+        data: Ham veri
+
+    Returns:
+        bytes: Kodlanmış veri
+    """
+    out = bytearray()
+    for block in data.split(b"\x00"):
+        # 254 bayttan uzun sıfırsız bloklar 0xFF kodlu parçalara bölünür
+        while len(block) >= 254:
+            out.append(0xFF)
+            out += block[:254]
+            block = block[254:]
+        out.append(len(block) + 1)
+        out += block
+    return bytes(out)
+
+
+def cobs_decode(data: bytes) -> bytes:
+    """
+    COBS ile kodlanmış veriyi çözer.
+
+    Args:
+        data: Sonlandırıcısız kodlanmış veri
+
+    Returns:
+        bytes: Ham veri
+
+    Raises:
+        ProtocolError: Kodlama geçersizse
+    """
+    out = bytearray()
+    i = 0
+    n = len(data)
+
+    while i < n:
+        code = data[i]
+        if code == 0:
+            raise ProtocolError("COBS verisinde beklenmeyen sıfır bayt")
+
+        i += 1
+        end = i + code - 1
+        if end > n:
+            raise ProtocolError("COBS bloğu çerçeve sonunu aşıyor")
+
+        out += data[i:end]
+        i = end
+        if code < 0xFF and i < n:
+            out.append(0)
+
+    return bytes(out)
+
+
+def encode_frame(msg_type: int, seq: int, body: bytes = b"") -> bytes:
+    """
+    Başlık, gövde ve CRC'den oluşan mesajı COBS çerçevesine dönüştürür.
+
+    Args:
+        msg_type: Mesaj tipi
+        seq: Sıra numarası (uint16)
+        body: Mesaj gövdesi
+
+    Returns:
+        bytes: Sonlandırıcı dahil çerçeve
+    """
+    payload = HEADER.pack(msg_type, seq & 0xFFFF) + body
+    return cobs_encode(payload + CRC.pack(crc16(payload))) + FRAME_DELIMITER
+
+
+def encode_command(command: Dict[str, Any]) -> bytes:
+    """
+    JSON biçimindeki komutu ikili çerçeveye dönüştürür.
+    İkili karşılığı olmayan komutlar JSON zarfı ile taşınır.
+
+    Args:
+        command: Komut ("id" anahtarı sıra numarası olarak kullanılır)
+
+    Returns:
+        bytes: Sonlandırıcı dahil çerçeve
+    """
+    command_type = command.get("type")
+    seq = int(command.get("id", 0))
+
+    if command_type == "motor":
+        body = MOTOR_BODY.pack(float(command.get("horizontal", 0.0)), float(command.get("vertical", 0.0)),
+                               max(0, min(255, int(command.get("speed", 0)))))
+        return encode_frame(MSG_MOTOR, seq, body)
+
+    if command_type == "laser":
+        duration_ms = int(round(float(command.get("duration", 0.0)) * 1000))
+        body = LASER_BODY.pack(1 if command.get("state") else 0, max(0, min(0xFFFF, duration_ms)))
+        return encode_frame(MSG_LASER, seq, body)
+
+    if command_type == "fan":
+        return encode_frame(MSG_FAN, seq, FLAG_BODY.pack(1 if command.get("state") else 0))
+
+    if command_type == "emergency_stop":
+        return encode_frame(MSG_EMERGENCY_STOP, seq, FLAG_BODY.pack(1 if command.get("stop", True) else 0))
+
+    if command_type == "trajectory":
+        points = command.get("points", [])
+        body = TRAJECTORY_HEADER.pack(TRAJECTORY_APPEND if command.get("append") else 0, len(points))
+        body += b"".join(TRAJECTORY_POINT.pack(float(h), float(v), max(1, min(0xFFFF, int(duration_ms))))
+                         for h, v, duration_ms in points)
+        return encode_frame(MSG_TRAJECTORY, seq, body)
+
+    if command_type in _EMPTY_COMMANDS:
+        return encode_frame(_EMPTY_COMMANDS[command_type], seq)
+
+    # İkili karşılığı yok: JSON zarfı (sıra numarası başlıkta taşınır)
+    envelope = {key: value for key, value in command.items() if key != "id"}
+    return encode_frame(MSG_JSON_ENVELOPE, seq, json.dumps(envelope, separators=(",", ":")).encode())
+
+
+def encode_report(message: Dict[str, Any]) -> bytes:
+    """
+    Arduino'dan Pi'ye giden JSON biçimindeki mesajı ikili çerçeveye dönüştürür
+    (simülatör ve testler için).
+
+    Args:
+        message: Yanıt, durum, hata veya durum mesajı
+
+    Returns:
+        bytes: Sonlandırıcı dahil çerçeve
+    """
+    message_type = message.get("type")
+    seq = int(message.get("id", 0))
+
+    if "status" in message and message_type in (None, "response"):
+        success = 1 if message["status"] == "success" else 0
+        if "horizontal_pos" in message and "vertical_pos" in message:
+            body = POSITION_RESPONSE_BODY.pack(success, float(message["horizontal_pos"]),
+                                               float(message["vertical_pos"]))
+        else:
+            body = FLAG_BODY.pack(success)
+        return encode_frame(MSG_RESPONSE, seq, body)
+
+    if message_type == "status":
+        flags = ((STATUS_LASER_ACTIVE if message.get("laser_active") else 0) |
+                 (STATUS_FAN_ACTIVE if message.get("fan_active") else 0) |
+                 (STATUS_EMERGENCY_STOP if message.get("emergency_stop") else 0))
+        body = STATUS_BODY.pack(float(message.get("temperature", 0.0)), float(message.get("horizontal_pos", 0.0)),
+                                float(message.get("vertical_pos", 0.0)), flags)
+        return encode_frame(MSG_STATUS, seq, body)
+
+    if message_type == "error":
+        return encode_frame(MSG_ERROR, seq, message.get("message", "").encode())
+
+    if message_type == "status_message":
+        return encode_frame(MSG_STATUS_MESSAGE, seq, message.get("message", "").encode())
+
+    if message_type == "trajectory_done":
+        body = TRAJECTORY_DONE_BODY.pack(int(message.get("trajectory", 0)) & 0xFFFF,
+                                         1 if message.get("completed") else 0)
+        return encode_frame(MSG_TRAJECTORY_DONE, seq, body)
+
+    envelope = {key: value for key, value in message.items() if key != "id"}
+    return encode_frame(MSG_JSON_ENVELOPE, seq, json.dumps(envelope, separators=(",", ":")).encode())
+
+
+def decode_frame(frame: bytes) -> Dict[str, Any]:
+    """
+    Sonlandırıcısız COBS çerçevesini JSON biçimindeki mesaja çözer.
+    Sıra numarası sıfırdan farklıysa "id" anahtarı olarak eklenir.
+
+    Args:
+        frame: Sonlandırıcısız çerçeve
+
+    Returns:
+        Dict[str, Any]: Mesaj
+
+    Raises:
+        ProtocolError: Çerçeve bozuk veya mesaj tipi tanınmıyorsa
+    """
+    payload = cobs_decode(frame)
+    if len(payload) < HEADER.size + CRC.size:
+        raise ProtocolError(f"Çerçeve çok kısa: {len(payload)} bayt")
+
+    (crc,) = CRC.unpack_from(payload, len(payload) - CRC.size)
+    if crc != crc16(payload[:-CRC.size]):
+        raise ProtocolError("CRC uyuşmazlığı")
+
+    msg_type, seq = HEADER.unpack_from(payload)
+    body = payload[HEADER.size:-CRC.size]
+
+    try:
+        if msg_type == MSG_RESPONSE:
+            if len(body) == POSITION_RESPONSE_BODY.size:
+                success, horizontal, vertical = POSITION_RESPONSE_BODY.unpack(body)
+                message = {"type": "response", "status": "success" if success else "error",
+                           "horizontal_pos": horizontal, "vertical_pos": vertical}
+            else:
+                (success,) = FLAG_BODY.unpack(body)
+                message = {"type": "response", "status": "success" if success else "error"}
+        elif msg_type == MSG_STATUS:
+            temperature, horizontal, vertical, flags = STATUS_BODY.unpack(body)
+            message = {
+                "type": "status",
+                "temperature": temperature,
+                "horizontal_pos": horizontal,
+                "vertical_pos": vertical,
+                "laser_active": bool(flags & STATUS_LASER_ACTIVE),
+                "fan_active": bool(flags & STATUS_FAN_ACTIVE),
+                "emergency_stop": bool(flags & STATUS_EMERGENCY_STOP)
+            }
+        elif msg_type == MSG_ERROR:
+            message = {"type": "error", "message": body.decode(errors="replace")}
+        elif msg_type == MSG_STATUS_MESSAGE:
+            message = {"type": "status_message", "message": body.decode(errors="replace")}
+        elif msg_type == MSG_TRAJECTORY_DONE:
+            trajectory_id, completed = TRAJECTORY_DONE_BODY.unpack(body)
+            message = {"type": "trajectory_done", "trajectory": trajectory_id, "completed": bool(completed)}
+        elif msg_type == MSG_MOTOR:
+            horizontal, vertical, speed = MOTOR_BODY.unpack(body)
+            message = {"type": "motor", "horizontal": horizontal, "vertical": vertical, "speed": speed}
+        elif msg_type == MSG_TRAJECTORY:
+            flags, count = TRAJECTORY_HEADER.unpack_from(body)
+            if len(body) != TRAJECTORY_HEADER.size + count * TRAJECTORY_POINT.size:
+                raise ProtocolError(f"Yörünge gövdesi {count} nokta ile uyuşmuyor")
+            points = [list(TRAJECTORY_POINT.unpack_from(body, TRAJECTORY_HEADER.size + i * TRAJECTORY_POINT.size))
+                      for i in range(count)]
+            message = {"type": "trajectory", "append": bool(flags & TRAJECTORY_APPEND), "points": points}
+        elif msg_type == MSG_LASER:
+            state, duration_ms = LASER_BODY.unpack(body)
+            message = {"type": "laser", "state": bool(state)}
+            if duration_ms:
+                message["duration"] = duration_ms / 1000.0
+        elif msg_type == MSG_FAN:
+            (state,) = FLAG_BODY.unpack(body)
+            message = {"type": "fan", "state": bool(state)}
+        elif msg_type == MSG_EMERGENCY_STOP:
+            (stop,) = FLAG_BODY.unpack(body)
+            message = {"type": "emergency_stop", "stop": bool(stop)}
+        elif msg_type in _EMPTY_TYPES:
+            message = {"type": _EMPTY_TYPES[msg_type]}
+        elif msg_type == MSG_JSON_ENVELOPE:
+            message = json.loads(body)
+            if not isinstance(message, dict):
+                raise ProtocolError("JSON zarfı nesne içermiyor")
+        else:
+            raise ProtocolError(f"Bilinmeyen mesaj tipi: 0x{msg_type:02X}")
+    except ProtocolError:
+        raise
+    except (struct.error, ValueError) as e:
+        raise ProtocolError(f"Geçersiz mesaj gövdesi (tip 0x{msg_type:02X}): {str(e)}")
+
+    if seq:
+        message["id"] = seq
+    return message
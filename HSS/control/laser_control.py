@@ -2,41 +2,51 @@
 Lazer kontrol modülü.
 12V DC güç girişiyle çalışan lazer modülünün kontrolünü sağlar.
 MOSFET üzerinden Arduino ile kontrol edilir.
+
+Atış süresi dolunca lazerin kapatılması paylaşılan zamanlayıcıya bırakılır;
+atış başına iş parçacığı açılmaz ve çağıran beklemez. Arduino da aynı süreyle
+lazeri kendisi kapatır (bağlantı kesilse bile).
 """
 
 import time
 import logging
-import threading
 from typing import Optional
 
+from utils.scheduler import scheduler as default_scheduler
+
 class LaserController:
     """
     Lazer modülünü kontrol eden sınıf.
     """
     
-    def __init__(self, arduino_comm, timeout: float = 2.0):
+    def __init__(self, arduino_comm, timeout: float = 2.0, scheduler=None):
         """
         LaserController sınıfını başlatır.
         
         Args:
             arduino_comm: Arduino iletişim nesnesi
             timeout: Maksimum lazer açık kalma süresi (saniye)
+            scheduler: Otomatik kapatma zamanlayıcısı (None ise paylaşılan zamanlayıcı)
         """
         self.arduino = arduino_comm
         self.timeout = timeout
+        self.scheduler = scheduler or default_scheduler
         self.is_firing = False
         self.fire_start_time = 0
-        self.safety_timer = None
+        
+        # Otomatik kapatma eylemi ve atış numarası (eski atışın eylemi yeni atışı kapatmasın)
+        self.stop_event = None
+        self.shot = 0
         
         # Logger
         self.logger = logging.getLogger("LaserController")
         
         # Test modu kontrolü
-        self.test_mode = not hasattr(arduino_comm, 'serial') or arduino_comm.serial is None
+        self.test_mode = arduino_comm.test_mode
     
     def fire(self, duration: Optional[float] = None) -> bool:
         """
-        Lazeri ateşler.
+        Lazeri ateşler ve süre sonunda kapatılmasını zamanlar (beklemez).
         
         Args:
             duration: Ateşleme süresi (None ise timeout değeri kullanılır)
@@ -60,30 +70,16 @@ class LaserController:
         
         if self.test_mode:
             # Test modunda
-            self.is_firing = True
-            self.fire_start_time = time.time()
-            
-            # Güvenlik için otomatik durdurma
-            self.safety_timer = threading.Timer(duration, self.stop)
-            self.safety_timer.daemon = True
-            self.safety_timer.start()
-            
+            self._start_shot(duration)
             self.logger.debug(f"Test modu: Lazer ateşlendi, süre: {duration} saniye")
             return True
             
         try:
-            # Arduino'ya ateşleme komutu gönder - bu Arduino iletişim formatını kullanır
-            result = self.arduino.fire(duration)
+            # Arduino da süre sonunda lazeri kendisi kapatır
+            result = self.arduino.send_command({"type": "laser", "state": True, "duration": duration})
             
             if result:
-                self.is_firing = True
-                self.fire_start_time = time.time()
-                
-                # Güvenlik için otomatik durdurma
-                self.safety_timer = threading.Timer(duration, self.stop)
-                self.safety_timer.daemon = True
-                self.safety_timer.start()
-                
+                self._start_shot(duration)
                 return True
             else:
                 self.logger.error("Ateşleme komutu gönderilemedi")
@@ -93,6 +89,30 @@ class LaserController:
             self.logger.error(f"Ateşleme hatası: {str(e)}")
             return False
     
+    def _start_shot(self, duration: float):
+        """
+        Atış durumunu kaydeder ve otomatik kapatmayı zamanlar.
+        
+        Args:
+            duration: Ateşleme süresi (saniye)
+        """
+        self.shot += 1
+        self.is_firing = True
+        self.fire_start_time = time.time()
+        
+        # Güvenlik için otomatik durdurma
+        self.stop_event = self.scheduler.schedule(duration, self._auto_stop, self.shot)
+    
+    def _auto_stop(self, shot: int):
+        """
+        Atış süresi dolduğunda lazeri kapatır (zamanlayıcı iş parçacığında çalışır).
+        
+        Args:
+            shot: Eylemin zamanlandığı atış numarası
+        """
+        if shot == self.shot:
+            self.stop()
+    
     def stop(self) -> bool:
         """
         Lazeri durdurur.
@@ -105,11 +125,10 @@ class LaserController:
             
         self.logger.info("Lazer ateşlemesi durduruluyor")
         
-        # Güvenlik zamanlayıcısını iptal et
-        if self.safety_timer:
-            self.safety_timer.cancel()
-            self.safety_timer = None
-            
+        # Otomatik kapatmayı iptal et
+        self.scheduler.cancel(self.stop_event)
+        self.stop_event = None
+        
         if self.test_mode:
             # Test modunda
             active_duration = time.time() - self.fire_start_time
@@ -118,9 +137,8 @@ class LaserController:
             return True
             
         try:
-            # Arduino'ya durdurma komutu gönder - stop komutu motorları etkilemeden lazeri kapatır
-            current_h, current_v = self.arduino.get_servo_position(1), self.arduino.get_servo_position(2)
-            result = self.arduino.send_command(f"{current_h},{current_v},0")
+            # Arduino'ya durdurma komutu gönder - motorları etkilemeden lazeri kapatır
+            result = self.arduino.send_command({"type": "laser", "state": False})
             
             if result:
                 active_duration = time.time() - self.fire_start_time
@@ -161,4 +179,4 @@ class LaserController:
         if not self.is_firing:
             return 0.0
             
-        return time.time() - self.fire_start_time 
\ No newline at end of file
+        return time.time() - self.fire_start_time
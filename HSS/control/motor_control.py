@@ -4,13 +4,35 @@ Arduino üzerinden motorlara komut göndermek için ArduinoComm sınıfını kul
 """
 
 import time
-import uuid
 import logging
-from typing import Tuple, Dict, Any, Optional
+import threading
+import numpy as np
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Tuple, Dict, Any, Optional, Callable
+
+from config import MOTOR_SETPOINT_RATE, MOTOR_SPEED, MOTOR_ACCELERATION, TRAJECTORY_COMPLETION_MARGIN
+from control.zone_map import ZoneMap
+from control.trajectory import TrajectoryPlanner, TrajectoryHandle, points_per_command
+from utils.tracing import tracer
 
 class MotorController:
     """
     Step motorları kontrol eden sınıf.
+    
+    Takip döngüleri set_setpoint() ile hedef noktası bildirir. Arka plandaki
+    gönderici sabit hızda yalnızca en son hedefi gönderir; arada gelen eski
+    hedefler kuyruğa alınmadan atlanır ve yanıt beklenmez.
+    
+    Mevcut pozisyon Arduino'nun ölçtüğü pozisyondur. Her motor onayı komutun
+    alındığı andaki pozisyonu taşır; böylece takip sırasında pozisyon hedef
+    gönderim hızında (MOTOR_SETPOINT_RATE) güncellenir. Durum mesajları hareket
+    komutu gönderilmeyen zamanlarda pozisyonu günceller. Takip hedefleri bu
+    ölçüme göre hesaplanmalıdır, aksi halde henüz yürütülmemiş hedeflerin
+    üzerine hata eklenir ve birikir.
+    
+    Çok adımlı hareketler (tahtaya yönelme, kalibrasyon) execute_trajectory()
+    ile planlanıp tek toplu komutla yüklenir; dönen tutamaç beklenebilir veya
+    sorgulanabilir.
     """
     
     def __init__(self, arduino_comm, config=None):
@@ -42,7 +64,7 @@ class MotorController:
             
         self.config = config
         
-        # Mevcut pozisyonlar
+        # Mevcut (ölçülen) pozisyonlar
         self.current_horizontal_position = 0.0  # derece
         self.current_vertical_position = 0.0    # derece
         
@@ -53,8 +75,36 @@ class MotorController:
         # Hareket durumu
         self.is_moving = False
         
-        # Güvenlik kontrolleri
+        # Güvenlik kontrolleri (sınırlar ve yasak bölgeler başlangıçta bir kez derlenir)
         self.restricted_zones = config.get("RESTRICTED_ZONES", [])
+        self.zone_map = ZoneMap(self.restricted_zones,
+                                config.get("MOTOR_HORIZONTAL_RANGE", 270),
+                                config.get("MOTOR_VERTICAL_RANGE", 60))
+        self.default_speed = config.get("MOTOR_SPEED", 100)
+        
+        # Yörünge planlayıcı ve yürütülen yörünge (aynı anda tek yörünge)
+        self.planner = TrajectoryPlanner(self.zone_map,
+                                         config.get("MOTOR_SPEED", MOTOR_SPEED),
+                                         config.get("MOTOR_ACCELERATION", MOTOR_ACCELERATION))
+        self.active_trajectory = None
+        self.trajectory_lock = threading.Lock()
+        self.arduino.add_message_listener("trajectory_done", self._on_trajectory_done)
+        
+        # Ölçülen pozisyon motor onaylarından ve durum mesajlarından okunur
+        self.arduino.add_status_listener(self._on_status)
+        
+        # Hedef noktası akışı (en son hedef kazanır)
+        self.setpoint_period = 1.0 / config.get("MOTOR_SETPOINT_RATE", MOTOR_SETPOINT_RATE)
+        self.pending_setpoint = None
+        self.setpoint_lock = threading.Lock()
+        self.setpoint_event = threading.Event()
+        self.setpoint_thread = None
+        self.setpoint_stop = threading.Event()
+        
+        # stop() her çağrıldığında artar; önceki nesilden kalan hedefler gönderilmez
+        self.setpoint_generation = 0
+        self.setpoints_posted = 0
+        self.setpoints_sent = 0
         
         # Logger
         self.logger = logging.getLogger("MotorController")
@@ -70,20 +120,57 @@ class MotorController:
             wait: Hareket tamamlanana kadar bekle
             
         Returns:
-            bool: Hareket başarılı ise True
+            bool: Hareket başarılı ise True (wait=False ise komut gönderildiyse True)
         """
+        future = self.move_to_position_async(horizontal, vertical, speed)
+        
+        if future.done():
+            return future.result()
+        
+        if not wait:
+            return True
+        
+        try:
+            return future.result(timeout=10.0)
+        except FutureTimeoutError:
+            self.is_moving = False
+            self.logger.error("Motor hareketi zaman aşımına uğradı")
+            return False
+    
+    def move_to_position_async(self, horizontal: float, vertical: float, speed: int = None,
+                               callback: Optional[Callable[[bool], None]] = None) -> Future:
+        """
+        Hareket komutunu gönderir ve tamamlanmayı beklemeden bir Future döndürür.
+        
+        Future, Arduino hareketi onayladığında True, reddettiğinde veya komut
+        gönderilemediğinde False ile çözülür. Güvenlik reddi ve test modunda
+        çözülmüş bir Future döner.
+        
+        Args:
+            horizontal: Yatay pozisyon (derece)
+            vertical: Dikey pozisyon (derece)
+            speed: Motor hızı (0-100)
+            callback: Hareket sonucu (bool) ile çağrılacak fonksiyon
+            
+        Returns:
+            Future: Hareket sonucu
+        """
+        result = Future()
+        if callback is not None:
+            result.add_done_callback(lambda f: callback(f.result()))
+        
+        # Sınırları uygula (güvenlik kontrolü gerçekte gidilecek pozisyon için yapılır)
+        horizontal, vertical = self.zone_map.clamp(horizontal, vertical)
+        
         # Güvenlik kontrolü
         if not self._is_position_safe(horizontal, vertical):
             self.logger.warning(f"Güvenlik kısıtlaması: {horizontal}, {vertical} konumu yasak bölgede")
-            return False
-        
-        # Sınırları kontrol et
-        horizontal = self._clamp_horizontal(horizontal)
-        vertical = self._clamp_vertical(vertical)
+            result.set_result(False)
+            return result
         
         # Motor hızını ayarla
         if speed is None:
-            speed = self.config.get("MOTOR_SPEED", 100)
+            speed = self.default_speed
         
         # Test modunda doğrudan pozisyonları güncelle
         if self.test_mode:
@@ -92,14 +179,11 @@ class MotorController:
             self.current_horizontal_position = horizontal
             self.current_vertical_position = vertical
             self.logger.debug(f"Test modu: Motorlar hareket etti - H:{horizontal}° V:{vertical}°")
-            return True
-            
-        # Komut ID'si oluştur
-        command_id = str(uuid.uuid4())
+            result.set_result(True)
+            return result
         
-        # Arduino'ya komut gönder
+        # Arduino'ya komut gönder (ID'yi ArduinoComm atar)
         command = {
-            "id": command_id,
             "type": "motor",
             "horizontal": horizontal,
             "vertical": vertical,
@@ -111,25 +195,145 @@ class MotorController:
         self.target_vertical_position = vertical
         self.is_moving = True
         
-        # Komutu gönder
-        if not self.arduino.send_command(command):
+        self.arduino.send_command_async(
+            command, lambda response: self._on_move_response(response, horizontal, vertical, result))
+        return result
+    
+    def _on_move_response(self, response: Optional[Dict[str, Any]], horizontal: float, vertical: float,
+                          result: Future):
+        """
+        Hareket komutunun yanıtını işler (okuma iş parçacığında çalışır).
+        
+        Args:
+            response: Arduino yanıtı (gönderim hatasında None)
+            horizontal: Komutun yatay pozisyonu
+            vertical: Komutun dikey pozisyonu
+            result: Hareket sonucunun yazılacağı Future
+        """
+        success = bool(response) and response.get("status") == "success"
+        
+        # Onay, komutun alındığı andaki ölçülen pozisyonu taşır (eski yazılımlarda yok)
+        if success:
+            self._update_measured_position(response)
+        else:
+            self.logger.error("Motor hareketi başarısız")
+        
+        # Daha yeni bir hedef gönderildiyse hareket sürüyor
+        if not success or (horizontal, vertical) == (self.target_horizontal_position,
+                                                     self.target_vertical_position):
             self.is_moving = False
-            return False
         
-        # Yanıtı bekle
-        if wait:
-            response = self.arduino.wait_for_response(command_id, timeout=10.0)
-            if response and response.get("status") == "success":
-                self.current_horizontal_position = horizontal
-                self.current_vertical_position = vertical
-                self.is_moving = False
-                return True
-            else:
-                self.is_moving = False
-                self.logger.error("Motor hareketi başarısız")
-                return False
-        
-        return True
+        result.set_result(success)
+    
+    def _on_status(self, status: Dict[str, Any]):
+        """
+        Durum mesajındaki ölçülen motor pozisyonlarını saklar (okuma iş parçacığında çalışır).
+        
+        Args:
+            status: Çözülmüş durum mesajı
+        """
+        self._update_measured_position(status)
+    
+    def _update_measured_position(self, message: Dict[str, Any]):
+        """
+        Mesajda ölçülen pozisyon varsa mevcut pozisyonu günceller. Mesajlar
+        okuma iş parçacığında geliş sırasıyla işlendiği için son mesaj en yeni
+        ölçümdür.
+        
+        Args:
+            message: Motor onayı veya durum mesajı
+        """
+        if "horizontal_pos" not in message or "vertical_pos" not in message:
+            return
+        
+        self.current_horizontal_position = float(message["horizontal_pos"])
+        self.current_vertical_position = float(message["vertical_pos"])
+    
+    def set_setpoint(self, horizontal: float, vertical: float, speed: int = None, trace_id: int = None):
+        """
+        Takip için yeni hedef noktası bildirir ve beklemeden döner.
+        
+        Gönderilmemiş önceki hedefin yerine geçer; gönderici iş parçacığı
+        MOTOR_SETPOINT_RATE hızında en son hedefi gönderir. Yasak bölgedeki
+        hedefler reddedilmek yerine en yakın güvenli pozisyona taşınır.
+        
+        Args:
+            horizontal: Yatay pozisyon (derece)
+            vertical: Dikey pozisyon (derece)
+            speed: Motor hızı (0-100)
+            trace_id: Hedefin hesaplandığı karenin gecikme izi numarası
+        """
+        with self.setpoint_lock:
+            if self.setpoint_stop.is_set():
+                return
+            
+            self.pending_setpoint = (horizontal, vertical, speed, trace_id)
+            self.setpoints_posted += 1
+            
+            # İş parçacığı kilit altında başlatılır; eşzamanlı çağrılar ikinci bir gönderici açmaz
+            if self.setpoint_thread is None or not self.setpoint_thread.is_alive():
+                self.setpoint_thread = threading.Thread(target=self._setpoint_loop)
+                self.setpoint_thread.daemon = True
+                self.setpoint_thread.start()
+        
+        self.setpoint_event.set()
+    
+    def _setpoint_loop(self):
+        """
+        Bekleyen en son hedef noktasını sabit periyotla gönderen döngü (arka plan iş parçacığı).
+        close() çağrılınca sonlanır.
+        """
+        next_send = time.monotonic()
+        
+        while not self.setpoint_stop.is_set():
+            self.setpoint_event.wait()
+            
+            # Kontrol periyodu dolmadan gönderme; bu sürede gelen hedefler birleşir
+            delay = next_send - time.monotonic()
+            if delay > 0 and self.setpoint_stop.wait(delay):
+                break
+            
+            self.setpoint_event.clear()
+            with self.setpoint_lock:
+                setpoint, self.pending_setpoint = self.pending_setpoint, None
+                generation = self.setpoint_generation
+            if setpoint is None:
+                continue
+            
+            horizontal, vertical, speed, trace_id = setpoint
+            try:
+                # Takip yasak bölge sınırında sürer
+                projected = self.zone_map.project_to_safe(horizontal, vertical)
+                if projected is None:
+                    continue
+                
+                # Alındıktan sonra stop() çağrıldıysa hedef gönderilmez. Kilit gönderim
+                # boyunca tutulur; böylece motor_stop her zaman bu komuttan sonra gider.
+                with self.setpoint_lock:
+                    if generation != self.setpoint_generation:
+                        continue
+                    result = self.move_to_position_async(projected[0], projected[1], speed)
+                self.setpoints_sent += 1
+                
+                # Komut seri porta yazıldı (güvenlik reddi hemen False ile sonuçlanır)
+                if not result.done() or result.result():
+                    tracer.mark(trace_id, "command")
+            except Exception as e:
+                self.logger.error(f"Hedef noktası gönderilemedi: {str(e)}")
+            
+            next_send = max(next_send + self.setpoint_period, time.monotonic())
+    
+    def get_setpoint_stats(self) -> Dict[str, int]:
+        """
+        Bildirilen, gönderilen ve atlanan hedef noktası sayılarını döndürür.
+        """
+        posted, sent = self.setpoints_posted, self.setpoints_sent
+        pending = 1 if self.pending_setpoint is not None else 0
+        return {
+            "posted": posted,
+            "sent": sent,
+            "dropped": max(0, posted - sent - pending)
+        }
     
     def stop(self) -> bool:
         """
@@ -138,6 +342,13 @@ class MotorController:
         Returns:
             bool: Durdurma başarılı ise True
         """
+        # Gönderilmemiş takip hedefini ve yürütülen yörüngeyi iptal et; göndericinin
+        # almış olduğu hedef nesil değiştiği için gönderilmez
+        with self.setpoint_lock:
+            self.pending_setpoint = None
+            self.setpoint_generation += 1
+        self._finish_trajectory(None, False)
+        
         # Test modunda
         if self.test_mode:
             self.is_moving = False
@@ -152,10 +363,31 @@ class MotorController:
         self.is_moving = False
         return result
     
+    def close(self):
+        """
+        Hedef noktası göndericisini durdurur ve iş parçacığının bitmesini bekler.
+        """
+        with self.setpoint_lock:
+            self.setpoint_stop.set()
+            self.pending_setpoint = None
+            self.setpoint_generation += 1
+            thread = self.setpoint_thread
+        self.setpoint_event.set()
+        
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=1.0)
+        
+        self.arduino.remove_message_listener("trajectory_done", self._on_trajectory_done)
+        self.arduino.remove_status_listener(self._on_status)
+    
     def get_current_position(self) -> Tuple[float, float]:
         """
         Mevcut motor pozisyonlarını döndürür.
         
+        Pozisyon son motor onayında veya durum mesajında ölçülen (test modunda
+        son komut edilen) pozisyondur; gönderilmiş ama henüz yürütülmemiş
+        hedefleri içermez.
+        
         Returns:
             Tuple[float, float]: (yatay, dikey) derece cinsinden
         """
@@ -236,10 +468,7 @@ class MotorController:
         Returns:
             float: Sınırlar içinde tutulan değer
         """
-        h_range = self.config.get("MOTOR_HORIZONTAL_RANGE", 270)
-        min_h = -h_range / 2
-        max_h = h_range / 2
-        
+        min_h, max_h = self.zone_map.horizontal_limits
         return max(min_h, min(max_h, value))
     
     def _clamp_vertical(self, value: float) -> float:
@@ -252,10 +481,7 @@ class MotorController:
         Returns:
             float: Sınırlar içinde tutulan değer
         """
-        v_range = self.config.get("MOTOR_VERTICAL_RANGE", 60)
-        min_v = 0  # Genellikle 0 derece alt sınır
-        max_v = v_range
-        
+        min_v, max_v = self.zone_map.vertical_limits
         return max(min_v, min(max_v, value))
     
     def _is_position_safe(self, horizontal: float, vertical: float) -> bool:
@@ -269,107 +495,252 @@ class MotorController:
         Returns:
             bool: Pozisyon güvenli ise True
         """
-        # Tüm kısıtlamalı bölgeleri kontrol et
-        for zone in self.restricted_zones:
-            h_range = zone.get("horizontal", (-180, 180))
-            v_range = zone.get("vertical", (0, 60))
+        return not self.zone_map.in_restricted_zone(horizontal, vertical)
+    
+    def are_positions_safe(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Pozisyon dizisini (örn. bir yörüngenin tüm noktaları) tek çağrıda kontrol eder.
+        
+        Args:
+            positions: [N, 2] (yatay, dikey) pozisyonlar (derece)
+            
+        Returns:
+            np.ndarray: [N] bool dizi - pozisyon sınırlar içinde ve yasak bölge dışındaysa True
+        """
+        return self.zone_map.are_positions_safe(positions)
+    
+    def execute_trajectory(self, waypoints, speed: int = None,
+                           callback: Optional[Callable[[bool], None]] = None) -> TrajectoryHandle:
+        """
+        Mevcut pozisyondan ara noktalara giden yörüngeyi planlar, Arduino'ya tek
+        toplu komutla yükler ve hareketin bitmesini beklemeden tutamaç döndürür.
+        
+        Yörünge hız/ivme sınırlarına uyar ve yolun tamamı yasak bölge kontrolünden
+        geçer; güvenli değilse hiçbir komut gönderilmez. Yeni yörünge veya başka
+        bir hareket komutu yürütülen yörüngeyi keser.
+        
+        Args:
+            waypoints: Sırayla gidilecek (yatay, dikey) pozisyonlar (derece)
+            speed: En yüksek motor hızı (None ise MOTOR_SPEED)
+            callback: Yörünge sonucu (bool) ile çağrılacak fonksiyon
+            
+        Returns:
+            TrajectoryHandle: Tamamlanmayı beklemek veya sorgulamak için tutamaç
+        """
+        trajectory = self.planner.plan(self.get_current_position(), waypoints, speed)
+        handle = TrajectoryHandle(trajectory, self.stop)
+        if callback is not None:
+            handle.add_done_callback(callback)
+        
+        if trajectory is None:
+            handle._finish(False)
+            return handle
+        
+        self.target_horizontal_position, self.target_vertical_position = trajectory.end
+        
+        # Test modunda veya zaten hedefteyse doğrudan tamamla
+        if self.test_mode or not len(trajectory.points):
+            self.current_horizontal_position, self.current_vertical_position = trajectory.end
+            self.logger.debug(f"Yörünge tamamlandı: {len(trajectory.points)} nokta, "
+                              f"{trajectory.duration:.2f} s")
+            handle._finish(True)
+            return handle
+        
+        # Tamamlanma mesajı ilk komutun ID'siyle gelir; yanıt beklemeden tüm parçalar gönderilir
+        commands = trajectory.to_commands(points_per_command(getattr(self.arduino, "protocol", "json")))
+        commands[0]["id"] = handle.trajectory_id = self.arduino.next_command_id()
+        
+        with self.trajectory_lock:
+            previous, self.active_trajectory = self.active_trajectory, handle
+        if previous is not None:
+            previous._finish(False)
+        self.is_moving = True
+        
+        for command in commands:
+            self.arduino.send_command_async(command, lambda response: self._on_trajectory_upload(response, handle))
+        
+        self.logger.debug(f"Yörünge yüklendi: {len(trajectory.points)} nokta, {len(commands)} komut, "
+                          f"{trajectory.duration:.2f} s")
+        return handle
+    
+    def follow_trajectory(self, waypoints, speed: int = None) -> bool:
+        """
+        Yörüngeyi yürütür ve tamamlanmasını bekler.
+        
+        Args:
+            waypoints: Sırayla gidilecek (yatay, dikey) pozisyonlar (derece)
+            speed: En yüksek motor hızı (None ise MOTOR_SPEED)
             
-            if (h_range[0] <= horizontal <= h_range[1] and 
-                v_range[0] <= vertical <= v_range[1]):
-                return False
+        Returns:
+            bool: Yörünge tamamlandıysa True
+        """
+        return self._wait_trajectory(self.execute_trajectory(waypoints, speed))
+    
+    def _wait_trajectory(self, handle: TrajectoryHandle) -> bool:
+        """
+        Yörüngeyi planlanan süre ve TRAJECTORY_COMPLETION_MARGIN kadar bekler;
+        süre dolarsa hareketi durdurur.
         
-        return True
+        Args:
+            handle: Yörünge tutamacı
+            
+        Returns:
+            bool: Yörünge tamamlandıysa True
+        """
+        if handle.wait(handle.duration + TRAJECTORY_COMPLETION_MARGIN):
+            return True
+        
+        if not handle.done():
+            self.logger.error("Yörünge zaman aşımına uğradı")
+            handle.cancel()
+        return False
     
-    def move_to_board(self, board: str) -> bool:
+    def _on_trajectory_upload(self, response: Optional[Dict[str, Any]], handle: TrajectoryHandle):
+        """
+        Yörünge komutunun yanıtını işler (okuma iş parçacığında çalışır).
+        Herhangi bir parça reddedilirse yörünge durdurulur.
+        
+        Args:
+            response: Arduino yanıtı (gönderim hatasında None)
+            handle: Yörünge tutamacı
+        """
+        if response and response.get("status") == "success":
+            return
+        
+        if not handle.done():
+            self.logger.error(f"Yörünge yüklenemedi: {response.get('message', '') if response else 'yanıt yok'}")
+            handle.cancel()
+    
+    def _on_trajectory_done(self, message: Dict[str, Any]):
         """
-        Belirtilen tahtaya yönelir (A veya B).
+        Arduino'nun yörünge tamamlandı mesajını işler (okuma iş parçacığında çalışır).
+        
+        Args:
+            message: {"type": "trajectory_done", "trajectory": ID, "completed": bool}
+        """
+        handle = self.active_trajectory
+        if handle is None or handle.trajectory_id != message.get("trajectory"):
+            return
+        
+        completed = bool(message.get("completed"))
+        if completed:
+            self.current_horizontal_position, self.current_vertical_position = handle.trajectory.end
+        else:
+            self.logger.warning("Yörünge tamamlanmadan kesildi")
+        
+        self.is_moving = False
+        self._finish_trajectory(handle, completed)
+    
+    def _finish_trajectory(self, handle: Optional[TrajectoryHandle], success: bool):
+        """
+        Yürütülen yörüngeyi sonuçlandırır.
+        
+        Args:
+            handle: Sonuçlandırılacak tutamaç (None ise yürütülen yörünge)
+            success: Yörünge sonucu
+        """
+        with self.trajectory_lock:
+            active = self.active_trajectory
+            if active is None or (handle is not None and handle is not active):
+                return
+            self.active_trajectory = None
+        active._finish(success)
+    
+    def _board_position(self, board: str) -> Optional[float]:
+        """
+        Tahtanın yatay pozisyonunu döndürür.
         
         Args:
             board: Tahta kimliği ('A' veya 'B')
             
         Returns:
-            bool: Hareket başarılı ise True
+            Optional[float]: Yatay pozisyon (derece, geçersiz kimlikte None)
         """
         if board.upper() == 'A':
-            position = self.config.get("BOARD_A_POSITION", -45)
-            return self.move_to_position(position, 30)
+            return self.config.get("BOARD_A_POSITION", -45)
         elif board.upper() == 'B':
-            position = self.config.get("BOARD_B_POSITION", 45)
-            return self.move_to_position(position, 30)
-        else:
-            self.logger.error(f"Geçersiz tahta kimliği: {board}")
-            return False
+            return self.config.get("BOARD_B_POSITION", 45)
+        
+        self.logger.error(f"Geçersiz tahta kimliği: {board}")
+        return None
     
-    def advanced_calibration(self) -> bool:
+    def move_to_board_async(self, board: str) -> TrajectoryHandle:
+        """
+        Belirtilen tahtaya (A veya B) yönelme hareketini başlatır ve beklemeden döner.
+        
+        Args:
+            board: Tahta kimliği ('A' veya 'B')
+            
+        Returns:
+            TrajectoryHandle: Hareket tutamacı (geçersiz kimlikte başarısız olarak sonuçlanmış)
         """
-        Motorlar için gelişmiş kalibrasyon yapar.
-        1. Sınır kontrolleri
+        position = self._board_position(board)
+        if position is None:
+            handle = TrajectoryHandle(None)
+            handle._finish(False)
+            return handle
+        
+        return self.execute_trajectory([(position, 30)])
+    
+    def move_to_board(self, board: str) -> bool:
+        """
+        Belirtilen tahtaya yönelir (A veya B) ve hareketin bitmesini bekler.
+        
+        Args:
+            board: Tahta kimliği ('A' veya 'B')
+            
+        Returns:
+            bool: Hareket başarılı ise True
+        """
+        return self._wait_trajectory(self.move_to_board_async(board))
+    
+    def advanced_calibration_async(self) -> TrajectoryHandle:
+        """
+        Gelişmiş kalibrasyonu başlatır ve beklemeden döner.
+        1. Her eksende hafif hareketle sınır kontrolü
         2. Yumuşak hareketlerle sıfır pozisyona dönüş
-        3. Ek olarak her eksende doğrulama kontrolü
+        
+        Tüm adımlar tek yörünge olarak yüklenir; yörünge tamamlanması her eksenin
+        doğrulaması sayılır.
         
         Returns:
-            bool: Kalibrasyon başarılı ise True
+            TrajectoryHandle: Kalibrasyon tutamacı
         """
         self.logger.info("Gelişmiş motor kalibrasyonu başlatılıyor...")
         
-        # Test modunda
-        if self.test_mode:
-            self.logger.debug("Test modu: Gelişmiş motor kalibrasyonu çalışıyor")
-            time.sleep(2.0)  # Simüle edilmiş kalibrasyon süresi
-            self.current_horizontal_position = 0.0
-            self.current_vertical_position = 0.0
-            self.target_horizontal_position = 0.0
-            self.target_vertical_position = 0.0
-            self.is_moving = False
-            self.logger.info("Test modu: Gelişmiş kalibrasyon tamamlandı")
-            return True
+        _, vertical = self.get_current_position()
+        waypoints = [
+            (10.0, vertical),   # Yatay kontrol - hafifçe sağa dön
+            (0.0, vertical),    # Tekrar merkeze dön
+            (0.0, 10.0),        # Dikey kontrol - hafifçe yukarı kalk
+            (0.0, 0.0)          # Sıfır pozisyona dön
+        ]
         
-        # Adım 1: Motor sınırlarını kontrol et
-        try:
-            # Yatay kontrol - Hafifçe sağa dön ve geri dön
-            h_check = self.move_to_position(10.0, self.current_vertical_position, 30)
-            if not h_check:
-                self.logger.error("Yatay motor kontrolü başarısız!")
-                return False
-            time.sleep(0.5)
-            
-            # Tekrar merkeze dön
-            h_center = self.move_to_position(0.0, self.current_vertical_position, 30)
-            if not h_center:
-                self.logger.error("Yatay pozisyona dönüş başarısız!")
-                return False
-            time.sleep(0.5)
-            
-            # Dikey kontrol - Hafifçe yukarı kalk ve geri dön
-            v_check = self.move_to_position(self.current_horizontal_position, 10.0, 30)
-            if not v_check:
-                self.logger.error("Dikey motor kontrolü başarısız!")
-                return False
-            time.sleep(0.5)
-            
-            # Tekrar merkeze dön
-            v_center = self.move_to_position(self.current_horizontal_position, 0.0, 30)
-            if not v_center:
-                self.logger.error("Dikey pozisyona dönüş başarısız!")
-                return False
-            
-            # Adım 2: Tam sıfır pozisyona hassas ayar
-            final_cal = self.move_to_position(0.0, 0.0, 20)
-            if not final_cal:
-                self.logger.error("Son kalibrasyon pozisyonu başarısız!")
-                return False
-            
-            # Başarılı kalibrasyon
-            self.current_horizontal_position = 0.0
-            self.current_vertical_position = 0.0
-            self.target_horizontal_position = 0.0
-            self.target_vertical_position = 0.0
-            self.is_moving = False
-            self.logger.info("Gelişmiş motor kalibrasyonu başarıyla tamamlandı!")
-            return True
-            
-        except Exception as e:
-            self.logger.error(f"Kalibrasyon sırasında hata: {str(e)}")
-            # Acil durumda en azından sıfır pozisyona dönmeyi dene
-            self.move_to_position(0.0, 0.0)
-            return False 
\ No newline at end of file
+        return self.execute_trajectory(waypoints, 30, self._on_advanced_calibration)
+    
+    def _on_advanced_calibration(self, success: bool):
+        """
+        Gelişmiş kalibrasyon yörüngesinin sonucunu işler.
+        
+        Args:
+            success: Yörünge tamamlandıysa True
+        """
+        if not success:
+            self.logger.error("Gelişmiş motor kalibrasyonu başarısız!")
+            return
+        
+        self.current_horizontal_position = 0.0
+        self.current_vertical_position = 0.0
+        self.target_horizontal_position = 0.0
+        self.target_vertical_position = 0.0
+        self.is_moving = False
+        self.logger.info("Gelişmiş motor kalibrasyonu başarıyla tamamlandı!")
+    
+    def advanced_calibration(self) -> bool:
+        """
+        Gelişmiş kalibrasyonu yapar ve tamamlanmasını bekler.
+        
+        Returns:
+            bool: Kalibrasyon başarılı ise True
+        """
+        return self._wait_trajectory(self.advanced_calibration_async())
@@ -0,0 +1,343 @@
+"""
+Çok adımlı motor hareketleri için yörünge planlama modülü.
+
+Ara noktalar arasındaki her doğru parçası için MOTOR_SPEED ve
+MOTOR_ACCELERATION sınırlarına uyan yamuk (trapez) hız profili çıkarılır.
+Profil, Arduino'nun yürütebileceği sabit hızlı parçalara bölünür: her yörünge
+noktası bir hedef pozisyon ve o pozisyona varış süresidir. Arduino iki ekseni
+noktaya aynı anda ulaşacak hızlarda sürdüğünden noktalar arasındaki yol
+doğrusaldır; bu yol sıkça örneklenip tek seferde yasak bölge kontrolünden
+geçirilir.
+
+Plan Arduino'ya tek bir toplu komut olarak yüklenir (çerçeve sınırını aşan
+planlar yanıt beklenmeden ardışık parçalar halinde gönderilir) ve hareketin
+tamamlanması TrajectoryHandle ile beklenir veya sorgulanır.
+
+Birimler: hız RPM (1 RPM = 6 derece/saniye), ivme RPM/saniye.
+"""
+
+import time
+import logging
+import numpy as np
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeoutError
+from typing import List, Tuple, Dict, Any, Optional, Callable, Sequence
+
+from config import (MOTOR_SPEED, MOTOR_ACCELERATION, TRAJECTORY_RAMP_STEPS, TRAJECTORY_MAX_POINTS,
+                    TRAJECTORY_CHECK_STEP)
+from control.binary_protocol import TRAJECTORY_FRAME_POINTS
+from control.zone_map import ZoneMap
+
+# Step motor hızı: derece/saniye = RPM * 6
+DEGREES_PER_SECOND_PER_RPM = 6.0
+
+# JSON modunda komut başına nokta sayısı (hss_arduino.ino StaticJsonDocument<256> sınırı)
+JSON_CHUNK_POINTS = 4
+
+
+def points_per_command(protocol: str) -> int:
+    """
+    Hat protokolüne göre tek komutta gönderilebilecek yörünge noktası sayısını döndürür.
+
+    Args:
+        protocol: "binary" veya "json"
+
+    Returns:
+        int: Komut başına en fazla nokta
+    """
+    return TRAJECTORY_FRAME_POINTS if protocol == "binary" else JSON_CHUNK_POINTS
+
+
+class Trajectory:
+    """
+    Planlanmış yörünge: başlangıç pozisyonu ve (yatay, dikey, süre) noktaları.
+    """
+
+    def __init__(self, start: Tuple[float, float], points: np.ndarray):
+        """
+        Trajectory sınıfını başlatır.
+
+        Args:
+            start: Başlangıç pozisyonu (yatay, dikey derece)
+            points: [N, 3] (yatay, dikey derece, varış süresi saniye) noktaları
+        """
+        self.start = (float(start[0]), float(start[1]))
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+
+        # Noktalara varış zamanları (başlangıçtan itibaren, saniye)
+        self.times = np.cumsum(self.points[:, 2])
+        self.duration = float(self.times[-1]) if len(self.times) else 0.0
+
+    @property
+    def end(self) -> Tuple[float, float]:
+        """
+        Yörüngenin bitiş pozisyonu.
+        """
+        if not len(self.points):
+            return self.start
+        return float(self.points[-1, 0]), float(self.points[-1, 1])
+
+    def position_at(self, elapsed: float) -> Tuple[float, float]:
+        """
+        Başlangıçtan elapsed saniye sonraki planlanan pozisyonu döndürür.
+
+        Args:
+            elapsed: Geçen süre (saniye)
+
+        Returns:
+            Tuple[float, float]: (yatay, dikey) derece
+        """
+        times = np.concatenate([[0.0], self.times])
+        h = np.concatenate([[self.start[0]], self.points[:, 0]])
+        v = np.concatenate([[self.start[1]], self.points[:, 1]])
+        return float(np.interp(elapsed, times, h)), float(np.interp(elapsed, times, v))
+
+    def to_commands(self, chunk_size: int) -> List[Dict[str, Any]]:
+        """
+        Yörüngeyi Arduino komutlarına böler. İlk komut mevcut yörüngenin yerine
+        geçer, sonrakiler kuyruğa eklenir.
+
+        Args:
+            chunk_size: Komut başına en fazla nokta sayısı
+
+        Returns:
+            List[Dict[str, Any]]: "trajectory" komutları (süreler milisaniye)
+        """
+        points = [[round(float(h), 3), round(float(v), 3), max(1, int(round(duration * 1000)))]
+                  for h, v, duration in self.points]
+        return [{"type": "trajectory", "append": i > 0, "points": points[i:i + chunk_size]}
+                for i in range(0, len(points), chunk_size)]
+
+
+class TrajectoryPlanner:
+    """
+    Ara noktalardan hız ve ivme sınırlarına uyan, yasak bölgelere girmeyen
+    yörünge planlayan sınıf.
+    """
+
+    def __init__(self, zone_map: ZoneMap, max_speed: float = MOTOR_SPEED,
+                 acceleration: float = MOTOR_ACCELERATION, ramp_steps: int = TRAJECTORY_RAMP_STEPS,
+                 max_points: int = TRAJECTORY_MAX_POINTS, check_step: float = TRAJECTORY_CHECK_STEP):
+        """
+        TrajectoryPlanner sınıfını başlatır.
+
+        Args:
+            zone_map: Hareket sınırları ve yasak bölgeler
+            max_speed: En yüksek motor hızı (RPM)
+            acceleration: Motor ivmesi (RPM/saniye)
+            ramp_steps: Hızlanma ve yavaşlama rampası başına nokta sayısı
+            max_points: Yörüngedeki en fazla nokta (Arduino kuyruk kapasitesi)
+            check_step: Yasak bölge kontrolünde yol örnekleme aralığı (derece)
+        """
+        self.zone_map = zone_map
+        self.max_speed = max_speed
+        self.acceleration = acceleration * DEGREES_PER_SECOND_PER_RPM
+        self.ramp_steps = max(1, ramp_steps)
+        self.max_points = max_points
+        self.check_step = check_step
+
+        # Logger
+        self.logger = logging.getLogger("TrajectoryPlanner")
+
+    def plan(self, start: Tuple[float, float], waypoints: Sequence[Tuple[float, float]],
+             speed: Optional[float] = None) -> Optional[Trajectory]:
+        """
+        Başlangıçtan ara noktalara sırayla giden yörüngeyi planlar. Her ara
+        noktada durulur (duruştan duruşa profiller).
+
+        Args:
+            start: Başlangıç pozisyonu (yatay, dikey derece)
+            waypoints: Ara noktalar (yatay, dikey derece)
+            speed: En yüksek hız (RPM, None ise max_speed; max_speed'i aşamaz)
+
+        Returns:
+            Optional[Trajectory]: Yörünge (ara nokta veya yol güvenli değilse,
+                                  ya da nokta sayısı sınırı aşılırsa None)
+        """
+        cruise = self.max_speed if speed is None else min(speed, self.max_speed)
+        cruise *= DEGREES_PER_SECOND_PER_RPM
+
+        targets = np.asarray(waypoints, dtype=np.float64).reshape(-1, 2)
+        unsafe = ~self.zone_map.are_positions_safe(targets)
+        if unsafe.any():
+            h, v = targets[np.argmax(unsafe)]
+            self.logger.warning(f"Yörünge planlanamadı: {h:.1f}, {v:.1f} ara noktası güvenli değil")
+            return None
+
+        points = []
+        position = np.asarray(start, dtype=np.float64)
+        for target in targets:
+            points.extend(self._plan_segment(position, target, cruise))
+            position = target
+
+        trajectory = Trajectory(start, np.array(points).reshape(-1, 3))
+        if len(trajectory.points) > self.max_points:
+            self.logger.warning(f"Yörünge planlanamadı: {len(trajectory.points)} nokta "
+                                f"(en fazla {self.max_points})")
+            return None
+
+        if not self._is_path_safe(trajectory):
+            return None
+
+        return trajectory
+
+    def _plan_segment(self, start: np.ndarray, end: np.ndarray, cruise: float) -> List[Tuple[float, float, float]]:
+        """
+        Doğru parçası için yamuk profili sabit hızlı parçalara böler.
+
+        Args:
+            start: Parça başı (yatay, dikey)
+            end: Parça sonu (yatay, dikey)
+            cruise: Seyir hızı (derece/saniye)
+
+        Returns:
+            List[Tuple[float, float, float]]: (yatay, dikey, süre) noktaları
+        """
+        direction = end - start
+        distance = float(np.hypot(*direction))
+        if distance < 1e-6:
+            return []
+
+        # Seyir hızına ulaşılamayan kısa parçalarda üçgen profil
+        accel = self.acceleration
+        peak = min(cruise, np.sqrt(accel * distance))
+        ramp_time = peak / accel
+        ramp_distance = peak * peak / (2 * accel)
+
+        # Rampa dilimlerinin sonundaki yol ve dilim süreleri
+        slice_time = ramp_time / self.ramp_steps
+        accel_ends = [0.5 * accel * (slice_time * (i + 1)) ** 2 for i in range(self.ramp_steps)]
+        decel_ends = [distance - 0.5 * accel * (slice_time * (self.ramp_steps - 1 - i)) ** 2
+                      for i in range(self.ramp_steps)]
+
+        profile = [(s, slice_time) for s in accel_ends]
+        cruise_distance = distance - 2 * ramp_distance
+        if cruise_distance > 1e-6:
+            profile.append((ramp_distance + cruise_distance, cruise_distance / peak))
+        profile.extend((s, slice_time) for s in decel_ends)
+
+        unit = direction / distance
+        return [(float(start[0] + unit[0] * s), float(start[1] + unit[1] * s), t) for s, t in profile]
+
+    def _is_path_safe(self, trajectory: Trajectory) -> bool:
+        """
+        Noktalar arasındaki doğrusal yolu örnekleyip tek çağrıda kontrol eder.
+
+        Args:
+            trajectory: Kontrol edilecek yörünge
+
+        Returns:
+            bool: Yolun tamamı sınırlar içinde ve yasak bölgelerin dışındaysa True
+        """
+        corners = np.vstack([trajectory.start, trajectory.points[:, :2]])
+        samples = [corners[:1]]
+        for a, b in zip(corners[:-1], corners[1:]):
+            count = max(1, int(np.ceil(np.hypot(*(b - a)) / self.check_step)))
+            fractions = np.linspace(0.0, 1.0, count + 1)[1:, None]
+            samples.append(a + (b - a) * fractions)
+        samples = np.vstack(samples)
+
+        safe = self.zone_map.are_positions_safe(samples)
+        if not safe.all():
+            h, v = samples[np.argmin(safe)]
+            self.logger.warning(f"Yörünge planlanamadı: yol {h:.1f}, {v:.1f} konumunda güvenli değil")
+            return False
+        return True
+
+
+class TrajectoryHandle:
+    """
+    Yüklenen yörüngenin tamamlanmasını beklemek veya sorgulamak için tutamaç.
+
+    Sonuç, Arduino yörüngeyi bitirdiğinde True; yükleme reddedildiğinde,
+    yörünge iptal edildiğinde veya başka bir hareketle kesildiğinde False olur.
+    """
+
+    def __init__(self, trajectory: Optional[Trajectory], cancel: Optional[Callable[[], Any]] = None):
+        """
+        TrajectoryHandle sınıfını başlatır.
+
+        Args:
+            trajectory: Planlanmış yörünge (planlama başarısızsa None)
+            cancel: cancel() çağrıldığında hareketi durduracak fonksiyon
+        """
+        self.trajectory = trajectory
+        self.trajectory_id = None
+        self.start_time = time.monotonic()
+        self.future = Future()
+        self._cancel = cancel
+
+    @property
+    def duration(self) -> float:
+        """
+        Planlanan hareket süresi (saniye).
+        """
+        return self.trajectory.duration if self.trajectory is not None else 0.0
+
+    def done(self) -> bool:
+        """
+        Yörünge sonuçlandıysa True döndürür (beklemez).
+        """
+        return self.future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Yörüngenin sonuçlanmasını bekler.
+
+        Args:
+            timeout: En fazla bekleme süresi (saniye, None ise süresiz)
+
+        Returns:
+            bool: Yörünge başarıyla tamamlandıysa True (zaman aşımında False)
+        """
+        try:
+            return self.future.result(timeout=timeout)
+        except FutureTimeoutError:
+            return False
+
+    def progress(self) -> float:
+        """
+        Planlanan süreye göre tahmini ilerlemeyi döndürür.
+
+        Returns:
+            float: 0.0-1.0 arası ilerleme (sonuçlandıysa 1.0)
+        """
+        if self.done() or self.duration <= 0:
+            return 1.0
+        return min(1.0, (time.monotonic() - self.start_time) / self.duration)
+
+    def expected_position(self) -> Optional[Tuple[float, float]]:
+        """
+        Planlanan profile göre şu anki tahmini pozisyonu döndürür.
+
+        Returns:
+            Optional[Tuple[float, float]]: (yatay, dikey) derece (yörünge yoksa None)
+        """
+        if self.trajectory is None:
+            return None
+        return self.trajectory.position_at(time.monotonic() - self.start_time)
+
+    def add_done_callback(self, callback: Callable[[bool], None]):
+        """
+        Yörünge sonuçlandığında sonuçla (bool) çağrılacak fonksiyon ekler.
+        Sonuçlanmışsa hemen çağrılır.
+        """
+        self.future.add_done_callback(lambda f: callback(f.result()))
+
+    def cancel(self):
+        """
+        Hareketi durdurur ve tutamacı başarısız olarak sonuçlandırır.
+        """
+        if self.done():
+            return
+        if self._cancel is not None:
+            self._cancel()
+        self._finish(False)
+
+    def _finish(self, success: bool):
+        """
+        Tutamacı sonuçlandırır (birden fazla çağrılırsa ilk sonuç geçerlidir).
+        """
+        try:
+            self.future.set_result(success)
+        except InvalidStateError:
+            pass
@@ -0,0 +1,182 @@
+"""
+Yasak bölgelerin (açı aralıkları) önceden derlenmiş arama yapısı.
+
+RESTRICTED_ZONES sözlükleri başlangıçta bir kez NumPy aralık dizilerine
+dönüştürülür. Tek pozisyon kontrolleri sözlük araması yapmadan düz float
+karşılaştırmalarıyla, pozisyon dizileri (örn. bir yörüngenin tüm noktaları)
+tek seferde vektörel olarak kontrol edilir. Güvensiz pozisyonlar reddedilmek
+yerine en yakın güvenli pozisyona izdüşürülebilir.
+
+Bölgeler kapalı aralıklardır (sınırlar dahil yasaktır); hareket sınırları
+ise dahil güvenlidir.
+"""
+
+import numpy as np
+from typing import List, Dict, Tuple, Optional
+
+
+class ZoneMap:
+    """
+    Yatay/dikey hareket sınırları ve yasak bölgeler için derlenmiş kontrol sınıfı.
+    """
+
+    def __init__(self, zones: List[Dict[str, Tuple[float, float]]], horizontal_range: float = 270,
+                 vertical_range: float = 60, margin: float = 0.01):
+        """
+        ZoneMap sınıfını başlatır ve bölgeleri derler.
+
+        Args:
+            zones: Yasak bölgeler ({"horizontal": (min, max), "vertical": (min, max)})
+            horizontal_range: Yatay hareket aralığı (derece, 0 merkezli)
+            vertical_range: Dikey hareket aralığı (derece, 0'dan yukarı)
+            margin: İzdüşümde bölge sınırından bırakılan pay (derece)
+        """
+        self.horizontal_limits = (-horizontal_range / 2, horizontal_range / 2)
+        self.vertical_limits = (0.0, float(vertical_range))
+        self.margin = margin
+
+        bounds = [(float(min(zone.get("horizontal", (-180, 180)))), float(max(zone.get("horizontal", (-180, 180)))),
+                   float(min(zone.get("vertical", (0, 60)))), float(max(zone.get("vertical", (0, 60)))))
+                  for zone in zones]
+
+        # Tek pozisyon kontrolü için düz demetler, dizi kontrolleri için [bölge] dizileri
+        self.zone_bounds = tuple(bounds)
+        zone_array = np.array(bounds, dtype=np.float64).reshape(-1, 4)
+        self.h_min, self.h_max, self.v_min, self.v_max = zone_array.T.copy()
+
+        # İzdüşüm adayları: her bölge için 4 kenar ve 4 köşe çıkışı
+        self._exit_h = np.concatenate([self.h_min - margin, self.h_max + margin])
+        self._exit_v = np.concatenate([self.v_min - margin, self.v_max + margin])
+
+    def clamp(self, horizontal: float, vertical: float) -> Tuple[float, float]:
+        """
+        Pozisyonu hareket sınırları içinde tutar.
+
+        Args:
+            horizontal: Yatay pozisyon (derece)
+            vertical: Dikey pozisyon (derece)
+
+        Returns:
+            Tuple[float, float]: Sınırlar içindeki pozisyon
+        """
+        h_lo, h_hi = self.horizontal_limits
+        v_lo, v_hi = self.vertical_limits
+        return max(h_lo, min(h_hi, horizontal)), max(v_lo, min(v_hi, vertical))
+
+    def in_restricted_zone(self, horizontal: float, vertical: float) -> bool:
+        """
+        Pozisyonun bir yasak bölgede olup olmadığını kontrol eder.
+
+        Args:
+            horizontal: Yatay pozisyon (derece)
+            vertical: Dikey pozisyon (derece)
+
+        Returns:
+            bool: Yasak bölgedeyse True
+        """
+        for h_min, h_max, v_min, v_max in self.zone_bounds:
+            if h_min <= horizontal <= h_max and v_min <= vertical <= v_max:
+                return True
+        return False
+
+    def is_safe(self, horizontal: float, vertical: float) -> bool:
+        """
+        Pozisyonun hareket sınırları içinde ve yasak bölgelerin dışında olup olmadığını kontrol eder.
+
+        Args:
+            horizontal: Yatay pozisyon (derece)
+            vertical: Dikey pozisyon (derece)
+
+        Returns:
+            bool: Pozisyon güvenli ise True
+        """
+        h_lo, h_hi = self.horizontal_limits
+        v_lo, v_hi = self.vertical_limits
+        if not (h_lo <= horizontal <= h_hi and v_lo <= vertical <= v_hi):
+            return False
+        return not self.in_restricted_zone(horizontal, vertical)
+
+    def are_positions_safe(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Pozisyon dizisini tek seferde kontrol eder (örn. bir yörüngenin tüm noktaları).
+
+        Args:
+            positions: [N, 2] (yatay, dikey) pozisyonlar (derece)
+
+        Returns:
+            np.ndarray: [N] bool dizi - pozisyon güvenli ise True
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        h = positions[:, 0]
+        v = positions[:, 1]
+
+        h_lo, h_hi = self.horizontal_limits
+        v_lo, v_hi = self.vertical_limits
+        safe = (h >= h_lo) & (h <= h_hi) & (v >= v_lo) & (v <= v_hi)
+
+        if len(self.zone_bounds):
+            h = h[:, None]
+            v = v[:, None]
+            inside = (h >= self.h_min) & (h <= self.h_max) & (v >= self.v_min) & (v <= self.v_max)
+            safe &= ~inside.any(axis=1)
+
+        return safe
+
+    def project_to_safe(self, horizontal: float, vertical: float) -> Optional[Tuple[float, float]]:
+        """
+        Pozisyonu sınırlar içine alır ve yasak bölgedeyse en yakın güvenli pozisyona taşır.
+
+        Args:
+            horizontal: Yatay pozisyon (derece)
+            vertical: Dikey pozisyon (derece)
+
+        Returns:
+            Optional[Tuple[float, float]]: Güvenli pozisyon veya güvenli pozisyon yoksa None
+        """
+        horizontal, vertical = self.clamp(horizontal, vertical)
+        if not self.in_restricted_zone(horizontal, vertical):
+            return horizontal, vertical
+
+        projected = self.project_positions(np.array([[horizontal, vertical]]))[0]
+        if np.isnan(projected[0]):
+            return None
+        return float(projected[0]), float(projected[1])
+
+    def project_positions(self, positions: np.ndarray) -> np.ndarray:
+        """
+        Pozisyon dizisini vektörel olarak en yakın güvenli pozisyonlara izdüşürür.
+
+        Adaylar sınırlara alınmış pozisyon, her bölgenin kenarlarından dik
+        çıkışlar ve bölge köşeleridir; güvenli adaylar arasından en yakını seçilir.
+
+        Args:
+            positions: [N, 2] (yatay, dikey) pozisyonlar (derece)
+
+        Returns:
+            np.ndarray: [N, 2] güvenli pozisyonlar (güvenli aday yoksa NaN)
+        """
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        h_lo, h_hi = self.horizontal_limits
+        v_lo, v_hi = self.vertical_limits
+        h = np.clip(positions[:, 0], h_lo, h_hi)[:, None]
+        v = np.clip(positions[:, 1], v_lo, v_hi)[:, None]
+        n = len(positions)
+
+        exit_h = np.broadcast_to(self._exit_h, (n, len(self._exit_h)))
+        exit_v = np.broadcast_to(self._exit_v, (n, len(self._exit_v)))
+        corner_h = np.repeat(exit_h, len(self._exit_v), axis=1)
+        corner_v = np.tile(exit_v, (1, len(self._exit_h)))
+
+        # [N, aday] kümeleri: kendisi, yatay çıkışlar, dikey çıkışlar, köşeler
+        candidates_h = np.concatenate([h, exit_h, np.repeat(h, exit_v.shape[1], axis=1), corner_h], axis=1)
+        candidates_v = np.concatenate([v, np.repeat(v, exit_h.shape[1], axis=1), exit_v, corner_v], axis=1)
+
+        safe = self.are_positions_safe(np.stack([candidates_h.ravel(), candidates_v.ravel()], axis=1))
+        distance = (candidates_h - h) ** 2 + (candidates_v - v) ** 2
+        distance = np.where(safe.reshape(distance.shape), distance, np.inf)
+
+        best = np.argmin(distance, axis=1)
+        rows = np.arange(n)
+        projected = np.stack([candidates_h[rows, best], candidates_v[rows, best]], axis=1)
+        projected[np.isinf(distance[rows, best])] = np.nan
+        return projected
@@ -5,6 +5,7 @@ Hava Savunma Sistemi (HSS) için PyQt5 tabanlı kullanıcı arayüzü.
 import sys
 import os
 import time
+import threading
 import cv2
 import numpy as np
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, pyqtSlot, QThread
@@ -16,22 +17,125 @@ from PyQt5.QtWidgets import (
 )
 
 from config import *
+from utils.tracing import tracer
 
 class VideoThread(QThread):
-    """Video akışını yöneten thread sınıfı"""
-    frame_update = pyqtSignal(np.ndarray)
+    """
+    Video akışını yöneten thread sınıfı.
     
-    def __init__(self, camera):
+    Ölçekleme, tespit çizimi ve BGR->RGB dönüşümü bu thread'de önceden ayrılmış
+    tamponlara yapılır; GUI thread'ine gösterime hazır QImage gönderilir.
+    Kareler ve tespitler sistemin kare hattından alınır; tespit burada tekrarlanmaz.
+    
+    QImage tampona kopyasız bağlıdır: tampon dizisi sinyalle birlikte gönderilir ve
+    aynı anda yalnızca bir kare yoldadır. GUI thread'i kareyi gösterince
+    frame_displayed() ile onaylar; onay gelene kadar yeni kareler atlanır, yoldaki
+    karenin tamponu yeniden kullanılmaz veya serbest bırakılmaz.
+    """
+    frame_ready = pyqtSignal(QImage, object, object)
+    
+    # Dönüşümlü RGB tampon sayısı (yoldaki kare gösterilirken sıradakine yazılır)
+    BUFFER_COUNT = 2
+    
+    def __init__(self, pipeline):
         super().__init__()
-        self.camera = camera
+        self.pipeline = pipeline
         self.running = False
         
+        # Hedef gösterim alanı (GUI thread'i günceller)
+        self.display_size = (0, 0)
+        
+        # Önceden ayrılmış tamponlar
+        self._scaled = None
+        self._rgb_buffers = []
+        self._buffer_index = 0
+        
+        # Son gösterilen kare bağlamı
+        self._last_context = None
+        
+        # GUI thread'inde gösterilmeyi bekleyen kare var mı
+        self._frame_in_flight = threading.Event()
+        
+    def set_display_size(self, width, height):
+        """Gösterim alanının boyutunu ayarlar (GUI thread'inden çağrılır)"""
+        self.display_size = (width, height)
+        
+    def _target_size(self, frame_width, frame_height):
+        """En-boy oranını koruyarak gösterim boyutunu hesaplar"""
+        label_width, label_height = self.display_size
+        if label_width <= 1 or label_height <= 1:
+            return frame_width, frame_height
+        
+        scale = min(label_width / frame_width, label_height / frame_height)
+        return max(1, int(frame_width * scale)), max(1, int(frame_height * scale))
+        
+    def frame_displayed(self):
+        """Gönderilen karenin gösterildiğini bildirir (GUI thread'inden çağrılır)"""
+        self._frame_in_flight.clear()
+        
+    def _ensure_buffers(self, width, height):
+        """Gösterim boyutu değiştiyse tamponları yeniden ayırır (yolda kare yokken çağrılır)"""
+        if self._scaled is not None and self._scaled.shape[:2] == (height, width):
+            return
+        
+        self._scaled = np.empty((height, width, 3), dtype=np.uint8)
+        self._rgb_buffers = [np.empty((height, width, 3), dtype=np.uint8) for _ in range(self.BUFFER_COUNT)]
+        self._buffer_index = 0
+        
+    def _draw_detections(self, image, detections, scale):
+        """Tespitleri ölçeklenmiş gösterim görüntüsüne çizer"""
+        for detection in detections:
+            # Sınırlayıcı kutu (gösterim koordinatlarına ölçeklenmiş)
+            x, y, w, h = [int(v * scale) for v in detection["box"]]
+            label = detection.get("class", "Nesne")
+            confidence = detection.get("confidence", 0)
+            
+            # Kutu rengi
+            color = (255, 0, 0) if label == "mavi_balon" else (0, 0, 255)
+            
+            # Çerçeve çiz
+            cv2.rectangle(image, (x, y), (x + w, y + h), color, 2)
+            
+            # Etiket metni
+            text = f"{label}: {confidence:.2f}"
+            
+            # Etiket
+            cv2.putText(image, text, (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 
+                       0.5, (255, 255, 255), 1)
+        
     def run(self):
         self.running = True
         while self.running:
-            ret, frame = self.camera.get_frame()
-            if ret:
-                self.frame_update.emit(frame)
+            context = self.pipeline.update()
+            
+            # Önceki kare henüz gösterilmediyse bu kareyi atla (tamponu hâlâ kullanımda)
+            if self._frame_in_flight.is_set():
+                time.sleep(1/CAMERA_FPS)
+                continue
+            
+            if context is not None and context is not self._last_context:
+                self._last_context = context
+                frame = context.frame
+                detections = context.detections
+                frame_height, frame_width = frame.shape[:2]
+                width, height = self._target_size(frame_width, frame_height)
+                self._ensure_buffers(width, height)
+                
+                # Tek seferde ölçekle (kamera karesine dokunulmaz)
+                cv2.resize(frame, (width, height), dst=self._scaled, interpolation=cv2.INTER_LINEAR)
+                
+                if detections:
+                    self._draw_detections(self._scaled, detections, width / frame_width)
+                
+                # BGR->RGB dönüşümünü sıradaki tampona yap ve kopyasız QImage oluştur
+                rgb = self._rgb_buffers[self._buffer_index]
+                self._buffer_index = (self._buffer_index + 1) % self.BUFFER_COUNT
+                cv2.cvtColor(self._scaled, cv2.COLOR_BGR2RGB, dst=rgb)
+                q_image = QImage(rgb.data, width, height, 3 * width, QImage.Format_RGB888)
+                
+                # Tampon dizisi QImage ile birlikte gönderilir, gösterilene kadar canlı kalır
+                self._frame_in_flight.set()
+                self.frame_ready.emit(q_image, rgb, detections)
             time.sleep(1/CAMERA_FPS)  # FPS'i sınırla
             
     def stop(self):
@@ -59,7 +163,8 @@ class SystemStatusWidget(QGroupBox):
             {"name": "fps", "label": "Kamera FPS:"},
             {"name": "motor_x", "label": "Motor X:"},
             {"name": "motor_y", "label": "Motor Y:"},
-            {"name": "battery", "label": "Batarya:"}
+            {"name": "battery", "label": "Batarya:"},
+            {"name": "latency", "label": "Gecikme p50/p99:"}
         ]
         
         for i, item in enumerate(status_items):
@@ -100,6 +205,8 @@ class CameraViewWidget(QGroupBox):
         self.image_label = QLabel()
         self.image_label.setAlignment(Qt.AlignCenter)
         self.image_label.setStyleSheet("background-color: #1E1E1E; border-radius: 5px;")
+        # Etiket piksel haritası boyutuna kilitlenmesin (ölçekleme video thread'inde yapılır)
+        self.image_label.setMinimumSize(1, 1)
         layout.addWidget(self.image_label)
         
         # FPS göstergesi
@@ -108,15 +215,16 @@ class CameraViewWidget(QGroupBox):
         self.fps_label.setAlignment(Qt.AlignRight)
         layout.addWidget(self.fps_label)
         
-    def update_frame(self, frame):
-        """Kamera karesini günceller"""
-        height, width, channel = frame.shape
-        bytes_per_line = 3 * width
-        q_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format_RGB888).rgbSwapped()
-        self.image_label.setPixmap(QPixmap.fromImage(q_image).scaled(
-            self.image_label.width(), self.image_label.height(), 
-            Qt.KeepAspectRatio, Qt.SmoothTransformation
-        ))
+    def update_frame(self, q_image):
+        """Kamera karesini günceller (görüntü video thread'inde ölçeklenmiş ve RGB'dir)"""
+        pixmap = QPixmap.fromImage(q_image)
+        
+        # Pencere boyutu değişirken video thread'i yeni boyuta geçene kadar hızlı ölçekle
+        label_width, label_height = self.image_label.width(), self.image_label.height()
+        if pixmap.width() > label_width or pixmap.height() > label_height:
+            pixmap = pixmap.scaled(label_width, label_height, Qt.KeepAspectRatio, Qt.FastTransformation)
+        
+        self.image_label.setPixmap(pixmap)
 
 class ControlPanelWidget(QGroupBox):
     """Kontrol paneli widget'ı"""
@@ -347,9 +455,16 @@ class HSSMainWindow(QMainWindow):
         
     def setup_connections(self):
         """Sinyal ve yuva bağlantılarını kurar"""
-        # Video thread'ini başlat
-        self.video_thread = VideoThread(self.system.camera)
-        self.video_thread.frame_update.connect(self.process_frame)
+        # Tespit iş parçacığını başlat (tespit Qt yuvası içinde yapılmaz)
+        if getattr(self.system, 'detection_worker', None):
+            self.system.detection_worker.start()
+        
+        # Video thread'ini başlat (kare hattını ilerletir; ölçekleme, çizim ve renk
+        # dönüşümü bu thread'de yapılır)
+        self.video_thread = VideoThread(self.system.pipeline)
+        self.video_thread.set_display_size(self.camera_view.image_label.width(),
+                                           self.camera_view.image_label.height())
+        self.video_thread.frame_ready.connect(self.process_frame)
         self.video_thread.start()
         
         # Buton bağlantıları
@@ -361,8 +476,16 @@ class HSSMainWindow(QMainWindow):
         # Başlangıç log mesajı
         self.control_panel.add_log("HSS sistemi başlatıldı", "SUCCESS")
     
-    def process_frame(self, frame):
-        """Kameradan gelen kareyi işler"""
+    def process_frame(self, q_image, buffer, detections):
+        """Video thread'inden gelen hazır kareyi gösterir ve tamponu video thread'ine geri verir"""
+        try:
+            self._show_frame(q_image, detections)
+        finally:
+            # QPixmap görüntüyü kopyaladı; tampon yeniden kullanılabilir
+            self.video_thread.frame_displayed()
+    
+    def _show_frame(self, q_image, detections):
+        """Kareyi, FPS'i ve ilk hedefin bilgilerini gösterir"""
         # Kare sayacını artır
         self.frame_count += 1
         
@@ -373,46 +496,24 @@ class HSSMainWindow(QMainWindow):
             self.frame_count = 0
             self.last_frame_time = current_time
             self.camera_view.fps_label.setText(f"FPS: {self.fps}")
-            
-        # YOLO tespiti (her N karede bir)
-        self.yolo_frame_count = getattr(self, 'yolo_frame_count', 0) + 1
-        if self.yolo_frame_count % YOLO_PROCESS_EVERY_N_FRAME == 0:
-            # Görüntü işleme ve tespit
-            detections = self.system.detector.detect(frame)
-            
-            # Tespit sonuçlarını çiz
-            if detections:
-                for detection in detections:
-                    # Sınırlayıcı kutu
-                    x, y, w, h = detection["box"]
-                    label = detection.get("class", "Nesne")
-                    confidence = detection.get("confidence", 0)
-                    
-                    # Kutu rengi
-                    color = (255, 0, 0) if label == "mavi_balon" else (0, 0, 255)
-                    
-                    # Çerçeve çiz
-                    cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-                    
-                    # Etiket metni
-                    text = f"{label}: {confidence:.2f}"
-                    
-                    # Etiket
-                    cv2.putText(frame, text, (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 
-                               0.5, (255, 255, 255), 1)
-                    
-                # İlk hedefin bilgilerini göster
-                detection = detections[0]
-                x, y, w, h = detection["box"]
-                self.target_info.update_target("konum_x", f"{x + w//2} px")
-                self.target_info.update_target("konum_y", f"{y + h//2} px")
-                self.target_info.update_target("genislik", f"{w} px")
-                self.target_info.update_target("yukseklik", f"{h} px")
-                self.target_info.update_target("guven", f"{detection.get('confidence', 0):.2f}")
-                self.target_info.update_target("uzaklik", "1.5 m")  # Örnek değer
-            
+        
+        # İlk hedefin bilgilerini göster
+        if detections:
+            detection = detections[0]
+            x, y, w, h = detection["box"]
+            self.target_info.update_target("konum_x", f"{x + w//2} px")
+            self.target_info.update_target("konum_y", f"{y + h//2} px")
+            self.target_info.update_target("genislik", f"{w} px")
+            self.target_info.update_target("yukseklik", f"{h} px")
+            self.target_info.update_target("guven", f"{detection.get('confidence', 0):.2f}")
+            self.target_info.update_target("uzaklik", "1.5 m")  # Örnek değer
+        
         # Kareyi görüntüle
-        self.camera_view.update_frame(frame)
+        self.camera_view.update_frame(q_image)
+        
+        # Gösterim alanı boyutunu video thread'ine bildir
+        self.video_thread.set_display_size(self.camera_view.image_label.width(),
+                                           self.camera_view.image_label.height())
     
     def update_ui(self):
         """UI bileşenlerini günceller"""
@@ -428,6 +529,10 @@ class HSSMainWindow(QMainWindow):
         
         self.system_status.update_status("fps", f"{self.fps}")
         
+        # Uçtan uca gecikme (kare yakalama -> motor komutu)
+        latency = tracer.get_latency_summary()
+        self.system_status.update_status("latency", f"{latency[0]:.0f}/{latency[1]:.0f} ms" if latency else "--")
+        
         # Motor pozisyonlarını güncelle
         if hasattr(self.system, 'arduino') and self.system.arduino.is_connected():
             motor_x = self.system.arduino.get_servo_position(1)
@@ -14,6 +14,9 @@ import numpy as np
 
 # Modülleri içe aktar
 from config import *
+from utils.tracing import tracer
+from utils.scheduler import scheduler
+from vision.pipeline import FramePipeline
 
 # Test modu için mock sınıflar
 class MockArduinoComm:
@@ -59,7 +62,7 @@ class MockCamera:
         self.logger.info("Mock kamera başlatıldı")
         return True
         
-    def get_frame(self):
+    def get_frame(self, copy=True):
         # Basit hareket eden noktalar çiz (demo amaçlı)
         frame = self.dummy_frame.copy()
         t = time.time()
@@ -156,22 +159,33 @@ class MockSafetyMonitor:
 try:
     from utils.safety import SafetyMonitor
     from vision.camera import Camera
+    from vision.replay_camera import ReplayCamera, FrameRecorder
     from vision.yolo_detector import YoloDetector
     from vision.qr_detector import QRDetector
+    from vision.detection_worker import DetectionWorker
+    from vision.detector_pool import DetectorPool
+    from vision.tracker import TrackingDetector, PooledTrackingDetector
     from control.arduino_comm import ArduinoComm
     from modes.mode1_manual_fire import Mode1
     from modes.mode2_auto_fire import Mode2
     from modes.mode3_engagement import Mode3
 except ImportError:
     # Test modunda bu modüller yoksa dummy modüller oluştur
+    DetectionWorker = None
+    DetectorPool = None
+    TrackingDetector = None
+    PooledTrackingDetector = None
+    ReplayCamera = None
+    FrameRecorder = None
+    
     class Mode1:
-        def __init__(self, camera, detector, arduino, safety):
+        def __init__(self, camera, detector, arduino, safety, detection_worker=None, pipeline=None):
             self.camera = camera
             self.detector = detector
             self.arduino = arduino
             self.safety = safety
             
-        def run(self, user_input):
+        def run(self, user_input=None, context=None):
             pass
             
     class Mode2(Mode1):
@@ -183,7 +197,6 @@ except ImportError:
 # Kullanıcı arayüzü ve görselleştirme
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
 
 # Canvas için yuvarlatılmış dikdörtgen desteği ekle
 def _create_rounded_rectangle(self, x1, y1, x2, y2, radius=25, **kwargs):
@@ -233,9 +246,12 @@ class HSSSystem:
     Hava Savunma Sistemi (HSS) ana sınıf.
     """
     
-    def __init__(self):
+    def __init__(self, camera=None):
         """
         HSS sistemini başlatır.
+        
+        Args:
+            camera: Kullanılacak kamera (örn. ReplayCamera); None ise varsayılan kamera
         """
         # Loglama ayarları
         self._setup_logging()
@@ -243,6 +259,11 @@ class HSSSystem:
         self.logger = logging.getLogger("HSSSystem")
         self.logger.info("Hava Savunma Sistemi başlatılıyor...")
         
+        self.camera = camera
+        
+        # Kare kaydedici (--record ile etkinleşir)
+        self.recorder = None
+        
         # Ana bileşenleri başlat
         self._initialize_components()
         
@@ -321,30 +342,74 @@ class HSSSystem:
             # Güvenlik izleyiciyi başlat
             self.safety = MockSafetyMonitor(self.arduino)
             
-            # Kamerayı başlat
-            self.camera = MockCamera(
-                CAMERA_ID,
-                CAMERA_WIDTH,
-                CAMERA_HEIGHT,
-                CAMERA_FPS
-            )
+            # Kamerayı başlat (oynatma kamerası verilmediyse varsayılan kamera)
+            if self.camera is None:
+                self.camera = MockCamera(
+                    CAMERA_ID,
+                    CAMERA_WIDTH,
+                    CAMERA_HEIGHT,
+                    CAMERA_FPS
+                )
             if not self.camera.initialize():
                 self.logger.error("Kamera başlatılamadı")
                 sys.exit(1)
             
             # YOLO detektörünü başlat
-            self.detector = MockYoloDetector(
-                YOLO_CONFIG_PATH,
-                YOLO_WEIGHTS_PATH,
-                YOLO_CONFIDENCE_THRESHOLD,
-                YOLO_NMS_THRESHOLD
-            )
+            if MOCK_DETECTOR:
+                self.detector = MockYoloDetector(
+                    YOLO_CONFIG_PATH,
+                    YOLO_WEIGHTS_PATH,
+                    YOLO_CONFIDENCE_THRESHOLD,
+                    YOLO_NMS_THRESHOLD
+                )
+            elif YOLO_PROCESS_POOL_SIZE > 1 and DetectorPool is not None:
+                # Çok çekirdekli kartlarda çok işlemli dedektör havuzu. Kopyasız kare paylaşımı
+                # yalnızca shared_memory=True ile açılmış ve ilk karesini yakalamış kamerada
+                # mümkündür; tanım yoksa kareler görev kuyruğuyla kopyalanarak gönderilir.
+                buffer_spec = None
+                if hasattr(self.camera, 'get_buffer_spec'):
+                    buffer_spec = self.camera.get_buffer_spec()
+                if buffer_spec is None:
+                    self.logger.info("Paylaşımlı kare tamponu yok, havuza kareler kopyalanarak gönderilecek")
+                self.detector = DetectorPool(
+                    YOLO_CONFIG_PATH,
+                    YOLO_WEIGHTS_PATH,
+                    YOLO_CONFIDENCE_THRESHOLD,
+                    YOLO_NMS_THRESHOLD,
+                    num_workers=YOLO_PROCESS_POOL_SIZE,
+                    buffer_spec=buffer_spec
+                )
+            else:
+                self.detector = YoloDetector(
+                    YOLO_CONFIG_PATH,
+                    YOLO_WEIGHTS_PATH,
+                    YOLO_CONFIDENCE_THRESHOLD,
+                    YOLO_NMS_THRESHOLD
+                )
+            
+            # YOLO karelerinin arasında hedefleri takipçi ile taşı
+            if USE_TRACKER and TrackingDetector is not None:
+                if hasattr(self.detector, 'submit'):
+                    # Havuzda tam kare taramaları ardışık hatta paralel yürür
+                    self.detector = PooledTrackingDetector(self.detector)
+                else:
+                    self.detector = TrackingDetector(self.detector)
+            
             if not self.detector.initialize():
                 self.logger.error("YOLO dedektörü başlatılamadı")
                 sys.exit(1)
             
             self.logger.info("YOLOv4-tiny dedektörü başarıyla başlatıldı")
             
+            # Tespit iş parçacığını oluştur (arayüzü ve mod döngüsünü bloklamamak için)
+            self.detection_worker = None
+            if USE_DETECTION_WORKER and DetectionWorker is not None:
+                self.detection_worker = DetectionWorker(self.camera, self.detector)
+            
+            # Kare hattı: tespit ve sınıflandırma kare başına bir kez yapılır,
+            # aktif mod ve arayüz aynı kare bağlamını kullanır
+            self.pipeline = FramePipeline(self.camera, self.detector, self.detection_worker)
+            
             # QR kod dedektörünü başlat
             self.qr_detector = MockQRDetector()
             
@@ -359,9 +424,9 @@ class HSSSystem:
         Sistem modlarını başlatır.
         """
         # Modları oluştur
-        self.mode1 = Mode1(self.camera, self.detector, self.arduino, self.safety)
-        self.mode2 = Mode2(self.camera, self.detector, self.arduino, self.safety)
-        self.mode3 = Mode3(self.camera, self.detector, self.arduino, self.safety)
+        self.mode1 = Mode1(self.camera, self.detector, self.arduino, self.safety, self.detection_worker, self.pipeline)
+        self.mode2 = Mode2(self.camera, self.detector, self.arduino, self.safety, self.detection_worker, self.pipeline)
+        self.mode3 = Mode3(self.camera, self.detector, self.arduino, self.safety, self.detection_worker, self.pipeline)
         
         self.logger.info("Sistem modları başlatıldı")
     
@@ -465,10 +530,10 @@ class HSSSystem:
         from config import UI_UPDATE_RATE
         self.ui_update_rate = UI_UPDATE_RATE if 'UI_UPDATE_RATE' in globals() else 30  # msec
         
-        # Kare sayacı ve YOLO işlem kontrolü
+        # Kare sayacı ve saniyedeki tespit sonucu sayısı
         self.frame_count = 0
-        self.process_yolo = True
-        self.yolo_process_frame_count = 0
+        self.yolo_fps = 0
+        self.last_detections_run = 0
         
         # UI çizim optimizasyonu
         cv2.setUseOptimized(True)
@@ -1019,11 +1084,27 @@ class HSSSystem:
             else:
                 # Gelişmiş kalibrasyon
                 if hasattr(self, 'safety') and hasattr(self.safety, 'motor_controller'):
-                    result = self.safety.motor_controller.advanced_calibration()
-                    if result:
-                        self._add_log_message("Gelişmiş kalibrasyon başarıyla tamamlandı", "INFO")
-                    else:
-                        self._add_log_message("Gelişmiş kalibrasyon başarısız oldu", "ERROR")
+                    motor_controller = self.safety.motor_controller
+                    if not hasattr(motor_controller, 'advanced_calibration_async'):
+                        report_calibration(motor_controller.advanced_calibration())
+                        return
+                    
+                    # Kalibrasyon yörüngesi arayüzü bloklamadan sorgulanır
+                    handle = motor_controller.advanced_calibration_async()
+                    
+                    def poll_calibration():
+                        if handle.done():
+                            report_calibration(handle.wait())
+                        else:
+                            self.ui_root.after(100, poll_calibration)
+                    
+                    poll_calibration()
+        
+        def report_calibration(result):
+            if result:
+                self._add_log_message("Gelişmiş kalibrasyon başarıyla tamamlandı", "INFO")
+            else:
+                self._add_log_message("Gelişmiş kalibrasyon başarısız oldu", "ERROR")
         
         ttk.Button(cal_dialog, text="Başlat", command=start_calibration).pack(pady=20)
     
@@ -1336,6 +1417,10 @@ class HSSSystem:
         # Güvenlik izlemeyi başlat
         self.safety.start_monitoring()
         
+        # Tespit iş parçacığını başlat
+        if self.detection_worker:
+            self.detection_worker.start()
+        
         self.logger.info("Sistem çalışıyor")
         
         # Ana döngü (tkinter event loop)
@@ -1356,15 +1441,22 @@ class HSSSystem:
             self.ui_root.after(5, self.run_system_loop)
             return
         
+        # Zaman ölçümü başlat
+        start_time = time.time()
+        
+        # Kare hattını ilerlet; arayüz modlar duraklatılsa da bu bağlamı gösterir
+        try:
+            context = self.pipeline.update()
+        except Exception as e:
+            self.logger.error(f"Kare hattında hata: {str(e)}")
+            context = None
+        
         # Güvenlik kontrolü
         if not self.safety.is_system_safe():
             self.logger.warning("Sistem güvenli değil, modlar duraklatıldı")
             self.ui_root.after(50, self.run_system_loop)
             return
         
-        # Zaman ölçümü başlat
-        start_time = time.time()
-        
         # Aktif modu çalıştır - hafif şekilde
         try:
             if self.current_mode == 1:
@@ -1373,21 +1465,21 @@ class HSSSystem:
                 self.ui_root.update_idletasks()
                 self.is_processing = False
                 
-                self.mode1.run(self.user_input)
+                self.mode1.run(self.user_input, context=context)
             elif self.current_mode == 2:
                 # İşlem yapmadan önce çok kısa bir süre bekle (UI olaylarının işlenmesi için)
                 self.is_processing = True
                 self.ui_root.update_idletasks()
                 self.is_processing = False
                 
-                self.mode2.run()
+                self.mode2.run(context=context)
             elif self.current_mode == 3:
                 # İşlem yapmadan önce çok kısa bir süre bekle (UI olaylarının işlenmesi için)
                 self.is_processing = True
                 self.ui_root.update_idletasks()
                 self.is_processing = False
                 
-                self.mode3.run(self.user_input)
+                self.mode3.run(self.user_input, context=context)
             
             # Kullanıcı girişini sıfırla
             self._reset_user_input()
@@ -1427,6 +1519,21 @@ class HSSSystem:
         # Güvenlik izlemeyi durdur
         self.safety.shutdown()
         
+        # Zamanlanmış eylemleri durdur (lazer güvenlik izlemesi tarafından kapatıldı)
+        scheduler.shutdown()
+        
+        # Tespit iş parçacığını durdur
+        if getattr(self, 'detection_worker', None):
+            self.detection_worker.stop()
+        
+        # Dedektör havuzu işlemlerini kapat
+        if hasattr(self, 'detector') and hasattr(self.detector, 'close'):
+            self.detector.close()
+        
+        # Kare kaydını durdur
+        if self.recorder is not None:
+            self.recorder.stop()
+        
         # Kamerayı kapat
         if hasattr(self, 'camera'):
             self.camera.release()
@@ -1533,8 +1640,8 @@ class HSSSystem:
             else:
                 self.connection_status.configure(text="◉ KAMERA BAĞLANTISI YOK", foreground="#F44336")
         
-        # Kayıt durumu (demo amaçlı)
-        if hasattr(self, 'fps') and self.fps > 0:
+        # Kayıt durumu
+        if self.recorder is not None and self.recorder.running:
             # Saniyede bir yanıp sönen kayıt göstergesi
             current_time = time.time()
             if int(current_time) % 2 == 0:
@@ -1616,6 +1723,8 @@ class HSSSystem:
             self.camera_canvas.create_rounded_rectangle(0, 0, width, height, radius=15, 
                                                    fill=self.ui_colors['indicator'], 
                                                    outline="", tags="camera_frame")
+            # Kamera görüntüsü çerçevenin üstünde kalmalı
+            self.camera_canvas.tag_lower("camera_frame")
         
         self.camera_canvas.bind("<Configure>", draw_rounded_camera_frame)
         
@@ -1624,10 +1733,14 @@ class HSSSystem:
         cv2_img = cv2.putText(empty_img, "HSS - Kamera Görüntüsü Bekleniyor...", (120, 240), 
                            cv2.FONT_HERSHEY_SIMPLEX, 0.8, (200, 200, 200), 2)
         
-        # PIL için rengi BGR'den RGB'ye dönüştür
-        cv2_img = cv2.cvtColor(cv2_img, cv2.COLOR_BGR2RGB)
-        pil_img = Image.fromarray(cv2_img)
-        self.current_photo = ImageTk.PhotoImage(image=pil_img)
+        # Kalıcı görüntü: her karede yeni PhotoImage/canvas öğesi oluşturulmaz,
+        # _render_camera_frame aynı nesneyi PPM verisiyle günceller
+        self.last_resize_dims = None
+        self.last_canvas_size = None
+        self.last_rendered_context = None
+        self._prepare_display_buffers(empty_img.shape[1], empty_img.shape[0])
+        cv2.cvtColor(cv2_img, cv2.COLOR_BGR2RGB, dst=self.display_rgb)
+        self.current_photo = tk.PhotoImage(data=bytes(self.display_ppm), format="PPM")
         
         # Görüntü göstericisi
         self.cam_image_id = self.camera_canvas.create_image(0, 0, image=self.current_photo, 
@@ -1803,7 +1916,8 @@ class HSSSystem:
             {"name": "fps", "label": "Kamera FPS:", "value": "--", "color": "info"},
             {"name": "yolo_fps", "label": "YOLO FPS:", "value": "--", "color": "info"},
             {"name": "motor_x", "label": "Motor X:", "value": "--", "color": "info"},
-            {"name": "motor_y", "label": "Motor Y:", "value": "--", "color": "info"}
+            {"name": "motor_y", "label": "Motor Y:", "value": "--", "color": "info"},
+            {"name": "latency", "label": "Gecikme p50/p99:", "value": "--", "color": "info"}
         ]
         
         # Grid'e durum bilgilerini yerleştir
@@ -2031,6 +2145,115 @@ class HSSSystem:
         self._add_log_message("HSS sistemi başlatıldı", "INFO")
         self._add_log_message("Kamera bağlantısı bekleniyor...", "INFO")
     
+    def _prepare_display_buffers(self, width, height):
+        """
+        Verilen görüntü boyutu için BGR ölçekleme tamponunu ve PPM tamponunu ayırır.
+        PPM tamponunun piksel bölümü numpy görünümü olarak tutulur; renk dönüşümü
+        doğrudan bu görünüme yazılır.
+        
+        Args:
+            width: Görüntü genişliği
+            height: Görüntü yüksekliği
+        """
+        header = f"P6 {width} {height} 255\n".encode("ascii")
+        self.display_bgr = np.empty((height, width, 3), dtype=np.uint8)
+        self.display_ppm = bytearray(len(header) + width * height * 3)
+        self.display_ppm[:len(header)] = header
+        self.display_rgb = np.frombuffer(self.display_ppm, dtype=np.uint8,
+                                         offset=len(header)).reshape(height, width, 3)
+        self.last_resize_dims = (width, height)
+    
+    def _show_camera_image(self, rgb_ppm, canvas_width, canvas_height):
+        """
+        Kalıcı PhotoImage'ı PPM verisiyle yerinde günceller. Canvas öğesi yeniden
+        oluşturulmaz; yalnızca canvas boyutu değiştiğinde ortaya taşınır.
+        
+        Args:
+            rgb_ppm: PPM biçimli görüntü verisi
+            canvas_width: Canvas genişliği
+            canvas_height: Canvas yüksekliği
+        """
+        self.current_photo.configure(data=bytes(rgb_ppm), format="PPM",
+                                     width=self.last_resize_dims[0], height=self.last_resize_dims[1])
+        
+        if self.last_canvas_size != (canvas_width, canvas_height):
+            self.last_canvas_size = (canvas_width, canvas_height)
+            self.camera_canvas.itemconfigure(self.cam_image_id, anchor=tk.CENTER)
+            self.camera_canvas.coords(self.cam_image_id, canvas_width // 2, canvas_height // 2)
+    
+    def _render_camera_frame(self, frame, detections):
+        """
+        Kareyi canvas boyutuna OpenCV ile ölçekler, tespitleri ölçeklenmiş
+        görüntü üzerine çizer ve kamera panelini günceller. Kamera karesi
+        değiştirilmez; tüm tamponlar boyut değişene kadar yeniden kullanılır.
+        
+        Args:
+            frame: Kamera karesi (salt okunur)
+            detections: Tespit edilen nesneler listesi
+        """
+        # Kamera canvas'ın boyutunu al
+        canvas_width = self.camera_canvas.winfo_width()
+        canvas_height = self.camera_canvas.winfo_height()
+        img_height, img_width = frame.shape[:2]
+        
+        if canvas_width > 1 and canvas_height > 1:  # Geçerli boyut kontrolü
+            # Canvas boyutuna sığdır (en-boy oranını koru)
+            aspect_ratio = img_width / img_height
+            if canvas_width / canvas_height > aspect_ratio:
+                # Canvas daha geniş, yüksekliğe göre ayarla
+                new_height = canvas_height
+                new_width = max(1, int(new_height * aspect_ratio))
+            else:
+                # Canvas daha dar, genişliğe göre ayarla
+                new_width = canvas_width
+                new_height = max(1, int(new_width / aspect_ratio))
+        else:
+            # Canvas henüz yerleşmediyse kare boyutunu kullan
+            new_width, new_height = img_width, img_height
+        
+        if self.last_resize_dims != (new_width, new_height):
+            self._prepare_display_buffers(new_width, new_height)
+        
+        # Görüntüyü yeniden boyutlandır (performans için NEAREST)
+        cv2.resize(frame, (new_width, new_height), dst=self.display_bgr, interpolation=cv2.INTER_NEAREST)
+        
+        # Tespit edilen nesneleri ölçeklenmiş görüntüye çiz
+        if detections:
+            scale_x = new_width / img_width
+            scale_y = new_height / img_height
+            
+            for detection in detections:
+                # Tespit edilen nesnenin kutu koordinatları
+                x, y, w, h = detection["box"]
+                x, y = int(x * scale_x), int(y * scale_y)
+                w, h = int(w * scale_x), int(h * scale_y)
+                
+                # Tespit türü ve güven değeri
+                label = detection.get("class", "Nesne")
+                confidence = detection.get("confidence", 0)
+                
+                # Kutu rengi - Mavi
+                color = (255, 0, 0) if label == "mavi_balon" else (0, 0, 255)
+                
+                # Çerçeve çiz
+                cv2.rectangle(self.display_bgr, (x, y), (x + w, y + h), color, 2)
+                
+                # Etiket metni
+                text = f"{label}: {confidence:.2f}"
+                
+                # Etiket için arka plan boyutu
+                (text_width, text_height), _ = cv2.getTextSize(
+                    text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
+                
+                # Etiket arka planı ve metni
+                cv2.rectangle(self.display_bgr, (x, y - 20), (x + text_width, y), color, -1)
+                cv2.putText(self.display_bgr, text, (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX,
+                          0.5, (255, 255, 255), 1)
+        
+        # BGR -> RGB dönüşümü doğrudan PPM tamponuna yazılır
+        cv2.cvtColor(self.display_bgr, cv2.COLOR_BGR2RGB, dst=self.display_rgb)
+        self._show_camera_image(self.display_ppm, canvas_width, canvas_height)
+    
     def _update_ui(self):
         """
         Kullanıcı arayüzü öğelerini günceller.
@@ -2041,111 +2264,15 @@ class HSSSystem:
         # Kamera çerçevesini güncelle
         try:
             if hasattr(self, 'camera'):
-                ret, frame = self.camera.get_frame()
+                # Kare hattının son bağlamı (mod döngüsü ilerletir, tespit burada tekrarlanmaz)
+                context = self.pipeline.latest()
                 
-                if ret and frame is not None:
-                    # Performans ayarı - düşük performans modunda YOLO'yu daha az sıklıkla çalıştır
-                    self.yolo_process_frame_count += 1
-                    process_frame = False
-                    
-                    # Performans moduna göre YOLO işleme sıklığını ayarla
-                    perf_mode = self.performance_var.get()
-                    skip_frames = 4  # Varsayılan: her 4 karede bir (daha iyi performans)
-                    
-                    if perf_mode == "Yüksek Hız":
-                        skip_frames = 6  # Her 6 karede bir (maksimum performans)
-                    elif perf_mode == "Yüksek Kalite": 
-                        skip_frames = 2  # Her 2 karede bir (daha iyi kalite)
-                    
-                    # Frame atlama kontrolü - config'deki değer ile çarparak daha fazla atlama
-                    process_frame = (self.yolo_process_frame_count % (skip_frames * YOLO_PROCESS_EVERY_N_FRAME) == 0)
-                    
-                    # YOLO tespiti (belirli periyodlarla)
-                    if process_frame and self.detector:
-                        # YOLO tespitleri
-                        detections = self.detector.detect(frame)
-                        
-                        # Tespit edilen nesneleri çiz
-                        if len(detections) > 0:
-                            for detection in detections:
-                                # Tespit edilen nesnenin kutu koordinatları
-                                x, y, w, h = detection["box"]
-                                
-                                # Tespit türü ve güven değeri
-                                label = detection.get("class", "Nesne")
-                                confidence = detection.get("confidence", 0)
-                                
-                                # Kutu rengi - Mavi
-                                color = (255, 0, 0) if label == "mavi_balon" else (0, 0, 255)
-                                
-                                # Çerçeve çiz
-                                cv2.rectangle(frame, (x, y), (x + w, y + h), color, 2)
-                                
-                                # Etiket metni
-                                text = f"{label}: {confidence:.2f}"
-                                
-                                # Metin rengi (arka plan için zıt renk)
-                                text_color = (255, 255, 255)
-                                
-                                # Etiket için arka plan boyutu
-                                (text_width, text_height), _ = cv2.getTextSize(
-                                    text, cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1)
-                                
-                                # Etiket arka planı
-                                cv2.rectangle(frame, (x, y - 20), (x + text_width, y), color, -1)
-                                
-                                # Etiket metni
-                                cv2.putText(frame, text, (x, y - 5), cv2.FONT_HERSHEY_SIMPLEX, 
-                                          0.5, text_color, 1)
-                    
-                    # PIL için görüntüyü BGR'den RGB'ye dönüştür
-                    rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    
-                    # Kamera canvas'ın boyutunu al
-                    canvas_width = self.camera_canvas.winfo_width()
-                    canvas_height = self.camera_canvas.winfo_height()
-                    
-                    # Statik değişkenleri tanımla - her kare için hesaplama yapmamak için
-                    if not hasattr(self, 'last_canvas_size') or self.last_canvas_size != (canvas_width, canvas_height):
-                        self.last_canvas_size = (canvas_width, canvas_height)
-                        self.resize_needed = True
-                    else:
-                        # Canvas boyutu değişmediyse boyutlandırmayı atla (performans için)
-                        self.resize_needed = False
-                    
-                    if canvas_width > 1 and canvas_height > 1 and self.resize_needed:  # Geçerli boyut kontrolü
-                        # Oranı koru
-                        img_height, img_width = frame.shape[:2]
-                        aspect_ratio = img_width / img_height
-                        
-                        # Canvas boyutuna sığdır (en-boy oranını koru)
-                        if canvas_width / canvas_height > aspect_ratio:
-                            # Canvas daha geniş, yüksekliğe göre ayarla
-                            new_height = canvas_height
-                            new_width = int(new_height * aspect_ratio)
-                        else:
-                            # Canvas daha dar, genişliğe göre ayarla
-                            new_width = canvas_width
-                            new_height = int(new_width / aspect_ratio)
-                        
-                        # Yeni boyutları sakla
-                        self.last_resize_dims = (new_width, new_height)
-                    elif not hasattr(self, 'last_resize_dims'):
-                        # İlk çalıştırma için varsayılan değerler
-                        self.last_resize_dims = (canvas_width, canvas_height)
-                    
-                    # Görüntüyü yeniden boyutlandır (performans için LANCZOS yerine NEAREST kullan)
-                    pil_img = Image.fromarray(rgb_frame)
-                    pil_img = pil_img.resize(self.last_resize_dims, Image.NEAREST)
-                    
-                    # ImageTk ile görüntüyü güncelle
-                    self.current_photo = ImageTk.PhotoImage(image=pil_img)
-                    
-                    # Canvas'ı güncelle
-                    self.camera_canvas.delete("camera_image")
-                    self.cam_image_id = self.camera_canvas.create_image(
-                        canvas_width // 2, canvas_height // 2, 
-                        image=self.current_photo, anchor=tk.CENTER, tags="camera_image")
+                if context is not None:
+                    # Yeni kare veya tespit sonucu yoksa yeniden çizme
+                    if context is not self.last_rendered_context:
+                        self.last_rendered_context = context
+                        self._render_camera_frame(context.frame, context.detections)
+                        self.frame_count += 1
                     
                     # FPS hesapla
                     current_time = time.time()
@@ -2154,6 +2281,11 @@ class HSSSystem:
                         self.frame_count = 0
                         self.last_frame_time = current_time
                         
+                        # Saniyedeki yeni tespit sonucu sayısı
+                        detections_run = self.pipeline.detections_run
+                        self.yolo_fps = detections_run - self.last_detections_run
+                        self.last_detections_run = detections_run
+                        
                         # FPS etiketini güncelle
                         self.fps_label.configure(text=f"FPS: {self.fps}")
                         
@@ -2166,18 +2298,21 @@ class HSSSystem:
                             except (ImportError, Exception):
                                 pass
                         
+                        # Uçtan uca gecikme (kare yakalama -> motor komutu)
+                        if "latency" in self.status_indicators:
+                            latency = tracer.get_latency_summary()
+                            self.status_indicators["latency"].configure(
+                                text=f"{latency[0]:.0f}/{latency[1]:.0f} ms" if latency else "--")
+                        
                         # Kamera ve kayıt durumunu güncelle
                         self._update_connection_status()
-                    
-                    self.frame_count += 1
                 
                 # Kamera ve YOLO FPS değerlerini güncelle
                 if "fps" in self.status_indicators:
                     self.status_indicators["fps"].configure(text=f"{self.fps}")
                 
                 if "yolo_fps" in self.status_indicators:
-                    yolo_fps = self.fps // skip_frames
-                    self.status_indicators["yolo_fps"].configure(text=f"{yolo_fps}")
+                    self.status_indicators["yolo_fps"].configure(text=f"{self.yolo_fps}")
             
             # Motor değerlerini güncelle
             if self.arduino and self.arduino.is_connected():
@@ -2246,16 +2381,57 @@ class LogHandler(logging.Handler):
         # Ana thread'de UI güncellemesi yap
         self.ui.ui_root.after(0, lambda: self.ui._add_log_message(log_entry, level))
 
+def _export_traces(system, path):
+    """
+    Gecikme izlerini dosyaya kaydeder.
+    
+    Args:
+        system: HSSSystem nesnesi
+        path: Çıktı dosyası (None ise kaydedilmez)
+    """
+    if not path:
+        return
+    
+    try:
+        tracer.export(path)
+    except OSError as e:
+        system.logger.error(f"Gecikme izleri kaydedilemedi: {str(e)}")
+
 def main():
     """
     Ana program başlangıç noktası.
     """
     parser = argparse.ArgumentParser(description="Hava Savunma Sistemi")
     parser.add_argument("--headless", action="store_true", help="Arayüzsüz modda çalıştır")
+    parser.add_argument("--trace-export", default=None, metavar="DOSYA",
+                        help="Çıkışta gecikme izlerini kaydet (.csv ise CSV, değilse Chrome trace JSON)")
+    parser.add_argument("--replay", default=None, metavar="KAYNAK",
+                        help="Kamera yerine video dosyası, görüntü dizini veya kayıt dizinini oynat")
+    parser.add_argument("--replay-pacing", default=CAMERA_REPLAY_PACING, choices=("realtime", "fixed", "fast"),
+                        help="Oynatma hızı: kaynak zamanlaması, sabit FPS veya beklemeden")
+    parser.add_argument("--replay-fps", type=float, default=None, help="fixed modunda oynatma FPS değeri")
+    parser.add_argument("--replay-loop", action="store_true", default=CAMERA_REPLAY_LOOP,
+                        help="Kaynak sonunda başa dön")
+    parser.add_argument("--record", default=None, metavar="DIZIN",
+                        help="Kamera karelerini --replay ile oynatılabilecek bir kayıt dizinine yaz")
     args = parser.parse_args()
     
+    # Oynatma kamerası
+    camera = None
+    if args.replay:
+        if ReplayCamera is None:
+            print("HATA: Oynatma kamerası kullanılamıyor", file=sys.stderr)
+            sys.exit(1)
+        camera = ReplayCamera(args.replay, CAMERA_WIDTH, CAMERA_HEIGHT, args.replay_fps,
+                              pacing=args.replay_pacing, loop=args.replay_loop)
+    
     # Hava Savunma Sistemi nesnesini oluştur
-    system = HSSSystem()
+    system = HSSSystem(camera)
+    
+    # Kare kaydını başlat
+    if args.record and FrameRecorder is not None:
+        system.recorder = FrameRecorder(system.camera, args.record)
+        system.recorder.start()
     
     if args.headless:
         # Arayüzsüz mod (konsol tabanlı)
@@ -2264,6 +2440,10 @@ def main():
         # Güvenlik izlemeyi başlat
         system.safety.start_monitoring()
         
+        # Tespit iş parçacığını başlat
+        if system.detection_worker:
+            system.detection_worker.start()
+        
         # İşlev modlarını başlat
         system.logger.info("Sistem arayüzsüz modda çalışıyor")
         
@@ -2272,19 +2452,15 @@ def main():
             system.current_mode = 1  # Varsayılan olarak mod 1 ile başla
             
             while system.running:
-                # Kamera görüntüsünü al
-                ret, frame = system.camera.get_frame()
+                # Kare bağlamı (tespit ve sınıflandırma kare başına bir kez, modlar tekrarlamaz)
+                context = system.pipeline.update()
                 
-                if ret and frame is not None:
-                    # YOLO tespitleri
-                    detections = system.detector.detect(frame)
-                    detections = system.detector.classify_balloons(frame, detections)
-                    
+                if context is not None:
                     # Aktif modu çalıştır
                     if system.current_mode == 1:
-                        system.mode1.run({"fire": False})  # Manuel atış yok
+                        system.mode1.run({"fire": False}, context=context)  # Manuel atış yok
                     elif system.current_mode == 2:
-                        system.mode2.run()
+                        system.mode2.run(context=context)
                     
                 # Kısa bekleme
                 time.sleep(0.1)
@@ -2293,6 +2469,7 @@ def main():
             system.logger.info("Kullanıcı tarafından durduruldu")
         finally:
             system.stop()
+            _export_traces(system, args.trace_export)
     else:
         try:
             # PyQt5 tabanlı arayüz modunu kullan (eğer varsa)
@@ -2306,6 +2483,7 @@ def main():
                 system.run()  # Tkinter arayüzünü başlat
         finally:
             system.stop()
+            _export_traces(system, args.trace_export)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
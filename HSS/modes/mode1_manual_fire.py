@@ -13,12 +13,15 @@ import cv2
 import numpy as np
 from typing import Dict, Any, Tuple
 
+from utils.tracing import tracer
+from vision.pipeline import FramePipeline
+
 class Mode1:
     """
     Mod 1: Otomatik Takip, Manuel Ates modu.
     """
     
-    def __init__(self, camera, detector, arduino_comm, safety_monitor):
+    def __init__(self, camera, detector, arduino_comm, safety_monitor, detection_worker=None, pipeline=None):
         """
         Mode1 sınıfını başlatır.
         
@@ -27,13 +30,25 @@ class Mode1:
             detector: YoloDetector nesnesi
             arduino_comm: ArduinoComm nesnesi
             safety_monitor: SafetyMonitor nesnesi
+            detection_worker: DetectionWorker nesnesi (None ise tespit döngü içinde yapılır)
+            pipeline: Paylaşılan FramePipeline (None ise mod kendi hattını oluşturur)
         """
         self.camera = camera
         self.detector = detector
         self.arduino = arduino_comm
         self.safety = safety_monitor
+        self.detection_worker = detection_worker
+        
+        # Kare hattı (yakalama, tespit, sınıflandırma kare başına bir kez)
+        self.pipeline = pipeline or FramePipeline(camera, detector, detection_worker)
+        
+        # Hattan okunan son tespit sonucunun sıra numarası
+        self.last_detection_seq = 0
         
-        # Motor ve lazer kontrol nesnelerini al
+        # Son tespitlerin ait olduğu karenin gecikme izi numarası
+        self.trace_id = None
+        
+        # Motor ve lazer kontrol nesnelerini al (güvenlik izleyicisiyle ortak; acil durdurma bunları durdurur)
         self.motor_controller = safety_monitor.motor_controller
         self.laser_controller = safety_monitor.laser_controller
         
@@ -52,12 +67,13 @@ class Mode1:
         # Logger
         self.logger = logging.getLogger("Mode1")
     
-    def run(self, user_input: Dict = None):
+    def run(self, user_input: Dict = None, context=None):
         """
         Mod 1'i çalıştırır.
         
         Args:
             user_input: Kullanıcıdan gelen giriş
+            context: Paylaşılan kare bağlamı (None ise modun hattından alınır)
         """
         if not self.is_running:
             self._start()
@@ -68,35 +84,30 @@ class Mode1:
             self._stop()
             return
         
-        # Görüntü al
-        ret, frame = self.camera.get_frame()
-        if not ret or frame is None:
+        # Kare bağlamını al (tespit ve sınıflandırma hatta bir kez yapılır)
+        if context is None:
+            context = self.pipeline.update()
+        if context is None:
             return
         
-        # Görüntü boyutlarını al
-        height, width, _ = frame.shape
-        self.frame_center = (width // 2, height // 2)
-        
-        # Hedefleri tespit et
-        detections = self.detector.detect(frame)
-        
-        # Balon renk sınıflandırması
-        detections = self.detector.classify_balloons(frame, detections)
-        
-        # Tüm balonlar arasında en yakın olanı bul
-        balloon_detections = [d for d in detections if "balloon" in d["class_name"]]
-        target = self.detector.find_closest_target(balloon_detections, self.frame_center)
-        
-        # Hedef varsa takip et
-        if target:
-            self.current_target = target
-            self._track_target(target)
-        else:
-            self.current_target = None
-            self.target_locked = False
+        # Görüntü merkezi
+        self.frame_center = context.frame_center
         
-        # Görüntüye tespitleri çiz
-        frame_with_detections = self.detector.draw_detections(frame, detections)
+        # Yeni tespit sonucu varsa hedefi güncelle
+        detections = self._get_detections(context)
+        if detections is not None:
+            # Tüm balonlar arasında en yakın olanı bul
+            balloon_detections = [d for d in detections if "balloon" in d["class_name"]]
+            target = self.detector.find_closest_target(balloon_detections, self.frame_center)
+            tracer.mark(self.trace_id, "prioritize")
+            
+            # Hedef varsa takip et
+            if target:
+                self.current_target = target
+                self._track_target(target)
+            else:
+                self.current_target = None
+                self.target_locked = False
         
         # Kullanıcı girişi varsa ve ateş komutu geldi mi kontrol et
         if user_input and user_input.get("fire") and self.target_locked:
@@ -107,6 +118,23 @@ class Mode1:
             self.logger.info("Mod 1 zaman aşımı, durduruluyor")
             self._stop()
     
+    def _get_detections(self, context):
+        """
+        Bağlamdaki tespitleri mod henüz işlemediyse döndürür.
+        
+        Args:
+            context: Kare bağlamı
+            
+        Returns:
+            Optional[List[Dict]]: Tespitler - mod bu sonucu zaten işlediyse None
+        """
+        if context.detection_seq == self.last_detection_seq:
+            return None
+        
+        self.last_detection_seq = context.detection_seq
+        self.trace_id = context.trace_id
+        return context.detections
+    
     def _start(self):
         """
         Mod 1'i başlatır.
@@ -119,8 +147,9 @@ class Mode1:
         if not self.camera.is_working():
             self.camera.initialize()
         
-        # YOLO dedektörünü başlat
-        self.detector.initialize()
+        # YOLO dedektörünü başlat (iş parçacığı kullanılıyorsa dedektör zaten başlatılmıştır)
+        if self.detection_worker is None:
+            self.detector.initialize()
         
         # Motorları kalibre et
         self.motor_controller.calibrate()
@@ -190,18 +219,19 @@ class Mode1:
         if abs(vertical_angle) < 0.05:
             vertical_angle = 0
         
-        # Mevcut motor pozisyonlarını al
+        # Ölçülen motor pozisyonlarını al (son komut edilen hedef değil; hata birikmez)
         current_h, current_v = self.motor_controller.get_current_position()
         
         # Yeni hedef konumunu hesapla
         new_h = current_h + horizontal_angle
         new_v = current_v + vertical_angle
+        tracer.mark(self.trace_id, "decision")
         
         # Eğer hareket gerekiyorsa motorları çalıştır
         if abs(horizontal_angle) > 0 or abs(vertical_angle) > 0:
             # Motor hızını uzaklığa göre ayarla (50-100 arası)
             motor_speed = int(50 + 50 * speed_factor)
-            self.motor_controller.move_to_position(new_h, new_v, motor_speed, wait=False)
+            self.motor_controller.set_setpoint(new_h, new_v, motor_speed, trace_id=self.trace_id)
         
         # Hedef kilitlenme durumunu kontrol et
         # Merkeze daha yakın olmayı gerektir ve yüksek güvenilirlik iste
@@ -244,19 +274,9 @@ class Mode1:
             self.logger.warning("Hedef merkez dışına çıktı, ateş iptal edildi")
             return
         
-        # Lazerin güvenlik kilidini geçici olarak devre dışı bırak
-        self.laser_controller.set_safety(False)
-        
-        try:
-            # Lazeri aktifleştir
-            self.logger.info(f"Hedefe ateş ediliyor: {self.current_target['class_name']}")
-            self.laser_controller.fire(duration=1.5)  # 1.5 saniyelik atış
-            
-            # Kısa bir bekleme
-            time.sleep(0.5)
-        finally:
-            # Güvenlik kilidini tekrar aktifleştir
-            self.laser_controller.set_safety(True)
+        # Lazeri aktifleştir (kapatma zamanlayıcıyla yapılır, döngü beklemez)
+        self.logger.info(f"Hedefe ateş ediliyor: {self.current_target['class_name']}")
+        self.laser_controller.fire(duration=1.5)  # 1.5 saniyelik atış
         
         # Hedefi sıfırla (sonraki hedefi bulmak için)
         self.current_target = None
@@ -14,12 +14,16 @@ import cv2
 import numpy as np
 from typing import Dict, Any, Tuple, List
 
+from utils.tracing import tracer
+from vision.pipeline import FramePipeline
+from utils.scheduler import scheduler
+
 class Mode2:
     """
     Mod 2: Otomatik Takip, Otomatik Ates modu.
     """
     
-    def __init__(self, camera, detector, arduino_comm, safety_monitor):
+    def __init__(self, camera, detector, arduino_comm, safety_monitor, detection_worker=None, pipeline=None):
         """
         Mode2 sınıfını başlatır.
         
@@ -28,13 +32,25 @@ class Mode2:
             detector: YoloDetector nesnesi
             arduino_comm: ArduinoComm nesnesi
             safety_monitor: SafetyMonitor nesnesi
+            detection_worker: DetectionWorker nesnesi (None ise tespit döngü içinde yapılır)
+            pipeline: Paylaşılan FramePipeline (None ise mod kendi hattını oluşturur)
         """
         self.camera = camera
         self.detector = detector
         self.arduino = arduino_comm
         self.safety = safety_monitor
+        self.detection_worker = detection_worker
+        
+        # Kare hattı (yakalama, tespit, sınıflandırma kare başına bir kez)
+        self.pipeline = pipeline or FramePipeline(camera, detector, detection_worker)
+        
+        # Hattan okunan son tespit sonucunun sıra numarası
+        self.last_detection_seq = 0
+        
+        # Son tespitlerin ait olduğu karenin gecikme izi numarası
+        self.trace_id = None
         
-        # Motor ve lazer kontrol nesnelerini al
+        # Motor ve lazer kontrol nesnelerini al (güvenlik izleyicisiyle ortak; acil durdurma bunları durdurur)
         self.motor_controller = safety_monitor.motor_controller
         self.laser_controller = safety_monitor.laser_controller
         
@@ -56,13 +72,17 @@ class Mode2:
         self.is_cooldown = False
         self.cooldown_time = 0
         self.cooldown_duration = 2.0  # Ateş sonrası bekleme süresi (saniye)
+        self.cooldown_event = None  # Bekleme süresinin bitişi (zamanlayıcı eylemi)
         
         # Logger
         self.logger = logging.getLogger("Mode2")
     
-    def run(self):
+    def run(self, context=None):
         """
         Mod 2'yi çalıştırır.
+        
+        Args:
+            context: Paylaşılan kare bağlamı (None ise modun hattından alınır)
         """
         if not self.is_running:
             self._start()
@@ -73,37 +93,32 @@ class Mode2:
             self._stop()
             return
         
-        # Görüntü al
-        ret, frame = self.camera.get_frame()
-        if not ret or frame is None:
+        # Kare bağlamını al (tespit ve sınıflandırma hatta bir kez yapılır)
+        if context is None:
+            context = self.pipeline.update()
+        if context is None:
             return
         
-        # Görüntü boyutlarını al
-        height, width, _ = frame.shape
-        self.frame_center = (width // 2, height // 2)
+        # Görüntü merkezi
+        self.frame_center = context.frame_center
         
-        # Hedefleri tespit et
-        detections = self.detector.detect(frame)
+        # Hattan gelen, mod tarafından henüz işlenmemiş tespitler
+        detections = self._get_detections(context)
         
-        # Balon renk sınıflandırması
-        detections = self.detector.classify_balloons(frame, detections)
+        # Yeni tespit sonucu yoksa hedef durumunu koru
+        if detections is None:
+            self._check_timeout()
+            return
         
         # Düşman hedefleri (kırmızı balonlar) filtrele
         enemy_detections = [d for d in detections if d.get("is_enemy", False)]
         
-        # Bekleme süresi kontrolü
-        if self.is_cooldown:
-            if time.time() - self.cooldown_time > self.cooldown_duration:
-                self.is_cooldown = False
-            else:
-                # Bekleme süresi dolmadıysa çalışmaya devam et
-                # ama ateş etme ve hedef kilitleme yapma
-                pass
-        
         # Düşman hedef varsa ve bekleme modunda değilsek takip et
+        # (bekleme süresinin bitişi zamanlayıcıyla işaretlenir)
         if enemy_detections and not self.is_cooldown:
             # Hedefleri tehdit seviyesine göre önceliklendir
             prioritized_targets = self.detector.prioritize_targets(enemy_detections, self.frame_center)
+            tracer.mark(self.trace_id, "prioritize")
             
             if prioritized_targets:
                 # En yüksek öncelikli hedefi seç
@@ -117,11 +132,13 @@ class Mode2:
                 self.current_target = highest_priority_target
                 self._track_target(highest_priority_target)
                 
-                # Hedef kilitliyse ve yeterince süre kilitli kaldıysa ateş et
+                # Hedef kilitliyse ve yeterince süre kilitli kaldıysa ateş et; takipçinin
+                # tahmin ettiği (bu karede görülmemiş) hedefe ateş edilmez
                 if self.target_locked:
                     if self.lock_time == 0:
                         self.lock_time = time.time()
-                    elif time.time() - self.lock_time > self.lock_duration:
+                    elif (time.time() - self.lock_time > self.lock_duration and
+                          not highest_priority_target.get("predicted", False)):
                         self._fire_at_target()
             else:
                 self.current_target = None
@@ -132,14 +149,34 @@ class Mode2:
             self.target_locked = False
             self.lock_time = 0
         
-        # Görüntüye tespitleri çiz
-        frame_with_detections = self.detector.draw_detections(frame, detections)
-        
         # Zaman aşımı kontrolü
+        self._check_timeout()
+    
+    def _check_timeout(self):
+        """
+        Mod zaman aşımını kontrol eder.
+        """
         if self.start_time > 0 and time.time() - self.start_time > self.timeout:
             self.logger.info("Mod 2 zaman aşımı, durduruluyor")
             self._stop()
     
+    def _get_detections(self, context):
+        """
+        Bağlamdaki tespitleri mod henüz işlemediyse döndürür.
+        
+        Args:
+            context: Kare bağlamı
+            
+        Returns:
+            Optional[List[Dict]]: Tespitler - mod bu sonucu zaten işlediyse None
+        """
+        if context.detection_seq == self.last_detection_seq:
+            return None
+        
+        self.last_detection_seq = context.detection_seq
+        self.trace_id = context.trace_id
+        return context.detections
+    
     def _start(self):
         """
         Mod 2'yi başlatır.
@@ -148,14 +185,15 @@ class Mode2:
         self.start_time = time.time()
         self.target_locked = False
         self.lock_time = 0
-        self.is_cooldown = False
+        self._end_cooldown()
         
         # Kamerayı başlat (eğer başlatılmamışsa)
         if not self.camera.is_working():
             self.camera.initialize()
         
-        # YOLO dedektörünü başlat
-        self.detector.initialize()
+        # YOLO dedektörünü başlat (iş parçacığı kullanılıyorsa dedektör zaten başlatılmıştır)
+        if self.detection_worker is None:
+            self.detector.initialize()
         
         # Motorları kalibre et
         self.motor_controller.calibrate()
@@ -168,6 +206,7 @@ class Mode2:
         """
         self.is_running = False
         self.target_locked = False
+        self._end_cooldown()
         
         # Lazeri kapat
         self.laser_controller.stop()
@@ -195,15 +234,16 @@ class Mode2:
         horizontal_angle = dx * 0.1  # Yatay açı (derece)
         vertical_angle = dy * 0.1    # Dikey açı (derece)
         
-        # Mevcut motor pozisyonlarını al
+        # Ölçülen motor pozisyonlarını al (son komut edilen hedef değil; hata birikmez)
         current_h, current_v = self.motor_controller.get_current_position()
         
         # Yeni hedef konumunu hesapla
         new_h = current_h + horizontal_angle
         new_v = current_v + vertical_angle
+        tracer.mark(self.trace_id, "decision")
         
-        # Motorları yeni konuma getir
-        self.motor_controller.move_to_position(new_h, new_v)
+        # Motorları yeni konuma yönlendir (beklemeden, en son hedef gönderilir)
+        self.motor_controller.set_setpoint(new_h, new_v, trace_id=self.trace_id)
         
         # Hedef kilitlenme durumunu kontrol et
         is_centered = abs(dx) < 20 and abs(dy) < 20
@@ -222,6 +262,14 @@ class Mode2:
             self.target_locked = False
             self.lock_time = 0
     
+    def _end_cooldown(self):
+        """
+        Ateş sonrası bekleme süresini bitirir (zamanlayıcı iş parçacığında da çağrılır).
+        """
+        scheduler.cancel(self.cooldown_event)
+        self.cooldown_event = None
+        self.is_cooldown = False
+    
     def _fire_at_target(self):
         """
         Hedefe ateş eder.
@@ -238,9 +286,10 @@ class Mode2:
         self.logger.info(f"Düşman hedefe ateş ediliyor: {self.current_target['class_name']}")
         self.laser_controller.fire()
         
-        # Bekleme modunu aktifleştir
+        # Bekleme modunu aktifleştir, bitişini zamanla
         self.is_cooldown = True
         self.cooldown_time = time.time()
+        self.cooldown_event = scheduler.schedule(self.cooldown_duration, self._end_cooldown)
         
         # Hedefi sıfırla
         self.current_target = None
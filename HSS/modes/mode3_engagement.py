@@ -16,12 +16,16 @@ import cv2
 import numpy as np
 from typing import Dict, Any, Tuple, List, Optional
 
+from utils.tracing import tracer
+from vision.pipeline import FramePipeline
+from utils.scheduler import scheduler
+
 class Mode3:
     """
     Mod 3: Angajman Modu.
     """
     
-    def __init__(self, camera, detector, arduino_comm, safety_monitor):
+    def __init__(self, camera, detector, arduino_comm, safety_monitor, detection_worker=None, pipeline=None):
         """
         Mode3 sınıfını başlatır.
         
@@ -30,13 +34,25 @@ class Mode3:
             detector: YoloDetector nesnesi
             arduino_comm: ArduinoComm nesnesi
             safety_monitor: SafetyMonitor nesnesi
+            detection_worker: DetectionWorker nesnesi (None ise tespit döngü içinde yapılır)
+            pipeline: Paylaşılan FramePipeline (None ise mod kendi hattını oluşturur)
         """
         self.camera = camera
         self.detector = detector
         self.arduino = arduino_comm
         self.safety = safety_monitor
+        self.detection_worker = detection_worker
+        
+        # Kare hattı (yakalama, tespit, sınıflandırma kare başına bir kez)
+        self.pipeline = pipeline or FramePipeline(camera, detector, detection_worker)
+        
+        # Hattan okunan son tespit sonucunun sıra numarası
+        self.last_detection_seq = 0
+        
+        # Son tespitlerin ait olduğu karenin gecikme izi numarası
+        self.trace_id = None
         
-        # Motor ve lazer kontrol nesnelerini al
+        # Motor ve lazer kontrol nesnelerini al (güvenlik izleyicisiyle ortak; acil durdurma bunları durdurur)
         self.motor_controller = safety_monitor.motor_controller
         self.laser_controller = safety_monitor.laser_controller
         
@@ -54,12 +70,15 @@ class Mode3:
         self.target_board = None  # Hedef tahta (A veya B)
         self.target_color = None  # Hedef renk
         self.target_shape = None  # Hedef şekil
+        self.board_move = None  # Tahtaya yönelme yörüngesi (TrajectoryHandle)
         
         # Hedef takibi
         self.current_target = None
         self.target_locked = False
         self.lock_time = 0
         self.lock_duration = 1.0  # Kilitli kalma süresi (saniye)
+        self.fire_duration = 1.0  # Angajman tamamlanmadan önceki atış süresi (saniye)
+        self.fire_event = None  # Atışın bitişi (zamanlayıcı eylemi)
         
         # Görüntü işleme parametreleri
         self.frame_center = (320, 240)  # Varsayılan (640x480 için)
@@ -71,12 +90,13 @@ class Mode3:
         # Logger
         self.logger = logging.getLogger("Mode3")
     
-    def run(self, user_input: Dict = None):
+    def run(self, user_input: Dict = None, context=None):
         """
         Mod 3'ü çalıştırır.
         
         Args:
             user_input: Kullanıcıdan gelen giriş
+            context: Paylaşılan kare bağlamı (None ise modun hattından alınır)
         """
         if not self.is_running:
             self._start()
@@ -87,30 +107,33 @@ class Mode3:
             self._stop()
             return
         
-        # Görüntü al
-        ret, frame = self.camera.get_frame()
-        if not ret or frame is None:
+        # Kare bağlamını al (tespit ve sınıflandırma hatta bir kez yapılır)
+        if context is None:
+            context = self.pipeline.update()
+        if context is None:
             return
         
-        # Görüntü boyutlarını al
-        height, width, _ = frame.shape
-        self.frame_center = (width // 2, height // 2)
+        # Görüntü merkezi
+        self.frame_center = context.frame_center
         
         # Durum makinesi
         if self.state == "SCAN_QR":
-            self._scan_qr_code(frame, user_input)
+            self._scan_qr_code(context, user_input)
         elif self.state == "SCAN_SHAPE":
-            self._scan_target_shape(frame, user_input)
+            self._scan_target_shape(context, user_input)
         elif self.state == "AWAIT_CONFIRMATION":
-            self._await_confirmation(frame, user_input)
+            self._await_confirmation(context, user_input)
         elif self.state == "MOVE_TO_BOARD":
-            self._move_to_board(frame)
+            self._move_to_board(context)
         elif self.state == "SEARCH_TARGET":
-            self._search_target(frame)
+            self._search_target(context)
         elif self.state == "TRACK_TARGET":
-            self._track_specific_target(frame)
+            self._track_specific_target(context)
+        elif self.state == "FIRING":
+            # Atış sürüyor; angajman zamanlayıcıyla tamamlanır
+            pass
         elif self.state == "COMPLETED":
-            self._engagement_completed(frame)
+            self._engagement_completed(context)
         else:
             self.logger.error(f"Bilinmeyen durum: {self.state}")
             self.state = "SCAN_QR"
@@ -120,6 +143,27 @@ class Mode3:
             self.logger.info("Mod 3 zaman aşımı, durduruluyor")
             self._stop()
     
+    def _get_detections(self, context, extract_features: bool = False):
+        """
+        Bağlamdaki tespitleri mod henüz işlemediyse döndürür.
+        
+        Args:
+            context: Kare bağlamı
+            extract_features: True ise balonlara renk ve şekil eklenmiş tespitler döner
+                (çıkarım bağlam başına bir kez yapılır)
+            
+        Returns:
+            Optional[List[Dict]]: Tespitler - mod bu sonucu zaten işlediyse None
+        """
+        if context.detection_seq == self.last_detection_seq:
+            return None
+        
+        self.last_detection_seq = context.detection_seq
+        self.trace_id = context.trace_id
+        if extract_features:
+            return context.features()
+        return context.detections
+    
     def _start(self):
         """
         Mod 3'ü başlatır.
@@ -130,6 +174,7 @@ class Mode3:
         self.target_board = None
         self.target_color = None
         self.target_shape = None
+        self.board_move = None
         self.current_target = None
         self.target_locked = False
         self.lock_time = 0
@@ -139,8 +184,9 @@ class Mode3:
         if not self.camera.is_working():
             self.camera.initialize()
         
-        # YOLO dedektörünü başlat
-        self.detector.initialize()
+        # YOLO dedektörünü başlat (iş parçacığı kullanılıyorsa dedektör zaten başlatılmıştır)
+        if self.detection_worker is None:
+            self.detector.initialize()
         
         # Motorları kalibre et
         self.motor_controller.calibrate()
@@ -153,6 +199,10 @@ class Mode3:
         """
         self.is_running = False
         
+        # Bekleyen angajman tamamlamasını iptal et
+        scheduler.cancel(self.fire_event)
+        self.fire_event = None
+        
         # Lazeri kapat
         self.laser_controller.stop()
         
@@ -161,19 +211,21 @@ class Mode3:
         
         self.logger.info("Mod 3 durduruldu")
     
-    def _scan_qr_code(self, frame, user_input):
+    def _scan_qr_code(self, context, user_input):
         """
         QR kodu tarar ve hedef tahtayı belirler.
         
         Args:
-            frame: İşlenecek görüntü
+            context: Kare bağlamı
             user_input: Kullanıcıdan gelen giriş
         """
-        # Hedefleri tespit et
-        detections = self.detector.detect(frame)
+        # Hattan gelen tespitler
+        detections = self._get_detections(context)
+        if detections is None:
+            return
         
-        # QR kod tespiti yap
-        qr_success, qr_text = self.qr_detector.find_qr_in_detections(detections, frame)
+        # QR kod tespiti yap (tespitlerin ait olduğu karede)
+        qr_success, qr_text = self.qr_detector.find_qr_in_detections(detections, context.detection_frame)
         
         if qr_success:
             self.logger.info(f"QR kod tespit edildi: {qr_text}")
@@ -185,31 +237,23 @@ class Mode3:
                 self.logger.info(f"Hedef tahta belirlendi: {self.target_board}")
             else:
                 self.logger.warning(f"Geçersiz QR kod içeriği: {qr_text}, 'A' veya 'B' bekleniyor")
-        
-        # Görüntüye tespitleri çiz
-        frame_with_detections = self.detector.draw_detections(frame, detections)
     
-    def _scan_target_shape(self, frame, user_input):
+    def _scan_target_shape(self, context, user_input):
         """
         Hedef şekli ve rengini tarar.
         
         Args:
-            frame: İşlenecek görüntü
+            context: Kare bağlamı
             user_input: Kullanıcıdan gelen giriş
         """
-        # Hedefleri tespit et
-        detections = self.detector.detect(frame)
-        
-        # Balon renk ve şekil sınıflandırması
-        detections = self.detector.classify_balloons(frame, detections)
-        detections = self.detector.detect_shapes(frame, detections)
+        # Balonların renk ve şekli eklenmiş tespitler
+        detections = self._get_detections(context, extract_features=True)
+        if detections is None:
+            return
         
         # Balon tespitlerini filtrele
         balloon_detections = [d for d in detections if "balloon" in d["class_name"]]
         
-        # Görüntüye tespitleri çiz
-        frame_with_detections = self.detector.draw_detections(frame, detections)
-        
         # Kullanıcıdan manuel giriş al (tipik olarak GUI'den)
         if user_input and "selected_target" in user_input:
             selected = user_input["selected_target"]
@@ -229,12 +273,12 @@ class Mode3:
                 self.state = "AWAIT_CONFIRMATION"
                 self.logger.info(f"Hedef belirlendi: {self.target_color} {self.target_shape}")
     
-    def _await_confirmation(self, frame, user_input):
+    def _await_confirmation(self, context, user_input):
         """
         Kullanıcıdan angajman onayı bekler.
         
         Args:
-            frame: İşlenecek görüntü
+            context: Kare bağlamı
             user_input: Kullanıcıdan gelen giriş
         """
         # Onay için kullanıcıdan giriş bekle
@@ -249,16 +293,23 @@ class Mode3:
                 self.target_color = None
                 self.target_shape = None
     
-    def _move_to_board(self, frame):
+    def _move_to_board(self, context):
         """
         Sistemi belirtilen tahtaya yönlendirir.
         
         Args:
-            frame: İşlenecek görüntü
+            context: Kare bağlamı
         """
-        # Tahtaya yönel
+        # Tahtaya yönel: yörünge bir kez yüklenir, sonraki karelerde beklemeden sorgulanır
         if self.target_board:
-            result = self.motor_controller.move_to_board(self.target_board)
+            if self.board_move is None:
+                self.board_move = self.motor_controller.move_to_board_async(self.target_board)
+            
+            if not self.board_move.done():
+                return
+            
+            result = self.board_move.wait()
+            self.board_move = None
             
             if result:
                 self.logger.info(f"Tahta {self.target_board}'ya yönelindi")
@@ -268,22 +319,17 @@ class Mode3:
                 self.state = "SCAN_QR"  # Yeniden başla
                 self.target_board = None
     
-    def _search_target(self, frame):
+    def _search_target(self, context):
         """
         Tahtada belirtilen hedefi arar.
         
         Args:
-            frame: İşlenecek görüntü
+            context: Kare bağlamı
         """
-        # Hedefleri tespit et
-        detections = self.detector.detect(frame)
-        
-        # Balon renk ve şekil sınıflandırması
-        detections = self.detector.classify_balloons(frame, detections)
-        detections = self.detector.detect_shapes(frame, detections)
-        
-        # Görüntüye tespitleri çiz
-        frame_with_detections = self.detector.draw_detections(frame, detections)
+        # Balonların renk ve şekli eklenmiş tespitler
+        detections = self._get_detections(context, extract_features=True)
+        if detections is None:
+            return
         
         # Hedef kriterlere uyan balonları filtrele
         target_balloons = [
@@ -301,23 +347,21 @@ class Mode3:
                 self.state = "TRACK_TARGET"
                 self.logger.info(f"Hedef bulundu: {self.target_color} {self.target_shape}")
     
-    def _track_specific_target(self, frame):
+    def _track_specific_target(self, context):
         """
         Belirli bir hedefi takip eder ve ateş eder.
         
         Args:
-            frame: İşlenecek görüntü
+            context: Kare bağlamı
         """
         if not self.current_target:
             self.state = "SEARCH_TARGET"
             return
         
-        # Hedefleri tespit et
-        detections = self.detector.detect(frame)
-        
-        # Balon renk ve şekil sınıflandırması
-        detections = self.detector.classify_balloons(frame, detections)
-        detections = self.detector.detect_shapes(frame, detections)
+        # Balonların renk ve şekli eklenmiş tespitler
+        detections = self._get_detections(context, extract_features=True)
+        if detections is None:
+            return
         
         # Hedef kriterlere uyan balonları filtrele
         target_balloons = [
@@ -338,6 +382,7 @@ class Mode3:
         
         # En yakın hedefi seç
         target = self.detector.find_closest_target(target_balloons, self.frame_center)
+        tracer.mark(self.trace_id, "prioritize")
         if target:
             self.current_target = target
             
@@ -352,15 +397,16 @@ class Mode3:
             horizontal_angle = dx * 0.1  # Yatay açı (derece)
             vertical_angle = dy * 0.1    # Dikey açı (derece)
             
-            # Mevcut motor pozisyonlarını al
+            # Ölçülen motor pozisyonlarını al (son komut edilen hedef değil; hata birikmez)
             current_h, current_v = self.motor_controller.get_current_position()
             
             # Yeni hedef konumunu hesapla
             new_h = current_h + horizontal_angle
             new_v = current_v + vertical_angle
+            tracer.mark(self.trace_id, "decision")
             
-            # Motorları yeni konuma getir
-            self.motor_controller.move_to_position(new_h, new_v)
+            # Motorları yeni konuma yönlendir (beklemeden, en son hedef gönderilir)
+            self.motor_controller.set_setpoint(new_h, new_v, trace_id=self.trace_id)
             
             # Hedef kilitlenme durumunu kontrol et
             is_centered = abs(dx) < 20 and abs(dy) < 20
@@ -371,8 +417,8 @@ class Mode3:
                     self.logger.info(f"Hedef kilitlendi: {target_info}")
                     self.target_locked = True
                     self.lock_time = time.time()
-                elif time.time() - self.lock_time > self.lock_duration:
-                    # Ateş et
+                elif time.time() - self.lock_time > self.lock_duration and not target.get("predicted", False):
+                    # Ateş et (takipçinin tahmin ettiği, bu karede görülmemiş hedefe değil)
                     self._fire_at_specific_target()
             else:
                 self.target_locked = False
@@ -380,9 +426,6 @@ class Mode3:
         else:
             self.state = "SEARCH_TARGET"
             self.current_target = None
-        
-        # Görüntüye tespitleri çiz
-        frame_with_detections = self.detector.draw_detections(frame, detections)
     
     def _fire_at_specific_target(self):
         """
@@ -395,33 +438,33 @@ class Mode3:
         self.logger.info(f"Hedefe ateş ediliyor: {self.target_color} {self.target_shape}")
         self.laser_controller.fire()
         
-        # Kısa bir bekleme
-        time.sleep(1)
+        # Atış süresince döngü beklemeden devam eder, angajman sonra tamamlanır
+        self.state = "FIRING"
+        self.fire_event = scheduler.schedule(self.fire_duration, self._complete_engagement)
+    
+    def _complete_engagement(self):
+        """
+        Atış süresi dolduğunda angajmanı tamamlar (zamanlayıcı iş parçacığında çalışır).
+        """
+        self.fire_event = None
+        if self.state != "FIRING":
+            return
         
-        # Angajmanı tamamla
         self.engagement_complete = True
         self.engagement_time = time.time()
         self.state = "COMPLETED"
+        self.logger.info(f"Angajman tamamlandı (toplam süre: {self.engagement_time - self.start_time:.1f} sn)")
     
-    def _engagement_completed(self, frame):
+    def _engagement_completed(self, context):
         """
         Angajman tamamlandıktan sonraki durum.
         
         Args:
-            frame: İşlenecek görüntü
+            context: Kare bağlamı
         """
         # Sistemi sıfır pozisyona getir
         self.motor_controller.calibrate()
         
-        # Ekrana mesaj çiz
-        cv2.putText(frame, "Angajman Tamamlandi", (50, 50),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        
-        # İstatistikler
-        elapsed_time = time.time() - self.start_time
-        cv2.putText(frame, f"Toplam Sure: {elapsed_time:.1f} sn", (50, 100),
-                    cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        
         # Yeni angajman için bir süre bekle
         wait_time = 5.0  # saniye
         if time.time() - self.engagement_time > wait_time:
@@ -1,6 +1,12 @@
 """
 Sistem güvenlik izleme modülü.
 Sıcaklık, acil durdurma ve diğer güvenlik özelliklerini kontrol eder.
+
+Arduino'nun durum mesajları ArduinoComm tarafından çözülür çözülmez
+SafetyMonitor'a iletilir ve güvenlik kuralları hemen değerlendirilir.
+Arka plan iş parçacığı yalnızca durum mesajlarının (kalp atışı) kesilmesini
+izler. Güvenlik durumu her değişiklikte yeni bir anlık görüntü (snapshot)
+olarak değiştirilir; is_system_safe() kilit almadan okur.
 """
 
 import time
@@ -8,51 +14,79 @@ import logging
 import threading
 from typing import Dict, Any
 
+from config import MAX_TEMPERATURE, SAFETY_HEARTBEAT_TIMEOUT, SAFETY_FAN_COOLDOWN
 from control.motor_control import MotorController
 from control.laser_control import LaserController
+from utils.scheduler import scheduler
+
+# Kural ihlalleri ve durum etiketleri (öncelik sırasıyla)
+VIOLATION_LABELS = {
+    "emergency_stop": "Acil Durdurma",
+    "heartbeat": "Bağlantı Kesildi",
+    "temperature": "Yüksek Sıcaklık"
+}
 
 class SafetyMonitor:
     """
     Sistem güvenliğini izleyen sınıf.
+    
+    Modlar motor ve lazer kontrolcülerini kendileri oluşturmaz, izleyicinin
+    motor_controller ve laser_controller nesnelerini paylaşır. Böylece acil
+    durdurma, modların hedef noktası göndericisini de durdurur.
     """
     
-    def __init__(self, arduino_comm):
+    def __init__(self, arduino_comm, motor_controller=None, laser_controller=None):
         """
         SafetyMonitor sınıfını başlatır.
         
         Args:
             arduino_comm: Arduino iletişim nesnesi
+            motor_controller: Paylaşılan MotorController (None ise izleyici oluşturur)
+            laser_controller: Paylaşılan LaserController (None ise izleyici oluşturur)
         """
         self.arduino = arduino_comm
         self.test_mode = arduino_comm.test_mode
         
-        # Motor ve lazer kontrol nesneleri
-        self.motor_controller = MotorController(arduino_comm)
-        self.laser_controller = LaserController(arduino_comm)
+        # Motor ve lazer kontrol nesneleri (sistemde tek örnek; verilmediyse izleyiciye aittir)
+        self.owns_motor_controller = motor_controller is None
+        self.motor_controller = motor_controller or MotorController(arduino_comm)
+        self.laser_controller = laser_controller or LaserController(arduino_comm)
         
         # Güvenlik parametreleri
-        self.max_temperature = 75.0  # Maksimum güvenli sıcaklık (°C)
-        self.is_system_safe_flag = True
+        self.max_temperature = MAX_TEMPERATURE  # Maksimum güvenli sıcaklık (°C)
+        self.heartbeat_timeout = SAFETY_HEARTBEAT_TIMEOUT
+        self.fan_cooldown = SAFETY_FAN_COOLDOWN
         
-        # İzleme iş parçacığı
+        # Sıcaklık normale döndükten sonra fanları kapatacak zamanlayıcı eylemi
+        self.fan_off_event = None
+        
+        # Kalp atışı izleme iş parçacığı
         self.monitoring_thread = None
         self.running = False
+        self.stop_event = threading.Event()
+        
+        # Kalp atışı kontrol aralığı (saniye)
+        self.monitoring_interval = self.heartbeat_timeout / 4
+        
+        # Son durum mesajının zamanı (time.monotonic)
+        self.last_heartbeat = time.monotonic()
         
-        # İzleme aralığı (saniye)
-        self.monitoring_interval = 1.0
-        
-        # Son durum bilgisi
-        self.status = {
-            "temperature": 0.0,
-            "motor_h_pos": 0,
-            "motor_v_pos": 0,
-            "laser_active": False,
-            "fan_active": False,
-            "emergency_stop": False,
-            "status": "Normal"
+        # Güvenlik durumu anlık görüntüsü: yalnızca bütün olarak değiştirilir, yerinde güncellenmez
+        self.state = {
+            "safe": True,
+            "violations": (),
+            "status": {
+                "temperature": 0.0,
+                "motor_h_pos": 0,
+                "motor_v_pos": 0,
+                "laser_active": False,
+                "fan_active": False,
+                "emergency_stop": False,
+                "status": "Normal"
+            }
         }
         
-        # İş parçacığı kilidi
+        # Durumu güncelleyenler arasındaki kilit (okuyucular kilit almaz)
         self.lock = threading.Lock()
         
         # Logger
@@ -60,105 +94,152 @@ class SafetyMonitor:
     
     def start_monitoring(self):
         """
-        Güvenlik izleme iş parçacığını başlatır.
+        Durum mesajlarına abone olur ve kalp atışı izleme iş parçacığını başlatır.
         """
         if self.monitoring_thread and self.monitoring_thread.is_alive():
             return
-            
+        
         self.running = True
+        self.stop_event.clear()
+        self.last_heartbeat = time.monotonic()
+        
+        if not self.test_mode:
+            self.arduino.add_status_listener(self._on_status)
+        
         self.monitoring_thread = threading.Thread(target=self._monitoring_loop)
         self.monitoring_thread.daemon = True
         self.monitoring_thread.start()
         
         self.logger.info("Güvenlik izleme başlatıldı")
     
+    def _on_status(self, arduino_status: Dict[str, Any]):
+        """
+        Arduino durum mesajını işler (ArduinoComm okuma iş parçacığında çağrılır).
+        
+        Args:
+            arduino_status: Çözülmüş durum mesajı
+        """
+        self.last_heartbeat = time.monotonic()
+        
+        status = {
+            "temperature": float(arduino_status.get("temperature", 0.0)),
+            "motor_h_pos": arduino_status.get("horizontal_pos", 0),
+            "motor_v_pos": arduino_status.get("vertical_pos", 0),
+            "laser_active": bool(arduino_status.get("laser_active", False)),
+            "fan_active": bool(arduino_status.get("fan_active", False)),
+            "emergency_stop": bool(arduino_status.get("emergency_stop", False))
+        }
+        self._check_safety(status, heartbeat_lost=False)
+    
     def _monitoring_loop(self):
         """
-        Sistem güvenliğini sürekli izleyen döngü (arka plan iş parçacığı).
+        Durum mesajlarının kesilmesini izleyen döngü (arka plan iş parçacığı).
+        Test modunda durum mesajı yerine örnek veriler üretir.
         """
-        while self.running:
+        while not self.stop_event.wait(self.monitoring_interval):
             try:
                 # Test modunda örnek veriler gönder
                 if self.test_mode:
-                    with self.lock:
-                        self.status = {
-                            "temperature": 25.0 + 5.0 * (time.time() % 10) / 10.0,  # 25-30 arası dalgalanma
-                            "motor_h_pos": int(45 * (time.time() % 20) / 20.0 - 22.5),  # -22.5 ile 22.5 arası
-                            "motor_v_pos": int(30 * (time.time() % 10) / 10.0 - 15),   # -15 ile 15 arası
-                            "laser_active": False,
-                            "fan_active": False,
-                            "emergency_stop": False,
-                            "status": "Normal"
-                        }
-                        self.is_system_safe_flag = True
-                    time.sleep(self.monitoring_interval)
+                    self._on_status({
+                        "temperature": 25.0 + 5.0 * (time.time() % 10) / 10.0,  # 25-30 arası dalgalanma
+                        "horizontal_pos": int(45 * (time.time() % 20) / 20.0 - 22.5),  # -22.5 ile 22.5 arası
+                        "vertical_pos": int(30 * (time.time() % 10) / 10.0 - 15)   # -15 ile 15 arası
+                    })
                     continue
                 
-                # Arduino'dan durum bilgisini al
-                arduino_status = self.arduino.read_status()
-                
-                if arduino_status:
-                    with self.lock:
-                        # Durum bilgisini güncelle
-                        self.status.update(arduino_status)
-                        
-                        # Güvenlik kontrolü
-                        self._check_safety()
-                
-                # İzleme aralığı kadar bekle
-                time.sleep(self.monitoring_interval)
-                    
+                heartbeat_lost = time.monotonic() - self.last_heartbeat > self.heartbeat_timeout
+                if heartbeat_lost != ("heartbeat" in self.state["violations"]):
+                    self._check_safety()
+            
             except Exception as e:
                 self.logger.error(f"Güvenlik izleme hatası: {str(e)}")
-                time.sleep(self.monitoring_interval)
     
-    def _check_safety(self):
-        """
-        Güvenlik kontrollerini yapar ve gerektiğinde güvenlik önlemleri alır.
+    def _check_safety(self, status: Dict[str, Any] = None, heartbeat_lost: bool = None):
         """
-        # Sıcaklık kontrolü
-        temperature = self.status.get("temperature", 0.0)
+        Güvenlik kurallarını değerlendirir, yeni durum görüntüsünü yayınlar ve
+        yeni oluşan ihlaller için güvenlik önlemlerini alır.
         
-        if temperature > self.max_temperature:
-            self.logger.warning(f"Sıcaklık kritik seviyede: {temperature}°C")
-            self.is_system_safe_flag = False
-            self.status["status"] = "Yüksek Sıcaklık"
-            
-            # Lazeri kapat
-            self.laser_controller.stop()
+        Args:
+            status: Yeni durum bilgisi (None ise son durum yeniden değerlendirilir)
+            heartbeat_lost: Durum mesajları zaman aşımına uğradıysa True
+                            (None ise son mesajın zamanından hesaplanır)
+        """
+        with self.lock:
+            previous = self.state["violations"]
+            status = dict(self.state["status"] if status is None else status)
+            if heartbeat_lost is None:
+                heartbeat_lost = time.monotonic() - self.last_heartbeat > self.heartbeat_timeout
             
-            # Soğutma fanlarını çalıştır
-            self.arduino.send_command({"type": "fan", "state": True})
+            temperature = status.get("temperature", 0.0)
+            violations = tuple(name for name, active in (
+                ("emergency_stop", status.get("emergency_stop", False)),
+                ("heartbeat", heartbeat_lost),
+                ("temperature", temperature > self.max_temperature)
+            ) if active)
             
-        # Acil durum butonu kontrolü
-        emergency_stop = self.status.get("emergency_stop", False)
+            status["status"] = VIOLATION_LABELS[violations[0]] if violations else "Normal"
+            self.state = {"safe": not violations, "violations": violations, "status": status}
         
-        if emergency_stop:
-            self.logger.warning("Acil durdurma butonu aktif")
-            self.is_system_safe_flag = False
-            self.status["status"] = "Acil Durdurma"
+        # Önlemler yalnızca ihlal ilk oluştuğunda alınır
+        new_violations = [name for name in violations if name not in previous]
+        try:
+            if "temperature" in new_violations:
+                self.logger.warning(f"Sıcaklık kritik seviyede: {temperature}°C")
+                
+                # Lazeri kapat
+                self.laser_controller.stop()
+                
+                # Soğutma fanlarını çalıştır (bekleyen kapatma iptal edilir)
+                scheduler.cancel(self.fan_off_event)
+                self.fan_off_event = None
+                self.arduino.send_command({"type": "fan", "state": True})
+            
+            if "temperature" in previous and "temperature" not in violations:
+                # Sıcaklık normale döndü: fanlar bir süre daha çalışıp kapanır
+                self.fan_off_event = scheduler.schedule(self.fan_cooldown, self._fan_off)
             
-            # Tüm sistemleri durdur
-            self.laser_controller.stop()
-            self.motor_controller.stop()
+            if "emergency_stop" in new_violations:
+                self.logger.warning("Acil durdurma butonu aktif")
+                
+                # Tüm sistemleri durdur
+                self.laser_controller.stop()
+                self.motor_controller.stop()
             
-        # Herşey normalde
-        if not emergency_stop and temperature <= self.max_temperature:
-            self.is_system_safe_flag = True
-            self.status["status"] = "Normal"
+            if "heartbeat" in new_violations:
+                self.logger.error(f"Arduino'dan {self.heartbeat_timeout:.1f} saniyedir durum mesajı alınamadı")
+                
+                # Bağlantı kesildiyse hareketi ve atışı durdur
+                self.laser_controller.stop()
+                self.motor_controller.stop()
+        
+        except Exception as e:
+            self.logger.error(f"Güvenlik önlemi alınamadı: {str(e)}")
+        
+        if previous and not violations:
+            self.logger.info("Sistem güvenli duruma döndü")
+    
+    def _fan_off(self):
+        """
+        Soğutma süresi dolduğunda fanları kapatır (zamanlayıcı iş parçacığında çalışır).
+        """
+        self.fan_off_event = None
+        if "temperature" in self.state["violations"]:
+            return
+        
+        self.arduino.send_command({"type": "fan", "state": False})
+        self.logger.info("Soğutma tamamlandı, fanlar kapatıldı")
     
     def is_system_safe(self) -> bool:
         """
-        Sistemin güvenli durumda olup olmadığını döndürür.
+        Sistemin güvenli durumda olup olmadığını döndürür (kilitsiz).
         
         Returns:
             bool: Sistem güvenliyse True
         """
         if self.test_mode:
             return True
-            
-        with self.lock:
-            return self.is_system_safe_flag
+        
+        return self.state["safe"]
     
     def get_status(self) -> Dict[str, Any]:
         """
@@ -167,19 +248,28 @@ class SafetyMonitor:
         Returns:
             Dict[str, Any]: Durum bilgisi
         """
-        with self.lock:
-            return self.status.copy()
+        return dict(self.state["status"])
     
     def shutdown(self):
         """
         Güvenlik izlemeyi durdurur ve kaynakları serbest bırakır.
         """
         self.running = False
+        self.stop_event.set()
+        
+        if not self.test_mode:
+            self.arduino.remove_status_listener(self._on_status)
+        
+        scheduler.cancel(self.fan_off_event)
+        self.fan_off_event = None
         
         if self.monitoring_thread and self.monitoring_thread.is_alive():
             self.monitoring_thread.join(timeout=2.0)
-            
-        # Güvenlik önlemi olarak lazeri kapat
+        
+        # Güvenlik önlemi olarak lazeri kapat; kendi oluşturduğu motor kontrolcüsünün
+        # hedef noktası göndericisini sonlandır
         self.laser_controller.stop()
+        if self.owns_motor_controller:
+            self.motor_controller.close()
         
-        self.logger.info("Güvenlik izleme durduruldu") 
\ No newline at end of file
+        self.logger.info("Güvenlik izleme durduruldu")
@@ -0,0 +1,189 @@
+"""
+Zamanlanmış eylemler için tek iş parçacıklı zamanlayıcı modülü.
+
+Lazerin kapatılması, fanın durdurulması, ateş sonrası bekleme süresinin
+bitmesi gibi zamanlı eylemler her biri için ayrı iş parçacığı (threading.Timer)
+açmak veya ana döngüde beklemek yerine tek bir zamanlayıcıya bırakılır.
+Eylemler son tarihlerine göre bir yığında (heap) tutulur; iş parçacığı en yakın
+son tarihe kadar uyur. İptal edilen eylemler yığından hemen silinmez, sırası
+geldiğinde atlanır.
+
+Eylemler zamanlayıcı iş parçacığında çalışır; kısa sürmeli ve yanıt beklememelidir.
+"""
+
+import time
+import heapq
+import logging
+import itertools
+import threading
+from typing import Callable, Any, Optional
+
+
+class ScheduledEvent:
+    """
+    Zamanlanmış tek bir eylem.
+    """
+
+    def __init__(self, deadline: float, callback: Callable[..., Any], args: tuple):
+        """
+        ScheduledEvent sınıfını başlatır.
+
+        Args:
+            deadline: Çalışma zamanı (time.monotonic)
+            callback: Çağrılacak fonksiyon
+            args: Fonksiyon argümanları
+        """
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        """
+        Eylemi iptal eder (çalışmışsa etkisizdir).
+        """
+        self.cancelled = True
+
+    def remaining(self) -> float:
+        """
+        Çalışmasına kalan süreyi döndürür (saniye, geçmişse 0).
+        """
+        return max(0.0, self.deadline - time.monotonic())
+
+
+class Scheduler:
+    """
+    Son tarih yığını ile çalışan tek iş parçacıklı zamanlayıcı.
+    """
+
+    def __init__(self, name: str = "Scheduler"):
+        """
+        Scheduler sınıfını başlatır. İş parçacığı ilk eylem zamanlandığında başlar.
+
+        Args:
+            name: İş parçacığı adı
+        """
+        self.name = name
+
+        # (son tarih, sıra, eylem) yığını; sıra aynı son tarihli eylemleri ekleme sırasında tutar
+        self.events = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+
+        # İstatistikler
+        self.events_run = 0
+
+        # Logger
+        self.logger = logging.getLogger("Scheduler")
+
+    def schedule(self, delay: float, callback: Callable[..., Any], *args) -> ScheduledEvent:
+        """
+        Eylemi delay saniye sonra çalışacak şekilde zamanlar.
+
+        Args:
+            delay: Gecikme (saniye)
+            callback: Çağrılacak fonksiyon
+            *args: Fonksiyon argümanları
+
+        Returns:
+            ScheduledEvent: İptal için eylem nesnesi
+        """
+        return self.schedule_at(time.monotonic() + max(0.0, delay), callback, *args)
+
+    def schedule_at(self, deadline: float, callback: Callable[..., Any], *args) -> ScheduledEvent:
+        """
+        Eylemi verilen zamanda (time.monotonic) çalışacak şekilde zamanlar.
+
+        Args:
+            deadline: Çalışma zamanı (time.monotonic)
+            callback: Çağrılacak fonksiyon
+            *args: Fonksiyon argümanları
+
+        Returns:
+            ScheduledEvent: İptal için eylem nesnesi
+        """
+        event = ScheduledEvent(deadline, callback, args)
+
+        with self.condition:
+            heapq.heappush(self.events, (deadline, next(self.sequence), event))
+
+            if self.thread is None or not self.thread.is_alive():
+                self.running = True
+                self.thread = threading.Thread(target=self._run, name=self.name)
+                self.thread.daemon = True
+                self.thread.start()
+
+            # Yeni eylem en yakın son tarihse uyuyan iş parçacığını uyandır
+            if self.events[0][2] is event:
+                self.condition.notify()
+
+        return event
+
+    def cancel(self, event: Optional[ScheduledEvent]):
+        """
+        Eylemi iptal eder (None ise bir şey yapmaz).
+
+        Args:
+            event: schedule() ile dönen eylem
+        """
+        if event is not None:
+            event.cancel()
+
+    def pending(self) -> int:
+        """
+        Bekleyen (iptal edilmemiş) eylem sayısını döndürür.
+        """
+        with self.condition:
+            return sum(1 for _, _, event in self.events if not event.cancelled)
+
+    def _run(self):
+        """
+        Son tarihi gelen eylemleri çalıştıran döngü (arka plan iş parçacığı).
+        """
+        while True:
+            with self.condition:
+                while self.running:
+                    # İptal edilmiş eylemleri at
+                    while self.events and self.events[0][2].cancelled:
+                        heapq.heappop(self.events)
+
+                    if self.events:
+                        wait = self.events[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                    else:
+                        wait = None
+                    self.condition.wait(wait)
+
+                if not self.running:
+                    return
+                _, _, event = heapq.heappop(self.events)
+
+            # Eylem kilit dışında çalışır; eylem içinden yeni eylem zamanlanabilir
+            try:
+                event.callback(*event.args)
+            except Exception as e:
+                self.logger.error(f"Zamanlanmış eylem hatası: {str(e)}")
+            self.events_run += 1
+
+    def shutdown(self, timeout: float = 1.0):
+        """
+        Zamanlayıcıyı durdurur; bekleyen eylemler çalıştırılmadan atılır.
+
+        Args:
+            timeout: İş parçacığını bekleme süresi (saniye)
+        """
+        with self.condition:
+            self.running = False
+            self.events.clear()
+            self.condition.notify()
+
+        if self.thread and self.thread.is_alive() and threading.current_thread() is not self.thread:
+            self.thread.join(timeout=timeout)
+        self.thread = None
+
+
+# Süreç genelinde paylaşılan zamanlayıcı
+scheduler = Scheduler()
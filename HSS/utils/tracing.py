@@ -0,0 +1,262 @@
+"""
+Kare yakalamadan motor komutuna kadar uçtan uca gecikme izleme modülü.
+
+Her kare için bir iz (trace) kaydı tutulur. İz numarası kameranın kare sıra
+numarasıdır; sıra numarası sağlamayan kameralar için negatif yapay numaralar
+kullanılır. Aşama zaman damgaları önceden ayrılmış bir halka tampona kilitsiz
+yazılır: her iz kendi satırına, her aşama kendi hücresine yazdığından
+iş parçacıkları birbirini beklemez. Halka dolduğunda en eski izlerin üzerine
+yazılır.
+
+Aşamalar (sırasıyla):
+    capture     Kamera karesi yakalandı (Camera zaman damgası)
+    detect      Nesne tespiti tamamlandı
+    classify    Renk sınıflandırması tamamlandı
+    prioritize  Hedef seçimi/önceliklendirme tamamlandı
+    decision    Mod motor hedefini belirledi
+    command     Motor komutu seri porta yazıldı
+
+Kayıtlar Chrome trace JSON (chrome://tracing, Perfetto) veya CSV olarak dışa aktarılabilir.
+"""
+
+import csv
+import json
+import time
+import itertools
+import logging
+import numpy as np
+from typing import Dict, Any, Optional, Tuple
+
+from config import TRACING_ENABLED, TRACE_RING_SIZE
+
+STAGES = ("capture", "detect", "classify", "prioritize", "decision", "command")
+
+# Boş satır işareti
+_NO_TRACE = np.iinfo(np.int64).min
+
+
+class LatencyTracer:
+    """
+    Kare başına aşama zaman damgalarını tutan halka tamponlu izleyici.
+    """
+
+    def __init__(self, capacity: int = TRACE_RING_SIZE, enabled: bool = TRACING_ENABLED):
+        """
+        LatencyTracer sınıfını başlatır.
+
+        Args:
+            capacity: Halka tampondaki iz sayısı
+            enabled: False ise kayıt yapılmaz
+        """
+        self.capacity = capacity
+        self.enabled = enabled
+        self.stage_index = {stage: i for i, stage in enumerate(STAGES)}
+
+        # Satır başına iz numarası ve aşama zaman damgaları (time.time, saniye)
+        self.trace_ids = np.full(capacity, _NO_TRACE, dtype=np.int64)
+        self.times = np.full((capacity, len(STAGES)), np.nan, dtype=np.float64)
+
+        # Sıra numarası olmayan kameralar için yapay iz numaraları
+        self.synthetic_ids = itertools.count(-1, -1)
+
+        # Logger
+        self.logger = logging.getLogger("LatencyTracer")
+
+    def begin(self, trace_id: Optional[int] = None, timestamp: Optional[float] = None) -> Optional[int]:
+        """
+        Yeni bir iz başlatır ve yakalama zamanını kaydeder.
+
+        Args:
+            trace_id: Kare sıra numarası (None ise yapay numara atanır)
+            timestamp: Karenin yakalanma zamanı (None ise şimdiki zaman)
+
+        Returns:
+            Optional[int]: İz numarası (izleme kapalıysa None)
+        """
+        if not self.enabled:
+            return None
+
+        if trace_id is None:
+            trace_id = next(self.synthetic_ids)
+
+        slot = trace_id % self.capacity
+        # Önce numarayı geçersiz kıl: eski izin geç gelen aşamaları yeni satıra yazılmasın
+        self.trace_ids[slot] = _NO_TRACE
+        self.times[slot] = np.nan
+        self.times[slot, 0] = time.time() if timestamp is None else timestamp
+        self.trace_ids[slot] = trace_id
+        return trace_id
+
+    def begin_for_camera(self, camera) -> Optional[int]:
+        """
+        Kameranın son karesinin iz numarasını döndürür. Kare sıra numarası
+        sağlamayan kameralar için son yakalama zamanıyla yeni bir iz başlatılır.
+
+        Args:
+            camera: Camera veya benzeri kamera nesnesi
+
+        Returns:
+            Optional[int]: İz numarası (izleme kapalıysa None)
+        """
+        if not self.enabled:
+            return None
+
+        get_sequence = getattr(camera, "get_latest_sequence", None)
+        seq = get_sequence() if get_sequence is not None else 0
+        if seq:
+            # İz kamera tarafından başlatılmıştır
+            return seq
+        return self.begin(None, getattr(camera, "last_timestamp", None))
+
+    def mark(self, trace_id: Optional[int], stage: str, timestamp: Optional[float] = None):
+        """
+        İzin bir aşamasının tamamlandığını kaydeder. Bilinmeyen veya üzerine
+        yazılmış izler yok sayılır.
+
+        Args:
+            trace_id: İz numarası
+            stage: Aşama adı (STAGES)
+            timestamp: Aşama zamanı (None ise şimdiki zaman)
+        """
+        if trace_id is None or not self.enabled:
+            return
+
+        slot = trace_id % self.capacity
+        if self.trace_ids[slot] == trace_id:
+            self.times[slot, self.stage_index[stage]] = time.time() if timestamp is None else timestamp
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Geçerli izlerin kopyasını yakalama zamanına göre sıralı döndürür.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: (iz numaraları, aşama zamanları [iz, aşama])
+        """
+        ids = self.trace_ids.copy()
+        times = self.times.copy()
+
+        valid = (ids != _NO_TRACE) & ~np.isnan(times[:, 0])
+        ids, times = ids[valid], times[valid]
+        order = np.argsort(times[:, 0], kind="stable")
+        return ids[order], times[order]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Aşama başına ve uçtan uca gecikme yüzdeliklerini hesaplar.
+
+        Aşama süresi, o aşamanın zamanından kendinden önce kaydedilmiş en son
+        aşamanın zamanı çıkarılarak bulunur. Uçtan uca süre, yakalamadan izin
+        kaydedilmiş son aşamasına kadardır.
+
+        Returns:
+            Dict[str, Any]: İz sayısı, aşama başına ve uçtan uca p50/p99 (ms)
+        """
+        _, times = self.snapshot()
+        stats = {"traces": len(times), "stages": {}, "end_to_end": None}
+        if not len(times):
+            return stats
+
+        previous = times[:, 0].copy()
+        for i, stage in enumerate(STAGES[1:], start=1):
+            column = times[:, i]
+            recorded = ~np.isnan(column)
+            if recorded.any():
+                stats["stages"][stage] = self._percentiles(1000 * (column[recorded] - previous[recorded]))
+            previous = np.where(recorded, column, previous)
+
+        end_to_end = 1000 * (previous - times[:, 0])
+        completed = previous > times[:, 0]
+        if completed.any():
+            stats["end_to_end"] = self._percentiles(end_to_end[completed])
+
+        return stats
+
+    def get_latency_summary(self) -> Optional[Tuple[float, float]]:
+        """
+        Arayüzler için uçtan uca gecikme özetini döndürür.
+
+        Returns:
+            Optional[Tuple[float, float]]: (p50 ms, p99 ms) - tamamlanmış iz yoksa None
+        """
+        end_to_end = self.get_stats()["end_to_end"]
+        if end_to_end is None:
+            return None
+        return end_to_end["p50_ms"], end_to_end["p99_ms"]
+
+    @staticmethod
+    def _percentiles(samples_ms: np.ndarray) -> Dict[str, float]:
+        p50, p99 = np.percentile(samples_ms, [50, 99])
+        return {"p50_ms": round(float(p50), 2), "p99_ms": round(float(p99), 2), "count": int(len(samples_ms))}
+
+    def export_chrome_trace(self, path: str) -> int:
+        """
+        İzleri Chrome trace JSON biçiminde (chrome://tracing, Perfetto) dışa aktarır.
+        Her kare ayrı bir asenkron iz, her aşama önceki aşamadan başlayan bir dilimdir.
+
+        Args:
+            path: Çıktı dosyası
+
+        Returns:
+            int: Aktarılan iz sayısı
+        """
+        ids, times = self.snapshot()
+        events = []
+
+        for trace_id, row in zip(ids.tolist(), times):
+            previous = row[0]
+            for i, stage in enumerate(STAGES[1:], start=1):
+                if np.isnan(row[i]):
+                    continue
+                common = {"name": stage, "cat": "frame", "id": trace_id, "pid": 1, "tid": 1}
+                events.append(dict(common, ph="b", ts=previous * 1e6, args={"trace_id": trace_id}))
+                events.append(dict(common, ph="e", ts=row[i] * 1e6))
+                previous = row[i]
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+        self.logger.info(f"{len(ids)} iz Chrome trace olarak kaydedildi: {path}")
+        return len(ids)
+
+    def export_csv(self, path: str) -> int:
+        """
+        İzleri CSV olarak dışa aktarır: iz numarası, aşama zaman damgaları ve
+        yakalamaya göre aşama gecikmeleri (ms).
+
+        Args:
+            path: Çıktı dosyası
+
+        Returns:
+            int: Aktarılan iz sayısı
+        """
+        ids, times = self.snapshot()
+
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["trace_id"] + list(STAGES) + [f"{stage}_ms" for stage in STAGES[1:]])
+            for trace_id, row in zip(ids.tolist(), times):
+                stamps = ["" if np.isnan(t) else f"{t:.6f}" for t in row]
+                offsets = ["" if np.isnan(t) else f"{1000 * (t - row[0]):.3f}" for t in row[1:]]
+                writer.writerow([trace_id] + stamps + offsets)
+
+        self.logger.info(f"{len(ids)} iz CSV olarak kaydedildi: {path}")
+        return len(ids)
+
+    def export(self, path: str) -> int:
+        """
+        Uzantıya göre CSV (.csv) veya Chrome trace JSON olarak dışa aktarır.
+        """
+        if path.lower().endswith(".csv"):
+            return self.export_csv(path)
+        return self.export_chrome_trace(path)
+
+    def clear(self):
+        """
+        Tüm izleri siler.
+        """
+        self.trace_ids[:] = _NO_TRACE
+        self.times[:] = np.nan
+
+
+# Süreç genelinde paylaşılan izleyici
+tracer = LatencyTracer()
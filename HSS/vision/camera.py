@@ -7,14 +7,21 @@ import time
 import logging
 import threading
 import numpy as np
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Dict, Any
+
+from vision.frame_buffer import FrameRingBuffer
+from utils.tracing import tracer
 
 class Camera:
     """
     Kamera yönetimi ve görüntü yakalama sınıfı.
     """
     
-    def __init__(self, camera_id: int, width: int = 640, height: int = 480, fps: int = 30):
+    # Kopyalama sırasında yuvanın üzerine yazılırsa en yeni kareyi tekrar deneme sayısı
+    COPY_RETRIES = 3
+    
+    def __init__(self, camera_id: int, width: int = 640, height: int = 480, fps: int = 30,
+                 buffer_slots: int = 4, shared_memory: bool = False):
         """
         Camera sınıfını başlatır.
         
@@ -23,6 +30,8 @@ class Camera:
             width: Görüntü genişliği
             height: Görüntü yüksekliği
             fps: Saniyedeki kare sayısı
+            buffer_slots: Kare halka tamponundaki yuva sayısı
+            shared_memory: True ise kareler paylaşımlı bellekte tutulur (ayrı işlemler için)
         """
         self.camera_id = camera_id
         self.width = width
@@ -31,20 +40,51 @@ class Camera:
         
         self.camera = None
         self.running = False
+        self.capture_thread = None
         
         # Test modu (-1 ID ise test modu aktif)
         self.test_mode = (camera_id == -1)
         
-        # Son kare ve zaman damgası
-        self.last_frame = None
+        # Kare halka tamponu (ilk karenin boyutuna göre oluşturulur)
+        self.buffer_slots = buffer_slots
+        self.shared_memory = shared_memory
+        self.frame_buffer = None
+        
+        # Son karenin zaman damgası
         self.last_timestamp = 0.0
         
-        # İş parçacığı kilidi
-        self.lock = threading.Lock()
+        # Bu süreden eski kareler için uyarı verilir (None ise kontrol edilmez)
+        self.stale_frame_timeout = None if self.test_mode else 1.0
         
         # Logger
         self.logger = logging.getLogger("Camera")
     
+    @property
+    def last_frame(self) -> Optional[np.ndarray]:
+        """
+        Son karenin salt okunur görünümü (geriye dönük uyumluluk için).
+        """
+        if self.frame_buffer is None:
+            return None
+        return self.frame_buffer.latest()[2]
+    
+    def _ensure_buffer(self, shape: Tuple[int, ...]) -> FrameRingBuffer:
+        """
+        Kare boyutuna uygun halka tamponunu döndürür, gerekirse oluşturur.
+        
+        Args:
+            shape: Kare boyutu
+            
+        Returns:
+            FrameRingBuffer: Halka tampon
+        """
+        if self.frame_buffer is None or self.frame_buffer.shape != tuple(shape):
+            if self.frame_buffer is not None:
+                self.logger.warning(f"Kare boyutu değişti: {self.frame_buffer.shape} -> {shape}")
+                self.frame_buffer.close()
+            self.frame_buffer = FrameRingBuffer(shape, self.buffer_slots, shared=self.shared_memory)
+        return self.frame_buffer
+    
     def initialize(self) -> bool:
         """
         Kamera bağlantısını başlatır.
@@ -58,10 +98,13 @@ class Camera:
             self.running = True
             
             # Test görüntüsü oluştur
-            self.last_frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-            cv2.putText(self.last_frame, "TEST MODU", (50, self.height//2), 
+            frame_buffer = self._ensure_buffer((self.height, self.width, 3))
+            test_frame = frame_buffer.begin_write()
+            test_frame[:] = 0
+            cv2.putText(test_frame, "TEST MODU", (50, self.height//2), 
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
             self.last_timestamp = time.time()
+            frame_buffer.commit_write(self.last_timestamp)
             
             # Test modu için ayrı bir thread başlat
             self.capture_thread = threading.Thread(target=self._test_mode_loop)
@@ -102,23 +145,24 @@ class Camera:
         """
         while self.running:
             try:
-                with self.lock:
-                    # Hareketli test görüntüsü oluştur
-                    self.last_frame = np.zeros((self.height, self.width, 3), dtype=np.uint8)
-                    
-                    # Zaman damgası (saat:dakika:saniye)
-                    time_str = time.strftime("%H:%M:%S")
-                    cv2.putText(self.last_frame, f"TEST MODU - {time_str}", 
-                               (50, self.height//2), cv2.FONT_HERSHEY_SIMPLEX, 
-                               1, (0, 255, 0), 2)
-                    
-                    # Hareketli daire çiz
-                    t = time.time()
-                    x = int(self.width/2 + 100 * np.cos(t))
-                    y = int(self.height/2 + 100 * np.sin(t))
-                    cv2.circle(self.last_frame, (x, y), 20, (0, 0, 255), -1)
-                    
-                    self.last_timestamp = time.time()
+                # Hareketli test görüntüsünü doğrudan tampon yuvasına çiz
+                test_frame = self.frame_buffer.begin_write()
+                test_frame[:] = 0
+                
+                # Zaman damgası (saat:dakika:saniye)
+                time_str = time.strftime("%H:%M:%S")
+                cv2.putText(test_frame, f"TEST MODU - {time_str}", 
+                           (50, self.height//2), cv2.FONT_HERSHEY_SIMPLEX, 
+                           1, (0, 255, 0), 2)
+                
+                # Hareketli daire çiz
+                t = time.time()
+                x = int(self.width/2 + 100 * np.cos(t))
+                y = int(self.height/2 + 100 * np.sin(t))
+                cv2.circle(test_frame, (x, y), 20, (0, 0, 255), -1)
+                
+                self.last_timestamp = time.time()
+                tracer.begin(self.frame_buffer.commit_write(self.last_timestamp), self.last_timestamp)
                     
                 time.sleep(0.033)  # ~30 FPS
                     
@@ -132,12 +176,22 @@ class Camera:
         """
         while self.running and self.camera:
             try:
-                ret, frame = self.camera.read()
+                # Kareyi doğrudan bir sonraki tampon yuvasına oku (kopyasız)
+                slot = self.frame_buffer.begin_write() if self.frame_buffer is not None else None
+                ret, frame = self.camera.read(slot) if slot is not None else self.camera.read()
                 
                 if ret and frame is not None:
-                    with self.lock:
-                        self.last_frame = frame.copy()
-                        self.last_timestamp = time.time()
+                    timestamp = time.time()
+                    
+                    if slot is not None and np.shares_memory(frame, slot):
+                        seq = self.frame_buffer.commit_write(timestamp)
+                    else:
+                        # İlk kare veya boyut değişimi: tamponu oluştur ve kareyi kopyala
+                        seq = self._ensure_buffer(frame.shape).write(frame, timestamp)
+                    
+                    self.last_timestamp = timestamp
+                    # Gecikme izi: kare sıra numarası iz numarası olarak kullanılır
+                    tracer.begin(seq, timestamp)
                 else:
                     self.logger.warning("Kameradan kare yakalanamadı")
                     time.sleep(0.1)  # Hata durumunda çok fazla CPU kullanmamak için bekle
@@ -146,25 +200,91 @@ class Camera:
                 self.logger.error(f"Kare yakalama hatası: {str(e)}")
                 time.sleep(0.1)
     
-    def get_frame(self) -> Tuple[bool, Optional[np.ndarray]]:
+    def get_frame(self, copy: bool = True) -> Tuple[bool, Optional[np.ndarray]]:
         """
         Son yakalanan kareyi döndürür.
         
+        Args:
+            copy: False ise kopya yerine halka tampondaki salt okunur görünüm döndürülür.
+                  Görünüm yaklaşık (yuva sayısı - 1) kare boyunca geçerlidir.
+        
         Returns:
             Tuple[bool, Optional[np.ndarray]]: (başarı, kare)
         """
-        with self.lock:
-            if self.last_frame is None:
+        if self.frame_buffer is None:
+            return False, None
+        
+        for _ in range(self.COPY_RETRIES):
+            seq, timestamp, frame = self.frame_buffer.latest()
+            if frame is None:
                 return False, None
-                
-            frame = self.last_frame.copy()
+            
             current_time = time.time()
             
             # Kareler çok eski ise uyarı ver (test modunda kontrolü atla)
-            if not self.test_mode and current_time - self.last_timestamp > 1.0:  # 1 saniyeden eski
+            if self.stale_frame_timeout is not None and current_time - timestamp > self.stale_frame_timeout:
                 self.logger.warning("Eski kare kullanılıyor")
-                
-            return True, frame
+            
+            if not copy:
+                return True, frame
+            
+            # Kopyalama sırasında yuvanın üzerine yazıldıysa en yeni kareyi tekrar al
+            frame = frame.copy()
+            if self.frame_buffer.is_valid(seq):
+                return True, frame
+        
+        self.logger.warning("Kare kopyalanırken sürekli üzerine yazıldı, kare atlandı")
+        return False, None
+    
+    def get_frame_view(self) -> Tuple[bool, int, Optional[np.ndarray]]:
+        """
+        Son karenin salt okunur görünümünü sıra numarasıyla birlikte döndürür (kopyasız).
+        
+        Returns:
+            Tuple[bool, int, Optional[np.ndarray]]: (başarı, sıra numarası, görünüm)
+        """
+        if self.frame_buffer is None:
+            return False, 0, None
+            
+        seq, _, frame = self.frame_buffer.latest()
+        return frame is not None, seq, frame
+    
+    def get_frame_by_sequence(self, seq: int) -> Optional[np.ndarray]:
+        """
+        Sıra numarasına ait karenin salt okunur görünümünü döndürür.
+        
+        Args:
+            seq: Kare sıra numarası
+            
+        Returns:
+            Optional[np.ndarray]: Görünüm veya kare artık tamponda değilse None
+        """
+        if self.frame_buffer is None:
+            return None
+        return self.frame_buffer.get(seq)[0]
+    
+    def get_latest_sequence(self) -> int:
+        """
+        Son yakalanan karenin sıra numarasını döndürür (henüz kare yoksa 0).
+        
+        Returns:
+            int: Sıra numarası
+        """
+        if self.frame_buffer is None:
+            return 0
+        return self.frame_buffer.latest_sequence()
+    
+    def get_buffer_spec(self) -> Optional[Dict[str, Any]]:
+        """
+        Paylaşımlı bellekteki kare tamponunun tanımını döndürür.
+        Ayrı bir işlem FrameRingBuffer.attach() ile bu tampona bağlanabilir.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Tampon tanımı veya paylaşımlı bellek kullanılmıyorsa None
+        """
+        if self.frame_buffer is None or not self.shared_memory:
+            return None
+        return self.frame_buffer.spec()
     
     def is_working(self) -> bool:
         """
@@ -182,10 +302,10 @@ class Camera:
             return False
             
         current_time = time.time()
-        with self.lock:
-            # Son 3 saniye içinde kare almadıysak, kamera çalışmıyor sayılır
-            if current_time - self.last_timestamp > 3.0:
-                return False
+        
+        # Son 3 saniye içinde kare almadıysak, kamera çalışmıyor sayılır
+        if current_time - self.last_timestamp > 3.0:
+            return False
                 
         return True
     
@@ -201,6 +321,11 @@ class Camera:
         if self.camera and not self.test_mode:
             self.camera.release()
             self.camera = None
+        
+        # Paylaşımlı bellek kullanılıyorsa serbest bırak
+        if self.frame_buffer is not None and self.shared_memory:
+            self.frame_buffer.close()
+            self.frame_buffer = None
             
         self.logger.info("Kamera kapatıldı")
         
@@ -0,0 +1,189 @@
+"""
+Önceden hesaplanmış BGR -> renk sınıfı arama tablosu (LUT) ile renk sınıflandırma modülü.
+Tablo config.py içindeki TARGET_COLORS HSV aralıklarından bir kez oluşturulur;
+sınıflandırma sırasında HSV dönüşümü yapılmaz.
+"""
+
+import cv2
+import logging
+import numpy as np
+from typing import List, Dict, Tuple, Optional, Sequence
+
+from config import TARGET_COLORS, ENEMY_COLORS, COLOR_LUT_BITS, COLOR_MIN_PIXEL_RATIO, COLOR_MAX_SAMPLES
+
+
+class ColorClassifier:
+    """
+    3B BGR arama tablosu ile piksel ve bölge renk sınıflandırıcısı.
+
+    Her kanal COLOR_LUT_BITS bite nicemlenir (varsayılan 5 bit -> 32³ hücre).
+    Hücre merkezinin HSV değeri TARGET_COLORS aralıklarından birine düşüyorsa
+    hücre o renk etiketini alır; 0 etiketi "unknown" anlamına gelir.
+    """
+
+    def __init__(self, target_colors: Optional[Dict] = None, enemy_colors: Sequence[str] = ENEMY_COLORS,
+                 bits: int = COLOR_LUT_BITS, min_pixel_ratio: float = COLOR_MIN_PIXEL_RATIO,
+                 max_samples: int = COLOR_MAX_SAMPLES):
+        """
+        ColorClassifier sınıfını başlatır.
+
+        Args:
+            target_colors: Renk adı -> HSV aralığı veya aralık listesi (None ise TARGET_COLORS)
+            enemy_colors: Düşman kabul edilen renk adları
+            bits: Kanal başına nicemleme biti
+            min_pixel_ratio: Bir rengin seçilmesi için bölgedeki minimum piksel oranı
+            max_samples: Bölge başına incelenecek maksimum piksel sayısı
+        """
+        self.target_colors = target_colors if target_colors is not None else TARGET_COLORS
+        self.enemy_colors = {name.lower() for name in enemy_colors}
+        self.bits = bits
+        self.shift = 8 - bits
+        self.min_pixel_ratio = min_pixel_ratio
+        self.max_samples = max_samples
+
+        # Etiket 0: bilinmeyen renk
+        self.labels = ["unknown"] + [name.lower() for name in self.target_colors]
+
+        # Logger
+        self.logger = logging.getLogger("ColorClassifier")
+
+        self.lut = self._build_lut()
+
+    @staticmethod
+    def _ranges_of(value) -> List[Tuple[Tuple[int, int, int], Tuple[int, int, int]]]:
+        """
+        Tek aralık (alt, üst) veya aralık listesi biçimindeki değeri listeye çevirir.
+        """
+        if len(value) == 2 and np.isscalar(value[0][0]):
+            return [tuple(value)]
+        return [tuple(r) for r in value]
+
+    def _build_lut(self) -> np.ndarray:
+        """
+        Nicemlenmiş BGR hücrelerinden renk etiketlerine arama tablosunu oluşturur.
+
+        Returns:
+            np.ndarray: (2^(3*bits),) boyutlu uint8 etiket tablosu
+        """
+        levels = 1 << self.bits
+        centers = (np.arange(levels, dtype=np.uint16) << self.shift) + (1 << self.shift) // 2
+        b, g, r = np.meshgrid(centers, centers, centers, indexing="ij")
+        bgr = np.stack((b, g, r), axis=-1).reshape(-1, 1, 3).astype(np.uint8)
+        hsv = cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV).reshape(-1, 3)
+
+        lut = np.zeros(len(hsv), dtype=np.uint8)
+        for label, name in enumerate(self.target_colors, start=1):
+            for lower, upper in self._ranges_of(self.target_colors[name]):
+                mask = np.all((hsv >= np.array(lower)) & (hsv <= np.array(upper)), axis=1)
+                lut[mask & (lut == 0)] = label
+
+        self.logger.debug(f"Renk tablosu oluşturuldu: {levels}³ hücre, "
+                          f"{np.count_nonzero(lut)} renkli hücre")
+        return lut
+
+    def label_image(self, image: np.ndarray) -> np.ndarray:
+        """
+        Görüntüdeki her piksel için renk etiketini döndürür.
+
+        Args:
+            image: BGR görüntü veya bölge
+
+        Returns:
+            np.ndarray: Görüntüyle aynı yükseklik/genişlikte uint8 etiket görüntüsü
+        """
+        q = image >> self.shift
+        index = ((q[..., 0].astype(np.int32) << (2 * self.bits)) |
+                 (q[..., 1].astype(np.int32) << self.bits) |
+                 q[..., 2])
+        return self.lut[index]
+
+    def dominant_label(self, labels: np.ndarray) -> int:
+        """
+        Etiket görüntüsündeki baskın renk etiketini döndürür.
+
+        Args:
+            labels: Etiket görüntüsü veya dizisi
+
+        Returns:
+            int: Etiket numarası (yeterli renkli piksel yoksa 0)
+        """
+        if labels.size == 0:
+            return 0
+
+        counts = np.bincount(labels.ravel(), minlength=len(self.labels))
+        best = int(np.argmax(counts[1:])) + 1
+        if counts[best] < self.min_pixel_ratio * labels.size:
+            return 0
+        return best
+
+    def classify_labels(self, labels: np.ndarray) -> str:
+        """
+        Etiket görüntüsünden baskın rengi seçer.
+
+        Args:
+            labels: Etiket görüntüsü veya dizisi
+
+        Returns:
+            str: Renk adı (küçük harf) veya "unknown"
+        """
+        return self.labels[self.dominant_label(labels)]
+
+    def classify_roi(self, roi: np.ndarray) -> str:
+        """
+        Bölgenin baskın rengini sınıflandırır.
+        Büyük bölgeler sabit maliyet için seyreltilerek örneklenir.
+
+        Args:
+            roi: BGR bölge
+
+        Returns:
+            str: Renk adı (küçük harf) veya "unknown"
+        """
+        if roi.size == 0:
+            return "unknown"
+
+        step = self.sample_step(roi)
+        return self.classify_labels(self.label_image(roi[::step, ::step]))
+
+    def sample_step(self, roi: np.ndarray) -> int:
+        """
+        Bölgedeki örneklenen piksel sayısını max_samples ile sınırlayan adımı döndürür.
+        """
+        pixels = roi.shape[0] * roi.shape[1]
+        if pixels <= self.max_samples:
+            return 1
+        return int(np.ceil(np.sqrt(pixels / self.max_samples)))
+
+    def classify_boxes(self, frame: np.ndarray, boxes: List[Tuple[int, int, int, int]],
+                       labels: Optional[np.ndarray] = None) -> List[str]:
+        """
+        Birden fazla kutunun rengini sınıflandırır.
+
+        Args:
+            frame: BGR görüntü
+            boxes: (x, y, w, h) kutuları (görüntü sınırlarına kırpılır)
+            labels: Önceden hesaplanmış tam kare etiket görüntüsü (varsa bölgeler buradan okunur)
+
+        Returns:
+            List[str]: Her kutu için renk adı
+        """
+        height, width = frame.shape[:2]
+        colors = []
+
+        for x, y, w, h in boxes:
+            x1, y1 = max(0, int(x)), max(0, int(y))
+            x2, y2 = min(width, int(x + w)), min(height, int(y + h))
+            if x2 <= x1 or y2 <= y1:
+                colors.append("unknown")
+            elif labels is not None:
+                colors.append(self.classify_labels(labels[y1:y2, x1:x2]))
+            else:
+                colors.append(self.classify_roi(frame[y1:y2, x1:x2]))
+
+        return colors
+
+    def is_enemy(self, color: str) -> bool:
+        """
+        Rengin düşman rengi olup olmadığını döndürür.
+        """
+        return color in self.enemy_colors
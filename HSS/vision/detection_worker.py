@@ -0,0 +1,311 @@
+"""
+Nesne tespitini arayüz ve mod döngüsünden ayıran arka plan iş parçacığı modülü.
+Kameradan en yeni kareyi alır, eski kareleri atlar ve zaman damgalı tespit
+sonuçlarını yayınlar.
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, List
+
+from utils.tracing import tracer
+from vision.detector_pool import STALE_RESULT
+from vision.tracker import TrackingDetector
+
+
+class DetectionWorker:
+    """
+    Tespiti ayrı bir iş parçacığında çalıştıran sınıf.
+
+    Modlar ve arayüzler get_latest_result() ile son sonucu beklemeden okur.
+    Dedektör bir DetectorPool ise kareler işlemlere ardışık olarak gönderilir
+    ve sonuçlar kare sırasıyla yayınlanır.
+    """
+
+    def __init__(self, camera, detector, idle_interval: float = 0.005):
+        """
+        DetectionWorker sınıfını başlatır.
+
+        Args:
+            camera: Kamera nesnesi
+            detector: YoloDetector nesnesi
+            idle_interval: Yeni kare yokken bekleme süresi (saniye)
+        """
+        self.camera = camera
+        self.detector = detector
+        self.idle_interval = idle_interval
+
+        self.running = False
+        self.worker_thread = None
+
+        # Son sonuç (tek referans ataması ile yayınlanır)
+        self.latest_result = None
+        self.result_seq = 0
+
+        # Son işlenen karenin sıra numarası ve zaman damgası
+        self.last_frame_seq = 0
+        self.last_frame_timestamp = None
+
+        # Kare kimliği vermeyen kameralar için bir sonraki okuma zamanı (time.monotonic)
+        self.next_untracked_read = 0.0
+
+        # İstatistikler
+        self.dropped_frames = 0
+        self.processed_frames = 0
+
+        # Yeni sonuç bildirimi
+        self.result_event = threading.Event()
+
+        # Logger
+        self.logger = logging.getLogger("DetectionWorker")
+
+    def start(self):
+        """
+        Tespit iş parçacığını başlatır.
+        """
+        if self.worker_thread and self.worker_thread.is_alive():
+            return
+
+        self.running = True
+        self.worker_thread = threading.Thread(target=self._worker_loop)
+        self.worker_thread.daemon = True
+        self.worker_thread.start()
+
+        self.logger.info("Tespit iş parçacığı başlatıldı")
+
+    def _next_frame(self):
+        """
+        Kameradan henüz işlenmemiş en yeni kareyi alır.
+
+        Returns:
+            Tuple[Optional[np.ndarray], int, float]: (kare, sıra numarası, zaman damgası) -
+            yeni kare yoksa (None, 0, 0.0)
+        """
+        # Halka tamponlu kamera: sıra numarasıyla kopyasız eriş
+        if hasattr(self.camera, "get_frame_view"):
+            ret, frame_seq, view = self.camera.get_frame_view()
+            if not ret or frame_seq == self.last_frame_seq:
+                return None, 0, 0.0
+
+            if self.last_frame_seq and frame_seq - self.last_frame_seq > 1:
+                self.dropped_frames += frame_seq - self.last_frame_seq - 1
+
+            # Sonuçla birlikte yayınlanacağı için kare bir kez kopyalanır
+            frame = view.copy()
+            if not self.camera.frame_buffer.is_valid(frame_seq):
+                return None, 0, 0.0
+
+            self.last_frame_seq = frame_seq
+            self.last_frame_timestamp = self.camera.frame_buffer.get(frame_seq)[1] or time.time()
+            return frame, frame_seq, self.last_frame_timestamp
+
+        frame_timestamp = getattr(self.camera, "last_timestamp", None)
+
+        # Zaman damgası değişmediyse yeni kare yok
+        if frame_timestamp is not None and frame_timestamp == self.last_frame_timestamp:
+            return None, 0, 0.0
+
+        # Kare kimliği yoksa her okuma yeni kare sayılır; kamera hızından sık okunmaz
+        if frame_timestamp is None:
+            now = time.monotonic()
+            if now < self.next_untracked_read:
+                return None, 0, 0.0
+            frame_interval = 1.0 / max(1, getattr(self.camera, "fps", 30))
+            self.next_untracked_read = max(self.next_untracked_read + frame_interval, now)
+
+        ret, frame = self.camera.get_frame()
+        if not ret or frame is None:
+            return None, 0, 0.0
+
+        if frame_timestamp is None:
+            frame_timestamp = time.time()
+        elif self.last_frame_timestamp is not None:
+            # Çıkarım sırasında gelen ve atlanan kareleri say
+            frame_interval = 1.0 / max(1, getattr(self.camera, "fps", 30))
+            skipped = int((frame_timestamp - self.last_frame_timestamp) / frame_interval) - 1
+            if skipped > 0:
+                self.dropped_frames += skipped
+
+        self.last_frame_timestamp = frame_timestamp
+        return frame, 0, frame_timestamp
+
+    def _publish(self, frame, frame_seq: int, frame_timestamp: float, start_time: float,
+                 detections: List[Dict[str, Any]]):
+        """
+        Tespitleri renk bazında sınıflandırır ve sonucu yayınlar.
+
+        Args:
+            frame: Tespitlerin ait olduğu kare
+            frame_seq: Kare sıra numarası
+            frame_timestamp: Karenin yakalanma zamanı
+            start_time: Tespitin başlama zamanı
+            detections: Tespitler
+        """
+        # Sıra numarası olmayan kameralarda iz burada başlatılır
+        trace_id = frame_seq if frame_seq else tracer.begin(None, frame_timestamp)
+        tracer.mark(trace_id, "detect")
+
+        detections = self.detector.classify_balloons(frame, detections)
+        detected_at = time.time()
+        tracer.mark(trace_id, "classify", detected_at)
+
+        # Sonucu yayınla
+        self.result_seq += 1
+        self.latest_result = {
+            "seq": self.result_seq,
+            "frame": frame,
+            "frame_seq": frame_seq,
+            "frame_timestamp": frame_timestamp,
+            "trace_id": trace_id,
+            "detected_at": detected_at,
+            "inference_time": detected_at - start_time,
+            "detections": detections
+        }
+        self.processed_frames += 1
+        self.result_event.set()
+
+    def _worker_loop(self):
+        """
+        En yeni kareyi alıp tespit yapan döngü (arka plan iş parçacığı).
+        """
+        if hasattr(self.detector, "submit"):
+            self._pipelined_loop()
+            return
+
+        while self.running:
+            try:
+                frame, frame_seq, frame_timestamp = self._next_frame()
+
+                if frame is None:
+                    time.sleep(self.idle_interval)
+                    continue
+
+                start_time = time.time()
+                if isinstance(self.detector, TrackingDetector):
+                    # İzler karelerin yakalanma zamanları farkıyla ileri taşınır
+                    detections = self.detector.detect(frame, frame_timestamp)
+                else:
+                    detections = self.detector.detect(frame)
+                self._publish(frame, frame_seq, frame_timestamp, start_time, detections)
+
+            except Exception as e:
+                self.logger.error(f"Tespit iş parçacığı hatası: {str(e)}")
+                time.sleep(0.1)
+
+    def _pipelined_loop(self):
+        """
+        Dedektör havuzu için ardışık hat döngüsü. Havuzdaki işlem sayısı kadar
+        kare aynı anda işlenir, sonuçlar gönderim sırasıyla yayınlanır.
+        """
+        pending = deque()
+
+        while self.running:
+            try:
+                # Boş işlem varsa yeni kareleri gönder
+                while len(pending) < self.detector.num_workers:
+                    frame, frame_seq, frame_timestamp = self._next_frame()
+                    if frame is None:
+                        break
+
+                    if isinstance(self.detector, TrackingDetector):
+                        # Takip katmanı tam kare taramalarını havuza iletir, kareyi iz kırpması için tutar
+                        ticket = self.detector.submit(frame, seq=frame_seq, timestamp=frame_timestamp)
+                    elif frame_seq and self.detector.uses_shared_frames:
+                        ticket = self.detector.submit(seq=frame_seq)
+                    else:
+                        ticket = self.detector.submit(frame)
+                    pending.append((ticket, frame, frame_seq, frame_timestamp, time.time()))
+
+                if not pending:
+                    time.sleep(self.idle_interval)
+                    continue
+
+                # En eski görevin sonucunu al (sıra korunur)
+                ticket, frame, frame_seq, frame_timestamp, start_time = pending[0]
+                detections = self.detector.collect(ticket, timeout=self.idle_interval)
+                if detections is None:
+                    # Sonuç çok gecikti: görevi bırak, hat tıkanmasın
+                    if time.time() - start_time > self.detector.result_timeout:
+                        self.logger.warning(f"Havuz sonucu {self.detector.result_timeout:.1f} saniyede "
+                                            f"gelmedi, kare atlandı (bilet {ticket})")
+                        self.detector.cancel(ticket)
+                        pending.popleft()
+                        self.dropped_frames += 1
+                    continue
+
+                pending.popleft()
+                if detections is STALE_RESULT:
+                    # Kare çıkarım sırasında tamponda üzerine yazıldı; sonuç atılır
+                    self.dropped_frames += 1
+                    continue
+
+                self._publish(frame, frame_seq, frame_timestamp, start_time, detections)
+
+            except Exception as e:
+                self.logger.error(f"Tespit iş parçacığı hatası: {str(e)}")
+                time.sleep(0.1)
+
+        # Durdurulurken bekleyen görevleri bırak
+        for ticket, *_ in pending:
+            self.detector.cancel(ticket)
+
+    def get_latest_result(self) -> Optional[Dict[str, Any]]:
+        """
+        Son tespit sonucunu beklemeden döndürür.
+
+        Tespit sözlükleri kopyalanır; çağıran taraf bunlara anahtar ekleyebilir.
+        Sonuçtaki kare salt okunur kabul edilmelidir.
+
+        Returns:
+            Optional[Dict[str, Any]]: Son sonuç veya henüz sonuç yoksa None
+        """
+        result = self.latest_result
+        if result is None:
+            return None
+
+        result = dict(result)
+        result["detections"] = [dict(d) for d in result["detections"]]
+        return result
+
+    def wait_for_result(self, timeout: float = 1.0) -> Optional[Dict[str, Any]]:
+        """
+        Yeni bir sonuç yayınlanana kadar bekler (arayüz dışı kullanım için).
+
+        Args:
+            timeout: Zaman aşımı süresi (saniye)
+
+        Returns:
+            Optional[Dict[str, Any]]: Yeni sonuç veya zaman aşımında None
+        """
+        self.result_event.clear()
+        if not self.result_event.wait(timeout):
+            return None
+        return self.get_latest_result()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Tespit iş parçacığı istatistiklerini döndürür.
+
+        Returns:
+            Dict[str, Any]: İstatistikler
+        """
+        result = self.latest_result
+        return {
+            "processed_frames": self.processed_frames,
+            "dropped_frames": self.dropped_frames,
+            "last_inference_time": result["inference_time"] if result else 0.0,
+            "result_age": time.time() - result["frame_timestamp"] if result else 0.0
+        }
+
+    def stop(self):
+        """
+        Tespit iş parçacığını durdurur.
+        """
+        self.running = False
+
+        if self.worker_thread and self.worker_thread.is_alive():
+            self.worker_thread.join(timeout=2.0)
+
+        self.logger.info("Tespit iş parçacığı durduruldu")
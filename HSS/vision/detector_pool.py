@@ -0,0 +1,500 @@
+"""
+Çok çekirdekli kartlar için çok işlemli YOLO dedektör havuzu modülü.
+Her işlem kendi cv2.dnn ağını yükler; ardışık kareler işlemlere dağıtılır
+ve sonuçlar gönderim sırasıyla toplanır.
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+import multiprocessing as mp
+from typing import List, Dict, Any, Optional, Tuple
+
+from config import YOLO_ROI_INPUT_SIZE, YOLO_POOL_RESULT_TIMEOUT
+from vision.yolo_detector import YoloDetector
+from vision.frame_buffer import FrameRingBuffer
+
+# collect() dönüşü: paylaşımlı tampondaki kare çıkarımdan önce veya çıkarım
+# sırasında üzerine yazıldı; kutular geçersizdir, çağıran kareyi atar veya yeniden gönderir
+STALE_RESULT = object()
+
+
+def _pool_worker(worker_index: int, task_queue, result_queue, detector_args: tuple,
+                 buffer_spec: Optional[Dict[str, Any]]):
+    """
+    Havuz işleminin ana döngüsü (ayrı işlemde çalışır).
+
+    Args:
+        worker_index: İşlem numarası
+        task_queue: Görev kuyruğu (bilet, tür, veri) - tür: "seq", "frame" veya "roi"
+        result_queue: Sonuç kuyruğu (tür, bilet, veri, süre) - tür: "result", "stale" veya "error"
+        detector_args: YoloDetector parametreleri
+        buffer_spec: Paylaşımlı kare tamponu tanımı (None ise kareler kuyruktan gelir)
+    """
+    # Ağın kendi iş parçacıkları çekirdekleri paylaşsın
+    import cv2
+    cv2.setNumThreads(1)
+
+    detector = YoloDetector(*detector_args)
+    if not detector.initialize():
+        result_queue.put(("init_failed", worker_index, None, 0.0))
+        return
+
+    frame_buffer = FrameRingBuffer.attach(buffer_spec) if buffer_spec else None
+    result_queue.put(("ready", worker_index, None, 0.0))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        ticket, kind, payload = task
+        try:
+            if kind == "roi":
+                crop, input_size = payload
+                detections = detector.detect_roi(crop, None, input_size)
+                result_queue.put(("result", ticket, detections, detector.last_inference_time))
+                continue
+
+            if kind == "seq":
+                frame = frame_buffer.get(payload)[0] if frame_buffer else None
+                if frame is None:
+                    result_queue.put(("stale", ticket, None, 0.0))
+                    continue
+
+                # Yuva çıkarım sırasında üzerine yazıldıysa kutular başka kareye aittir
+                detections = detector.detect(frame)
+                if not frame_buffer.is_valid(payload):
+                    result_queue.put(("stale", ticket, None, detector.last_inference_time))
+                    continue
+            else:
+                detections = detector.detect(payload)
+
+            result_queue.put(("result", ticket, detections, detector.last_inference_time))
+        except Exception as e:
+            result_queue.put(("error", ticket, str(e), 0.0))
+
+    if frame_buffer:
+        frame_buffer.close()
+
+
+class DetectorPool:
+    """
+    N işlemli YOLO dedektör havuzu.
+
+    detect() YoloDetector.detect ile aynı formatta sonuç döndürür.
+    Ardışık hat için submit() ile kareler gönderilir, collect() ile sırayla alınır.
+    Tespit dışındaki yardımcı metotlar (classify_balloons, draw_detections vb.)
+    ana işlemdeki YoloDetector nesnesine yönlendirilir.
+
+    Hiçbir bekleme süresiz değildir: sonuç beklenirken işlemlerin canlılığı
+    denetlenir, ölen işlemin bekleyen görevleri hata sonucuyla (boş liste)
+    tamamlanır ve yeni görevler canlı işlemlere gönderilir. Bilet ve sonuç
+    tabloları birden fazla iş parçacığından kullanılabilir (kilitle korunur).
+    """
+
+    def __init__(self, config_path: str, weights_path: str, confidence_threshold: float = 0.5,
+                 nms_threshold: float = 0.4, num_workers: Optional[int] = None,
+                 buffer_spec: Optional[Dict[str, Any]] = None):
+        """
+        DetectorPool sınıfını başlatır.
+
+        Args:
+            config_path: YOLO config dosya yolu
+            weights_path: YOLO ağırlık dosya yolu
+            confidence_threshold: Tespit güven eşiği
+            nms_threshold: NMS eşiği
+            num_workers: İşlem sayısı (None ise çekirdek sayısı - 1)
+            buffer_spec: Paylaşımlı kare tamponu tanımı (Camera.get_buffer_spec). Yalnızca
+                shared_memory=True ile açılmış ve ilk karesini yakalamış kamera tanım döndürür;
+                None ise kareler görev kuyruğuyla (kopyalanarak) gönderilir
+        """
+        self.detector_args = (config_path, weights_path, confidence_threshold, nms_threshold)
+        self.num_workers = num_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.buffer_spec = buffer_spec
+
+        # Yardımcı metotlar ve istatistikler için yerel dedektör (ağ yüklenmez)
+        self.detector = YoloDetector(*self.detector_args)
+
+        # İşlemler ve kuyruklar
+        self.context = mp.get_context("spawn")
+        self.processes = []
+        self.task_queues = []
+        self.result_queue = None
+
+        # Gönderilen görevler (kilitle korunur)
+        self.lock = threading.Lock()
+        self.next_ticket = 1
+        self.pending = {}      # ticket -> işlem numarası
+        self.results = {}      # ticket -> (tespitler, çıkarım süresi)
+        self.abandoned = set() # zaman aşımında bırakılan biletler (geç gelen sonuç atılır)
+        self.dead_workers = set()
+        self.worker_load = []
+        self.result_timeout = YOLO_POOL_RESULT_TIMEOUT
+
+        # Logger
+        self.logger = logging.getLogger("DetectorPool")
+
+    @property
+    def uses_shared_frames(self) -> bool:
+        """
+        Karelerin paylaşımlı bellekten okunup okunmadığını döndürür.
+        """
+        return self.buffer_spec is not None
+
+    def initialize(self, timeout: float = 60.0) -> bool:
+        """
+        Havuz işlemlerini başlatır ve ağların yüklenmesini bekler.
+
+        Args:
+            timeout: Ağların yüklenmesi için zaman aşımı (saniye)
+
+        Returns:
+            bool: Tüm işlemler başarıyla başlatıldıysa True
+        """
+        if self.processes:
+            return True
+
+        self.result_queue = self.context.Queue()
+
+        for index in range(self.num_workers):
+            task_queue = self.context.Queue()
+            process = self.context.Process(
+                target=_pool_worker,
+                args=(index, task_queue, self.result_queue, self.detector_args, self.buffer_spec),
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+            self.task_queues.append(task_queue)
+            self.worker_load.append(0)
+
+        # Tüm işlemlerin hazır olmasını bekle
+        ready = 0
+        deadline = time.time() + timeout
+        while ready < self.num_workers:
+            try:
+                kind, index, _, _ = self.result_queue.get(timeout=max(0.1, deadline - time.time()))
+            except queue.Empty:
+                self.logger.error("Dedektör havuzu başlatılırken zaman aşımı")
+                self.close()
+                return False
+
+            if kind == "init_failed":
+                self.logger.error(f"Havuz işlemi {index} YOLO modelini yükleyemedi")
+                self.close()
+                return False
+            ready += 1
+
+        self.logger.info(f"Dedektör havuzu başlatıldı: {self.num_workers} işlem")
+        return True
+
+    def submit(self, frame=None, seq: Optional[int] = None) -> int:
+        """
+        Kareyi en az yüklü işleme gönderir.
+
+        Args:
+            frame: İşlenecek kare
+            seq: Paylaşımlı tampondaki kare sıra numarası (frame yerine)
+
+        Returns:
+            int: Sonucu almak için kullanılacak bilet numarası
+        """
+        if seq is not None and self.uses_shared_frames:
+            return self._submit("seq", seq)
+        return self._submit("frame", frame)
+
+    def _submit(self, kind: str, payload) -> int:
+        """
+        Görevi en az yüklü işlemin kuyruğuna ekler.
+
+        Args:
+            kind: Görev türü
+            payload: Görev verisi
+
+        Returns:
+            int: Bilet numarası
+        """
+        if not self.processes:
+            raise RuntimeError("Dedektör havuzu başlatılmamış")
+
+        with self.lock:
+            alive = [i for i in range(self.num_workers) if i not in self.dead_workers]
+            if not alive:
+                raise RuntimeError("Dedektör havuzunda çalışan işlem kalmadı")
+
+            ticket = self.next_ticket
+            self.next_ticket += 1
+
+            index = min(alive, key=lambda i: self.worker_load[i])
+            self.worker_load[index] += 1
+            self.pending[ticket] = index
+
+        self.task_queues[index].put((ticket, kind, payload))
+        return ticket
+
+    def in_flight(self) -> int:
+        """
+        Sonucu henüz alınmamış görev sayısını döndürür.
+        """
+        with self.lock:
+            return len(self.pending)
+
+    def _receive(self, timeout: float) -> bool:
+        """
+        Sonuç kuyruğundan bir mesaj alır.
+
+        Args:
+            timeout: Bekleme süresi (saniye)
+
+        Returns:
+            bool: Mesaj alındıysa True
+        """
+        try:
+            kind, ticket, payload, inference_time = self.result_queue.get(timeout=timeout)
+        except queue.Empty:
+            return False
+
+        if kind == "error":
+            self.logger.error(f"Havuz işleminde tespit hatası: {payload}")
+            payload = []
+        elif kind == "stale":
+            payload = STALE_RESULT
+
+        with self.lock:
+            index = self.pending.get(ticket)
+            if index is not None and ticket not in self.results:
+                self.worker_load[index] -= 1
+
+            if ticket in self.abandoned:
+                # Zaman aşımında bırakılmış görevin geç gelen sonucu
+                self.abandoned.discard(ticket)
+                self.pending.pop(ticket, None)
+            elif index is not None and ticket not in self.results:
+                self.results[ticket] = (payload, inference_time)
+        return True
+
+    def _check_workers(self):
+        """
+        Ölen havuz işlemlerini bulur ve bekleyen görevlerini hata sonucuyla tamamlar.
+        """
+        for index, process in enumerate(self.processes):
+            if index in self.dead_workers or process.is_alive():
+                continue
+
+            with self.lock:
+                self.dead_workers.add(index)
+                failed = [t for t, i in self.pending.items() if i == index and t not in self.results]
+                for ticket in failed:
+                    if ticket in self.abandoned:
+                        self.abandoned.discard(ticket)
+                        self.pending.pop(ticket, None)
+                    else:
+                        self.results[ticket] = ([], 0.0)
+                self.worker_load[index] = 0
+
+            self.logger.error(f"Havuz işlemi {index} beklenmedik şekilde sonlandı "
+                              f"(çıkış kodu {process.exitcode}), {len(failed)} görev başarısız sayıldı")
+
+    def cancel(self, ticket: int):
+        """
+        Sonucu artık beklenmeyen görevi bırakır; geç gelen sonucu atılır.
+
+        Args:
+            ticket: submit() ile alınan bilet numarası
+        """
+        with self.lock:
+            if ticket not in self.pending:
+                return
+            if ticket in self.results:
+                self.results.pop(ticket)
+                self.pending.pop(ticket)
+            else:
+                self.abandoned.add(ticket)
+
+    def collect(self, ticket: int, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Bilet numarasına ait tespit sonucunu alır.
+
+        Args:
+            ticket: submit() ile alınan bilet numarası
+            timeout: Zaman aşımı (None ise result_timeout). Aşılırsa bilet bekler
+                durumda kalır; çağıran tekrar deneyebilir veya cancel() ile bırakabilir
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Tespitler, zaman aşımında None; paylaşımlı
+            tampondaki kare üzerine yazıldıysa STALE_RESULT; görevi yürüten işlem
+            öldüyse boş liste
+        """
+        deadline = time.time() + (self.result_timeout if timeout is None else timeout)
+
+        while True:
+            with self.lock:
+                if ticket in self.results:
+                    detections, inference_time = self.results.pop(ticket)
+                    self.pending.pop(ticket, None)
+                    break
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+
+            # Kısa dilimlerle bekle; sonuç gelmediyse işlemlerin canlılığını denetle
+            if not self._receive(min(remaining, 0.5)):
+                self._check_workers()
+
+        if detections is STALE_RESULT:
+            return STALE_RESULT
+
+        # Ana işlemdeki istatistikleri güncelle
+        self.detector.last_inference_time = inference_time
+        self.detector.total_inference_time += inference_time
+        self.detector.inference_count += 1
+        self.detector.detection_count = len(detections)
+
+        return detections
+
+    def _collect_or_cancel(self, ticket: int) -> List[Dict[str, Any]]:
+        """
+        Eşzamanlı çağrılar için sonucu bekler; zaman aşımında görevi bırakır.
+
+        Args:
+            ticket: Bilet numarası
+
+        Returns:
+            List[Dict[str, Any]]: Tespitler (zaman aşımında boş liste)
+        """
+        detections = self.collect(ticket)
+        if detections is None:
+            self.logger.error(f"Havuz sonucu {self.result_timeout:.1f} saniyede gelmedi, görev bırakıldı")
+            self.cancel(ticket)
+            return []
+        return detections
+
+    def detect(self, frame) -> List[Dict[str, Any]]:
+        """
+        Verilen görüntüde nesneleri tespit eder (YoloDetector.detect ile aynı format).
+
+        Args:
+            frame: İşlenecek görüntü
+
+        Returns:
+            List[Dict[str, Any]]: Tespit edilen nesneler listesi
+        """
+        if not self.processes:
+            self.logger.error("Dedektör havuzu başlatılmamış")
+            return []
+
+        if frame is None:
+            self.logger.error("Boş görüntü")
+            return []
+
+        return self._collect_or_cancel(self.submit(frame))
+
+    def detect_roi(self, frame, roi=None, input_size: int = YOLO_ROI_INPUT_SIZE) -> List[Dict[str, Any]]:
+        """
+        Görüntünün bir bölgesinde tespit yapar (YoloDetector.detect_roi ile aynı format).
+        Yalnızca kırpılmış bölge işleme gönderilir.
+
+        Args:
+            frame: İşlenecek görüntü
+            roi: Bölge (x, y, w, h). None ise tüm görüntü
+            input_size: YOLO giriş boyutu
+
+        Returns:
+            List[Dict[str, Any]]: Tespit edilen nesneler listesi (tam görüntü koordinatlarında)
+        """
+        if not self.processes:
+            self.logger.error("Dedektör havuzu başlatılmamış")
+            return []
+
+        if frame is None:
+            self.logger.error("Boş görüntü")
+            return []
+
+        frame_height, frame_width = frame.shape[:2]
+        if roi is None:
+            roi = (0, 0, frame_width, frame_height)
+        x, y, w, h = [int(v) for v in roi]
+        x1, y1 = max(0, x), max(0, y)
+        crop = frame[y1:min(frame_height, y + h), x1:min(frame_width, x + w)]
+        if crop.size == 0:
+            return []
+
+        detections = self._collect_or_cancel(self._submit("roi", (crop, input_size)))
+
+        # Kutuları tam görüntü koordinatlarına taşı
+        for detection in detections:
+            bx, by, bw, bh = detection["box"]
+            detection["box"] = (bx + x1, by + y1, bw, bh)
+            detection["center"] = (bx + x1 + bw // 2, by + y1 + bh // 2)
+
+        return detections
+
+    def detect_batch(self, images, input_size: Optional[int] = None,
+                     offsets: Optional[List[Tuple[int, int]]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Birden fazla görüntüde tespit yapar (YoloDetector.detect_batch ile aynı format).
+        Görüntüler havuz işlemlerine dağıtılır ve paralel işlenir.
+
+        Args:
+            images: İşlenecek görüntüler
+            input_size: YOLO giriş boyutu (None ise YOLO_INPUT_SIZE)
+            offsets: Her görüntünün kutularına eklenecek (x, y) kayması
+
+        Returns:
+            List[List[Dict[str, Any]]]: Her görüntü için tespit listesi
+        """
+        if not self.processes:
+            self.logger.error("Dedektör havuzu başlatılmamış")
+            return [[] for _ in images]
+
+        if input_size is None:
+            tickets = [self._submit("frame", image) for image in images]
+        else:
+            tickets = [self._submit("roi", (image, input_size)) for image in images]
+
+        results = []
+        for i, ticket in enumerate(tickets):
+            detections = self._collect_or_cancel(ticket)
+            dx, dy = offsets[i] if offsets else (0, 0)
+            for detection in detections:
+                bx, by, bw, bh = detection["box"]
+                detection["box"] = (bx + dx, by + dy, bw, bh)
+                detection["center"] = (bx + dx + bw // 2, by + dy + bh // 2)
+            results.append(detections)
+
+        return results
+
+    def close(self):
+        """
+        Havuz işlemlerini durdurur.
+        """
+        for task_queue in self.task_queues:
+            task_queue.put(None)
+
+        for process in self.processes:
+            process.join(timeout=2.0)
+            if process.is_alive():
+                process.terminate()
+
+        self.processes = []
+        self.task_queues = []
+        with self.lock:
+            self.worker_load = []
+            self.pending.clear()
+            self.results.clear()
+            self.abandoned.clear()
+            self.dead_workers.clear()
+
+        self.logger.info("Dedektör havuzu kapatıldı")
+
+    def __getattr__(self, name):
+        """
+        Tespit dışındaki metotları yerel YoloDetector nesnesine yönlendirir.
+        """
+        if name == "detector":
+            raise AttributeError(name)
+        return getattr(self.detector, name)
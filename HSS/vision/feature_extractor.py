@@ -0,0 +1,165 @@
+"""
+Tespitler için tek geçişte renk, şekil ve sınır doğrulaması yapan özellik çıkarma modülü.
+Sonuçlar iz numarasına (track_id) göre önbelleğe alınır; kutusu neredeyse
+kıpırdamayan izler için şekil yeniden hesaplanmaz.
+"""
+
+import cv2
+import logging
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+from config import FEATURE_CACHE_MOVE_RATIO
+from vision.color_classifier import ColorClassifier
+
+
+class FeatureExtractor:
+    """
+    Balon tespitleri için birleşik renk + şekil çıkarıcı.
+
+    Her bölge bir kez kırpılır ve renk tablosuyla etiketlenir. Baskın rengin
+    maskesi şekil için de kullanılır; renk bulunamazsa gri eşikleme uygulanır.
+    """
+
+    def __init__(self, color_classifier: Optional[ColorClassifier] = None,
+                 move_ratio: float = FEATURE_CACHE_MOVE_RATIO):
+        """
+        FeatureExtractor sınıfını başlatır.
+
+        Args:
+            color_classifier: Renk sınıflandırıcı (None ise yeni oluşturulur)
+            move_ratio: Kutu, boyutunun bu oranından az hareket ettiyse önbellek kullanılır
+        """
+        self.color_classifier = color_classifier or ColorClassifier()
+        self.move_ratio = move_ratio
+
+        # track_id -> {"box", "color", "shape"}
+        self.cache = {}
+
+        # İstatistikler
+        self.computed_count = 0
+        self.cached_count = 0
+
+        # Logger
+        self.logger = logging.getLogger("FeatureExtractor")
+
+    def extract(self, frame: np.ndarray, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Balon tespitlerine color, is_enemy ve shape anahtarlarını ekler.
+
+        Args:
+            frame: İşlenecek görüntü
+            detections: Tespit edilen nesneler listesi
+
+        Returns:
+            List[Dict[str, Any]]: Özellikleri eklenmiş tespit listesi
+        """
+        height, width = frame.shape[:2]
+        cache = {}
+
+        for detection in detections:
+            if "balloon" not in detection.get("class_name", ""):
+                continue
+
+            # Sınır doğrulaması (bir kez)
+            x, y, w, h = detection["box"]
+            x1, y1 = max(0, int(x)), max(0, int(y))
+            x2, y2 = min(width, int(x + w)), min(height, int(y + h))
+            if x2 <= x1 or y2 <= y1:
+                detection["color"] = "unknown"
+                detection["is_enemy"] = False
+                detection["shape"] = "unknown"
+                continue
+
+            box = (x1, y1, x2 - x1, y2 - y1)
+            track_id = detection.get("track_id")
+            cached = self.cache.get(track_id) if track_id is not None else None
+
+            if cached is not None and self._barely_moved(cached["box"], box):
+                color, shape = cached["color"], cached["shape"]
+                self.cached_count += 1
+            else:
+                color, shape = self._compute(frame[y1:y2, x1:x2])
+                self.computed_count += 1
+                cached = {"box": box, "color": color, "shape": shape}
+
+            if track_id is not None:
+                cache[track_id] = cached
+
+            detection["color"] = color
+            detection["is_enemy"] = self.color_classifier.is_enemy(color)
+            detection["shape"] = shape
+
+        # Görünmeyen izlerin önbelleğini bırak
+        self.cache = cache
+        return detections
+
+    def _compute(self, roi: np.ndarray) -> Tuple[str, str]:
+        """
+        Bölgenin rengini ve şeklini tek geçişte hesaplar.
+
+        Args:
+            roi: BGR bölge
+
+        Returns:
+            Tuple[str, str]: (renk, şekil)
+        """
+        step = self.color_classifier.sample_step(roi)
+        labels = self.color_classifier.label_image(roi[::step, ::step])
+        label = self.color_classifier.dominant_label(labels)
+
+        # Şekil maskesi: baskın rengin pikselleri, renk yoksa gri eşikleme
+        if label:
+            mask = (labels == label).astype(np.uint8)
+        else:
+            gray = cv2.cvtColor(roi[::step, ::step], cv2.COLOR_BGR2GRAY)
+            _, mask = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
+
+        return self.color_classifier.labels[label], self._classify_shape(mask)
+
+    @staticmethod
+    def _classify_shape(mask: np.ndarray) -> str:
+        """
+        İkili maskedeki en büyük dış konturun şeklini belirler.
+
+        Args:
+            mask: İkili maske
+
+        Returns:
+            str: "triangle", "square", "circle" veya "unknown"
+        """
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return "unknown"
+
+        largest_contour = max(contours, key=cv2.contourArea)
+        epsilon = 0.04 * cv2.arcLength(largest_contour, True)
+        approx = cv2.approxPolyDP(largest_contour, epsilon, True)
+
+        if len(approx) == 3:
+            return "triangle"
+        if len(approx) == 4:
+            return "square"
+        return "circle"
+
+    def _barely_moved(self, old_box: Tuple[int, int, int, int], new_box: Tuple[int, int, int, int]) -> bool:
+        """
+        Kutunun merkez ve boyut değişiminin eşik altında kalıp kalmadığını kontrol eder.
+        """
+        ox, oy, ow, oh = old_box
+        nx, ny, nw, nh = new_box
+        limit = self.move_ratio * max(ow, oh, 1)
+
+        return (abs((ox + ow / 2) - (nx + nw / 2)) <= limit and
+                abs((oy + oh / 2) - (ny + nh / 2)) <= limit and
+                abs(ow - nw) <= limit and abs(oh - nh) <= limit)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Hesaplanan ve önbellekten gelen özellik sayılarını döndürür.
+        """
+        return {
+            "computed_count": self.computed_count,
+            "cached_count": self.cached_count,
+            "cached_tracks": len(self.cache)
+        }
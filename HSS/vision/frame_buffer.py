@@ -0,0 +1,207 @@
+"""
+Kareler için önceden ayrılmış, sıra numaralı halka tampon modülü.
+İsteğe bağlı olarak multiprocessing.shared_memory üzerinde tutulur, böylece
+ayrı bir işlem kareleri pickle etmeden okuyabilir.
+"""
+
+import logging
+import numpy as np
+from multiprocessing import shared_memory
+from typing import Tuple, Optional, Dict, Any
+
+
+class FrameRingBuffer:
+    """
+    N yuvalı kare halka tamponu.
+
+    Tek bir yazıcı (kamera iş parçacığı) kareleri sırayla yuvalara yazar.
+    Okuyucular sıra numarasıyla salt okunur görünüm (view) alır, kopyalama yapılmaz.
+    Bir görünüm, yazıcı aynı yuvaya tekrar yazana kadar (N-1 kare boyunca) geçerlidir;
+    uzun süre tutulan görünümler is_valid() ile doğrulanmalıdır.
+    """
+
+    def __init__(self, shape: Tuple[int, ...], slots: int = 4, dtype=np.uint8,
+                 shared: bool = False, name: Optional[str] = None, _create: bool = True):
+        """
+        FrameRingBuffer sınıfını başlatır.
+
+        Args:
+            shape: Kare boyutu (yükseklik, genişlik, kanal)
+            slots: Yuva sayısı
+            dtype: Kare veri tipi
+            shared: True ise tampon paylaşımlı bellekte tutulur
+            name: Paylaşımlı bellek adı (None ise otomatik)
+        """
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        self.shared = shared
+        self.shm = None
+        self._owner = _create
+
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        header_bytes = 8 * (1 + slots) + 8 * slots  # son sıra + yuva sıraları + zaman damgaları
+
+        if shared:
+            if _create:
+                self.shm = shared_memory.SharedMemory(name=name, create=True,
+                                                      size=header_bytes + slots * frame_bytes)
+            else:
+                self.shm = shared_memory.SharedMemory(name=name)
+            buffer = self.shm.buf
+        else:
+            buffer = bytearray(header_bytes + slots * frame_bytes)
+
+        # Başlık: [son sıra numarası, yuva sıra numaraları...] ve yuva zaman damgaları
+        self._sequences = np.ndarray((1 + slots,), dtype=np.int64, buffer=buffer, offset=0)
+        self._timestamps = np.ndarray((slots,), dtype=np.float64, buffer=buffer, offset=8 * (1 + slots))
+        self.frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=buffer, offset=header_bytes)
+
+        if _create:
+            self._sequences[:] = 0
+            self._sequences[1:] = -1
+            self._timestamps[:] = 0.0
+
+        # Logger
+        self.logger = logging.getLogger("FrameRingBuffer")
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> "FrameRingBuffer":
+        """
+        Başka bir işlemde oluşturulmuş paylaşımlı tampona bağlanır.
+
+        Args:
+            spec: spec() ile alınan tampon tanımı
+
+        Returns:
+            FrameRingBuffer: Okuma için bağlanmış tampon
+        """
+        return cls(spec["shape"], spec["slots"], spec["dtype"], shared=True,
+                   name=spec["name"], _create=False)
+
+    def spec(self) -> Dict[str, Any]:
+        """
+        Tamponun başka bir işlemden bağlanabilmesi için tanımını döndürür.
+
+        Returns:
+            Dict[str, Any]: Ad, boyut, yuva sayısı ve veri tipi
+        """
+        return {
+            "name": self.shm.name if self.shm else None,
+            "shape": self.shape,
+            "slots": self.slots,
+            "dtype": self.dtype.str
+        }
+
+    def begin_write(self) -> np.ndarray:
+        """
+        Bir sonraki kare için yazılabilir yuvayı döndürür.
+        Yuva, commit_write() çağrılana kadar okuyucular için geçersizdir.
+
+        Returns:
+            np.ndarray: Yazılabilir yuva
+        """
+        slot = (int(self._sequences[0]) + 1) % self.slots
+        self._sequences[1 + slot] = -1
+        return self.frames[slot]
+
+    def commit_write(self, timestamp: float) -> int:
+        """
+        begin_write() ile alınan yuvayı yayınlar.
+
+        Args:
+            timestamp: Karenin yakalanma zamanı
+
+        Returns:
+            int: Yayınlanan karenin sıra numarası
+        """
+        seq = int(self._sequences[0]) + 1
+        slot = seq % self.slots
+        self._timestamps[slot] = timestamp
+        self._sequences[1 + slot] = seq
+        self._sequences[0] = seq
+        return seq
+
+    def write(self, frame: np.ndarray, timestamp: float) -> int:
+        """
+        Kareyi bir sonraki yuvaya kopyalar ve yayınlar.
+
+        Args:
+            frame: Kare
+            timestamp: Karenin yakalanma zamanı
+
+        Returns:
+            int: Yayınlanan karenin sıra numarası
+        """
+        np.copyto(self.begin_write(), frame)
+        return self.commit_write(timestamp)
+
+    def latest_sequence(self) -> int:
+        """
+        Son yayınlanan karenin sıra numarasını döndürür (henüz kare yoksa 0).
+        """
+        return int(self._sequences[0])
+
+    def is_valid(self, seq: int) -> bool:
+        """
+        Sıra numarasına ait karenin hâlâ tamponda olup olmadığını kontrol eder.
+
+        Args:
+            seq: Kare sıra numarası
+
+        Returns:
+            bool: Kare üzerine yazılmadıysa True
+        """
+        return seq > 0 and int(self._sequences[1 + seq % self.slots]) == seq
+
+    def get(self, seq: int) -> Tuple[Optional[np.ndarray], float]:
+        """
+        Sıra numarasına ait karenin salt okunur görünümünü döndürür.
+
+        Args:
+            seq: Kare sıra numarası
+
+        Returns:
+            Tuple[Optional[np.ndarray], float]: (görünüm, zaman damgası) - kare yoksa (None, 0.0)
+        """
+        if not self.is_valid(seq):
+            return None, 0.0
+
+        slot = seq % self.slots
+        view = self.frames[slot].view()
+        view.flags.writeable = False
+        return view, float(self._timestamps[slot])
+
+    def latest(self) -> Tuple[int, float, Optional[np.ndarray]]:
+        """
+        Son karenin salt okunur görünümünü döndürür.
+
+        Returns:
+            Tuple[int, float, Optional[np.ndarray]]: (sıra numarası, zaman damgası, görünüm)
+        """
+        seq = self.latest_sequence()
+        view, timestamp = self.get(seq)
+        if view is None:
+            return 0, 0.0, None
+        return seq, timestamp, view
+
+    def close(self):
+        """
+        Tampon kaynaklarını serbest bırakır (paylaşımlı bellek sahibi ise siler).
+        """
+        if self.shm is None:
+            return
+
+        # Görünümler bırakılmadan paylaşımlı bellek kapatılamaz
+        self.frames = None
+        self._sequences = None
+        self._timestamps = None
+
+        try:
+            self.shm.close()
+            if self._owner:
+                self.shm.unlink()
+        except (FileNotFoundError, BufferError) as e:
+            self.logger.warning(f"Paylaşımlı bellek kapatılırken hata: {str(e)}")
+
+        self.shm = None
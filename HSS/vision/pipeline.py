@@ -0,0 +1,308 @@
+"""
+Kare başına bir kez çalışan ortak görüntü işleme hattı modülü.
+
+Yakalama, tespit (takipçi dedektörün içindedir), renk sınıflandırması, özellik
+çıkarımı ve çizim aşamaları her kamera karesi için en fazla bir kez çalışır.
+Sonuç bir FrameContext nesnesinde toplanır; aktif mod, arayüz ve arayüzsüz
+döngü aynı bağlamı kullanır, tespiti yeniden yapmaz.
+
+Özellik çıkarımı ve çizim tembel aşamalardır: yalnızca bir tüketici istediğinde
+çalışır ve sonuç bağlamda saklanır.
+
+Halka tampon görünümü yalnızca birkaç kare boyunca geçerli olduğundan hat her yeni
+kareyi bir kez kopyalar; tespit, sınıflandırma, tembel aşamalar ve arayüzler bu
+kopyayı kullanır, kutular ile renkler hep aynı kareye aittir.
+"""
+
+import time
+import logging
+import threading
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from utils.tracing import tracer
+
+
+class FrameContext:
+    """
+    Tek bir kamera karesinin hat çıktısı.
+
+    Kareler hatta ait kopyalardır; kamera tamponu üzerine yazılsa da değişmez.
+    Tespit iş parçacığı kullanılıyorsa tespitler canlı kareden önceki bir kareye
+    ait olabilir; tespitlerin ait olduğu kare detection_frame'dir. Kareler salt
+    okunur kabul edilmelidir.
+    """
+
+    def __init__(self, pipeline, frame: np.ndarray, frame_id, timestamp: float,
+                 detections: List[Dict[str, Any]], detection_frame: np.ndarray,
+                 detection_seq: int, trace_id: Optional[int]):
+        """
+        FrameContext sınıfını başlatır.
+
+        Args:
+            pipeline: Bağlamı oluşturan FramePipeline (tembel aşamalar için)
+            frame: Canlı kamera karesi
+            frame_id: Kare tanımlayıcısı (sıra numarası/zaman damgası, yoksa None)
+            timestamp: Karenin alınma zamanı
+            detections: Renge göre sınıflandırılmış tespitler
+            detection_frame: Tespitlerin ait olduğu kare
+            detection_seq: Tespit sonucunun sıra numarası (yeni sonuçta artar)
+            trace_id: Tespitlerin gecikme izi numarası
+        """
+        self.pipeline = pipeline
+        self.frame = frame
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.detections = detections
+        self.detection_frame = detection_frame
+        self.detection_seq = detection_seq
+        self.trace_id = trace_id
+
+        height, width = frame.shape[:2]
+        self.frame_center = (width // 2, height // 2)
+
+        # Tembel aşama sonuçları
+        self._features = None
+        self._overlay = None
+
+    def balloons(self) -> List[Dict[str, Any]]:
+        """
+        Balon tespitlerini döndürür.
+        """
+        return [d for d in self.detections if "balloon" in d.get("class_name", "")]
+
+    def features(self) -> List[Dict[str, Any]]:
+        """
+        Balonlara renk ve şekil eklenmiş tespitleri döndürür (ilk çağrıda hesaplanır).
+
+        Returns:
+            List[Dict[str, Any]]: Özellikleri eklenmiş tespit listesi
+        """
+        if self._features is None:
+            self._features = self.pipeline._extract_features(self)
+        return self._features
+
+    def overlay(self) -> np.ndarray:
+        """
+        Tespitleri çizilmiş kareyi döndürür (ilk çağrıda çizilir, kare değiştirilmez).
+
+        Returns:
+            np.ndarray: Tespitlerin çizildiği kare kopyası
+        """
+        if self._overlay is None:
+            self._overlay = self.pipeline.detector.draw_detections(self.detection_frame, self.detections)
+        return self._overlay
+
+
+class FramePipeline:
+    """
+    Kamera, dedektör ve (varsa) tespit iş parçacığını tek hatta bağlayan sınıf.
+
+    update() her çağrıldığında kameranın son karesine bakar; kare ve tespit sonucu
+    değişmediyse önceki bağlamı döndürür. Böylece aynı tik içinde mod döngüsü ve
+    arayüz update() çağırsa da çıkarım kare başına bir kez yapılır.
+    """
+
+    # Kopyalama sırasında yuvanın üzerine yazılırsa en yeni kareyi tekrar deneme sayısı
+    CAPTURE_RETRIES = 3
+
+    def __init__(self, camera, detector, detection_worker=None, feature_extractor=None):
+        """
+        FramePipeline sınıfını başlatır.
+
+        Args:
+            camera: Kamera nesnesi
+            detector: YoloDetector nesnesi (TrackingDetector olabilir)
+            detection_worker: DetectionWorker nesnesi (None ise tespit hat içinde yapılır)
+            feature_extractor: Renk/şekil çıkarıcı (None ise ilk kullanımda oluşturulur)
+        """
+        self.camera = camera
+        self.detector = detector
+        self.detection_worker = detection_worker
+        self.feature_extractor = feature_extractor
+
+        # Son bağlam, tespit sonucu sıra numarası ve iş parçacığından okunan son sonuç
+        self.context = None
+        self.detection_seq = 0
+        self.worker_result_seq = 0
+
+        # Arayüz iş parçacığı ile mod döngüsü aynı anda çağırabilir
+        self.lock = threading.RLock()
+
+        # İstatistikler
+        self.frames_processed = 0
+        self.detections_run = 0
+        self.features_run = 0
+
+        # Logger
+        self.logger = logging.getLogger("FramePipeline")
+
+    def update(self) -> Optional[FrameContext]:
+        """
+        Son kamera karesi için bağlamı döndürür; gerekiyorsa aşamaları çalıştırır.
+
+        Returns:
+            Optional[FrameContext]: Güncel bağlam veya henüz kare yoksa None
+        """
+        with self.lock:
+            # Kare değişmediyse kopyalamadan önceki bağlamı döndür (kimliksiz kameralarda her kare yeni sayılır)
+            frame_id = self._get_frame_id()
+            if self.context is not None and frame_id is not None and frame_id == self.context.frame_id:
+                if self.detection_worker is None or self.detection_worker.result_seq == self.worker_result_seq:
+                    return self.context
+
+            frame, frame_id = self._capture()
+            if frame is None:
+                return self.context
+
+            if self.detection_worker is None:
+                context = self._detect(frame, frame_id)
+            else:
+                context = self._read_worker(frame, frame_id)
+            if context is None:
+                return self.context
+
+            self.context = context
+            self.frames_processed += 1
+            return context
+
+    def latest(self) -> Optional[FrameContext]:
+        """
+        Aşamaları çalıştırmadan son bağlamı döndürür.
+        """
+        return self.context
+
+    def _get_frame_id(self):
+        """
+        Kameranın son karesini tanımlayan değeri döndürür.
+
+        Returns:
+            Halka tamponlu kamerada sıra numarası, diğerlerinde son kare zaman
+            damgası; kamera bunları sağlamıyorsa None
+        """
+        if hasattr(self.camera, "get_latest_sequence"):
+            return self.camera.get_latest_sequence() or None
+        return getattr(self.camera, "last_timestamp", None)
+
+    def _capture(self):
+        """
+        Son kamera karesinin hatta ait kopyasını kimliğiyle birlikte alır.
+
+        Halka tamponlu kamerada sıra numarası ve görünüm birlikte okunur, kopya
+        alındıktan sonra yuvanın üzerine yazılmadığı doğrulanır.
+
+        Returns:
+            Tuple[Optional[np.ndarray], Any]: (kare kopyası, kare tanımlayıcısı) -
+            kare alınamadıysa (None, None)
+        """
+        if hasattr(self.camera, "get_frame_view"):
+            for _ in range(self.CAPTURE_RETRIES):
+                ret, seq, view = self.camera.get_frame_view()
+                if not ret or view is None:
+                    return None, None
+
+                frame = view.copy()
+                if self.camera.frame_buffer.is_valid(seq):
+                    return frame, seq
+
+            self.logger.warning("Kare kopyalanırken sürekli üzerine yazıldı, kare atlandı")
+            return None, None
+
+        # Tanımlayıcı kareden önce okunur; arada yeni kare gelirse bir sonraki çağrıda işlenir
+        frame_id = self._get_frame_id()
+        ret, frame = self.camera.get_frame()
+        if not ret or frame is None:
+            return None, None
+        return frame, frame_id
+
+    def _detect(self, frame: np.ndarray, frame_id) -> FrameContext:
+        """
+        Kare üzerinde tespit ve renk sınıflandırmasını çalıştırır.
+
+        Args:
+            frame: Kamera karesinin kopyası
+            frame_id: Kare tanımlayıcısı
+
+        Returns:
+            FrameContext: Yeni tespitli bağlam
+        """
+        if hasattr(self.camera, "get_frame_view"):
+            # İz, kopyalanan karenin sıra numarasıyla kamera tarafından başlatılmıştır
+            trace_id = frame_id if tracer.enabled else None
+        else:
+            trace_id = tracer.begin_for_camera(self.camera)
+        detections = self.detector.detect(frame)
+        tracer.mark(trace_id, "detect")
+        detections = self.detector.classify_balloons(frame, detections)
+        tracer.mark(trace_id, "classify")
+
+        self.detection_seq += 1
+        self.detections_run += 1
+        return FrameContext(self, frame, frame_id, time.time(), detections, frame,
+                            self.detection_seq, trace_id)
+
+    def _read_worker(self, frame: np.ndarray, frame_id) -> Optional[FrameContext]:
+        """
+        Tespit iş parçacığının son sonucunu canlı kareyle birleştirir. Sonuç
+        değişmediyse önceki tespitler yeniden kullanılır.
+
+        Args:
+            frame: Canlı kamera karesinin kopyası
+            frame_id: Kare tanımlayıcısı
+
+        Returns:
+            Optional[FrameContext]: Bağlam veya henüz tespit sonucu yoksa None
+        """
+        previous = self.context
+        if previous is None or self.detection_worker.result_seq != self.worker_result_seq:
+            result = self.detection_worker.get_latest_result()
+            if result is None:
+                return None
+
+            # Okuma sırasında daha yeni sonuç yayınlanmış olabilir; yayınlanan sıra esas alınır
+            if previous is None or result["seq"] != self.worker_result_seq:
+                self.worker_result_seq = result["seq"]
+                self.detection_seq += 1
+                self.detections_run += 1
+                return FrameContext(self, frame, frame_id, time.time(), result["detections"],
+                                    result["frame"], self.detection_seq, result.get("trace_id"))
+
+        context = FrameContext(self, frame, frame_id, time.time(), previous.detections,
+                               previous.detection_frame, previous.detection_seq, previous.trace_id)
+        context._features = previous._features
+        return context
+
+    def _extract_features(self, context: FrameContext) -> List[Dict[str, Any]]:
+        """
+        Bağlamın tespitlerine renk ve şekil ekler (FrameContext.features çağırır).
+
+        Args:
+            context: Tespitleri işlenecek bağlam
+
+        Returns:
+            List[Dict[str, Any]]: Özellikleri eklenmiş tespit listesi
+        """
+        with self.lock:
+            if self.feature_extractor is None:
+                from vision.feature_extractor import FeatureExtractor
+                self.feature_extractor = FeatureExtractor(getattr(self.detector, "color_classifier", None))
+
+            # Şekil çıkarımı da sınıflandırma aşamasına dahildir
+            detections = self.feature_extractor.extract(context.detection_frame, context.detections)
+            tracer.mark(context.trace_id, "classify")
+            self.features_run += 1
+            return detections
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Hat istatistiklerini döndürür.
+
+        Returns:
+            Dict[str, Any]: İşlenen kare, tespit ve özellik çıkarım sayıları
+        """
+        return {
+            "frames_processed": self.frames_processed,
+            "detections_run": self.detections_run,
+            "features_run": self.features_run
+        }
@@ -0,0 +1,524 @@
+"""
+Video dosyası, görüntü dizini veya sistem kayıtlarından kare oynatan kamera modülü.
+
+ReplayCamera, Camera ile aynı arayüzü (halka tampon, get_frame, get_frame_view,
+sıra numaraları) sunar; böylece modlar, dedektör, takipçi ve tespit iş parçacığı
+canlı kamera yerine tekrarlanabilir bir kaynakla çalıştırılabilir.
+
+Kaynaklar:
+    video     cv2.VideoCapture ile okunabilen dosya (zaman damgası: kare konumu)
+    dizin     Sıralı görüntü dosyaları (zaman damgası: sıra / FPS)
+    kayıt     FrameRecorder ile oluşturulmuş dizin (frames.csv: dosya ve yakalama zamanı)
+
+Hız (pacing) modları:
+    realtime  Kaynak zaman damgaları arasındaki süreler korunur; geride kalınırsa
+              canlı kamerada olduğu gibi kareler atlanır
+    fixed     Sabit FPS ile oynatılır
+    fast      Kareler beklemeden art arda yayınlanır
+    step      Kareler yalnızca step() çağrıldığında yayınlanır (deterministik testler için)
+
+Tampondaki zaman damgaları yayınlanma anının duvar saatidir (gecikme ölçümleri
+ve kare yaşı hesapları canlı kamerayla aynı kalır); kaynağın özgün zaman damgası
+get_source_timestamp() ile okunur.
+"""
+
+import os
+import csv
+import time
+import logging
+import threading
+import numpy as np
+import cv2
+from typing import Tuple, Optional, Dict, Any
+
+from config import CAMERA_FPS, CAMERA_REPLAY_PACING, CAMERA_REPLAY_LOOP, RECORDING_IMAGE_FORMAT
+from vision.camera import Camera
+from utils.tracing import tracer
+
+# Kayıt dizinindeki kare dizini dosyası
+RECORDING_INDEX = "frames.csv"
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+
+PACING_MODES = ("realtime", "fixed", "fast", "step")
+
+
+class ReplayCamera(Camera):
+    """
+    Video, görüntü dizini veya kayıttan kare oynatan kamera sınıfı.
+    """
+
+    def __init__(self, source: str, width: int = None, height: int = None, fps: float = None,
+                 pacing: str = CAMERA_REPLAY_PACING, loop: bool = CAMERA_REPLAY_LOOP,
+                 buffer_slots: int = 4, shared_memory: bool = False):
+        """
+        ReplayCamera sınıfını başlatır.
+
+        Args:
+            source: Video dosyası, görüntü dizini veya kayıt dizini
+            width: Kare genişliği (None ise kaynağın boyutu kullanılır)
+            height: Kare yüksekliği (None ise kaynağın boyutu kullanılır)
+            fps: fixed modunda oynatma hızı; dizinlerde zaman damgası aralığı
+                 (None ise kaynağın kare hızı)
+            pacing: Hız modu (realtime, fixed, fast, step)
+            loop: True ise kaynak sonunda başa dönülür
+            buffer_slots: Kare halka tamponundaki yuva sayısı
+            shared_memory: True ise kareler paylaşımlı bellekte tutulur
+
+        Raises:
+            ValueError: Hız modu geçersizse
+        """
+        if pacing not in PACING_MODES:
+            raise ValueError(f"Geçersiz oynatma hızı modu: {pacing} ({', '.join(PACING_MODES)})")
+
+        super().__init__(source, width or 0, height or 0, fps or 0, buffer_slots, shared_memory)
+
+        self.source = source
+        self.pacing = pacing
+        self.loop = loop
+        self.output_size = (width, height) if width and height else None
+
+        # Adım modunda karelerin yaşı tüketiciye bağlıdır
+        if pacing == "step":
+            self.stale_frame_timeout = None
+
+        # Kaynak durumu: video için self.camera (VideoCapture), dizinler için dosya listesi
+        self.kind = None
+        self.entries = []
+        self.source_fps = 0.0
+        self.position = 0
+        self.passes = 0
+        self.pass_frames = 0
+
+        # Tampon yuvası başına kaynağın özgün zaman damgası
+        self.source_timestamps = np.zeros(buffer_slots, dtype=np.float64)
+        self.source_sequences = np.zeros(buffer_slots, dtype=np.int64)
+        self.last_source_timestamp = 0.0
+
+        # İstatistikler
+        self.frames_published = 0
+        self.dropped_frames = 0
+        self.finished = threading.Event()
+
+        # Logger
+        self.logger = logging.getLogger("ReplayCamera")
+
+    def _open_source(self) -> bool:
+        """
+        Kaynağı açar ve türünü belirler.
+
+        Returns:
+            bool: Kaynak açıldıysa True
+        """
+        if os.path.isdir(self.source):
+            index_path = os.path.join(self.source, RECORDING_INDEX)
+
+            if os.path.exists(index_path):
+                with open(index_path, newline="", encoding="utf-8") as f:
+                    self.entries = [(os.path.join(self.source, row["file"]), float(row["timestamp"]))
+                                    for row in csv.DictReader(f)]
+                self.kind = "recording"
+
+                if len(self.entries) > 1:
+                    duration = self.entries[-1][1] - self.entries[0][1]
+                    self.source_fps = (len(self.entries) - 1) / duration if duration > 0 else CAMERA_FPS
+                else:
+                    self.source_fps = CAMERA_FPS
+            else:
+                names = sorted(n for n in os.listdir(self.source) if n.lower().endswith(IMAGE_EXTENSIONS))
+                self.source_fps = self.fps or CAMERA_FPS
+                self.entries = [(os.path.join(self.source, name), i / self.source_fps)
+                                for i, name in enumerate(names)]
+                self.kind = "images"
+
+            if not self.entries:
+                self.logger.error(f"Oynatılacak kare bulunamadı: {self.source}")
+                return False
+
+        elif os.path.isfile(self.source):
+            self.camera = cv2.VideoCapture(self.source)
+            if not self.camera.isOpened():
+                self.logger.error(f"Video açılamadı: {self.source}")
+                self.camera = None
+                return False
+
+            self.source_fps = self.camera.get(cv2.CAP_PROP_FPS) or CAMERA_FPS
+            self.kind = "video"
+
+        else:
+            self.logger.error(f"Oynatma kaynağı bulunamadı: {self.source}")
+            return False
+
+        if not self.fps:
+            self.fps = self.source_fps
+
+        self.logger.info(f"Oynatma kaynağı açıldı: {self.source} ({self.kind}, {self.source_fps:.1f} FPS, "
+                         f"{self.pacing})")
+        return True
+
+    def _rewind(self) -> bool:
+        """
+        Kaynak sonunda başa döner (loop kapalıysa False döndürür).
+        """
+        if not self.loop:
+            return False
+
+        if self.kind == "video":
+            self.camera.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        self.position = 0
+        self.passes += 1
+        self.pass_frames = 0
+        return True
+
+    def _read_next(self) -> Tuple[bool, Optional[np.ndarray], float]:
+        """
+        Kaynaktan bir sonraki kareyi okur.
+
+        Returns:
+            Tuple[bool, Optional[np.ndarray], float]: (başarı, kare, kaynak zaman damgası)
+        """
+        while True:
+            if self.kind == "video":
+                ret, frame = self.camera.read()
+                if ret and frame is not None:
+                    timestamp = self.camera.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                    if timestamp <= 0 and self.position > 0:
+                        timestamp = self.position / self.source_fps
+                    self.position += 1
+                    self.pass_frames += 1
+                    return True, frame, timestamp
+
+            elif self.position < len(self.entries):
+                path, timestamp = self.entries[self.position]
+                self.position += 1
+                frame = cv2.imread(path)
+                if frame is not None:
+                    self.pass_frames += 1
+                    return True, frame, timestamp
+                self.logger.warning(f"Kare okunamadı, atlanıyor: {path}")
+                continue
+
+            # Kaynak sonu (bu geçişte hiç kare okunamadıysa başa dönmek anlamsız)
+            if self.pass_frames == 0 or not self._rewind():
+                return False, None, 0.0
+
+    def _publish(self, frame: np.ndarray, source_timestamp: float) -> int:
+        """
+        Kareyi halka tampona yazar (gerekirse yeniden boyutlandırarak).
+
+        Args:
+            frame: Kare
+            source_timestamp: Kaynağın özgün zaman damgası
+
+        Returns:
+            int: Karenin sıra numarası
+        """
+        if self.output_size is not None:
+            shape = (self.output_size[1], self.output_size[0]) + frame.shape[2:]
+        else:
+            shape = frame.shape
+
+        frame_buffer = self._ensure_buffer(shape)
+        timestamp = time.time()
+
+        if shape != frame.shape:
+            cv2.resize(frame, self.output_size, dst=frame_buffer.begin_write(), interpolation=cv2.INTER_AREA)
+            seq = frame_buffer.commit_write(timestamp)
+        else:
+            seq = frame_buffer.write(frame, timestamp)
+
+        slot = seq % self.buffer_slots
+        self.source_timestamps[slot] = source_timestamp
+        self.source_sequences[slot] = seq
+
+        self.height, self.width = shape[:2]
+        self.last_source_timestamp = source_timestamp
+        self.last_timestamp = timestamp
+        self.frames_published += 1
+        tracer.begin(seq, timestamp)
+
+        return seq
+
+    def initialize(self) -> bool:
+        """
+        Kaynağı açar ve oynatmayı başlatır. Adım modunda yalnızca ilk kare yayınlanır.
+
+        Returns:
+            bool: Başlatma başarılı ise True
+        """
+        if not self._open_source():
+            return False
+
+        self.running = True
+        self.finished.clear()
+
+        if self.pacing == "step":
+            return self.step()
+
+        self.capture_thread = threading.Thread(target=self._replay_loop)
+        self.capture_thread.daemon = True
+        self.capture_thread.start()
+
+        return True
+
+    def step(self) -> bool:
+        """
+        Bir sonraki kareyi çağıran iş parçacığında okuyup yayınlar (step modu).
+
+        Returns:
+            bool: Kare yayınlandıysa True, kaynak bittiyse False
+        """
+        if not self.running:
+            return False
+
+        ret, frame, source_timestamp = self._read_next()
+        if not ret:
+            self._finish()
+            return False
+
+        self._publish(frame, source_timestamp)
+        return True
+
+    def _replay_loop(self):
+        """
+        Kareleri seçilen hıza göre yayınlayan döngü (arka plan iş parçacığı).
+        """
+        interval = 1.0 / self.fps if self.fps else 0.0
+        anchor = None
+        anchor_pass = -1
+        next_due = time.time()
+
+        while self.running:
+            try:
+                ret, frame, source_timestamp = self._read_next()
+                if not ret:
+                    break
+
+                if self.pacing == "realtime":
+                    # Her geçişte kaynak zamanı duvar saatine yeniden bağlanır
+                    if anchor is None or anchor_pass != self.passes:
+                        anchor = (max(time.time(), next_due), source_timestamp)
+                        anchor_pass = self.passes
+
+                    due = anchor[0] + (source_timestamp - anchor[1])
+                    delay = due - time.time()
+                    if delay > 0:
+                        time.sleep(delay)
+                    elif -delay > 1.0 / self.source_fps:
+                        # Bir kareden fazla geride: canlı kamera gibi kareyi atla
+                        self.dropped_frames += 1
+                        continue
+                    next_due = due + 1.0 / self.source_fps
+
+                elif self.pacing == "fixed":
+                    delay = next_due - time.time()
+                    if delay > 0:
+                        time.sleep(delay)
+                    next_due = max(next_due + interval, time.time())
+
+                self._publish(frame, source_timestamp)
+
+            except Exception as e:
+                self.logger.error(f"Oynatma hatası: {str(e)}")
+                time.sleep(0.1)
+
+        self._finish()
+
+    def _finish(self):
+        """
+        Kaynak sona erdiğinde oynatmayı bitirir.
+        """
+        if not self.finished.is_set():
+            self.logger.info(f"Oynatma tamamlandı: {self.frames_published} kare yayınlandı, "
+                             f"{self.dropped_frames} kare atlandı")
+        self.running = False
+        self.finished.set()
+
+    def wait_until_finished(self, timeout: float = None) -> bool:
+        """
+        Kaynağın sonuna kadar oynatılmasını bekler.
+
+        Args:
+            timeout: Maksimum bekleme süresi (saniye)
+
+        Returns:
+            bool: Oynatma bittiyse True
+        """
+        return self.finished.wait(timeout)
+
+    def get_source_timestamp(self, seq: int) -> Optional[float]:
+        """
+        Sıra numarasına ait karenin kaynaktaki özgün zaman damgasını döndürür.
+
+        Args:
+            seq: Kare sıra numarası
+
+        Returns:
+            Optional[float]: Zaman damgası veya kare artık tamponda değilse None
+        """
+        slot = seq % self.buffer_slots
+        if self.source_sequences[slot] != seq:
+            return None
+        return float(self.source_timestamps[slot])
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Oynatma istatistiklerini döndürür.
+
+        Returns:
+            Dict[str, Any]: Kaynak türü, yayınlanan/atlanan kare sayısı, geçiş sayısı ve durum
+        """
+        return {
+            "source": self.source,
+            "kind": self.kind,
+            "pacing": self.pacing,
+            "frames_published": self.frames_published,
+            "dropped_frames": self.dropped_frames,
+            "passes": self.passes + 1,
+            "finished": self.finished.is_set()
+        }
+
+    def is_working(self) -> bool:
+        """
+        Oynatmanın sürüp sürmediğini kontrol eder (kaynak bittiğinde False).
+
+        Returns:
+            bool: Oynatma sürüyorsa True
+        """
+        return self.running and not self.finished.is_set()
+
+
+class FrameRecorder:
+    """
+    Kamera karelerini yakalama zamanlarıyla birlikte ReplayCamera'nın
+    oynatabileceği kayıt dizinine yazan sınıf.
+    """
+
+    def __init__(self, camera, path: str, image_format: str = RECORDING_IMAGE_FORMAT):
+        """
+        FrameRecorder sınıfını başlatır.
+
+        Args:
+            camera: Kaydedilecek kamera (Camera veya get_frame sunan kamera)
+            path: Kayıt dizini
+            image_format: Kare dosya biçimi (png: kayıpsız, jpg: küçük)
+        """
+        self.camera = camera
+        self.path = path
+        self.image_format = image_format.lstrip(".").lower()
+
+        self.running = False
+        self.record_thread = None
+        self.index_file = None
+        self.writer = None
+
+        self.last_seq = 0
+        self.frames_recorded = 0
+        self.dropped_frames = 0
+
+        # Yeni kare yoklama aralığı (kare süresinin yarısı)
+        self.poll_interval = 0.5 / (getattr(camera, "fps", 0) or CAMERA_FPS)
+
+        # Logger
+        self.logger = logging.getLogger("FrameRecorder")
+
+    def start(self) -> bool:
+        """
+        Kayıt dizinini hazırlar ve kaydı başlatır.
+
+        Returns:
+            bool: Kayıt başladıysa True
+        """
+        if self.running:
+            return True
+
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            self.index_file = open(os.path.join(self.path, RECORDING_INDEX), "w", newline="", encoding="utf-8")
+        except OSError as e:
+            self.logger.error(f"Kayıt dizini hazırlanamadı: {str(e)}")
+            return False
+
+        self.writer = csv.writer(self.index_file)
+        self.writer.writerow(["index", "file", "timestamp", "seq"])
+
+        self.running = True
+        self.record_thread = threading.Thread(target=self._record_loop)
+        self.record_thread.daemon = True
+        self.record_thread.start()
+
+        self.logger.info(f"Kayıt başlatıldı: {self.path}")
+        return True
+
+    def _next_frame(self) -> Tuple[Optional[np.ndarray], float, int]:
+        """
+        Henüz kaydedilmemiş en yeni kareyi alır.
+
+        Returns:
+            Tuple[Optional[np.ndarray], float, int]: (kare kopyası, yakalama zamanı, sıra numarası) -
+            yeni kare yoksa kare None
+        """
+        frame_buffer = getattr(self.camera, "frame_buffer", None)
+
+        if frame_buffer is None:
+            # Halka tamponu olmayan kameralar: yoklama anındaki kare
+            ret, frame = self.camera.get_frame()
+            return (frame if ret else None), time.time(), 0
+
+        seq = frame_buffer.latest_sequence()
+        if seq == self.last_seq:
+            return None, 0.0, 0
+
+        view, timestamp = frame_buffer.get(seq)
+        if view is None:
+            return None, 0.0, 0
+        frame = view.copy()
+
+        # Kopyalama sırasında yuvanın üzerine yazıldıysa bir sonraki turda tekrar dene
+        if not frame_buffer.is_valid(seq):
+            return None, 0.0, 0
+
+        if self.last_seq and seq - self.last_seq > 1:
+            self.dropped_frames += seq - self.last_seq - 1
+        self.last_seq = seq
+        return frame, timestamp, seq
+
+    def _record_loop(self):
+        """
+        Yeni kareleri diske yazan döngü (arka plan iş parçacığı).
+        """
+        while self.running:
+            try:
+                frame, timestamp, seq = self._next_frame()
+                if frame is None:
+                    time.sleep(self.poll_interval)
+                    continue
+
+                name = f"{self.frames_recorded:06d}.{self.image_format}"
+                if not cv2.imwrite(os.path.join(self.path, name), frame):
+                    self.logger.error(f"Kare yazılamadı: {name}")
+                    continue
+
+                self.writer.writerow([self.frames_recorded, name, f"{timestamp:.6f}", seq])
+                self.frames_recorded += 1
+
+            except Exception as e:
+                self.logger.error(f"Kayıt hatası: {str(e)}")
+                time.sleep(0.1)
+
+    def stop(self):
+        """
+        Kaydı durdurur ve kare dizinini kapatır.
+        """
+        if not self.running:
+            return
+
+        self.running = False
+        if self.record_thread and self.record_thread.is_alive():
+            self.record_thread.join(timeout=2.0)
+
+        if self.index_file is not None:
+            self.index_file.close()
+            self.index_file = None
+
+        self.logger.info(f"Kayıt durduruldu: {self.frames_recorded} kare, {self.dropped_frames} kare atlandı")
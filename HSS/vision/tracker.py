@@ -0,0 +1,683 @@
+"""
+Dedektör kareleri arasında hedefleri izleyen hafif çoklu nesne takip modülü.
+IoU ile eşleştirme ve iz başına sabit hızlı Kalman durumu kullanır; YOLO yalnızca
+her N karede bir veya iz güveni düştüğünde çalıştırılır.
+"""
+
+import time
+import logging
+import numpy as np
+from typing import List, Dict, Any, Optional, Tuple
+
+from config import (CAMERA_FPS, TRACKER_DETECT_INTERVAL, TRACKER_MIN_CONFIDENCE, TRACKER_CONFIDENCE_DECAY,
+                    TRACKER_IOU_THRESHOLD, TRACKER_MAX_MISSES, USE_ROI_DETECTION, YOLO_ROI_INPUT_SIZE,
+                    YOLO_ROI_SCALE, YOLO_ROI_MAX_AREA, YOLO_FULL_SCAN_INTERVAL)
+from vision.detector_pool import STALE_RESULT
+
+
+# Sabit hızlı model: durum [cx, cy, w, h, vcx, vcy, vw, vh], ölçüm [cx, cy, w, h].
+# Hızlar ve süreç gürültüsü bir kamera karesi süresi (1 / CAMERA_FPS) içindir;
+# tahmin adımı karelerin zaman damgası farkıyla ölçeklenir.
+_FRAME_INTERVAL = 1.0 / CAMERA_FPS
+_MAX_PREDICT_INTERVAL = 1.0   # Bundan uzun aralıklar (duraklatma, kesinti) tek adımda bu kadar sayılır
+_H = np.eye(4, 8)
+_Q = np.diag([1.0, 1.0, 1.0, 1.0, 0.5, 0.5, 0.1, 0.1])
+_R = np.diag([4.0, 4.0, 16.0, 16.0])
+_P0 = np.diag([10.0, 10.0, 10.0, 10.0, 1000.0, 1000.0, 1000.0, 1000.0])
+
+
+def _transition(steps: float) -> np.ndarray:
+    """
+    Verilen kare sayısı kadar ileri taşıyan durum geçiş matrisini döndürür.
+
+    Args:
+        steps: Kare süresi cinsinden adım (kesirli olabilir)
+
+    Returns:
+        np.ndarray: (8, 8) geçiş matrisi
+    """
+    transition = np.eye(8)
+    transition[:4, 4:] = steps * np.eye(4)
+    return transition
+
+
+def box_iou(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+    """
+    İki kutu kümesi arasındaki IoU matrisini hesaplar.
+
+    Args:
+        boxes_a: (N, 4) boyutlu (x, y, w, h) kutular
+        boxes_b: (M, 4) boyutlu (x, y, w, h) kutular
+
+    Returns:
+        np.ndarray: (N, M) boyutlu IoU matrisi
+    """
+    ax1, ay1 = boxes_a[:, 0:1], boxes_a[:, 1:2]
+    ax2, ay2 = ax1 + boxes_a[:, 2:3], ay1 + boxes_a[:, 3:4]
+    bx1, by1 = boxes_b[:, 0], boxes_b[:, 1]
+    bx2, by2 = bx1 + boxes_b[:, 2], by1 + boxes_b[:, 3]
+
+    inter_w = np.clip(np.minimum(ax2, bx2) - np.maximum(ax1, bx1), 0, None)
+    inter_h = np.clip(np.minimum(ay2, by2) - np.maximum(ay1, by1), 0, None)
+    inter = inter_w * inter_h
+
+    area_a = boxes_a[:, 2:3] * boxes_a[:, 3:4]
+    area_b = boxes_b[:, 2] * boxes_b[:, 3]
+    union = area_a + area_b - inter
+
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def merge_rois(rois: List[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+    """
+    Örtüşen bölgeleri kapsayan tek bir bölgede birleştirir.
+    Birleşik bölgeler örtüşmediği için aynı hedef iki kez tespit edilmez.
+
+    Args:
+        rois: (x, y, w, h) bölgeleri
+
+    Returns:
+        List[Tuple[int, int, int, int]]: Örtüşmeyen bölgeler
+    """
+    merged = [list(roi) for roi in rois]
+
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                ax, ay, aw, ah = merged[i]
+                bx, by, bw, bh = merged[j]
+                if ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah:
+                    x1, y1 = min(ax, bx), min(ay, by)
+                    x2, y2 = max(ax + aw, bx + bw), max(ay + ah, by + bh)
+                    merged[i] = [x1, y1, x2 - x1, y2 - y1]
+                    del merged[j]
+                    changed = True
+                    break
+            if changed:
+                break
+
+    return [tuple(roi) for roi in merged]
+
+
+class Track:
+    """
+    Tek bir hedefin Kalman durumu ve son tespit bilgisi.
+    """
+
+    def __init__(self, track_id: int, detection: Dict[str, Any]):
+        """
+        Track sınıfını başlatır.
+
+        Args:
+            track_id: Kalıcı iz numarası
+            detection: İzi başlatan tespit
+        """
+        self.track_id = track_id
+        self.detection = dict(detection)
+        self.confidence = float(detection.get("confidence", 0.0))
+
+        x, y, w, h = detection["box"]
+        self.state = np.array([x + w / 2, y + h / 2, w, h, 0, 0, 0, 0], dtype=np.float64)
+        self.covariance = _P0.copy()
+
+        self.hits = 1
+        self.misses = 0
+        self.updated = True
+
+    @property
+    def box(self) -> Tuple[float, float, float, float]:
+        """
+        İzin tahmini kutusunu (x, y, w, h) döndürür.
+        """
+        cx, cy, w, h = self.state[:4]
+        return cx - w / 2, cy - h / 2, w, h
+
+    def predict(self, steps: float = 1.0):
+        """
+        Durumu verilen kare süresi kadar ileri taşır ve güveni azaltır.
+
+        Args:
+            steps: Kare süresi cinsinden geçen zaman
+        """
+        transition = _transition(steps)
+        self.state = transition @ self.state
+        self.state[2:4] = np.maximum(self.state[2:4], 1.0)
+        self.covariance = transition @ self.covariance @ transition.T + _Q * steps
+        self.confidence *= TRACKER_CONFIDENCE_DECAY ** steps
+        self.updated = False
+
+    def update(self, detection: Dict[str, Any]):
+        """
+        Durumu yeni tespitle düzeltir.
+
+        Args:
+            detection: İzle eşleşen tespit
+        """
+        x, y, w, h = detection["box"]
+        measurement = np.array([x + w / 2, y + h / 2, w, h], dtype=np.float64)
+
+        innovation = measurement - _H @ self.state
+        s = _H @ self.covariance @ _H.T + _R
+        gain = self.covariance @ _H.T @ np.linalg.inv(s)
+        self.state = self.state + gain @ innovation
+        self.covariance = (np.eye(8) - gain @ _H) @ self.covariance
+
+        self.detection = dict(detection)
+        self.confidence = float(detection.get("confidence", 0.0))
+        self.hits += 1
+        self.misses = 0
+        self.updated = True
+
+
+class MultiObjectTracker:
+    """
+    IoU eşleştirmeli çoklu nesne takipçisi.
+    """
+
+    def __init__(self, iou_threshold: float = TRACKER_IOU_THRESHOLD, max_misses: int = TRACKER_MAX_MISSES):
+        """
+        MultiObjectTracker sınıfını başlatır.
+
+        Args:
+            iou_threshold: Eşleştirme için minimum IoU
+            max_misses: İz silinmeden önce kaçırılabilecek tespit turu sayısı
+        """
+        self.iou_threshold = iou_threshold
+        self.max_misses = max_misses
+
+        self.tracks: List[Track] = []
+        self.next_track_id = 1
+
+        # Logger
+        self.logger = logging.getLogger("MultiObjectTracker")
+
+    def predict(self, steps: float = 1.0):
+        """
+        Tüm izleri verilen kare süresi kadar ileri taşır.
+
+        Args:
+            steps: Kare süresi cinsinden geçen zaman
+        """
+        for track in self.tracks:
+            track.predict(steps)
+
+    def update(self, detections: List[Dict[str, Any]]):
+        """
+        Tespitleri izlerle eşleştirir, eşleşmeyenler için yeni iz açar.
+
+        Args:
+            detections: Dedektörden gelen tespitler
+        """
+        matched_tracks = set()
+        matched_detections = set()
+
+        if self.tracks and detections:
+            track_boxes = np.array([track.box for track in self.tracks], dtype=np.float64)
+            detection_boxes = np.array([d["box"] for d in detections], dtype=np.float64)
+            iou = box_iou(track_boxes, detection_boxes)
+
+            # Farklı sınıflar eşleşmesin
+            for ti, track in enumerate(self.tracks):
+                track_class = self._class_of(track.detection)
+                for di, detection in enumerate(detections):
+                    if self._class_of(detection) != track_class:
+                        iou[ti, di] = 0.0
+
+            # Açgözlü eşleştirme: en yüksek IoU'dan başla
+            for flat_index in np.argsort(iou, axis=None)[::-1]:
+                ti, di = np.unravel_index(flat_index, iou.shape)
+                if iou[ti, di] < self.iou_threshold:
+                    break
+                if ti in matched_tracks or di in matched_detections:
+                    continue
+
+                self.tracks[ti].update(detections[di])
+                matched_tracks.add(ti)
+                matched_detections.add(di)
+
+        # Eşleşmeyen izler
+        for ti, track in enumerate(self.tracks):
+            if ti not in matched_tracks:
+                track.misses += 1
+
+        self.tracks = [track for track in self.tracks if track.misses <= self.max_misses]
+
+        # Eşleşmeyen tespitler için yeni izler
+        for di, detection in enumerate(detections):
+            if di not in matched_detections:
+                self.tracks.append(Track(self.next_track_id, detection))
+                self.next_track_id += 1
+
+    def min_confidence(self) -> float:
+        """
+        İzler arasındaki en düşük güven değerini döndürür (iz yoksa 1.0).
+        """
+        if not self.tracks:
+            return 1.0
+        return min(track.confidence for track in self.tracks)
+
+    def get_detections(self, frame_shape: Tuple[int, ...]) -> List[Dict[str, Any]]:
+        """
+        İzleri YoloDetector.detect formatında tespit listesine dönüştürür.
+        Kutular görüntü sınırlarına kırpılır, tamamen dışarı çıkan izler silinir.
+
+        Args:
+            frame_shape: Görüntü boyutu
+
+        Returns:
+            List[Dict[str, Any]]: track_id ve predicted anahtarları eklenmiş tespitler
+        """
+        height, width = frame_shape[:2]
+        detections = []
+        visible_tracks = []
+
+        for track in self.tracks:
+            x, y, w, h = track.box
+            x1 = int(max(0, x))
+            y1 = int(max(0, y))
+            x2 = int(min(width, x + w))
+            y2 = int(min(height, y + h))
+            if x2 - x1 < 2 or y2 - y1 < 2:
+                continue
+
+            visible_tracks.append(track)
+
+            detection = dict(track.detection)
+            detection["box"] = (x1, y1, x2 - x1, y2 - y1)
+            detection["center"] = (x1 + (x2 - x1) // 2, y1 + (y2 - y1) // 2)
+            detection["confidence"] = track.confidence
+            detection["track_id"] = track.track_id
+            detection["predicted"] = not track.updated
+            detections.append(detection)
+
+        self.tracks = visible_tracks
+        return detections
+
+    def reset(self):
+        """
+        Tüm izleri siler.
+        """
+        self.tracks = []
+
+    @staticmethod
+    def _class_of(detection: Dict[str, Any]) -> Optional[str]:
+        """
+        Tespitin sınıf adını döndürür.
+        """
+        return detection.get("class_name", detection.get("class"))
+
+
+class TrackingDetector:
+    """
+    YoloDetector üzerine takip katmanı.
+
+    detect() her karede çağrılabilir: izler ucuz şekilde ileri taşınır, ağ yalnızca
+    her detect_interval karede bir veya iz güveni min_confidence altına düştüğünde
+    çalıştırılır. İz varken ağ yalnızca tahmin edilen hedef konumları çevresindeki
+    bölgelerde (ROI) çalışır; yeni hedefler için belirli aralıklarla tam kare taranır.
+    Diğer metotlar sarılan dedektöre yönlendirilir.
+    """
+
+    def __init__(self, detector, detect_interval: int = TRACKER_DETECT_INTERVAL,
+                 min_confidence: float = TRACKER_MIN_CONFIDENCE,
+                 tracker: Optional[MultiObjectTracker] = None, use_roi: bool = USE_ROI_DETECTION,
+                 roi_input_size: int = YOLO_ROI_INPUT_SIZE, full_scan_interval: int = YOLO_FULL_SCAN_INTERVAL):
+        """
+        TrackingDetector sınıfını başlatır.
+
+        Args:
+            detector: Sarılan dedektör (YoloDetector veya DetectorPool)
+            detect_interval: Ağın çalıştırılacağı kare aralığı
+            min_confidence: Bu değerin altına düşen iz varsa ağ hemen çalıştırılır
+            tracker: Kullanılacak takipçi (None ise yeni oluşturulur)
+            use_roi: İz çevresinde bölgesel tespit kullanılsın mı
+            roi_input_size: Bölgesel tespitte YOLO giriş boyutu
+            full_scan_interval: Kaç YOLO turunda bir tam kare taranacağı
+        """
+        self.detector = detector
+        self.detect_interval = max(1, detect_interval)
+        self.min_confidence = min_confidence
+        self.tracker = tracker or MultiObjectTracker()
+
+        # Bölgesel tespit
+        self.use_roi = use_roi and hasattr(detector, "detect_roi")
+        self.roi_input_size = roi_input_size
+        self.full_scan_interval = max(1, full_scan_interval)
+        self.rounds_since_full_scan = 0
+
+        self.frames_since_detection = self.detect_interval
+        self.force_detection = False
+
+        # Son işlenen karenin zaman damgası (tahmin adımı bu farkla ölçeklenir)
+        self.last_frame_time = None
+
+        # İstatistikler
+        self.frame_count = 0
+        self.network_count = 0
+        self.roi_round_count = 0
+
+        # Logger
+        self.logger = logging.getLogger("TrackingDetector")
+
+    def initialize(self) -> bool:
+        """
+        Sarılan dedektörü başlatır.
+
+        Returns:
+            bool: Başlatma başarılı ise True
+        """
+        self.tracker.reset()
+        self.last_frame_time = None
+        return self.detector.initialize()
+
+    @property
+    def confidence_threshold(self) -> float:
+        """
+        Sarılan dedektörün güven eşiği (arayüzden değiştirilebilir).
+        """
+        return self.detector.confidence_threshold
+
+    @confidence_threshold.setter
+    def confidence_threshold(self, value: float):
+        self.detector.confidence_threshold = value
+
+    def request_detection(self):
+        """
+        Bir sonraki karede ağın çalıştırılmasını ister.
+        """
+        self.force_detection = True
+
+    def _needs_detection(self) -> bool:
+        """
+        Bu karede ağın çalıştırılıp çalıştırılmayacağını belirler.
+        """
+        return (self.force_detection or
+                self.frames_since_detection >= self.detect_interval or
+                self.tracker.min_confidence() < self.min_confidence)
+
+    def detect(self, frame: np.ndarray, timestamp: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Verilen görüntüdeki hedefleri döndürür (YoloDetector.detect ile aynı format).
+
+        İzler önceki kareden bu yana geçen süre kadar ileri taşınır; bu yüzden
+        hareket modeli detect() çağrı sıklığına bağlı değildir.
+
+        Args:
+            frame: İşlenecek görüntü
+            timestamp: Karenin yakalanma zamanı (None ise çağrı zamanı)
+
+        Returns:
+            List[Dict[str, Any]]: Tespitler (track_id ve predicted anahtarları ile).
+            predicted=True olan tespitler bu karede ölçülmemiş, tahmin edilmiş izlerdir.
+        """
+        if frame is None:
+            self.logger.error("Boş görüntü")
+            return []
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        self.frame_count += 1
+        self.frames_since_detection += 1
+        self.tracker.predict(self._predict_steps(timestamp))
+
+        if self._needs_detection():
+            self.tracker.update(self._run_detector(frame))
+            self.frames_since_detection = 0
+            self.force_detection = False
+            self.network_count += 1
+
+        return self.tracker.get_detections(frame.shape)
+
+    def _predict_steps(self, timestamp: float) -> float:
+        """
+        Önceki kareden bu yana geçen süreyi kare süresi cinsinden döndürür.
+
+        Args:
+            timestamp: Karenin yakalanma zamanı
+
+        Returns:
+            float: Tahmin adımı (ilk karede 1, aynı veya daha eski karede 0)
+        """
+        previous, self.last_frame_time = self.last_frame_time, timestamp
+        if previous is None:
+            return 1.0
+
+        elapsed = min(max(0.0, timestamp - previous), _MAX_PREDICT_INTERVAL)
+        return elapsed / _FRAME_INTERVAL
+
+    def _get_rois(self, frame_shape: Tuple[int, ...]) -> Optional[List[Tuple[int, int, int, int]]]:
+        """
+        Tahmin edilen iz konumları çevresindeki kare bölgeleri hesaplar.
+
+        Args:
+            frame_shape: Görüntü boyutu
+
+        Returns:
+            Optional[List[Tuple[int, int, int, int]]]: Bölgeler veya tam kare taranmalıysa None
+        """
+        if not self.tracker.tracks:
+            return None
+
+        height, width = frame_shape[:2]
+        rois = []
+
+        for track in self.tracker.tracks:
+            x, y, w, h = track.box
+            # Kare bölge: YOLO girişi kare olduğu için en-boy oranı bozulmaz
+            side = int(min(max(max(w, h) * YOLO_ROI_SCALE, self.roi_input_size), width, height))
+            cx, cy = x + w / 2, y + h / 2
+            x1 = int(min(max(0, cx - side / 2), width - side))
+            y1 = int(min(max(0, cy - side / 2), height - side))
+            rois.append((x1, y1, side, side))
+
+        rois = merge_rois(rois)
+
+        # Bölgeler karenin büyük kısmını kaplıyorsa tam kare taraması daha ucuz
+        if sum(w * h for _, _, w, h in rois) > YOLO_ROI_MAX_AREA * width * height:
+            return None
+
+        return rois
+
+    def _run_detector(self, frame: np.ndarray) -> List[Dict[str, Any]]:
+        """
+        Ağı iz bölgelerinde veya tam karede çalıştırır.
+
+        Args:
+            frame: İşlenecek görüntü
+
+        Returns:
+            List[Dict[str, Any]]: Tespitler
+        """
+        rois = self._plan_rois(frame.shape)
+        if rois is None:
+            return self.detector.detect(frame)
+        return self._detect_rois(frame, rois)
+
+    def _plan_rois(self, frame_shape: Tuple[int, ...]) -> Optional[List[Tuple[int, int, int, int]]]:
+        """
+        Bu YOLO turunun bölgesel mi tam kare mi olacağını belirler ve tur sayaçlarını günceller.
+
+        Args:
+            frame_shape: Görüntü boyutu
+
+        Returns:
+            Optional[List[Tuple[int, int, int, int]]]: Bölgeler veya tam kare taranmalıysa None
+        """
+        rois = None
+        if self.use_roi and self.rounds_since_full_scan < self.full_scan_interval - 1:
+            rois = self._get_rois(frame_shape)
+
+        if rois is None:
+            self.rounds_since_full_scan = 0
+            return None
+
+        self.rounds_since_full_scan += 1
+        self.roi_round_count += 1
+        return rois
+
+    def _detect_rois(self, frame: np.ndarray, rois: List[Tuple[int, int, int, int]]) -> List[Dict[str, Any]]:
+        """
+        Ağı verilen bölgelerde çalıştırır.
+
+        Args:
+            frame: İşlenecek görüntü
+            rois: (x, y, w, h) bölgeleri
+
+        Returns:
+            List[Dict[str, Any]]: Tespitler (tam görüntü koordinatlarında)
+        """
+        # Birden fazla bölge tek ileri yayılımda işlenir
+        if len(rois) > 1 and hasattr(self.detector, "detect_batch"):
+            crops = [frame[y:y + h, x:x + w] for x, y, w, h in rois]
+            offsets = [(x, y) for x, y, _, _ in rois]
+            results = self.detector.detect_batch(crops, self.roi_input_size, offsets)
+            return [detection for detections in results for detection in detections]
+
+        detections = []
+        for roi in rois:
+            detections.extend(self.detector.detect_roi(frame, roi, self.roi_input_size))
+        return detections
+
+    def get_tracker_stats(self) -> Dict[str, Any]:
+        """
+        Takip istatistiklerini döndürür.
+
+        Returns:
+            Dict[str, Any]: Kare sayısı, ağ çalıştırma sayısı ve aktif iz sayısı
+        """
+        return {
+            "frame_count": self.frame_count,
+            "network_count": self.network_count,
+            "roi_round_count": self.roi_round_count,
+            "network_ratio": self.network_count / self.frame_count if self.frame_count else 0.0,
+            "active_tracks": len(self.tracker.tracks)
+        }
+
+    def __getattr__(self, name):
+        """
+        Takip dışındaki metotları sarılan dedektöre yönlendirir.
+        Havuzun ardışık hat metotları yönlendirilmez; her kare takipçiden geçmelidir
+        (havuz için PooledTrackingDetector kullanılır).
+        """
+        if name in ("detector", "submit", "collect", "cancel"):
+            raise AttributeError(name)
+        return getattr(self.detector, name)
+
+
+class PooledTrackingDetector(TrackingDetector):
+    """
+    DetectorPool üzerine ardışık hat destekli takip katmanı.
+
+    submit() tam kare taraması gereken kareleri hemen havuza gönderir; böylece
+    ardışık karelerin tam kare YOLO çıkarımları işlemlerde paralel yürür.
+    collect() kareleri gönderim sırasıyla takipçiden geçirir: izler karenin
+    zamanına taşınır, havuz sonucu (veya bölgesel tespit) izlerle birleştirilir.
+    Bölgesel tespit güncel iz konumlarına ihtiyaç duyduğu için collect()
+    sırasında yapılır; bölgeler detect_batch ile işlemlere dağıtılır.
+
+    Tespit gerekip gerekmediği gönderimde, sonucu henüz alınmamış kareleri
+    bilmeden belirlenir; bu yüzden karar en fazla havuzdaki işlem sayısı kadar
+    kare gecikebilir.
+    """
+
+    def __init__(self, detector, **kwargs):
+        """
+        PooledTrackingDetector sınıfını başlatır.
+
+        Args:
+            detector: Sarılan DetectorPool
+            **kwargs: TrackingDetector parametreleri
+        """
+        super().__init__(detector, **kwargs)
+
+        # Gönderilen kareler: bilet -> (havuz bileti veya None, kare, zaman damgası, YOLO turu mu)
+        self.next_ticket = 1
+        self.submitted = {}
+
+    def submit(self, frame: np.ndarray, seq: Optional[int] = None, timestamp: Optional[float] = None) -> int:
+        """
+        Kareyi takip hattına gönderir; tam kare taraması gerekiyorsa havuza iletir.
+
+        Args:
+            frame: İşlenecek görüntü (bölgesel tespit ve iz kırpması için tutulur)
+            seq: Paylaşımlı tampondaki kare sıra numarası (havuz paylaşımlı bellek kullanıyorsa)
+            timestamp: Karenin yakalanma zamanı (None ise gönderim zamanı)
+
+        Returns:
+            int: Sonucu almak için kullanılacak bilet numarası
+        """
+        if timestamp is None:
+            timestamp = time.time()
+
+        self.frame_count += 1
+        self.frames_since_detection += 1
+
+        pool_ticket = None
+        network = self._needs_detection()
+        if network:
+            self.frames_since_detection = 0
+            self.force_detection = False
+            self.network_count += 1
+
+            # Bölgesel tur iz konumlarına bağlıdır ve collect() sırasında yapılır
+            full_scan = (not self.use_roi or not self.tracker.tracks or
+                         self.rounds_since_full_scan >= self.full_scan_interval - 1)
+            if full_scan:
+                self.rounds_since_full_scan = 0
+                if seq and self.detector.uses_shared_frames:
+                    pool_ticket = self.detector.submit(seq=seq)
+                else:
+                    pool_ticket = self.detector.submit(frame)
+
+        ticket = self.next_ticket
+        self.next_ticket += 1
+        self.submitted[ticket] = (pool_ticket, frame, timestamp, network)
+        return ticket
+
+    def collect(self, ticket: int, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        Karenin takip sonucunu alır. Biletler gönderim sırasıyla alınmalıdır.
+
+        Args:
+            ticket: submit() ile alınan bilet numarası
+            timeout: Havuz sonucu için zaman aşımı (None ise havuzun result_timeout değeri)
+
+        Returns:
+            Optional[List[Dict[str, Any]]]: Tespitler (track_id ve predicted anahtarları ile),
+            havuz sonucu gelmediyse None (bilet bekler durumda kalır); paylaşımlı tampondaki
+            kare üzerine yazıldıysa STALE_RESULT (izler bu kareyle güncellenmez)
+        """
+        pool_ticket, frame, timestamp, network = self.submitted[ticket]
+
+        detections = None
+        if pool_ticket is not None:
+            detections = self.detector.collect(pool_ticket, timeout)
+            if detections is None:
+                return None
+            if detections is STALE_RESULT:
+                del self.submitted[ticket]
+                return STALE_RESULT
+
+        del self.submitted[ticket]
+        self.tracker.predict(self._predict_steps(timestamp))
+
+        if network:
+            if detections is None:
+                detections = self._run_detector(frame)
+            self.tracker.update(detections)
+
+        return self.tracker.get_detections(frame.shape)
+
+    def cancel(self, ticket: int):
+        """
+        Sonucu artık beklenmeyen kareyi bırakır; izler bu kareyle güncellenmez.
+
+        Args:
+            ticket: submit() ile alınan bilet numarası
+        """
+        entry = self.submitted.pop(ticket, None)
+        if entry is not None and entry[0] is not None:
+            self.detector.cancel(entry[0])
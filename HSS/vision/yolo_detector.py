@@ -8,14 +8,48 @@ import numpy as np
 import logging
 import time
 import os
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple, Optional
 
+from config import YOLO_INPUT_SIZE, YOLO_ROI_INPUT_SIZE, LOW_PERFORMANCE_MODE, YOLO_DETECTION_CLASSES
+from vision.color_classifier import ColorClassifier
+
+
+@lru_cache(maxsize=256)
+def _text_width(text: str, font_scale: float, thickness: int) -> int:
+    """
+    Metnin piksel genişliğini döndürür (önbellekli).
+    """
+    return cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)[0][0]
+
+
+def _label_width(label: str, font_scale: float, thickness: int) -> int:
+    """
+    "<etiket> <güven>" metninin piksel genişliğini döndürür.
+
+    Hershey yazı tipinde genişlik karakter genişliklerinin toplamıdır ve
+    rakamlar eşit genişliktedir; bu yüzden güven değeri önbellek anahtarına
+    girmez, yalnızca etiket ve sabit genişlikli " 0.00" soneki önbelleklenir.
+    """
+    return _text_width(label, font_scale, thickness) + _text_width(" 0.00", font_scale, thickness)
+
+
 class YoloDetector:
     """
     YOLOv4 tabanlı nesne tespiti yapan sınıf.
     """
     
-    def __init__(self, config_path: str, weights_path: str, confidence_threshold: float = 0.5, nms_threshold: float = 0.4):
+    # Seçilebilir DNN backend/hedef çiftleri (OpenCV sabit adlarıyla)
+    BACKENDS = {
+        "cpu": ("DNN_BACKEND_OPENCV", "DNN_TARGET_CPU"),
+        "opencl": ("DNN_BACKEND_OPENCV", "DNN_TARGET_OPENCL"),
+        "opencl_fp16": ("DNN_BACKEND_OPENCV", "DNN_TARGET_OPENCL_FP16"),
+        "cuda": ("DNN_BACKEND_CUDA", "DNN_TARGET_CUDA"),
+        "cuda_fp16": ("DNN_BACKEND_CUDA", "DNN_TARGET_CUDA_FP16")
+    }
+    
+    def __init__(self, config_path: str, weights_path: str, confidence_threshold: float = 0.5, nms_threshold: float = 0.4,
+                 input_size: Optional[int] = None, backend: str = "auto"):
         """
         YoloDetector sınıfını başlatır.
         
@@ -24,12 +58,18 @@ class YoloDetector:
             weights_path: YOLO ağırlık dosya yolu
             confidence_threshold: Tespit güven eşiği
             nms_threshold: NMS (Non-Maximum Suppression) eşiği
+            input_size: YOLO giriş boyutu (None ise YOLO_INPUT_SIZE)
+            backend: DNN backend'i ("auto" veya BACKENDS anahtarlarından biri)
         """
         self.config_path = config_path
         self.weights_path = weights_path
         self.confidence_threshold = confidence_threshold
         self.nms_threshold = nms_threshold
         
+        # Giriş boyutu (düşük performans modunda daha küçük)
+        self.input_size = input_size or (256 if LOW_PERFORMANCE_MODE else YOLO_INPUT_SIZE)
+        self.backend = backend
+        
         # Sınıf isimleri
         self.classes = [
             "balloon", "board_A", "board_B", "red_balloon", "blue_balloon",
@@ -67,6 +107,12 @@ class YoloDetector:
         self.net = None
         self.output_layers = []
         
+        # Öncelikli sınıf maskesi (ilk çözümlemede oluşturulur)
+        self._priority_mask = None
+        
+        # Renk sınıflandırıcı (arama tablosu bir kez oluşturulur)
+        self.color_classifier = ColorClassifier()
+        
         # Performans ölçümü
         self.last_inference_time = 0.0
         
@@ -98,6 +144,20 @@ class YoloDetector:
             # YOLO ağını yükle
             self.net = cv2.dnn.readNetFromDarknet(self.config_path, self.weights_path)
             
+            # Belirli bir backend istendiyse otomatik seçimi atla
+            if self.backend != "auto":
+                if self.backend not in self.BACKENDS:
+                    self.logger.error(f"Bilinmeyen DNN backend'i: {self.backend}")
+                    self.net = None
+                    return False
+                
+                backend_name, target_name = self.BACKENDS[self.backend]
+                self.net.setPreferableBackend(getattr(cv2.dnn, backend_name))
+                self.net.setPreferableTarget(getattr(cv2.dnn, target_name))
+                self.logger.info(f"{self.backend} backend etkinleştirildi")
+                self._load_output_layers()
+                return True
+            
             # Donanım hızlandırma dene ama güvenli bir şekilde
             has_acceleration = False
             
@@ -133,24 +193,30 @@ class YoloDetector:
             if not has_acceleration:
                 self.logger.warning("Donanım hızlandırma etkinleştirilemedi, CPU kullanılıyor")
             
-            # Çıkış katmanlarını al
-            layer_names = self.net.getLayerNames()
-            output_layers_indices = self.net.getUnconnectedOutLayers()
-            
-            # OpenCV versiyonuna bağlı olarak indis tipi değişebilir
-            if isinstance(output_layers_indices[0], (list, np.ndarray)):
-                self.output_layers = [layer_names[i[0] - 1] for i in output_layers_indices]
-            else:
-                self.output_layers = [layer_names[i - 1] for i in output_layers_indices]
-            
-            self.logger.info(f"YOLOv4-tiny modeli başarıyla yüklendi")
-            self.logger.info(f"Tespit edilebilir nesneler: {len(self.classes)} sınıf")
+            self._load_output_layers()
             return True
             
         except Exception as e:
             self.logger.error(f"YOLO modeli yüklenirken hata oluştu: {str(e)}")
+            self.net = None
             return False
     
+    def _load_output_layers(self):
+        """
+        Ağın çıkış katmanı adlarını alır.
+        """
+        layer_names = self.net.getLayerNames()
+        output_layers_indices = self.net.getUnconnectedOutLayers()
+        
+        # OpenCV versiyonuna bağlı olarak indis tipi değişebilir
+        if isinstance(output_layers_indices[0], (list, np.ndarray)):
+            self.output_layers = [layer_names[i[0] - 1] for i in output_layers_indices]
+        else:
+            self.output_layers = [layer_names[i - 1] for i in output_layers_indices]
+        
+        self.logger.info(f"YOLOv4-tiny modeli başarıyla yüklendi")
+        self.logger.info(f"Tespit edilebilir nesneler: {len(self.classes)} sınıf")
+    
     def detect(self, frame: np.ndarray) -> List[Dict[str, Any]]:
         """
         Verilen görüntüde nesneleri tespit eder.
@@ -169,23 +235,139 @@ class YoloDetector:
             self.logger.error("Boş görüntü")
             return []
         
-        # Performans izleme için zaman damgası
-        start_time = time.time()
-        
         # Görüntü boyutları
         height, width, _ = frame.shape
         
-        # Görüntüyü küçült (performans için)
-        from config import YOLO_INPUT_SIZE, LOW_PERFORMANCE_MODE
-        input_size = YOLO_INPUT_SIZE if 'YOLO_INPUT_SIZE' in globals() else 416
+        # İleri yayılım ve çıkışların çözümlenmesi (görüntü input_size'a küçültülür)
+        outputs = self._infer(frame, self.input_size)
+        boxes, confidences, class_ids = self._decode_outputs(outputs, width, height)
+        detections = self._build_detections(boxes, confidences, class_ids)
+        
+        # Tespit sayısını güncelle
+        self.detection_count = len(detections)
+        self.logger.debug(f"{len(detections)} nesne tespit edildi, çıkarım süresi: {self.last_inference_time:.3f} sn")
+        
+        return detections
+    
+    def detect_roi(self, frame: np.ndarray, roi: Optional[Tuple[int, int, int, int]] = None,
+                   input_size: int = YOLO_ROI_INPUT_SIZE) -> List[Dict[str, Any]]:
+        """
+        Görüntünün yalnızca bir bölgesinde (ROI) nesne tespiti yapar.
+        
+        Ağ, kırpılmış bölge üzerinde daha küçük giriş boyutuyla çalışır; böylece
+        küçük hedefler daha yüksek çözünürlükle ve daha kısa sürede işlenir.
+        Kutular tam görüntü koordinatlarına dönüştürülür.
+        
+        Args:
+            frame: İşlenecek görüntü
+            roi: Bölge (x, y, w, h). None ise tüm görüntü
+            input_size: YOLO giriş boyutu (32'nin katı)
+            
+        Returns:
+            List[Dict[str, Any]]: Tespit edilen nesneler listesi (tam görüntü koordinatlarında)
+        """
+        if self.net is None:
+            self.logger.error("YOLO modeli başlatılmamış")
+            return []
+            
+        if frame is None:
+            self.logger.error("Boş görüntü")
+            return []
+        
+        # Bölgeyi görüntü sınırlarına kırp
+        frame_height, frame_width = frame.shape[:2]
+        if roi is None:
+            roi = (0, 0, frame_width, frame_height)
+        x, y, w, h = [int(v) for v in roi]
+        x1, y1 = max(0, x), max(0, y)
+        x2, y2 = min(frame_width, x + w), min(frame_height, y + h)
+        
+        crop = frame[y1:y2, x1:x2]
+        if crop.size == 0:
+            return []
+        
+        outputs = self._infer(crop, input_size)
+        boxes, confidences, class_ids = self._decode_outputs(outputs, x2 - x1, y2 - y1)
+        detections = self._build_detections(boxes, confidences, class_ids, offset=(x1, y1))
+        
+        self.detection_count = len(detections)
+        self.logger.debug(f"ROI {(x1, y1, x2 - x1, y2 - y1)}: {len(detections)} nesne tespit edildi, "
+                          f"çıkarım süresi: {self.last_inference_time:.3f} sn")
+        
+        return detections
+    
+    def detect_batch(self, images: List[np.ndarray], input_size: Optional[int] = None,
+                     offsets: Optional[List[Tuple[int, int]]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Birden fazla görüntüde (kare, karo veya ROI kırpıntısı) tek ileri yayılımla tespit yapar.
+        
+        Görüntüler tek bir NCHW blob'da toplanır; çağrı başına sabit maliyet
+        (blob hazırlama, ağ çağrısı) tüm görüntülere bölünür.
+        
+        Args:
+            images: İşlenecek görüntüler (boyutları farklı olabilir)
+            input_size: YOLO giriş boyutu (None ise self.input_size)
+            offsets: Her görüntünün kutularına eklenecek (x, y) kayması (ROI kırpıntıları için)
+            
+        Returns:
+            List[List[Dict[str, Any]]]: Her görüntü için detect() ile aynı formatta tespit listesi
+        """
+        if self.net is None:
+            self.logger.error("YOLO modeli başlatılmamış")
+            return [[] for _ in images]
+        
+        if not images:
+            return []
+        
+        if input_size is None:
+            input_size = self.input_size
+        
+        # Tek blob, tek ileri yayılım
+        blob = cv2.dnn.blobFromImages(images, 1/255.0, (input_size, input_size), swapRB=True, crop=False)
+        outputs = self._forward(blob)
+        
+        # Çıkışları görüntü başına ayır
+        batch_size = len(images)
+        outputs = [output.reshape(batch_size, -1, output.shape[-1]) for output in outputs]
+        
+        results = []
+        for i, image in enumerate(images):
+            height, width = image.shape[:2]
+            boxes, confidences, class_ids = self._decode_outputs([output[i] for output in outputs], width, height)
+            offset = offsets[i] if offsets else (0, 0)
+            results.append(self._build_detections(boxes, confidences, class_ids, offset=offset))
+        
+        self.detection_count = sum(len(detections) for detections in results)
+        self.logger.debug(f"{batch_size} görüntüde {self.detection_count} nesne tespit edildi, "
+                          f"çıkarım süresi: {self.last_inference_time:.3f} sn")
         
-        # Düşük performans modunda daha küçük giriş boyutu
-        if 'LOW_PERFORMANCE_MODE' in globals() and LOW_PERFORMANCE_MODE:
-            input_size = 256
+        return results
+    
+    def _infer(self, image: np.ndarray, input_size: int) -> List[np.ndarray]:
+        """
+        Görüntüyü ağa verir ve çıkış katmanlarını döndürür.
+        
+        Args:
+            image: Ağa verilecek görüntü (tam kare veya kırpılmış bölge)
+            input_size: YOLO giriş boyutu
             
+        Returns:
+            List[np.ndarray]: Ağın çıkış katmanları
+        """
         # YOLO için görüntüyü hazırla
-        blob = cv2.dnn.blobFromImage(frame, 1/255.0, (input_size, input_size), swapRB=True, crop=False)
+        blob = cv2.dnn.blobFromImage(image, 1/255.0, (input_size, input_size), swapRB=True, crop=False)
+        return self._forward(blob)
+    
+    def _forward(self, blob: np.ndarray) -> List[np.ndarray]:
+        """
+        Hazırlanmış blob ile ileri yayılım yapar ve çıkarım istatistiklerini günceller.
         
+        Args:
+            blob: NCHW giriş blob'u
+            
+        Returns:
+            List[np.ndarray]: Ağın çıkış katmanları
+        """
         # İleri yayılım
         self.net.setInput(blob)
         start_time = time.time()
@@ -197,52 +379,28 @@ class YoloDetector:
         self.total_inference_time += inference_time
         self.inference_count += 1
         
-        # Tespit sonuçlarını işle
-        class_ids = []
-        confidences = []
-        boxes = []
-        
-        for output in outputs:
-            for detection in output:
-                scores = detection[5:]
-                class_id = np.argmax(scores)
-                confidence = scores[class_id]
-                
-                # Prioritize specified classes for better performance
-                class_name = self.classes[class_id] if class_id < len(self.classes) else "unknown"
-                
-                # Optimize with class filtering
-                from config import YOLO_DETECTION_CLASSES
-                if 'YOLO_DETECTION_CLASSES' in globals() and YOLO_DETECTION_CLASSES and class_name not in YOLO_DETECTION_CLASSES:
-                    if confidence < self.confidence_threshold + 0.1:  # Higher threshold for non-priority classes
-                        continue
-                
-                if confidence > self.confidence_threshold:
-                    # Nesne koordinatları
-                    center_x = int(detection[0] * width)
-                    center_y = int(detection[1] * height)
-                    w = int(detection[2] * width)
-                    h = int(detection[3] * height)
-                    
-                    # Çok küçük tespitleri filtrele (muhtemelen yanlış pozitif)
-                    min_size = min(width, height) * 0.02  # Görüntünün %2'sinden küçük olanları filtrele
-                    if w < min_size or h < min_size:
-                        continue
-                    
-                    # Dikdörtgen koordinatları
-                    x = int(center_x - w / 2)
-                    y = int(center_y - h / 2)
-                    
-                    # Listeye ekle
-                    boxes.append([x, y, w, h])
-                    confidences.append(float(confidence))
-                    class_ids.append(class_id)
+        return outputs
+    
+    def _build_detections(self, boxes: List[List[int]], confidences: List[float], class_ids: List[int],
+                          offset: Tuple[int, int] = (0, 0)) -> List[Dict[str, Any]]:
+        """
+        NMS uygular ve çözümlenmiş kutulardan tespit listesini oluşturur.
         
+        Args:
+            boxes: Kutular (x, y, w, h)
+            confidences: Güven değerleri
+            class_ids: Sınıf ID'leri
+            offset: Kutulara eklenecek (x, y) kayması (ROI tespitinde bölge köşesi)
+            
+        Returns:
+            List[Dict[str, Any]]: Tespit edilen nesneler listesi
+        """
         # Non-maximum suppression ile gereksiz kutuları kaldır
         indices = cv2.dnn.NMSBoxes(boxes, confidences, self.confidence_threshold, self.nms_threshold)
         
         # Sonuçları biçimlendir
         detections = []
+        offset_x, offset_y = offset
         
         try:
             # Tüm tespitleri işle
@@ -253,6 +411,8 @@ class YoloDetector:
                 
                 box = boxes[i]
                 x, y, w, h = box
+                x += offset_x
+                y += offset_y
                 
                 # Sınırlama kontrolü
                 x = max(0, x)
@@ -276,16 +436,92 @@ class YoloDetector:
             # Hata durumunda boş liste döndür
             return []
         
-        # Tespit sayısını güncelle
-        self.detection_count = len(detections)
-        self.logger.debug(f"{len(detections)} nesne tespit edildi, çıkarım süresi: {self.last_inference_time:.3f} sn")
-        
         return detections
     
+    def _get_priority_mask(self, num_classes: int) -> np.ndarray:
+        """
+        Ağ çıktısındaki her sınıf sütunu için öncelikli sınıf maskesini döndürür.
+        
+        Args:
+            num_classes: Ağ çıktısındaki sınıf skoru sayısı
+            
+        Returns:
+            np.ndarray: Öncelikli sınıflar için True olan boolean dizi
+        """
+        if self._priority_mask is None or len(self._priority_mask) != num_classes:
+            mask = np.zeros(num_classes, dtype=bool)
+            for class_id, class_name in enumerate(self.classes[:num_classes]):
+                if class_name in YOLO_DETECTION_CLASSES:
+                    mask[class_id] = True
+            self._priority_mask = mask
+            
+        return self._priority_mask
+    
+    def _decode_outputs(self, outputs: List[np.ndarray], width: int, height: int) -> Tuple[List[List[int]], List[float], List[int]]:
+        """
+        YOLO çıkış katmanlarını tek seferde (NumPy ile) çözümler.
+        
+        Eşik, öncelikli sınıf ve minimum boyut filtreleri satır satır döngü
+        yerine maskelerle uygulanır.
+        
+        Args:
+            outputs: Ağın çıkış katmanları
+            width: Görüntü genişliği
+            height: Görüntü yüksekliği
+            
+        Returns:
+            Tuple[List[List[int]], List[float], List[int]]: (kutular, güven değerleri, sınıf ID'leri)
+        """
+        # Tüm çıkışları tek bir matriste birleştir
+        if len(outputs) == 1:
+            rows = outputs[0].reshape(-1, outputs[0].shape[-1])
+        else:
+            rows = np.concatenate([output.reshape(-1, output.shape[-1]) for output in outputs], axis=0)
+        
+        if rows.shape[0] == 0:
+            return [], [], []
+        
+        # Sınıf ID'leri ve güven değerleri
+        scores = rows[:, 5:]
+        class_ids = np.argmax(scores, axis=1)
+        confidences = scores[np.arange(scores.shape[0]), class_ids]
+        
+        # Eşik maskesi - öncelikli olmayan sınıflar için daha yüksek eşik
+        keep = confidences > self.confidence_threshold
+        if YOLO_DETECTION_CLASSES:
+            priority = self._get_priority_mask(scores.shape[1])[class_ids]
+            keep &= priority | (confidences >= self.confidence_threshold + 0.1)
+        
+        if not keep.any():
+            return [], [], []
+        
+        rows = rows[keep]
+        class_ids = class_ids[keep]
+        confidences = confidences[keep]
+        
+        # Nesne koordinatları (int() ile aynı şekilde sıfıra doğru kırpılır)
+        center_x = (rows[:, 0] * width).astype(np.int32)
+        center_y = (rows[:, 1] * height).astype(np.int32)
+        w = (rows[:, 2] * width).astype(np.int32)
+        h = (rows[:, 3] * height).astype(np.int32)
+        
+        # Çok küçük tespitleri filtrele (muhtemelen yanlış pozitif)
+        min_size = min(width, height) * 0.02  # Görüntünün %2'sinden küçük olanları filtrele
+        size_ok = (w >= min_size) & (h >= min_size)
+        
+        # Dikdörtgen koordinatları
+        x = (center_x[size_ok] - w[size_ok] / 2).astype(np.int32)
+        y = (center_y[size_ok] - h[size_ok] / 2).astype(np.int32)
+        boxes = np.stack((x, y, w[size_ok], h[size_ok]), axis=1)
+        
+        return boxes.tolist(), confidences[size_ok].astype(float).tolist(), class_ids[size_ok].tolist()
+    
     def classify_balloons(self, frame: np.ndarray, detections: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
         Tespit edilen balonları renk bazında sınıflandırır (kırmızı/mavi).
         
+        Renkler önceden hesaplanmış BGR arama tablosuyla bulunur (bkz. ColorClassifier).
+        
         Args:
             frame: İşlenecek görüntü
             detections: Tespit edilen nesneler listesi
@@ -293,38 +529,15 @@ class YoloDetector:
         Returns:
             List[Dict[str, Any]]: Renk sınıflandırması eklenmiş tespit listesi
         """
-        for i, detection in enumerate(detections):
-            if "balloon" in detection["class_name"]:
-                # Balon kutusu
-                x, y, w, h = detection["box"]
-                
-                # Görüntü sınırlarını kontrol et
-                if x < 0 or y < 0 or x+w > frame.shape[1] or y+h > frame.shape[0]:
-                    continue
-                
-                # Balon bölgesini al
-                balloon_roi = frame[y:y+h, x:x+w]
-                
-                if balloon_roi.size == 0:
-                    continue
-                
-                # HSV'ye dönüştür
-                hsv_roi = cv2.cvtColor(balloon_roi, cv2.COLOR_BGR2HSV)
-                
-                # Ortalama H (Hue) değerini hesapla
-                h_channel = hsv_roi[:, :, 0]
-                average_h = np.mean(h_channel)
-                
-                # Renk sınıflandırması
-                if 0 <= average_h <= 10 or 170 <= average_h <= 180:
-                    detection["color"] = "red"
-                    detection["is_enemy"] = True
-                elif 100 <= average_h <= 140:
-                    detection["color"] = "blue"
-                    detection["is_enemy"] = False
-                else:
-                    detection["color"] = "unknown"
-                    detection["is_enemy"] = False
+        balloons = [d for d in detections if "balloon" in d["class_name"]]
+        if not balloons:
+            return detections
+        
+        colors = self.color_classifier.classify_boxes(frame, [d["box"] for d in balloons])
+        
+        for detection, color in zip(balloons, colors):
+            detection["color"] = color
+            detection["is_enemy"] = self.color_classifier.is_enemy(color)
                 
         return detections
     
@@ -358,7 +571,7 @@ class YoloDetector:
                 _, thresh = cv2.threshold(gray_roi, 127, 255, cv2.THRESH_BINARY)
                 
                 # Konturları bul
-                contours, _ = cv2.findContours(thresh, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+                contours, _ = cv2.findContours(thresh, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
                 
                 if not contours:
                     detection["shape"] = "unknown"
@@ -425,18 +638,23 @@ class YoloDetector:
         enemy_detections = [d for d in detections if d.get("is_enemy", False)]
         return self.find_closest_target(enemy_detections, frame_center)
     
-    def draw_detections(self, frame: np.ndarray, detections: List[Dict[str, Any]]) -> np.ndarray:
+    def draw_detections(self, frame: np.ndarray, detections: List[Dict[str, Any]], in_place: bool = False) -> np.ndarray:
         """
         Tespitleri görüntü üzerine çizer.
         
+        Saydam dolgu yalnızca kutu bölgesinde karıştırılır; çizim maliyeti
+        kare boyutuyla değil kutu alanıyla orantılıdır.
+        
         Args:
             frame: Görüntü
             detections: Tespit edilen nesneler listesi
+            in_place: True ise doğrudan verilen görüntüye çizer (kopya yapılmaz)
             
         Returns:
             np.ndarray: Çizimler eklenmiş görüntü
         """
-        frame_out = frame.copy()
+        frame_out = frame if in_place else frame.copy()
+        frame_height, frame_width = frame_out.shape[:2]
         
         for detection in detections:
             x, y, w, h = detection["box"]
@@ -465,10 +683,14 @@ class YoloDetector:
             # Merkez noktası
             center_x, center_y = detection["center"]
             
-            # Kutuyu çiz (hafif saydam)
-            overlay = frame_out.copy()
-            cv2.rectangle(overlay, (x, y), (x + w, y + h), border_color, -1)  # Dolgulu
-            cv2.addWeighted(overlay, 0.2, frame_out, 0.8, 0, frame_out)  # %20 opaklık
+            # Kutuyu çiz (hafif saydam) - yalnızca kutu bölgesinde karıştır
+            x1, y1 = max(0, x), max(0, y)
+            x2, y2 = min(frame_width, x + w), min(frame_height, y + h)
+            if x2 > x1 and y2 > y1:
+                roi = frame_out[y1:y2, x1:x2]
+                fill = np.empty_like(roi)
+                fill[:] = border_color
+                frame_out[y1:y2, x1:x2] = cv2.addWeighted(fill, 0.2, roi, 0.8, 0)  # %20 opaklık
             
             # Kutunun kenarlarını çiz
             cv2.rectangle(frame_out, (x, y), (x + w, y + h), border_color, 2)
@@ -477,11 +699,12 @@ class YoloDetector:
             cv2.circle(frame_out, (center_x, center_y), 3, (0, 255, 255), -1)
             
             # Etiket arka planı
-            text_size = cv2.getTextSize(f"{label} {confidence:.2f}", cv2.FONT_HERSHEY_SIMPLEX, 0.5, 2)[0]
-            cv2.rectangle(frame_out, (x, y - 25), (x + text_size[0] + 10, y), border_color, -1)
+            text = f"{label} {confidence:.2f}"
+            text_width = _label_width(label, 0.5, 2)
+            cv2.rectangle(frame_out, (x, y - 25), (x + text_width + 10, y), border_color, -1)
             
             # Etiketi çiz
-            cv2.putText(frame_out, f"{label} {confidence:.2f}", (x + 5, y - 7),
+            cv2.putText(frame_out, text, (x + 5, y - 7),
                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2)  # Beyaz metin
         
         # Performans bilgisini ekle